@@ -0,0 +1,36 @@
+"""add index on books publication_date and manuscripts due_date
+
+Revision ID: 4b67ee9ef67c
+Revises: b0650b658695
+Create Date: 2026-10-19 17:10:04.281937
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "4b67ee9ef67c"
+down_revision = "b0650b658695"
+branch_labels = None
+depends_on = None
+
+
+# The date columns are the ones collection queries filter by range and
+# sort on, so they get btree indexes rather than hash ones.
+def upgrade():
+    op.execute(
+        """
+CREATE INDEX idx_books_publication_date ON books (publication_date);
+CREATE INDEX idx_manuscripts_due_date ON manuscripts (due_date);
+"""
+    )
+
+
+def downgrade():
+    op.execute(
+        """
+DROP INDEX idx_manuscripts_due_date;
+DROP INDEX idx_books_publication_date;
+"""
+    )
@@ -0,0 +1,49 @@
+"""add keyset indexes on foreign keys
+
+Revision ID: 5e0c2a9d7f41
+Revises: 4b67ee9ef67c
+Create Date: 2026-10-19 18:02:37.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "5e0c2a9d7f41"
+down_revision = "4b67ee9ef67c"
+branch_labels = None
+depends_on = None
+
+
+# The nested collection endpoints page through an outer row's inner rows
+# in primary key order, seeking past the previous page's last key. A
+# btree index on (foreign key, primary key) lets each page be read as
+# one index range, where the hash indexes on the foreign keys would
+# need every row for the outer row fetched and sorted. The association
+# tables' primary keys already serve the author endpoints.
+def upgrade():
+    op.execute(
+        """
+CREATE INDEX idx_books_editor_id_book_id ON books (editor_id, book_id);
+CREATE INDEX idx_books_series_id_book_id ON books (series_id, book_id);
+CREATE INDEX idx_manuscripts_editor_id_manuscript_id
+    ON manuscripts (editor_id, manuscript_id);
+CREATE INDEX idx_manuscripts_series_id_manuscript_id
+    ON manuscripts (series_id, manuscript_id);
+CREATE INDEX idx_clients_salesperson_id_client_id
+    ON clients (salesperson_id, client_id);
+"""
+    )
+
+
+def downgrade():
+    op.execute(
+        """
+DROP INDEX idx_clients_salesperson_id_client_id;
+DROP INDEX idx_manuscripts_series_id_manuscript_id;
+DROP INDEX idx_manuscripts_editor_id_manuscript_id;
+DROP INDEX idx_books_series_id_book_id;
+DROP INDEX idx_books_editor_id_book_id;
+"""
+    )
@@ -0,0 +1,101 @@
+"""partition sales_records by year
+
+Revision ID: 6a789c63469d
+Revises: 782cc7fa5c1b
+Create Date: 2026-10-19 13:47:05.611284
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "6a789c63469d"
+down_revision = "782cc7fa5c1b"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The table is rebuilt as a partitioned one with a partition for each
+    # year it has rows for, plus a default partition. The sequence moves
+    # to the new table so ids carry on where they left off.
+    op.execute(
+        """
+LOCK TABLE sales_records IN ACCESS EXCLUSIVE MODE;
+ALTER TABLE sales_records RENAME TO sales_records_unpartitioned;
+DROP INDEX idx_sales_records_book_id;
+CREATE TABLE sales_records (
+    sales_record_id INTEGER NOT NULL
+        DEFAULT nextval('sales_records_sales_record_id_seq'),
+    book_id INT,
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    copies_sold INTEGER,
+    gross_profit NUMERIC,
+    net_profit NUMERIC,
+    PRIMARY KEY (sales_record_id, year),
+    CONSTRAINT fk_book FOREIGN KEY (book_id)
+        REFERENCES books (book_id) ON DELETE RESTRICT
+) PARTITION BY RANGE (year);
+ALTER SEQUENCE sales_records_sales_record_id_seq
+    OWNED BY sales_records.sales_record_id;
+CREATE TABLE sales_records_default PARTITION OF sales_records DEFAULT;
+DO $$
+DECLARE
+    partition_year INTEGER;
+BEGIN
+    FOR partition_year IN
+        SELECT DISTINCT year FROM sales_records_unpartitioned ORDER BY year
+    LOOP
+        EXECUTE format(
+            'CREATE TABLE sales_records_y%s PARTITION OF sales_records '
+            'FOR VALUES FROM (%s) TO (%s)',
+            partition_year, partition_year, partition_year + 1
+        );
+    END LOOP;
+END
+$$;
+INSERT INTO sales_records (sales_record_id, book_id, year, month, copies_sold,
+                           gross_profit, net_profit)
+    SELECT sales_record_id, book_id, year, month, copies_sold, gross_profit,
+           net_profit
+    FROM sales_records_unpartitioned;
+DROP TABLE sales_records_unpartitioned;
+CREATE INDEX idx_sales_records_book_id ON sales_records USING hash(book_id);
+"""
+    )
+
+
+def downgrade():
+    op.execute(
+        """
+LOCK TABLE sales_records IN ACCESS EXCLUSIVE MODE;
+ALTER TABLE sales_records RENAME TO sales_records_partitioned;
+DROP INDEX idx_sales_records_book_id;
+ALTER TABLE sales_records_partitioned DROP CONSTRAINT fk_book;
+CREATE TABLE sales_records (
+    sales_record_id INTEGER PRIMARY KEY
+        DEFAULT nextval('sales_records_sales_record_id_seq'),
+    book_id INT,
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    copies_sold INTEGER,
+    gross_profit NUMERIC,
+    net_profit NUMERIC
+);
+ALTER SEQUENCE sales_records_sales_record_id_seq
+    OWNED BY sales_records.sales_record_id;
+INSERT INTO sales_records
+    SELECT sales_record_id, book_id, year, month, copies_sold, gross_profit,
+           net_profit
+    FROM sales_records_partitioned;
+DROP TABLE sales_records_partitioned;
+ALTER TABLE sales_records
+ADD CONSTRAINT fk_book
+FOREIGN KEY (book_id)
+REFERENCES books (book_id)
+ON DELETE RESTRICT;
+CREATE INDEX idx_sales_records_book_id ON sales_records USING hash(book_id);
+"""
+    )
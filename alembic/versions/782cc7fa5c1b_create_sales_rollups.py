@@ -0,0 +1,82 @@
+"""create sales rollups
+
+Revision ID: 782cc7fa5c1b
+Revises: ac8b8ff6849d
+Create Date: 2026-10-19 10:12:41.502318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "782cc7fa5c1b"
+down_revision = "ac8b8ff6849d"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        """
+CREATE TABLE book_year_sales (
+    book_id INTEGER NOT NULL,
+    year INTEGER NOT NULL,
+    copies_sold BIGINT NOT NULL,
+    gross_profit NUMERIC NOT NULL,
+    net_profit NUMERIC NOT NULL,
+    PRIMARY KEY (book_id, year)
+);
+CREATE TABLE series_year_sales (
+    series_id INTEGER NOT NULL,
+    year INTEGER NOT NULL,
+    copies_sold BIGINT NOT NULL,
+    gross_profit NUMERIC NOT NULL,
+    net_profit NUMERIC NOT NULL,
+    PRIMARY KEY (series_id, year)
+);
+CREATE TABLE editor_year_sales (
+    editor_id INTEGER NOT NULL,
+    year INTEGER NOT NULL,
+    copies_sold BIGINT NOT NULL,
+    gross_profit NUMERIC NOT NULL,
+    net_profit NUMERIC NOT NULL,
+    PRIMARY KEY (editor_id, year)
+);
+CREATE TABLE sales_rollup_months (
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    rolled_up_at TIMESTAMP NOT NULL DEFAULT now(),
+    PRIMARY KEY (year, month)
+);
+INSERT INTO sales_rollup_months (year, month)
+    SELECT DISTINCT year, month FROM sales_records;
+INSERT INTO book_year_sales
+    SELECT book_id, year, sum(copies_sold), sum(gross_profit), sum(net_profit)
+    FROM sales_records
+    GROUP BY book_id, year;
+INSERT INTO series_year_sales
+    SELECT books.series_id, year, sum(copies_sold), sum(gross_profit),
+           sum(net_profit)
+    FROM sales_records JOIN books ON books.book_id = sales_records.book_id
+    WHERE books.series_id IS NOT NULL
+    GROUP BY books.series_id, year;
+INSERT INTO editor_year_sales
+    SELECT books.editor_id, year, sum(copies_sold), sum(gross_profit),
+           sum(net_profit)
+    FROM sales_records JOIN books ON books.book_id = sales_records.book_id
+    WHERE books.editor_id IS NOT NULL
+    GROUP BY books.editor_id, year;
+"""
+    )
+
+
+def downgrade():
+    op.execute(
+        """
+DROP TABLE sales_rollup_months;
+DROP TABLE editor_year_sales;
+DROP TABLE series_year_sales;
+DROP TABLE book_year_sales;
+"""
+    )
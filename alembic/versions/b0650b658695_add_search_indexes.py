@@ -0,0 +1,73 @@
+"""add search indexes
+
+Revision ID: b0650b658695
+Revises: 6a789c63469d
+Create Date: 2026-10-19 15:20:37.118042
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b0650b658695"
+down_revision = "6a789c63469d"
+branch_labels = None
+depends_on = None
+
+
+# The expressions have to match the ones in risuspubl/api/search.py
+# for the indexes to be used. The trigram indexes need the pg_trgm
+# extension; where it isn't available they're skipped, and searches fall
+# back to ILIKE.
+def upgrade():
+    op.execute(
+        """
+CREATE INDEX idx_books_title_tsv ON books
+    USING gin(to_tsvector('english', title));
+CREATE INDEX idx_manuscripts_working_title_tsv ON manuscripts
+    USING gin(to_tsvector('english', working_title));
+CREATE INDEX idx_series_title_tsv ON series
+    USING gin(to_tsvector('english', title));
+CREATE INDEX idx_authors_name_tsv ON authors
+    USING gin(to_tsvector('english', first_name || ' ' || last_name));
+CREATE INDEX idx_authors_metadata_biography_tsv ON authors_metadata
+    USING gin(to_tsvector('english', biography));
+"""
+    )
+    trgm_available = (
+        op.get_bind()
+        .execute(
+            sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        )
+        .scalar()
+    )
+    if not trgm_available:
+        return
+    op.execute(
+        """
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX idx_books_title_trgm ON books USING gin(title gin_trgm_ops);
+CREATE INDEX idx_manuscripts_working_title_trgm ON manuscripts
+    USING gin(working_title gin_trgm_ops);
+CREATE INDEX idx_series_title_trgm ON series USING gin(title gin_trgm_ops);
+CREATE INDEX idx_authors_name_trgm ON authors
+    USING gin((first_name || ' ' || last_name) gin_trgm_ops);
+"""
+    )
+
+
+def downgrade():
+    op.execute(
+        """
+DROP INDEX idx_authors_metadata_biography_tsv;
+DROP INDEX idx_authors_name_tsv;
+DROP INDEX IF EXISTS idx_authors_name_trgm;
+DROP INDEX idx_series_title_tsv;
+DROP INDEX IF EXISTS idx_series_title_trgm;
+DROP INDEX idx_manuscripts_working_title_tsv;
+DROP INDEX IF EXISTS idx_manuscripts_working_title_trgm;
+DROP INDEX idx_books_title_tsv;
+DROP INDEX IF EXISTS idx_books_title_trgm;
+"""
+    )
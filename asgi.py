@@ -0,0 +1,7 @@
+#!/usr/bin/python3
+
+from risuspubl.asyncapp import create_asgi_app
+
+
+# Serve with an ASGI server, e.g. `uvicorn asgi:app --workers 4`.
+app = create_asgi_app()
@@ -0,0 +1,214 @@
+#!/usr/bin/python3
+
+"""
+Compares the sync (WSGI) and async (ASGI) serving paths for the
+read-only books, series and sales_records routes under high
+concurrency. Each target is sent requests over --connections concurrent
+keep-alive connections for --duration seconds, and its throughput and
+latency percentiles are recorded to JSON.
+
+Both servers have to be started first, against a database loaded by
+datagen.py, e.g.:
+
+    gunicorn -w 4 -k gthread --threads 32 -b 127.0.0.1:5000 wsgi:app
+    uvicorn --workers 4 --port 5001 asgi:app
+
+Usage: python benchmarks/bench_async.py [--sync-url URL] [--async-url URL]
+       [--connections N] [--duration SECONDS] [--endpoints REGEX]
+       [--db-uri URI] [--json PATH]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import sys
+import time
+from os.path import abspath, dirname
+from urllib.parse import urlsplit
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from bench_endpoints import git_commit, percentile, sample_arguments  # noqa: E402
+from datagen import DEFAULT_DB_URI  # noqa: E402
+from risuspubl.asyncapp import url_map  # noqa: E402
+from risuspubl.dbmodels import db  # noqa: E402
+from risuspubl.flaskapp import create_app  # noqa: E402
+
+
+def sample_paths(db_uri, endpoints_re):
+    """
+    Builds request paths for the routes the async app serves, with URL
+    arguments sampled from the database.
+
+    :db_uri: A postgresql:// URI.
+    :endpoints_re: A compiled regex that endpoint names must match, or
+    None.
+    :return: A list of str paths.
+    """
+    async_endpoints = {rule.endpoint for rule in url_map.iter_rules()}
+    app = create_app(dict(SQLALCHEMY_DATABASE_URI=db_uri, SQLALCHEMY_ECHO=False))
+    paths = list()
+    with app.app_context():
+        for rule in app.url_map.iter_rules():
+            if rule.endpoint not in async_endpoints or (
+                endpoints_re is not None and not endpoints_re.search(rule.endpoint)
+            ):
+                continue
+            for arguments in sample_arguments(rule):
+                paths.append(rule.build(arguments, append_unknown=False)[1])
+        db.engine.dispose()
+    return paths
+
+
+async def read_response(reader):
+    # Reads one HTTP/1.1 response, discarding the body. Returns the
+    # status code and whether the connection can be reused.
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionResetError("connection closed by server")
+    version, status = status_line.split(b" ", 2)[:2]
+    headers = dict()
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.partition(b":")
+        headers[name.strip().lower()] = value.strip().lower()
+    keep_alive = headers.get(b"connection") != b"close" and (
+        version == b"HTTP/1.1" or headers.get(b"connection") == b"keep-alive"
+    )
+    if b"content-length" in headers:
+        await reader.readexactly(int(headers[b"content-length"]))
+    elif headers.get(b"transfer-encoding") == b"chunked":
+        while True:
+            chunk_size = int((await reader.readline()).split(b";")[0], 16)
+            await reader.readexactly(chunk_size + 2)
+            if chunk_size == 0:
+                break
+    else:
+        await reader.read()
+        keep_alive = False
+    return int(status), keep_alive
+
+
+async def connection_worker(host, port, paths, deadline, latencies, failures):
+    # Sends requests one after another over a single connection,
+    # reconnecting whenever the server closes it.
+    reader = writer = None
+    while time.perf_counter() < deadline:
+        if writer is None:
+            try:
+                reader, writer = await asyncio.open_connection(host, port)
+            except OSError:
+                failures.append("connect")
+                await asyncio.sleep(0.1)
+                continue
+        path = random.choice(paths)
+        start = time.perf_counter()
+        writer.write(
+            f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\n\r\n".encode("latin1")
+        )
+        try:
+            status, keep_alive = await read_response(reader)
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            failures.append("read")
+            writer.close()
+            writer = None
+            continue
+        latencies.append(time.perf_counter() - start)
+        if status >= 500:
+            failures.append(status)
+        if not keep_alive:
+            writer.close()
+            writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def run_load(url, paths, connection_count, duration):
+    """
+    Sends requests to a server over connection_count concurrent
+    connections for duration seconds.
+
+    :url: The server's base URL.
+    :paths: A list of paths to choose requests from.
+    :connection_count: The number of concurrent connections.
+    :duration: The number of seconds to run for.
+    :return: A dict of results.
+    """
+    url_parts = urlsplit(url)
+    latencies = list()
+    failures = list()
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(
+        *(
+            connection_worker(
+                url_parts.hostname,
+                url_parts.port or 80,
+                paths,
+                deadline,
+                latencies,
+                failures,
+            )
+            for _ in range(connection_count)
+        )
+    )
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return dict(
+        url=url,
+        connections=connection_count,
+        requests=len(latencies),
+        failures=len(failures),
+        throughput_rps=len(latencies) / elapsed,
+        p50_ms=percentile(latencies, 0.50) * 1000 if latencies else None,
+        p90_ms=percentile(latencies, 0.90) * 1000 if latencies else None,
+        p99_ms=percentile(latencies, 0.99) * 1000 if latencies else None,
+        max_ms=latencies[-1] * 1000 if latencies else None,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--sync-url", default="http://127.0.0.1:5000")
+    parser.add_argument("--async-url", default="http://127.0.0.1:5001")
+    parser.add_argument("--connections", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--endpoints", default=None)
+    parser.add_argument("--db-uri", default=DEFAULT_DB_URI)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", default=None)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    endpoints_re = re.compile(args.endpoints) if args.endpoints else None
+    paths = sample_paths(args.db_uri, endpoints_re)
+    results = dict()
+    print(
+        f"{'mode':<6} {'requests':>9} {'failures':>8} {'req/s':>9} {'p50 ms':>9} "
+        + f"{'p90 ms':>9} {'p99 ms':>9}"
+    )
+    for mode, url in (("sync", args.sync_url), ("async", args.async_url)):
+        result = results[mode] = asyncio.run(
+            run_load(url, paths, args.connections, args.duration)
+        )
+        print(
+            f"{mode:<6} {result['requests']:>9} {result['failures']:>8} "
+            + f"{result['throughput_rps']:>9.1f} {result['p50_ms'] or 0:>9.2f} "
+            + f"{result['p90_ms'] or 0:>9.2f} {result['p99_ms'] or 0:>9.2f}"
+        )
+
+    if args.json_path is not None:
+        with open(args.json_path, "w") as json_fh:
+            json.dump(
+                dict(git_commit=git_commit(), path_count=len(paths), results=results),
+                json_fh,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
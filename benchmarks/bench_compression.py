@@ -0,0 +1,117 @@
+#!/usr/bin/python3
+
+"""
+Measures the bandwidth/CPU tradeoff of each response content-coding
+and level on sales-record payloads shaped like the output of GET
+/sales_records/years/{year}.
+
+Usage: python benchmarks/bench_compression.py [--books N] [--repeat N]
+       [--json PATH]
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from os.path import abspath, dirname
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from risuspubl.compression import available_encodings, compress_bytes  # noqa: E402
+
+
+# The levels to try for each encoding, spanning fastest to smallest.
+_levels_by_encoding = {
+    "gzip": (1, 6, 9),
+    "br": (1, 4, 6, 9, 11),
+    "zstd": (1, 3, 9, 19),
+}
+
+
+def gen_sales_year_payload(book_count, year, seed=0):
+    """
+    Builds the JSON bytes for a year of sales records for book_count
+    books, in the same shape and order the sales_records endpoints emit.
+
+    :book_count: The number of books with sales that year.
+    :year: The year of the sales records.
+    :seed: A seed for the random number generator, for reproducibility.
+    :return: A bytes object.
+    """
+    rand = random.Random(seed)
+    records = list()
+    sales_record_id = 1
+    for month in range(1, 13):
+        for book_id in range(1, book_count + 1):
+            copies_sold = max(0, round(rand.gauss(87.5, 20)))
+            gross_profit = round(copies_sold * rand.uniform(7.5, 17.5), 2)
+            records.append(
+                {
+                    "sales_record_id": sales_record_id,
+                    "book_id": book_id,
+                    "year": year,
+                    "month": month,
+                    "copies_sold": copies_sold,
+                    "gross_profit": gross_profit,
+                    "net_profit": round(gross_profit * rand.uniform(0.075, 0.125), 2),
+                }
+            )
+            sales_record_id += 1
+    return json.dumps(records).encode("utf8")
+
+
+def bench_encoding(body, encoding, level, repeat):
+    # Compresses the body `repeat` times and returns the compressed
+    # size and the median wall-clock time per compression in seconds.
+    timings = list()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        compressed = compress_bytes(body, encoding, level)
+        timings.append(time.perf_counter() - start)
+    return len(compressed), statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--books", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--json", dest="json_path", default=None)
+    args = parser.parse_args()
+
+    results = list()
+    print(
+        f"{'books':>6} {'encoding':>8} {'level':>5} {'raw KiB':>9} {'out KiB':>9} "
+        + f"{'ratio':>6} {'ms':>8} {'MiB/s':>8}"
+    )
+    for book_count in args.books:
+        body = gen_sales_year_payload(book_count, 2020)
+        for encoding in available_encodings():
+            for level in _levels_by_encoding[encoding]:
+                size, seconds = bench_encoding(body, encoding, level, args.repeat)
+                result = dict(
+                    books=book_count,
+                    encoding=encoding,
+                    level=level,
+                    raw_bytes=len(body),
+                    compressed_bytes=size,
+                    ratio=len(body) / size,
+                    median_ms=seconds * 1000,
+                    mib_per_sec=len(body) / seconds / 2**20,
+                )
+                results.append(result)
+                print(
+                    f"{book_count:>6} {encoding:>8} {level:>5} "
+                    + f"{len(body) / 1024:>9.1f} {size / 1024:>9.1f} "
+                    + f"{result['ratio']:>6.1f} {result['median_ms']:>8.2f} "
+                    + f"{result['mib_per_sec']:>8.1f}"
+                )
+
+    if args.json_path is not None:
+        with open(args.json_path, "w") as json_fh:
+            json.dump(results, json_fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
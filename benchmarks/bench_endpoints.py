@@ -0,0 +1,401 @@
+#!/usr/bin/python3
+
+"""
+Drives every endpoint of every blueprint in API_MODULES against a
+database loaded by datagen.py, and records each endpoint's throughput
+and latency percentiles to a JSON file tagged with the git commit, for
+comparison between commits with compare.py.
+
+Usage: python benchmarks/bench_endpoints.py [--db-uri URI] [--requests N]
+       [--warmup N] [--endpoints REGEX] [--writes] [--row-cache]
+       [--seed N] [--json PATH]
+"""
+
+import argparse
+import json
+import platform
+import random
+import re
+import statistics
+import subprocess
+import sys
+import time
+from os.path import abspath, dirname, join as path_join
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+sys.path.insert(0, path_join(dirname(dirname(abspath(__file__))), "tests"))
+
+from sqlalchemy import text  # noqa: E402
+
+from conftest import Genius  # noqa: E402
+from datagen import DEFAULT_DB_URI  # noqa: E402
+from risuspubl.dbmodels import db  # noqa: E402
+from risuspubl.flaskapp import API_MODULES, create_app  # noqa: E402
+
+
+# How many sets of URL arguments are sampled from the database for each
+# endpoint; requests cycle through them in random order.
+_sample_size = 200
+
+# Queries that return valid URL arguments for a route, keyed by the set
+# of its URL variables. Each row's columns are named after the
+# variables.
+_sample_queries = {
+    frozenset(): "SELECT 1",
+    frozenset(("author_id",)): "SELECT DISTINCT author_id FROM authors_books",
+    frozenset(("author_id", "book_id")): "SELECT author_id, book_id FROM authors_books",
+    frozenset(("author_id", "manuscript_id")): (
+        "SELECT author_id, manuscript_id FROM authors_manuscripts"
+    ),
+    frozenset(("author1_id", "author2_id")): (
+        "SELECT ab1.author_id AS author1_id, ab2.author_id AS author2_id "
+        + "FROM authors_books ab1 JOIN authors_books ab2 "
+        + "ON ab1.book_id = ab2.book_id AND ab1.author_id < ab2.author_id"
+    ),
+    frozenset(("author1_id", "author2_id", "book_id")): (
+        "SELECT ab1.author_id AS author1_id, ab2.author_id AS author2_id, "
+        + "ab1.book_id FROM authors_books ab1 JOIN authors_books ab2 "
+        + "ON ab1.book_id = ab2.book_id AND ab1.author_id < ab2.author_id"
+    ),
+    frozenset(("author1_id", "author2_id", "manuscript_id")): (
+        "SELECT am1.author_id AS author1_id, am2.author_id AS author2_id, "
+        + "am1.manuscript_id FROM authors_manuscripts am1 "
+        + "JOIN authors_manuscripts am2 ON am1.manuscript_id = am2.manuscript_id "
+        + "AND am1.author_id < am2.author_id"
+    ),
+    frozenset(("book_id",)): "SELECT book_id FROM books",
+    frozenset(("client_id",)): "SELECT client_id FROM clients",
+    frozenset(("editor_id",)): "SELECT editor_id FROM editors",
+    frozenset(("editor_id", "book_id")): (
+        "SELECT editor_id, book_id FROM books WHERE editor_id IS NOT NULL"
+    ),
+    frozenset(("editor_id", "manuscript_id")): (
+        "SELECT editor_id, manuscript_id FROM manuscripts WHERE editor_id IS NOT NULL"
+    ),
+    frozenset(("manuscript_id",)): "SELECT manuscript_id FROM manuscripts",
+    frozenset(("sales_record_id",)): "SELECT sales_record_id FROM sales_records",
+    frozenset(("year",)): "SELECT DISTINCT year FROM sales_records",
+    frozenset(("year", "book_id")): (
+        "SELECT DISTINCT year, book_id FROM sales_records"
+    ),
+    frozenset(("year", "month")): "SELECT DISTINCT year, month FROM sales_records",
+    frozenset(("year", "month", "book_id")): (
+        "SELECT year, month, book_id FROM sales_records"
+    ),
+    frozenset(("salesperson_id",)): "SELECT salesperson_id FROM salespeople",
+    frozenset(("salesperson_id", "client_id")): (
+        "SELECT salesperson_id, client_id FROM clients "
+        + "WHERE salesperson_id IS NOT NULL"
+    ),
+    frozenset(("series_id",)): "SELECT series_id FROM series",
+    frozenset(("series_id", "book_id")): (
+        "SELECT series_id, book_id FROM books WHERE series_id IS NOT NULL"
+    ),
+    frozenset(("series_id", "manuscript_id")): (
+        "SELECT series_id, manuscript_id FROM manuscripts "
+        + "WHERE series_id IS NOT NULL"
+    ),
+}
+
+# Routes whose arguments need a narrower query than their variables
+# imply.
+_sample_queries_by_rule = {
+    "/authors/<int:author_id>/metadata": (
+        "SELECT author_id FROM authors_metadata WHERE author_id IS NOT NULL"
+    ),
+    "/authors/<int:author_id>/manuscripts": (
+        "SELECT DISTINCT author_id FROM authors_manuscripts"
+    ),
+    "/sales_records/books/<int:book_id>": (
+        "SELECT DISTINCT book_id FROM sales_records"
+    ),
+    "/editors/<int:editor_id>/books": (
+        "SELECT DISTINCT editor_id FROM books WHERE editor_id IS NOT NULL"
+    ),
+    "/editors/<int:editor_id>/manuscripts": (
+        "SELECT DISTINCT editor_id FROM manuscripts WHERE editor_id IS NOT NULL"
+    ),
+    "/salespeople/<int:salesperson_id>/clients": (
+        "SELECT DISTINCT salesperson_id FROM clients WHERE salesperson_id IS NOT NULL"
+    ),
+    "/series/<int:series_id>/books": (
+        "SELECT DISTINCT series_id FROM books WHERE series_id IS NOT NULL"
+    ),
+    "/series/<int:series_id>/manuscripts": (
+        "SELECT DISTINCT series_id FROM manuscripts WHERE series_id IS NOT NULL"
+    ),
+    "/sales_records/rollups/books/<int:book_id>": (
+        "SELECT DISTINCT book_id FROM book_year_sales"
+    ),
+    "/sales_records/rollups/series/<int:series_id>": (
+        "SELECT DISTINCT series_id FROM series_year_sales"
+    ),
+    "/sales_records/rollups/editors/<int:editor_id>": (
+        "SELECT DISTINCT editor_id FROM editor_year_sales"
+    ),
+    "/sales_records/rollups/years/<int:year>/books/<int:book_id>": (
+        "SELECT year, book_id FROM book_year_sales"
+    ),
+    "/sales_records/rollups/years/<int:year>/series/<int:series_id>": (
+        "SELECT year, series_id FROM series_year_sales"
+    ),
+    "/sales_records/rollups/years/<int:year>/editors/<int:editor_id>": (
+        "SELECT year, editor_id FROM editor_year_sales"
+    ),
+}
+
+# Routes that are never benchmarked. Every author already has metadata,
+# so creating it always fails.
+_skipped_routes = {("POST", "/authors/<int:author_id>/metadata")}
+
+
+def make_body_generators():
+    """
+    Builds the generators of request bodies for PATCH and POST, keyed
+    by the last static path segment of the route. Foreign keys are
+    chosen from rows that exist in the database.
+
+    :return: A dict mapping path segments to callables.
+    """
+
+    def sample_ids(table_name, id_column):
+        return db.session.execute(
+            text(f"SELECT {id_column} FROM {table_name} LIMIT :limit"),
+            dict(limit=_sample_size),
+        ).scalars().all() or [None]
+
+    editor_ids = sample_ids("editors", "editor_id")
+    series_ids = sample_ids("series", "series_id")
+    salesperson_ids = sample_ids("salespeople", "salesperson_id")
+    return {
+        "authors": Genius.gen_author_dict,
+        "books": lambda: Genius.gen_book_dict(
+            random.choice(editor_ids), random.choice(series_ids)
+        ),
+        "clients": lambda: Genius.gen_client_dict(random.choice(salesperson_ids)),
+        "editors": Genius.gen_editor_dict,
+        "manuscripts": lambda: Genius.gen_manuscript_dict(
+            random.choice(editor_ids), random.choice(series_ids)
+        ),
+        "metadata": Genius.gen_metadata_dict,
+        "salespeople": Genius.gen_salesperson_dict,
+        "series": Genius.gen_series_dict,
+    }
+
+
+def git_commit():
+    """
+    Returns the current git commit hash, with a '-dirty' suffix if the
+    working tree has uncommitted changes, or None outside a git checkout.
+
+    :return: A str or None.
+    """
+    repo_dir = dirname(dirname(abspath(__file__)))
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=repo_dir,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=repo_dir,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ("-dirty" if dirty else "")
+
+
+def percentile(sorted_values, fraction):
+    # Nearest-rank percentile of an already sorted list.
+    index = max(
+        0, min(len(sorted_values) - 1, round(fraction * len(sorted_values)) - 1)
+    )
+    return sorted_values[index]
+
+
+def collect_routes(app, methods):
+    """
+    Lists the routes of every blueprint in API_MODULES that accept one
+    of the given methods.
+
+    :app: The flask.Flask app.
+    :methods: A set of HTTP method names.
+    :return: A list of (method, werkzeug.routing.Rule) tuples.
+    """
+    blueprint_names = {api_module.blueprint.name for api_module in API_MODULES}
+    routes = list()
+    for rule in sorted(app.url_map.iter_rules(), key=lambda rule: rule.rule):
+        if rule.endpoint.split(".")[0] not in blueprint_names:
+            continue
+        for method in sorted(rule.methods & methods):
+            # PUT is an alias for PATCH throughout the API.
+            if method == "PUT" and "PATCH" in rule.methods:
+                continue
+            routes.append((method, rule))
+    return routes
+
+
+def sample_arguments(rule):
+    """
+    Samples valid sets of URL arguments for a route from the database.
+
+    :rule: A werkzeug.routing.Rule.
+    :return: A list of dicts mapping URL variable names to values.
+    """
+    query = (
+        _sample_queries_by_rule.get(rule.rule)
+        or _sample_queries[frozenset(rule.arguments)]
+    )
+    rows = db.session.execute(
+        text(f"SELECT * FROM ({query}) AS args ORDER BY random() LIMIT :limit"),
+        dict(limit=_sample_size),
+    ).mappings()
+    return [
+        {name: value for name, value in row.items() if name in rule.arguments}
+        for row in rows
+    ]
+
+
+def bench_route(
+    client, method, rule, arguments, body_generators, request_count, warmup_count
+):
+    """
+    Sends request_count requests (after warmup_count unmeasured ones) to
+    a route, cycling through the given URL arguments.
+
+    :client: A flask.testing.FlaskClient.
+    :method: The HTTP method.
+    :rule: A werkzeug.routing.Rule.
+    :arguments: A list of dicts of URL arguments.
+    :body_generators: A dict as returned by make_body_generators().
+    :request_count: The number of measured requests.
+    :warmup_count: The number of unmeasured requests sent first.
+    :return: A dict of results.
+    """
+    static_segments = [
+        segment for segment in rule.rule.split("/") if segment and segment[0] != "<"
+    ]
+    body_generator = static_segments and body_generators.get(static_segments[-1])
+    timings = list()
+    statuses = dict()
+    for index in range(warmup_count + request_count):
+        path = rule.build(arguments[index % len(arguments)], append_unknown=False)[1]
+        request_kwargs = dict()
+        if method in ("POST", "PATCH") and body_generator is not None:
+            request_kwargs["json"] = body_generator()
+        start = time.perf_counter()
+        response = client.open(path, method=method, **request_kwargs)
+        response.get_data()
+        elapsed = time.perf_counter() - start
+        if index >= warmup_count:
+            timings.append(elapsed)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    timings.sort()
+    return dict(
+        method=method,
+        rule=rule.rule,
+        endpoint=rule.endpoint,
+        requests=request_count,
+        errors=sum(count for status, count in statuses.items() if status >= 400),
+        statuses={str(status): count for status, count in sorted(statuses.items())},
+        throughput_rps=request_count / sum(timings),
+        mean_ms=statistics.fmean(timings) * 1000,
+        p50_ms=percentile(timings, 0.50) * 1000,
+        p90_ms=percentile(timings, 0.90) * 1000,
+        p99_ms=percentile(timings, 0.99) * 1000,
+        max_ms=timings[-1] * 1000,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--db-uri", default=DEFAULT_DB_URI)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--endpoints", default=None)
+    parser.add_argument("--writes", action="store_true")
+    parser.add_argument("--row-cache", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", default=None)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    Genius.faker_obj.seed_instance(args.seed)
+    config = dict(SQLALCHEMY_DATABASE_URI=args.db_uri, SQLALCHEMY_ECHO=False)
+    if args.row_cache:
+        config["ROW_CACHE_BACKEND"] = "lru"
+    app = create_app(config)
+
+    # Deletes are never sent, since they'd eat into the loaded data.
+    methods = {"GET", "PATCH", "PUT", "POST"} if args.writes else {"GET"}
+    endpoints_re = re.compile(args.endpoints) if args.endpoints else None
+
+    results = list()
+    print(
+        f"{'method':<6} {'route':<72} {'req/s':>8} {'p50 ms':>8} {'p90 ms':>8} "
+        + f"{'p99 ms':>8} {'errors':>6}"
+    )
+    with app.app_context(), app.test_client() as client:
+        body_generators = make_body_generators()
+        for method, rule in collect_routes(app, methods):
+            if (method, rule.rule) in _skipped_routes or (
+                endpoints_re is not None and not endpoints_re.search(rule.endpoint)
+            ):
+                continue
+            arguments = sample_arguments(rule)
+            db.session.rollback()
+            if not arguments:
+                print(f"{method:<6} {rule.rule:<72} skipped, no data")
+                continue
+            result = bench_route(
+                client,
+                method,
+                rule,
+                arguments,
+                body_generators,
+                args.requests,
+                args.warmup,
+            )
+            results.append(result)
+            print(
+                f"{method:<6} {rule.rule:<72} {result['throughput_rps']:>8.1f} "
+                + f"{result['p50_ms']:>8.2f} {result['p90_ms']:>8.2f} "
+                + f"{result['p99_ms']:>8.2f} {result['errors']:>6}"
+            )
+
+        row_counts = {
+            table_name: db.session.execute(
+                text(f"SELECT count(*) FROM {table_name}")
+            ).scalar()
+            for table_name in ("authors", "books", "manuscripts", "sales_records")
+        }
+
+    report = dict(
+        git_commit=git_commit(),
+        timestamp=time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        python=platform.python_version(),
+        platform=platform.platform(),
+        row_counts=row_counts,
+        settings=dict(
+            requests=args.requests,
+            warmup=args.warmup,
+            writes=args.writes,
+            row_cache=args.row_cache,
+            seed=args.seed,
+        ),
+        results=results,
+    )
+    json_path = args.json_path or f"bench-{(report['git_commit'] or 'nogit')[:12]}.json"
+    with open(json_path, "w") as json_fh:
+        json.dump(report, json_fh, indent=2)
+    print(f"wrote {json_path}")
+
+
+if __name__ == "__main__":
+    main()
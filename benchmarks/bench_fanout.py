@@ -0,0 +1,200 @@
+#!/usr/bin/python3
+
+"""
+Measures how much fan-out cuts the latency of the composite
+/authors/{author1_id}/{author2_id} endpoint when the database is
+far away. The app's connections go through a local proxy that delays
+traffic by --rtt-ms per round trip. Each endpoint is timed with
+FANOUT_MAX_CONCURRENCY set to 1 (one query after another) and then to
+--concurrency.
+
+Usage: python benchmarks/bench_fanout.py [--db-uri URI] [--rtt-ms MS]
+       [--concurrency N] [--requests N] [--json PATH]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import threading
+from os.path import abspath, dirname
+
+from sqlalchemy.engine import make_url
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from bench_endpoints import bench_route, git_commit, sample_arguments  # noqa: E402
+from datagen import DEFAULT_DB_URI  # noqa: E402
+from risuspubl.dbmodels import db  # noqa: E402
+from risuspubl.flaskapp import create_app  # noqa: E402
+
+
+# The endpoints that fan out. The other two-author endpoints run one
+# indexed query rather than loading each author.
+_fanout_endpoints = ("authors.disp_auths_by_auids_endpt",)
+
+
+class LatencyProxy:
+    """
+    A TCP proxy that forwards connections to a target, holding back the
+    data sent in each direction for half the given round trip time.
+    Runs its own event loop on a daemon thread.
+
+    :target_host: The host to forward to.
+    :target_port: The port to forward to.
+    :rtt: The round trip time to add, in seconds.
+    """
+
+    def __init__(self, target_host, target_port, rtt):
+        self.target_host = target_host
+        self.target_port = target_port
+        self.delay = rtt / 2
+        self.port = None
+
+    def start(self):
+        """
+        Starts the proxy listening on a free localhost port, which is
+        then set as self.port.
+
+        :return: None
+        """
+        started = threading.Event()
+
+        async def serve():
+            server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+            self.port = server.sockets[0].getsockname()[1]
+            started.set()
+            await server.serve_forever()
+
+        threading.Thread(
+            target=asyncio.run, args=(serve(),), name="latency-proxy", daemon=True
+        ).start()
+        started.wait()
+
+    async def _handle(self, client_reader, client_writer):
+        try:
+            upstream_reader, upstream_writer = await asyncio.open_connection(
+                self.target_host, self.target_port
+            )
+        except OSError:
+            client_writer.close()
+            return
+        await asyncio.gather(
+            self._pipe(client_reader, upstream_writer),
+            self._pipe(upstream_reader, client_writer),
+        )
+
+    async def _pipe(self, reader, writer):
+        # Data is queued with the time it's due and written out by a
+        # separate task, so a delay doesn't hold up reading.
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+
+        async def deliver():
+            while True:
+                due, data = await queue.get()
+                await asyncio.sleep(max(0.0, due - loop.time()))
+                if not data:
+                    writer.close()
+                    return
+                writer.write(data)
+                await writer.drain()
+
+        delivery = asyncio.create_task(deliver())
+        try:
+            while data := await reader.read(65536):
+                queue.put_nowait((loop.time() + self.delay, data))
+        except ConnectionError:
+            pass
+        queue.put_nowait((loop.time() + self.delay, b""))
+        try:
+            await delivery
+        except ConnectionError:
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--db-uri", default=DEFAULT_DB_URI)
+    parser.add_argument("--rtt-ms", type=float, default=20.0)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--json", dest="json_path", default=None)
+    args = parser.parse_args()
+
+    db_url = make_url(args.db_uri)
+    proxy = LatencyProxy(db_url.host, db_url.port or 5432, args.rtt_ms / 1000)
+    proxy.start()
+    proxied_uri = db_url.set(host="127.0.0.1", port=proxy.port).render_as_string(
+        hide_password=False
+    )
+
+    results = list()
+    arguments_by_endpoint = None
+    for concurrency in (1, args.concurrency):
+        app = create_app(
+            dict(
+                SQLALCHEMY_DATABASE_URI=proxied_uri,
+                SQLALCHEMY_ECHO=False,
+                FANOUT_MAX_CONCURRENCY=concurrency,
+                FANOUT_POOL_SIZE=max(concurrency, 1),
+                PROFILE_ENABLED=False,
+            )
+        )
+        client = app.test_client()
+        rules = [
+            rule
+            for rule in app.url_map.iter_rules()
+            if rule.endpoint in _fanout_endpoints
+        ]
+        with app.app_context():
+            # Both runs use the same URL arguments.
+            if arguments_by_endpoint is None:
+                arguments_by_endpoint = {
+                    rule.endpoint: sample_arguments(rule) for rule in rules
+                }
+            for rule in sorted(rules, key=lambda rule: rule.rule):
+                arguments = arguments_by_endpoint[rule.endpoint]
+                if not arguments:
+                    print(f"no sample arguments for {rule.rule}, skipping")
+                    continue
+                result = bench_route(
+                    client, "GET", rule, arguments, {}, args.requests, args.warmup
+                )
+                result["fanout_max_concurrency"] = concurrency
+                results.append(result)
+            db.engine.dispose()
+
+    print(f"database round trip time: {args.rtt_ms:.1f} ms")
+    print(
+        f"{'route':<64} {'serial p50':>10} {'fan-out p50':>11} {'change':>8} "
+        + f"{'errors':>6}"
+    )
+    serial_results = {
+        result["rule"]: result
+        for result in results
+        if result["fanout_max_concurrency"] == 1
+    }
+    for result in results:
+        if result["fanout_max_concurrency"] == 1:
+            continue
+        serial_result = serial_results[result["rule"]]
+        change = (result["p50_ms"] / serial_result["p50_ms"] - 1) * 100
+        print(
+            f"{result['rule']:<64} {serial_result['p50_ms']:>10.2f} "
+            + f"{result['p50_ms']:>11.2f} {change:>+7.1f}% "
+            + f"{serial_result['errors'] + result['errors']:>6}"
+        )
+
+    if args.json_path is not None:
+        with open(args.json_path, "w") as json_fh:
+            json.dump(
+                dict(git_commit=git_commit(), rtt_ms=args.rtt_ms, results=results),
+                json_fh,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+#!/usr/bin/python3
+
+"""
+Measures the ORM's per-call overhead on the hot-path lookups, comparing
+the legacy Query API the endpoints used to build on each call with the
+select() statements they now build once with bound parameters, which
+hit SQLAlchemy's compiled cache. Each lookup is timed both ways in the
+same session, and the time spent in the database driver (between the
+cursor execute events) is subtracted to leave the ORM's share.
+
+Load some data first, e.g.:
+
+    python benchmarks/datagen.py --scale tiny
+
+Usage: python benchmarks/bench_orm.py [--db-uri URI] [--repeat N]
+       [--json PATH]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from os.path import abspath, dirname
+
+from sqlalchemy import event, func, select
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from bench_endpoints import git_commit  # noqa: E402
+from datagen import DEFAULT_DB_URI  # noqa: E402
+from risuspubl.api.sales_records import (  # noqa: E402
+    _min_and_max_year_stmt,
+    _slrcds_by_bkid_stmt,
+    _slrcds_by_yr_mo_stmt,
+)
+from risuspubl.api.utility import select_by_column  # noqa: E402
+from risuspubl.dbmodels import Client, SalesRecord, db  # noqa: E402
+from risuspubl.flaskapp import create_app  # noqa: E402
+
+
+class DriverTimer:
+    """
+    Adds up the time spent between before_cursor_execute and
+    after_cursor_execute on an engine, i.e. in the DBAPI driver and the
+    database.
+
+    :engine: A sqlalchemy.engine.Engine.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.elapsed = 0.0
+        self._started = None
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        self._started = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        self.elapsed += time.perf_counter() - self._started
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._before)
+        event.listen(self.engine, "after_cursor_execute", self._after)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(self.engine, "before_cursor_execute", self._before)
+        event.remove(self.engine, "after_cursor_execute", self._after)
+
+
+def _lookups(book_id, salesperson_id, year, month):
+    # Each lookup as (name, legacy callable, statement callable). Both
+    # return the same rows.
+    clients_by_salesperson_stmt = select_by_column(Client, "salesperson_id")
+    return (
+        (
+            "clients by salesperson_id",
+            lambda: Client.query.filter_by(salesperson_id=salesperson_id).all(),
+            lambda: db.session.scalars(
+                clients_by_salesperson_stmt, dict(salesperson_id=salesperson_id)
+            ).all(),
+        ),
+        (
+            "sales records by book_id",
+            lambda: SalesRecord.query.where(SalesRecord.book_id == book_id).all(),
+            lambda: db.session.scalars(
+                _slrcds_by_bkid_stmt, dict(book_id=book_id)
+            ).all(),
+        ),
+        (
+            "sales records by year and month",
+            lambda: SalesRecord.query.where(SalesRecord.year == year)
+            .where(SalesRecord.month == month)
+            .all(),
+            lambda: db.session.scalars(
+                _slrcds_by_yr_mo_stmt, dict(year=year, month=month)
+            ).all(),
+        ),
+        (
+            "min and max year",
+            lambda: (
+                db.session.query(func.min(SalesRecord.year)).scalar(),
+                db.session.query(func.max(SalesRecord.year)).scalar(),
+            ),
+            lambda: db.session.execute(_min_and_max_year_stmt).one(),
+        ),
+    )
+
+
+def bench_lookup(call, repeat, timer):
+    """
+    Times a lookup, splitting each call's time into the time in the
+    driver and the rest.
+
+    :call: A callable that runs the lookup.
+    :repeat: How many times to run it.
+    :timer: A DriverTimer on the engine the lookup uses.
+    :return: A dict of results, in microseconds per call.
+    """
+    # One untimed call so both variants start with warm caches.
+    call()
+    totals = list()
+    overheads = list()
+    for _ in range(repeat):
+        driver_before = timer.elapsed
+        start = time.perf_counter()
+        call()
+        total = time.perf_counter() - start
+        db.session.expunge_all()
+        totals.append(total)
+        overheads.append(total - (timer.elapsed - driver_before))
+    return dict(
+        median_total_us=statistics.median(totals) * 1e6,
+        median_orm_us=statistics.median(overheads) * 1e6,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--db-uri", default=DEFAULT_DB_URI)
+    parser.add_argument("--repeat", type=int, default=500)
+    parser.add_argument("--json", dest="json_path", default=None)
+    args = parser.parse_args()
+
+    app = create_app(
+        dict(
+            SQLALCHEMY_DATABASE_URI=args.db_uri,
+            SQLALCHEMY_ECHO=False,
+            PROFILE_ENABLED=False,
+        )
+    )
+    results = list()
+    with app.app_context():
+        sales_record = db.session.scalars(select(SalesRecord).limit(1)).first()
+        client = db.session.scalars(select(Client).limit(1)).first()
+        if sales_record is None or client is None:
+            sys.exit("no data loaded; run benchmarks/datagen.py first")
+        lookups = _lookups(
+            sales_record.book_id,
+            client.salesperson_id,
+            sales_record.year,
+            sales_record.month,
+        )
+        print(
+            f"{'lookup':<32} {'variant':<9} {'total us':>9} {'orm us':>9} "
+            + f"{'orm change':>10}"
+        )
+        with DriverTimer(db.engine) as timer:
+            for lookup_name, legacy_call, stmt_call in lookups:
+                legacy_result = bench_lookup(legacy_call, args.repeat, timer)
+                stmt_result = bench_lookup(stmt_call, args.repeat, timer)
+                change = (
+                    stmt_result["median_orm_us"] / legacy_result["median_orm_us"] - 1
+                ) * 100
+                for variant, result in (
+                    ("legacy", legacy_result),
+                    ("select", stmt_result),
+                ):
+                    result.update(lookup=lookup_name, variant=variant)
+                    results.append(result)
+                    print(
+                        f"{lookup_name:<32} {variant:<9} "
+                        + f"{result['median_total_us']:>9.1f} "
+                        + f"{result['median_orm_us']:>9.1f} "
+                        + (f"{change:>+9.1f}%" if variant == "select" else "")
+                    )
+        db.engine.dispose()
+
+    if args.json_path is not None:
+        with open(args.json_path, "w") as json_fh:
+            json.dump(
+                dict(git_commit=git_commit(), repeat=args.repeat, results=results),
+                json_fh,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/python3
+
+"""
+Shows the effect of partitioning sales_records by year. The queries
+behind GET /sales_records/years/{year} and
+/sales_records/years/{year}/months/{month} are run against the
+partitioned sales_records table and against an unpartitioned copy of
+it, reporting their latency and, from EXPLAIN ANALYZE, how many tables
+each scanned and how many buffers it touched.
+
+Load a long history first, e.g. 20 years of sales records:
+
+    python benchmarks/datagen.py --scale medium --as-of 2019-12-31
+
+Usage: python benchmarks/bench_partitions.py [--db-uri URI]
+       [--repeat N] [--json PATH]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from os.path import abspath, dirname
+
+from sqlalchemy import create_engine, text
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from bench_endpoints import git_commit  # noqa: E402
+from datagen import DEFAULT_DB_URI  # noqa: E402
+
+
+_unpartitioned_table = "sales_records_unpartitioned_bench"
+
+_queries = {
+    "year": "SELECT * FROM {table} WHERE year = :year",
+    "year_month": "SELECT * FROM {table} WHERE year = :year AND month = :month",
+}
+
+
+def _scanned_relations(plan):
+    # The names of the tables a query plan reads, found by walking its
+    # nodes.
+    relations = set()
+    if "Relation Name" in plan:
+        relations.add(plan["Relation Name"])
+    for subplan in plan.get("Plans", ()):
+        relations |= _scanned_relations(subplan)
+    return relations
+
+
+def make_unpartitioned_copy(connection):
+    """
+    Copies sales_records into an ordinary table with the same indexes,
+    unless that's already been done for the current row count.
+
+    :connection: A sqlalchemy.engine.Connection.
+    :return: None
+    """
+    row_count = connection.execute(text("SELECT count(*) FROM sales_records")).scalar()
+    if connection.execute(
+        text("SELECT to_regclass(:name)"), dict(name=_unpartitioned_table)
+    ).scalar():
+        copy_count = connection.execute(
+            text(f"SELECT count(*) FROM {_unpartitioned_table}")
+        ).scalar()
+        if copy_count == row_count:
+            return
+        connection.execute(text(f"DROP TABLE {_unpartitioned_table}"))
+    connection.execute(
+        text(f"CREATE TABLE {_unpartitioned_table} AS SELECT * FROM sales_records")
+    )
+    connection.execute(
+        text(f"ALTER TABLE {_unpartitioned_table} ADD PRIMARY KEY (sales_record_id)")
+    )
+    connection.execute(
+        text(
+            f"CREATE INDEX ON {_unpartitioned_table} USING hash(book_id)",
+        )
+    )
+    connection.execute(text(f"ANALYZE {_unpartitioned_table}"))
+
+
+def bench_query(connection, query, params, repeat):
+    """
+    Times a query and collects its EXPLAIN ANALYZE statistics.
+
+    :connection: A sqlalchemy.engine.Connection.
+    :query: The SQL text.
+    :params: A dict of bound parameters.
+    :repeat: How many times to run the query.
+    :return: A dict of results.
+    """
+    timings = list()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        connection.execute(text(query), params).all()
+        timings.append(time.perf_counter() - start)
+    (plan_jsobj,) = connection.execute(
+        text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}"), params
+    ).scalar()
+    plan = plan_jsobj["Plan"]
+    return dict(
+        median_ms=statistics.median(timings) * 1000,
+        tables_scanned=len(_scanned_relations(plan)),
+        shared_buffers=plan.get("Shared Hit Blocks", 0)
+        + plan.get("Shared Read Blocks", 0),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--db-uri", default=DEFAULT_DB_URI)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--json", dest="json_path", default=None)
+    args = parser.parse_args()
+
+    engine = create_engine(args.db_uri)
+    results = list()
+    with engine.begin() as connection:
+        partition_count = connection.execute(
+            text(
+                "SELECT count(*) FROM pg_inherits "
+                + "WHERE inhparent = to_regclass('sales_records')"
+            )
+        ).scalar()
+        if not partition_count:
+            sys.exit("sales_records isn't partitioned; run the migrations first")
+        make_unpartitioned_copy(connection)
+        years = connection.execute(
+            text("SELECT DISTINCT year FROM sales_records ORDER BY year")
+        ).scalars()
+        years = list(years)
+        print(
+            f"{len(years)} years of sales records ({years[0]}-{years[-1]}) in "
+            + f"{partition_count} partitions"
+        )
+        print(
+            f"{'query':<11} {'year':>5} {'table':<14} {'median ms':>10} "
+            + f"{'tables':>7} {'buffers':>8}"
+        )
+        # The first, middle and last years.
+        for year in sorted({years[0], years[len(years) // 2], years[-1]}):
+            for query_name, query in _queries.items():
+                params = dict(year=year, month=6)
+                for table_label, table_name in (
+                    ("partitioned", "sales_records"),
+                    ("unpartitioned", _unpartitioned_table),
+                ):
+                    result = bench_query(
+                        connection,
+                        query.format(table=table_name),
+                        params,
+                        args.repeat,
+                    )
+                    result.update(query=query_name, year=year, table=table_label)
+                    results.append(result)
+                    print(
+                        f"{query_name:<11} {year:>5} {table_label:<14} "
+                        + f"{result['median_ms']:>10.2f} "
+                        + f"{result['tables_scanned']:>7} "
+                        + f"{result['shared_buffers']:>8}"
+                    )
+    engine.dispose()
+
+    if args.json_path is not None:
+        with open(args.json_path, "w") as json_fh:
+            json.dump(
+                dict(
+                    git_commit=git_commit(),
+                    years=len(years),
+                    partitions=partition_count,
+                    results=results,
+                ),
+                json_fh,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
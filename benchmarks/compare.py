@@ -0,0 +1,81 @@
+#!/usr/bin/python3
+
+"""
+Compares two JSON reports written by bench_endpoints.py and lists the
+change in each endpoint's latency percentiles and throughput, flagging
+regressions beyond a threshold. Exits with status 1 if there are any.
+
+Usage: python benchmarks/compare.py BASELINE.json CANDIDATE.json
+       [--metric p50_ms|p90_ms|p99_ms|mean_ms] [--threshold PERCENT]
+"""
+
+import argparse
+import json
+import sys
+
+
+def load_results(json_path):
+    # Returns the report and its results keyed by (method, rule).
+    with open(json_path) as json_fh:
+        report = json.load(json_fh)
+    return report, {
+        (result["method"], result["rule"]): result for result in report["results"]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument(
+        "--metric", choices=("p50_ms", "p90_ms", "p99_ms", "mean_ms"), default="p50_ms"
+    )
+    parser.add_argument("--threshold", type=float, default=10.0)
+    args = parser.parse_args()
+
+    baseline_report, baseline_results = load_results(args.baseline)
+    candidate_report, candidate_results = load_results(args.candidate)
+    print(f"baseline:  {baseline_report['git_commit']} {baseline_report['row_counts']}")
+    print(
+        f"candidate: {candidate_report['git_commit']} {candidate_report['row_counts']}"
+    )
+    if baseline_report["row_counts"] != candidate_report["row_counts"]:
+        print("warning: the reports were run against different data")
+    print()
+    print(
+        f"{'method':<6} {'route':<72} {'before':>9} {'after':>9} {'change':>8} "
+        + f"{'req/s chg':>9}"
+    )
+
+    regressions = 0
+    for key in sorted(baseline_results.keys() & candidate_results.keys()):
+        before = baseline_results[key][args.metric]
+        after = candidate_results[key][args.metric]
+        change = (after - before) / before * 100 if before else 0.0
+        throughput_change = (
+            candidate_results[key]["throughput_rps"]
+            / baseline_results[key]["throughput_rps"]
+            - 1
+        ) * 100
+        flag = ""
+        if change > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif change < -args.threshold:
+            flag = "  improved"
+        print(
+            f"{key[0]:<6} {key[1]:<72} {before:>9.2f} {after:>9.2f} "
+            + f"{change:>+7.1f}% {throughput_change:>+8.1f}%{flag}"
+        )
+    for key in sorted(baseline_results.keys() - candidate_results.keys()):
+        print(f"{key[0]:<6} {key[1]:<72} only in baseline")
+    for key in sorted(candidate_results.keys() - baseline_results.keys()):
+        print(f"{key[0]:<6} {key[1]:<72} only in candidate")
+
+    print()
+    print(f"{regressions} regression(s) in {args.metric} beyond {args.threshold:.0f}%")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
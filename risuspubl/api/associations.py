@@ -0,0 +1,172 @@
+#!/usr/bin/python3
+
+from flask import Blueprint, current_app, jsonify, request
+from sqlalchemy import exists, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from risuspubl.api.utility import handle_exc, missing_ids
+from risuspubl.dbmodels import (
+    Author,
+    AuthorsBooks,
+    AuthorsManuscripts,
+    Book,
+    Manuscript,
+    db,
+)
+
+
+blueprint = Blueprint("associations", __name__, url_prefix="/associations")
+
+
+# The default configuration values, applied with setdefault() when the
+# blueprint is registered so that anything passed to create_app() in
+# test_config takes precedence.
+_default_config = {
+    # The most pairs a single request can add and remove, together.
+    "ASSOCIATIONS_MAX_PAIRS": 10000,
+}
+
+
+@blueprint.record_once
+def _set_default_config(state):
+    for key, value in _default_config.items():
+        state.app.config.setdefault(key, value)
+
+
+def _parse_pairs(request_json, list_name, other_id_column):
+    # Validates request_json[list_name], a list of objects each with an
+    # author_id and an other_id_column, both integers. Returns them as a
+    # list of distinct (author_id, other_id) tuples, in order.
+    pair_jsobjs = request_json.get(list_name, [])
+    if not isinstance(pair_jsobjs, list):
+        raise ValueError(f"parameter {list_name}: must be a list")
+    pairs = dict()
+    for pair_jsobj in pair_jsobjs:
+        if (
+            not isinstance(pair_jsobj, dict)
+            or pair_jsobj.keys() != {"author_id", other_id_column}
+            or not all(
+                isinstance(id_val, int) and not isinstance(id_val, bool)
+                for id_val in pair_jsobj.values()
+            )
+        ):
+            raise ValueError(
+                f"parameter {list_name}: each element must be an object with "
+                + f"integer author_id and {other_id_column} properties"
+            )
+        pairs[(pair_jsobj["author_id"], pair_jsobj[other_id_column])] = None
+    return list(pairs)
+
+
+def _updt_assocs_clos(assoc_table, other_class):
+    # Returns an endpoint function that adds and removes rows in the
+    # association table between authors and other_class, Book or
+    # Manuscript.
+    other_id_column = other_class.__primary_key__
+    assoc_author_id = assoc_table.c.author_id
+    assoc_other_id = assoc_table.c[other_id_column]
+
+    def _updt_assocs_endpt():
+        """
+        Implements a PATCH /associations/{association table} endpoint.
+        The JSON body has an add list and a remove list of objects, each
+        with an author_id and a book_id or manuscript_id. The pairs in
+        add that aren't in the table already are inserted, and the pairs
+        in remove are deleted, in one transaction. The counts of rows
+        added and removed are output.
+
+        :return: A flask.Response object.
+        """
+        try:
+            if not isinstance(request.json, dict):
+                raise ValueError("request body must be a JSON object")
+            unexpected_props = request.json.keys() - {"add", "remove"}
+            if unexpected_props:
+                raise ValueError(
+                    f"unexpected properties {sorted(unexpected_props)}; the "
+                    + "request body has add and/or remove lists"
+                )
+            add_pairs = _parse_pairs(request.json, "add", other_id_column)
+            remove_pairs = _parse_pairs(request.json, "remove", other_id_column)
+            max_pairs = current_app.config["ASSOCIATIONS_MAX_PAIRS"]
+            if len(add_pairs) + len(remove_pairs) > max_pairs:
+                raise ValueError(
+                    f"at most {max_pairs} pairs can be added and removed at once"
+                )
+            if set(add_pairs) & set(remove_pairs):
+                raise ValueError("a pair can't be both added and removed")
+
+            # Every author_id and other id being added is checked, one
+            # SELECT per table.
+            for model_class, id_vals in (
+                (Author, {author_id for author_id, _ in add_pairs}),
+                (other_class, {other_id for _, other_id in add_pairs}),
+            ):
+                absent_ids = missing_ids(model_class, sorted(id_vals))
+                if absent_ids:
+                    raise ValueError(
+                        f"supplied {model_class.__primary_key__} values "
+                        + f"{absent_ids} do not correspond to any rows in the "
+                        + f"`{model_class.__tablename__}` table"
+                    )
+
+            # Adding the pairs not there already, then removing the ones
+            # that are, each as one statement.
+            added_count = removed_count = 0
+            if add_pairs:
+                added_count = db.session.execute(
+                    pg_insert(assoc_table)
+                    .values(
+                        [
+                            {"author_id": author_id, other_id_column: other_id}
+                            for author_id, other_id in add_pairs
+                        ]
+                    )
+                    .on_conflict_do_nothing()
+                ).rowcount
+            if remove_pairs:
+                removed_count = db.session.execute(
+                    assoc_table.delete().where(
+                        tuple_(assoc_author_id, assoc_other_id).in_(remove_pairs)
+                    )
+                ).rowcount
+
+                # A book or manuscript left with no authors would be an
+                # orphan, so that's refused, and nothing is changed.
+                other_primary_key = getattr(other_class, other_id_column)
+                orphan_ids = db.session.scalars(
+                    select(other_primary_key)
+                    .where(
+                        other_primary_key.in_(
+                            sorted({other_id for _, other_id in remove_pairs})
+                        ),
+                        ~exists().where(assoc_other_id == other_primary_key),
+                    )
+                    .order_by(other_primary_key)
+                ).all()
+                if orphan_ids:
+                    db.session.rollback()
+                    raise ValueError(
+                        f"removing these pairs would leave {other_id_column} "
+                        + f"values {orphan_ids} with no authors"
+                    )
+            db.session.commit()
+            return jsonify(dict(added=added_count, removed=removed_count))
+        except Exception as exception:
+            return handle_exc(exception)
+
+    _updt_assocs_endpt.__name__ = f"updt_{assoc_table.name}_endpt"
+    return _updt_assocs_endpt
+
+
+# PATCH (or PUT) /associations/authors_books and
+# /associations/authors_manuscripts
+for _assoc_table, _other_class in (
+    (AuthorsBooks, Book),
+    (AuthorsManuscripts, Manuscript),
+):
+    blueprint.add_url_rule(
+        f"/{_assoc_table.name}",
+        view_func=_updt_assocs_clos(_assoc_table, _other_class),
+        methods=["PATCH", "PUT"],
+    )
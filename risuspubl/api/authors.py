@@ -1,20 +1,37 @@
 #!/usr/bin/python3
 
-import itertools
-
 from flask import Blueprint, Response, abort, jsonify, request
+from sqlalchemy import and_, bindparam, exists, select
+from sqlalchemy.orm import lazyload
 
 from risuspubl.api.utility import (
+    check_json_req_props,
     crt_model_obj,
+    del_model_obj,
     crt_tbl_row_clos,
-    check_json_req_props,
+    crt_tbl_row_with_authors_clos,
     disp_tbl_row_by_id_clos,
+    disp_tbl_rows_by_foreign_id_clos,
+    disp_tbl_rows_by_ids_clos,
     disp_tbl_rows_clos,
+    fields_options,
     gen_crt_updt_argd,
     handle_exc,
+    jsonify_and_commit,
+    keyset_link,
+    keyset_page_result,
+    missing_ids,
+    parse_fields,
+    parse_ids_json,
+    parse_keyset_args,
+    select_by_column,
+    table_columns,
     updt_model_obj,
     updt_tbl_row_by_id_clos,
+    updt_tbl_rows_clos,
 )
+from risuspubl.cache import invalidate_rows
+from risuspubl.fanout import fan_out
 from risuspubl.dbmodels import (
     Author,
     AuthorMetadata,
@@ -24,6 +41,7 @@ from risuspubl.dbmodels import (
     Manuscript,
     db,
 )
+from risuspubl.lookups import abort_if_missing, get_row_or_404
 
 
 blueprint = Blueprint("authors", __name__, url_prefix="/authors")
@@ -36,6 +54,12 @@ blueprint = Blueprint("authors", __name__, url_prefix="/authors")
 # A closure for GET /authors
 disp_auths = disp_tbl_rows_clos(Author)
 
+# A closure for POST /authors/ids
+disp_auths_by_ids = disp_tbl_rows_by_ids_clos(Author)
+
+# A closure for PATCH /authors, a bulk update by filter
+updt_auths = updt_tbl_rows_clos(Author)
+
 # A closure for POST /authors
 crt_auth = crt_tbl_row_clos(Author)
 
@@ -46,27 +70,94 @@ disp_auth_by_auid = disp_tbl_row_by_id_clos(Author)
 # A closure for PATCH /authors/<id>
 updt_auth_by_auid = updt_tbl_row_by_id_clos(Author)
 
+# Closures for GET /authors/<id>/books and /authors/<id>/manuscripts.
+# An author with none gets an empty list.
+disp_bks_by_auth_id = disp_tbl_rows_by_foreign_id_clos(
+    Author, "author_id", Book, AuthorsBooks, empty_ok=True
+)
+disp_mscrpts_by_auth_id = disp_tbl_rows_by_foreign_id_clos(
+    Author, "author_id", Manuscript, AuthorsManuscripts, empty_ok=True
+)
+
+# Closures for POST /authors/<id>/books and /authors/<id>/<id>/books,
+# and the same for manuscripts
+crt_bk_with_auths = crt_tbl_row_with_authors_clos(Book, AuthorsBooks)
+crt_mscrpt_with_auths = crt_tbl_row_with_authors_clos(Manuscript, AuthorsManuscripts)
+
+# The columns of authors_metadata that a fields parameter can name. The
+# biography column is unbounded text, so leaving it out can make a
+# response much smaller.
+_auth_metdt_columns = table_columns(AuthorMetadata)
+
+# The authors_metadata row for an author_id, as a statement built once.
+_auth_metdt_by_auth_stmt = select_by_column(AuthorMetadata, "author_id")
+
+
+# This private utility function builds a statement that tests whether
+# each of author_count author_ids (bound as author1_id, author2_id...)
+# is associated with an item_id in authors_books or authors_manuscripts,
+# with an EXISTS per author_id on the table's primary key index.
+def _auths_assocd_stmt(assoc_table, author_count: int):
+    author_id_column, item_id_column = assoc_table.columns
+    return select(
+        and_(
+            *(
+                exists().where(
+                    author_id_column == bindparam(f"author{index}_id"),
+                    item_id_column == bindparam("item_id"),
+                )
+                for index in range(1, author_count + 1)
+            )
+        )
+    )
+
+
+# The membership statements for one and for two authors, built once.
+_auths_assocd_stmts = {
+    (assoc_table, author_count): _auths_assocd_stmt(assoc_table, author_count)
+    for assoc_table in (AuthorsBooks, AuthorsManuscripts)
+    for author_count in (1, 2)
+}
+
+
+# This private utility function returns True if every one of the
+# author_ids is associated with the book_id or manuscript_id item_id in
+# the assoc_table association table, without loading any author's books
+# or manuscripts, so it takes the same time however many they have.
+def _auths_assocd(assoc_table, item_id: int, *author_ids: int) -> bool:
+    params = {
+        f"author{index}_id": author_id
+        for index, author_id in enumerate(author_ids, start=1)
+    }
+    return db.session.scalar(
+        _auths_assocd_stmts[assoc_table, len(author_ids)], dict(params, item_id=item_id)
+    )
+
 
 @blueprint.route("/<int:author_id>/metadata", methods=["GET"])
 def disp_auth_metdt_endpt(author_id: int):
     """
     Implements a GET /authors/{author_id}/metadata endpoint. The row
     in the authors_metadata table for that author_id is retrieved and
-    displayed.
+    displayed. A fields query parameter selects the columns to output.
 
     :author_id: the value for the author_id column in the
     authors_metadata table
     :return: a flask.Response object
     """
     try:
-        metadata_objs = list(
-            AuthorMetadata.query.where(AuthorMetadata.author_id == author_id)
-        )
+        field_names = parse_fields(_auth_metdt_columns, request.args)
+        metadata_objs = db.session.scalars(
+            _auth_metdt_by_auth_stmt.options(
+                *fields_options(_auth_metdt_columns, field_names)
+            ),
+            dict(author_id=author_id),
+        ).all()
         match len(metadata_objs):
             case 0:
                 return abort(404)
             case 1:
-                return jsonify(metadata_objs[0].serialize())
+                return jsonify(metadata_objs[0].serialize(field_names))
             case _:
                 # Have more than one row for this author_id in the
                 # author_metadata table fsr.
@@ -85,10 +176,50 @@ def index_endpt():
     Implements a GET /authors endpoint. All rows in the authors table
     are loaded and output as a JSON list.
 
+    The filter, sort and fields query parameters narrow, order and
+    project the rows; see utility.compile_collection_query(). With an
+    ids query parameter, just the rows with those ids are output; see
+    utility.disp_tbl_rows_by_ids_clos().
+
     :return:    a flask.Response object
     """
     try:
-        return disp_auths()
+        return disp_auths(request.args)
+    except Exception as exception:
+        return handle_exc(exception)
+
+
+@blueprint.route("/ids", methods=["POST"])
+def disp_auths_by_ids_endpt():
+    """
+    Implements a POST /authors/ids endpoint, the same multi-get as GET
+    /authors?ids= for a list of author_ids too long for a URL. The JSON body
+    is {"ids": [...]}. The rows found are output in the order given,
+    and the ids not found are listed; see
+    utility.disp_tbl_rows_by_ids_clos().
+
+    :return:    a flask.Response object
+    """
+    try:
+        return disp_auths_by_ids(parse_ids_json(request.json), request.args)
+    except Exception as exception:
+        return handle_exc(exception)
+
+
+@blueprint.route("", methods=["PATCH"])
+def updt_bulk_endpt():
+    """
+    Implements a PATCH /authors endpoint. Every row in the authors table
+    matching the filter query parameters, of which there must be at
+    least one, is updated from the JSON parameters in one UPDATE. An
+    integer column can also be given as {"add": n} or {"mul": n}.
+    The number of rows updated is output, or with return=rows the rows
+    themselves; see utility.updt_tbl_rows_clos().
+
+    :return:    a flask.Response object
+    """
+    try:
+        return updt_auths(request.args, request.json)
     except Exception as exception:
         return handle_exc(exception)
 
@@ -107,15 +238,7 @@ def disp_auths_bks_endpt(author1_id: int, author2_id: int):
     :return: a flask.Response object
     """
     try:
-        if author1_id == author2_id:
-            raise ValueError("author1_id and author2_id were identical")
-        # A utility function is used to fetch a list of Book objects
-        # whose book_id is associated with both author_ids in
-        # authors_books.
-        shared_books = _auths_shared_bkids(author1_id, author2_id)
-        # The list is serialized and returned as json.
-        retval = [book_obj.serialize() for book_obj in shared_books]
-        return jsonify(retval)
+        return disp_auths_shared_bks(author1_id, author2_id, request.args)
     except Exception as exception:
         return handle_exc(exception)
 
@@ -141,57 +264,92 @@ def disp_auths_bk_by_bkid_endpt(author1_id: int, author2_id: int, book_id: int):
     try:
         if author1_id == author2_id:
             raise ValueError("author1_id and author2_id were identical")
-        # A utility function is used to fetch a list of Book objects
-        # whose book_id is associated with both author_ids in
-        # authors_books.
-        shared_books = _auths_shared_bkids(author1_id, author2_id)
-        # The Book object list is iterated over, looking for the object
-        # with the matching book_id. If it's found, it's serialized and
-        # returned as json.
-        for book_obj in shared_books:
-            if book_obj.book_id != book_id:
-                continue
-            return jsonify(book_obj.serialize())
-        # If the book_id wasn't found, that's a 404.
-        return abort(404)
+        abort_if_missing(Author, author1_id, author2_id)
+        # Verifying that both author_ids are associated with the book_id
+        # in authors_books. If they aren't, that's a 404.
+        if not _auths_assocd(AuthorsBooks, book_id, author1_id, author2_id):
+            return abort(404)
+        # The Book object is loaded, serialized and returned as json.
+        book_obj = get_row_or_404(Book, book_id)
+        return jsonify(book_obj.serialize())
     except Exception as exception:
         return handle_exc(exception)
 
 
-# This private utility function is used by display_authors_manuscripts()
-# and display_authors_manuscript_by_id() to generate a list of Book
-# objects with manuscript_ids that are associated with both author_ids
-# in the authors_manuscripts table.
-def _auths_shared_msids(author1_id: int, author2_id: int) -> list:
-    if author1_id == author2_id:
-        raise ValueError("author1_id and author2_id were identical")
-    author1_obj = Author.query.get_or_404(author1_id)
-    author2_obj = Author.query.get_or_404(author2_id)
-    # The manuscripts attribute on an Author object comprises the
-    # Manuscript objects whose manuscript_ids are associated with its
-    # author_id in the authors_manuscripts table.
-    author1_manuscripts = author1_obj.manuscripts
-    author2_manuscripts = author2_obj.manuscripts
-    # A dict of Manuscript objects by manuscript_id is built from both
-    # lists chained in sequence.
-    manuscript_objs_by_id = {
-        manuscript_obj.manuscript_id: manuscript_obj
-        for manuscript_obj in itertools.chain(author1_manuscripts, author2_manuscripts)
-    }
-    # Sets of manuscript_ids associated with each author_id are built
-    # and intersected to find the shared manuscripts.
-    shared_manuscript_ids = set(
-        author1_manuscript_obj.manuscript_id
-        for author1_manuscript_obj in author1_manuscripts
-    ) & set(
-        author2_manuscript_obj.manuscript_id
-        for author2_manuscript_obj in author2_manuscripts
+# This private utility function returns a function for fan_out() that
+# loads the Author object with the given author_id, 404ing if there
+# isn't one.
+def _load_auth_clos(author_id: int):
+    def _load_auth(session):
+        author_obj = session.get(Author, author_id)
+        if author_obj is None:
+            abort(404)
+        return author_obj
+
+    return _load_auth
+
+
+# This private utility function returns a closure that displays a page of
+# the books or manuscripts associated with both of two author_ids in
+# authors_books or authors_manuscripts, in id order. The association
+# table is joined to itself once per author, so a page is read from
+# its primary key index without loading either author's others.
+def _disp_auths_shared_clos(inner_class, assoc_table):
+    inner_key_name = inner_class.__primary_key__
+    inner_key = getattr(inner_class, inner_key_name)
+    author1_assoc, author2_assoc = assoc_table.alias(), assoc_table.alias()
+    page_stmt = (
+        select(author1_assoc.columns.author_id, inner_class)
+        .select_from(author1_assoc)
+        .join(
+            author2_assoc,
+            and_(
+                author2_assoc.columns[inner_key_name]
+                == author1_assoc.columns[inner_key_name],
+                author2_assoc.columns.author_id == bindparam("author2_id"),
+            ),
+        )
+        .join(inner_class, inner_key == author1_assoc.columns[inner_key_name])
+        .where(
+            author1_assoc.columns.author_id == bindparam("author1_id"),
+            author1_assoc.columns[inner_key_name] > bindparam("after"),
+        )
+        .order_by(author1_assoc.columns[inner_key_name])
+        .limit(bindparam("limit"))
+        .options(lazyload("*"))
     )
-    # The manuscript_ids are looked up in the dict via a list
-    # comprehension and that list is returned.
-    return [
-        manuscript_objs_by_id[manuscript_id] for manuscript_id in shared_manuscript_ids
-    ]
+
+    def _disp_auths_shared(author1_id: int, author2_id: int, request_args):
+        if author1_id == author2_id:
+            raise ValueError("author1_id and author2_id were identical")
+        after, per_page = parse_keyset_args(request_args)
+        abort_if_missing(Author, author1_id, author2_id)
+        inner_objs, next_after = keyset_page_result(
+            db.session.execute(
+                page_stmt,
+                dict(
+                    author1_id=author1_id,
+                    author2_id=author2_id,
+                    after=after,
+                    limit=per_page + 1,
+                ),
+            ).all(),
+            per_page,
+        )
+        response = jsonify([inner_obj.serialize() for inner_obj in inner_objs or ()])
+        if next_after is not None:
+            response.headers["Link"] = keyset_link(
+                request.path, request_args, next_after
+            )
+        return response
+
+    return _disp_auths_shared
+
+
+# Closures for GET /authors/<id>/<id>/books and
+# /authors/<id>/<id>/manuscripts
+disp_auths_shared_bks = _disp_auths_shared_clos(Book, AuthorsBooks)
+disp_auths_shared_mscrpts = _disp_auths_shared_clos(Manuscript, AuthorsManuscripts)
 
 
 @blueprint.route("/<int:author1_id>/<int:author2_id>/manuscripts", methods=["GET"])
@@ -209,15 +367,7 @@ def disp_auths_mscrpts_endpt(author1_id: int, author2_id: int):
     :return: a flask.Response object
     """
     try:
-        if author1_id == author2_id:
-            raise ValueError("author1_id and author2_id were identical")
-        # This utility function looks up which manuscript_ids are
-        # associated with both author_ids in authors_manuscripts and
-        # returns Manuscript() objects for those manuscript_ids.
-        shared_manuscripts = _auths_shared_msids(author1_id, author2_id)
-        # A list of serializations is built # and returned via jsonify.
-        retval = [manuscript_obj.serialize() for manuscript_obj in shared_manuscripts]
-        return jsonify(retval)
+        return disp_auths_shared_mscrpts(author1_id, author2_id, request.args)
     except Exception as exception:
         return handle_exc(exception)
 
@@ -245,19 +395,18 @@ def disp_auths_mscrpt_by_msid_endpt(
     :return: a flask.Response object
     """
     try:
-        # Using a utility function to look up which manuscript_ids are
-        # associated with both author_ids in authors_manuscripts and
-        # return Manuscript() objects for those manuscript_ids.
-        shared_manuscripts = _auths_shared_msids(author1_id, author2_id)
-        # Iterating across the Manuscript object list until the object
-        # with the matching manuscript_id is found.
-        for manuscript_obj in shared_manuscripts:
-            if manuscript_obj.manuscript_id != manuscript_id:
-                continue
-            return jsonify(manuscript_obj.serialize())
-        # If the loop completed and the Manuscript() object wasn't
-        # found, that's a 404.
-        return abort(404)
+        if author1_id == author2_id:
+            raise ValueError("author1_id and author2_id were identical")
+        abort_if_missing(Author, author1_id, author2_id)
+        # Verifying that both author_ids are associated with the
+        # manuscript_id in authors_manuscripts. If they aren't, that's a
+        # 404.
+        if not _auths_assocd(AuthorsManuscripts, manuscript_id, author1_id, author2_id):
+            return abort(404)
+        # The Manuscript object is loaded, serialized and returned as
+        # json.
+        manuscript_obj = get_row_or_404(Manuscript, manuscript_id)
+        return jsonify(manuscript_obj.serialize())
     except Exception as exception:
         return handle_exc(exception)
 
@@ -273,7 +422,7 @@ def disp_auth_by_auid_endpt(author_id: int):
     :return: a flask.Response object
     """
     try:
-        return disp_auth_by_auid(author_id)
+        return disp_auth_by_auid(author_id, request.args)
     except Exception as exception:
         return handle_exc(exception)
 
@@ -290,9 +439,7 @@ def disp_auth_bks_endpt(author_id: int):
     :return: a flask.Response object
     """
     try:
-        author_obj = Author.query.get_or_404(author_id)
-        retval = [book_obj.serialize() for book_obj in author_obj.books]
-        return jsonify(retval)
+        return disp_bks_by_auth_id(author_id, request.args)
     except Exception as exception:
         return handle_exc(exception)
 
@@ -311,19 +458,18 @@ def disp_auth_bk_by_bkid_endpt(author_id: int, book_id: int):
     :return: a flask.Response object
     """
     try:
-        author_obj = Author.query.get_or_404(author_id)
-        # Iterating across the Author.manuscripts list looking for a
-        # Book object by that id. If it's found, it's serialized and
-        # returned as JSON. Otherwise, a 404 error is raised.
-        for book_obj in author_obj.books:
-            if book_obj.book_id != book_id:
-                continue
-            return jsonify(book_obj.serialize())
-        return Response(
-            f"author with author_id {author_id} does not have a book with "
-            + f"book_id {book_id}",
-            status=400,
-        )
+        abort_if_missing(Author, author_id)
+        # Verifying that the author_id is associated with the book_id in
+        # authors_books. If it is, the Book object is loaded, serialized
+        # and returned as JSON.
+        if not _auths_assocd(AuthorsBooks, book_id, author_id):
+            return Response(
+                f"author with author_id {author_id} does not have a book with "
+                + f"book_id {book_id}",
+                status=400,
+            )
+        book_obj = get_row_or_404(Book, book_id)
+        return jsonify(book_obj.serialize())
     except Exception as exception:
         return handle_exc(exception)
 
@@ -341,11 +487,7 @@ def disp_auth_mscrpts_endpt(author_id: int):
     :return: a flask.Response object
     """
     try:
-        author_obj = Author.query.get_or_404(author_id)
-        retval = [
-            manuscript_obj.serialize() for manuscript_obj in author_obj.manuscripts
-        ]
-        return jsonify(retval)
+        return disp_mscrpts_by_auth_id(author_id, request.args)
     except Exception as exception:
         return handle_exc(exception)
 
@@ -365,15 +507,15 @@ def disp_auth_mscrpt_by_msid_endpt(author_id: int, manuscript_id: int):
     :return: a flask.Response object
     """
     try:
-        author_obj = Author.query.get_or_404(author_id)
-        # Iterating across the Author.manuscripts list looking for a
-        # Manuscript object by that id. If it's found, it's serialized
-        # and returned as JSON. Otherwise, a 404 error is raised.
-        for manuscript_obj in author_obj.manuscripts:
-            if manuscript_obj.manuscript_id != manuscript_id:
-                continue
-            return jsonify(manuscript_obj.serialize())
-        return abort(404)
+        abort_if_missing(Author, author_id)
+        # Verifying that the author_id is associated with the
+        # manuscript_id in authors_manuscripts. If it is, the Manuscript
+        # object is loaded, serialized and returned as JSON. Otherwise,
+        # a 404 error is raised.
+        if not _auths_assocd(AuthorsManuscripts, manuscript_id, author_id):
+            return abort(404)
+        manuscript_obj = get_row_or_404(Manuscript, manuscript_id)
+        return jsonify(manuscript_obj.serialize())
     except Exception as exception:
         return handle_exc(exception)
 
@@ -397,8 +539,9 @@ def disp_auths_by_auids_endpt(author1_id: int, author2_id: int):
     :return: a flask.Response object
     """
     try:
-        author1_obj = Author.query.get_or_404(author1_id)
-        author2_obj = Author.query.get_or_404(author2_id)
+        author1_obj, author2_obj = fan_out(
+            _load_auth_clos(author1_id), _load_auth_clos(author2_id)
+        )
         if author1_id == author2_id:
             raise ValueError("author1_id and author2_id are equal")
         # The two author_objs are serialized and returned as a 2-element
@@ -409,70 +552,45 @@ def disp_auths_by_auids_endpt(author1_id: int, author2_id: int):
         return handle_exc(exception)
 
 
-# This private utility function is used by display_authors_books() and
-# display_authors_book_by_id() to generate a list of Book objects with
-# book_ids that are associated with both author_ids in the authors_books
-# table.
-def _auths_shared_bkids(author1_id: int, author2_id: int) -> list:
-    author1_obj = Author.query.get_or_404(author1_id)
-    author2_obj = Author.query.get_or_404(author2_id)
-    # The books attribute on an Author object comprises the Book
-    # objects whose book_ids are associated with its author_id in the
-    # authors_books table.
-    author1_books = author1_obj.books
-    author2_books = author2_obj.books
-    # A dict of Book objects by book_id is built from both lists chained
-    # in sequence.
-    book_objs_by_id = {
-        book_obj.book_id: book_obj
-        for book_obj in itertools.chain(author1_books, author2_books)
-    }
-    # Sets of book_ids associated with each author_id are built and
-    # intersected to find the shared books.
-    shared_book_ids = set(
-        author1_book_obj.book_id for author1_book_obj in author1_books
-    ) & set(author2_book_obj.book_id for author2_book_obj in author2_books)
-    # The book_ids are looked up in the dict via a list comprehension
-    # and that list is returned.
-    return [book_objs_by_id[book_id] for book_id in shared_book_ids]
-
-
 @blueprint.route("/<int:author_id>/metadata", methods=["PATCH"])
 def updt_auth_metdt_endpt(author_id: int):
     """
     Implements a PATCH /authors/{author_id}/metadata endpoint. The row
     in the authors_metadata table associated with the given author_id is
-    updated from the JSON parameters.
+    updated from the JSON parameters. A fields query parameter selects
+    the columns to output.
 
     :author_id: the author_id to locate the row to change in the
     authors_metadata table with
     :return: a flask.Response object
     """
     try:
+        field_names = parse_fields(_auth_metdt_columns, request.args)
         check_json_req_props(
             AuthorMetadata, request.json, {"author_metadata_id"}, chk_missing=False
         )
-        author_metadata_objs = (
-            db.session.query(AuthorMetadata).filter_by(author_id=author_id).all()
-        )
+        # Only the primary key is needed to find the row.
+        author_metadata_objs = db.session.scalars(
+            _auth_metdt_by_auth_stmt.options(
+                *fields_options(_auth_metdt_columns, ["author_metadata_id"])
+            ),
+            dict(author_id=author_id),
+        ).all()
         match len(author_metadata_objs):
             case 0:
                 return abort(404)
             case 1:
                 author_metadata_id = author_metadata_objs[0].author_metadata_id
-                # We have the model subclass object, but the endpoint
-                # closure takes the author_metadata_id and grabs the
-                # object itself. A little wasteful, nbd. Updates the
-                # object and returns it, it's saved, serialized,
-                # jsonified and returned.
+                # The row is updated by its author_metadata_id; with
+                # fields, the UPDATE returns just those columns. The
+                # object is serialized, jsonified and returned.
                 author_metadata_obj = updt_model_obj(
                     author_metadata_id,
                     AuthorMetadata,
                     gen_crt_updt_argd(AuthorMetadata, request.json),
+                    field_names,
                 )
-                db.session.add(author_metadata_obj)
-                db.session.commit()
-                return jsonify(author_metadata_obj.serialize())
+                return jsonify_and_commit(author_metadata_obj, field_names)
             case _:
                 # Have more than one row for this author_id in the
                 # author_metadata table fsr.
@@ -509,27 +627,19 @@ def updt_auths_bk_endpt(author1_id: int, author2_id: int, book_id: int):
             Book, request.json, {"book_id"}, {"series_id"}, chk_missing=False
         )
         # Check that both the Author objects exist.
-        author1_obj = Author.query.get_or_404(author1_id)
-        author2_obj = Author.query.get_or_404(author2_id)
+        abort_if_missing(Author, author1_id, author2_id)
         if author1_id == author2_id:
             raise ValueError("author1_id and author2_id are equal")
-        # Grabbing each Author object's associated Book objects, looking
-        # for one with an id matching the book_id arg. If either list is
-        # empty, errors out with a 404.
-        a1_book_objs = list(
-            filter(lambda bobj: bobj.book_id == book_id, author1_obj.books)
-        )
-        a2_book_objs = list(
-            filter(lambda bobj: bobj.book_id == book_id, author2_obj.books)
-        )
-        if len(a1_book_objs) == 0 or len(a2_book_objs) == 0:
+        # Verifying that both author_ids are associated with the book_id
+        # in authors_books, else it's a 404.
+        if not _auths_assocd(AuthorsBooks, book_id, author1_id, author2_id):
             return abort(404)
         # The book_id checks out, so the update closure is used to
         # update it. The Book object is saved, serialized and jsonified.
         book_obj = updt_model_obj(book_id, Book, gen_crt_updt_argd(Book, request.json))
-        db.session.add(book_obj)
-        db.session.commit()
-        return jsonify(book_obj.serialize())
+        response = jsonify_and_commit(book_obj)
+        invalidate_rows(Book, book_id)
+        return response
     except Exception as exception:
         return handle_exc(exception)
 
@@ -564,28 +674,12 @@ def updt_auths_mscrpt_endpt(author1_id: int, author2_id: int, manuscript_id: int
             chk_missing=False,
         )
         # Check that both the Author objects exist.
-        author1_obj = Author.query.get_or_404(author1_id)
-        author2_obj = Author.query.get_or_404(author2_id)
+        abort_if_missing(Author, author1_id, author2_id)
         if author1_id == author2_id:
             raise ValueError("author1_id and author2_id are equal")
-        # Grabbing each Author object's associated Manuscript objects,
-        # looking for one with an id matching the manuscript_id arg. If
-        # either list is empty, errors out with a 404.
-        a1_manuscript_objs = list(
-            filter(
-                lambda bobj: bobj.manuscript_id == manuscript_id,
-                author1_obj.manuscripts,
-            )
-        )
-        a2_manuscript_objs = list(
-            filter(
-                lambda bobj: bobj.manuscript_id == manuscript_id,
-                author2_obj.manuscripts,
-            )
-        )
         # Verifying that the two author_ids are associated with the
-        # manuscript_id in authors_manuscripts.
-        if len(a1_manuscript_objs) == 0 or len(a2_manuscript_objs) == 0:
+        # manuscript_id in authors_manuscripts, else it's a 404.
+        if not _auths_assocd(AuthorsManuscripts, manuscript_id, author1_id, author2_id):
             return abort(404)
         # Using updt_model_obj() to fetch the Manuscript object and
         # update it against request.json.
@@ -594,9 +688,9 @@ def updt_auths_mscrpt_endpt(author1_id: int, author2_id: int, manuscript_id: int
             Manuscript,
             gen_crt_updt_argd(Manuscript, request.json),
         )
-        db.session.add(manuscript_obj)
-        db.session.commit()
-        return jsonify(manuscript_obj.serialize())
+        response = jsonify_and_commit(manuscript_obj)
+        invalidate_rows(Manuscript, manuscript_id)
+        return response
     except Exception as exception:
         return handle_exc(exception)
 
@@ -635,18 +729,17 @@ def updt_auth_bk_endpt(author_id: int, book_id: int):
         check_json_req_props(
             Book, request.json, {"book_id"}, {"series_id"}, chk_missing=False
         )
-        author_obj = Author.query.get_or_404(author_id)
-        book_objs = list(filter(lambda bobj: bobj.book_id == book_id, author_obj.books))
+        abort_if_missing(Author, author_id)
         # Verifying that this author_id is associated with this book_id
         # in authors_books.
-        if len(book_objs) == 0:
+        if not _auths_assocd(AuthorsBooks, book_id, author_id):
             return abort(404)
         # Using updt_model_obj() to fetch the Book object and update it
         # against request.json.
         book_obj = updt_model_obj(book_id, Book, gen_crt_updt_argd(Book, request.json))
-        db.session.add(book_obj)
-        db.session.commit()
-        return jsonify(book_obj.serialize())
+        response = jsonify_and_commit(book_obj)
+        invalidate_rows(Book, book_id)
+        return response
     except Exception as exception:
         return handle_exc(exception)
 
@@ -671,15 +764,10 @@ def updt_auth_mscrpt_endpt(author_id: int, manuscript_id: int):
         check_json_req_props(
             Manuscript, request.json, {"manuscript_id"}, chk_missing=False
         )
-        author_obj = Author.query.get_or_404(author_id)
-        manuscript_objs = list(
-            filter(
-                lambda bobj: bobj.manuscript_id == manuscript_id, author_obj.manuscripts
-            )
-        )
+        abort_if_missing(Author, author_id)
         # Verifying that this author_id is associated with this
         # manuscript_id in authors_manuscripts.
-        if len(manuscript_objs) == 0:
+        if not _auths_assocd(AuthorsManuscripts, manuscript_id, author_id):
             return abort(404)
         # Using updt_model_obj() to fetch the Manuscript object and
         # update it against request.json.
@@ -688,9 +776,9 @@ def updt_auth_mscrpt_endpt(author_id: int, manuscript_id: int):
             Manuscript,
             gen_crt_updt_argd(Manuscript, request.json),
         )
-        db.session.add(manuscript_obj)
-        db.session.commit()
-        return jsonify(manuscript_obj.serialize())
+        response = jsonify_and_commit(manuscript_obj)
+        invalidate_rows(Manuscript, manuscript_id)
+        return response
     except Exception as exception:
         return handle_exc(exception)
 
@@ -701,23 +789,25 @@ def crt_auth_metdt_endpt(author_id: int):
     Implements a POST /authors/{author_id}/metadata endpoint. Creates
     a row in the authors_metadata table with the given author_id
     from the JSON parameters. Fails if there already is a row in the
-    authors_metadata table with that author_id value.
+    authors_metadata table with that author_id value. A fields query
+    parameter selects the columns to output.
 
     :author_id: the author_id value to set on the new row in the
     authors_metadata table
     :return: a flask.Response object
     """
     try:
+        field_names = parse_fields(_auth_metdt_columns, request.args)
         check_json_req_props(
             AuthorMetadata, request.json, {"author_metadata_id", "author_id"}
         )
-        Author.query.get_or_404(author_id)
+        abort_if_missing(Author, author_id)
         check_json_req_props(
             AuthorMetadata, request.json, {"author_id", "author_metadata_id"}
         )
-        results = tuple(
-            AuthorMetadata.query.where(AuthorMetadata.author_id == author_id)
-        )
+        results = db.session.scalars(
+            _auth_metdt_by_auth_stmt, dict(author_id=author_id)
+        ).all()
         if len(results):
             raise ValueError(
                 f"metadata for author with id {author_id} already exists; cannot create anew"
@@ -728,8 +818,7 @@ def crt_auth_metdt_endpt(author_id: int):
             AuthorMetadata, gen_crt_updt_argd(AuthorMetadata, query_dict)
         )
         db.session.add(author_metadata_obj)
-        db.session.commit()
-        return jsonify(author_metadata_obj.serialize())
+        return jsonify_and_commit(author_metadata_obj, field_names)
     except Exception as exception:
         return handle_exc(exception)
 
@@ -765,32 +854,14 @@ def crt_auths_bk_endpt(author1_id: int, author2_id: int):
     :return: a flask.Response object
     """
     try:
-        Author.query.get_or_404(author1_id)
-        Author.query.get_or_404(author2_id)
+        if missing_ids(Author, [author1_id, author2_id]):
+            return abort(404)
         if author1_id == author2_id:
             raise ValueError("author1_id and author2_id are equal")
         check_json_req_props(Book, request.json, {"book_id"}, {"series_id"})
-        # Using crt_model_obj() to process request.json into a Book()
-        # argument dict and instance a Book() object.
-        book_obj = crt_model_obj(
-            Book,
-            gen_crt_updt_argd(Book, request.json),
-            optional_params={"series_id"},
-        )
-        db.session.add(book_obj)
-        db.session.commit()
-        # Associating the new book_id with both author_ids in the
-        # authors_books table.
-        ab1_insert = AuthorsBooks.insert().values(
-            author_id=author1_id, book_id=book_obj.book_id
-        )
-        ab2_insert = AuthorsBooks.insert().values(
-            author_id=author2_id, book_id=book_obj.book_id
-        )
-        db.session.execute(ab1_insert)
-        db.session.execute(ab2_insert)
-        db.session.commit()
-        return jsonify(book_obj.serialize())
+        # The new book is created and associated with both author_ids
+        # in the authors_books table, in one transaction.
+        return crt_bk_with_auths([author1_id, author2_id], request.json)
     except Exception as exception:
         return handle_exc(exception)
 
@@ -812,32 +883,15 @@ def crt_auths_mscrpt_endpt(author1_id: int, author2_id: int):
     :return: a flask.Response object
     """
     try:
-        Author.query.get_or_404(author1_id)
-        Author.query.get_or_404(author2_id)
+        if missing_ids(Author, [author1_id, author2_id]):
+            return abort(404)
         if author1_id == author2_id:
             raise ValueError("author1_id and author2_id are equal")
         check_json_req_props(Manuscript, request.json, {"manuscript_id"}, {"series_id"})
-        # Using crt_model_obj() to process request.json into a
-        # Manuscript() argument dict and instance a Manuscript() object.
-        manuscript_obj = crt_model_obj(
-            Manuscript,
-            gen_crt_updt_argd(Manuscript, request.json),
-            optional_params={"series_id"},
-        )
-        db.session.add(manuscript_obj)
-        db.session.commit()
-        # Associating the new manuscript_id with both author_ids in the
-        # authors_manuscripts table.
-        ab1_insert = AuthorsManuscripts.insert().values(
-            author_id=author1_id, manuscript_id=manuscript_obj.manuscript_id
-        )
-        ab2_insert = AuthorsManuscripts.insert().values(
-            author_id=author2_id, manuscript_id=manuscript_obj.manuscript_id
-        )
-        db.session.execute(ab1_insert)
-        db.session.execute(ab2_insert)
-        db.session.commit()
-        return jsonify(manuscript_obj.serialize())
+        # The new manuscript is created and associated with both
+        # author_ids in the authors_manuscripts table, in one
+        # transaction.
+        return crt_mscrpt_with_auths([author1_id, author2_id], request.json)
     except Exception as exception:
         return handle_exc(exception)
 
@@ -856,27 +910,14 @@ def crt_auth_bk_endpt(author_id: int):
     :return: a flask.Response object
     """
     try:
-        Author.query.get_or_404(author_id)
-        # Using crt_model_obj() to process request.json into a Book()
-        # argument dict and instance a Book() object.
+        if missing_ids(Author, [author_id]):
+            return abort(404)
         check_json_req_props(
             Book, request.json, {"author_id", "book_id"}, {"series_id"}
         )
-        book_obj = crt_model_obj(
-            Book,
-            gen_crt_updt_argd(Book, request.json),
-            optional_params={"series_id"},
-        )
-        db.session.add(book_obj)
-        db.session.commit()
-        # Associating the new book_id with both author_ids in the
-        # authors_books table.
-        ab_insert = AuthorsBooks.insert().values(
-            author_id=author_id, book_id=book_obj.book_id
-        )
-        db.session.execute(ab_insert)
-        db.session.commit()
-        return jsonify(book_obj.serialize())
+        # The new book is created and associated with the author_id in
+        # the authors_books table, in one transaction.
+        return crt_bk_with_auths([author_id], request.json)
     except Exception as exception:
         return handle_exc(exception)
 
@@ -897,24 +938,12 @@ def crt_auth_mscrpt_endpt(author_id: int):
     """
     try:
         check_json_req_props(Manuscript, request.json, {"manuscript_id"})
-        Author.query.get_or_404(author_id)
-        # Using crt_model_obj() to process request.json into a
-        # Manuscript() argument dict and instance a Manuscript() object.
-        manuscript_obj = crt_model_obj(
-            Manuscript,
-            gen_crt_updt_argd(Manuscript, request.json),
-            optional_params={"series_id"},
-        )
-        db.session.add(manuscript_obj)
-        db.session.commit()
-        # Associating the new manuscript_id with the author_id in the
-        # authors_manuscripts table.
-        ab_insert = AuthorsManuscripts.insert().values(
-            author_id=author_id, manuscript_id=manuscript_obj.manuscript_id
-        )
-        db.session.execute(ab_insert)
-        db.session.commit()
-        return jsonify(manuscript_obj.serialize())
+        if missing_ids(Author, [author_id]):
+            return abort(404)
+        # The new manuscript is created and associated with the
+        # author_id in the authors_manuscripts table, in one
+        # transaction.
+        return crt_mscrpt_with_auths([author_id], request.json)
     except Exception as exception:
         return handle_exc(exception)
 
@@ -931,9 +960,9 @@ def del_auth_metdt_endpt(author_id: int):
     :return: a flask.Response object
     """
     try:
-        metadata_objs = tuple(
-            AuthorMetadata.query.where(AuthorMetadata.author_id == author_id)
-        )
+        metadata_objs = db.session.scalars(
+            _auth_metdt_by_auth_stmt, dict(author_id=author_id)
+        ).all()
         if len(metadata_objs) == 0:
             return abort(404)
         elif len(metadata_objs) > 1:
@@ -969,27 +998,16 @@ def del_auths_bk_endpt(author1_id: int, author2_id: int, book_id: int):
     :return: a flask.Response object
     """
     try:
-        author1_obj = Author.query.get_or_404(author1_id)
-        author2_obj = Author.query.get_or_404(author2_id)
+        abort_if_missing(Author, author1_id, author2_id)
         if author1_id == author2_id:
             raise ValueError("author1_id and author2_id are equal")
-        a1_book_objs = list(
-            filter(lambda bobj: bobj.book_id == book_id, author1_obj.books)
-        )
-        a2_book_objs = list(
-            filter(lambda bobj: bobj.book_id == book_id, author2_obj.books)
-        )
         # This step verifies that the two author_ids each occur in a row
         # in authors_books with this book_id set.
-        if len(a1_book_objs) == 0 or len(a2_book_objs) == 0:
+        if not _auths_assocd(AuthorsBooks, book_id, author1_id, author2_id):
             return abort(404)
-        (book_obj,) = a1_book_objs
-        # That row in authors_books needs to be deleted too.
-        ab_del = AuthorsBooks.delete().where(AuthorsBooks.columns[1] == book_id)
-        db.session.execute(ab_del)
-        db.session.commit()
-        db.session.delete(book_obj)
-        db.session.commit()
+        # del_model_obj() deletes the rows in authors_books with that
+        # book_id too.
+        del_model_obj(book_id, Book)
         return jsonify(True)
     except Exception as exception:
         return handle_exc(exception)
@@ -1017,36 +1035,16 @@ def del_auths_mscrpt_endpt(author1_id: int, author2_id: int, manuscript_id: int)
     :return: a flask.Response object
     """
     try:
-        author1_obj = Author.query.get_or_404(author1_id)
-        author2_obj = Author.query.get_or_404(author2_id)
+        abort_if_missing(Author, author1_id, author2_id)
         if author1_id == author2_id:
             raise ValueError("author1_id and author2_id are equal")
-        a1_manuscript_objs = list(
-            filter(
-                lambda bobj: bobj.manuscript_id == manuscript_id,
-                author1_obj.manuscripts,
-            )
-        )
-        a2_manuscript_objs = list(
-            filter(
-                lambda bobj: bobj.manuscript_id == manuscript_id,
-                author2_obj.manuscripts,
-            )
-        )
         # This step verifies that the two author_ids each occur in a row
         # in authors_manuscripts with this manuscript_id set.
-        if len(a1_manuscript_objs) == 0 or len(a2_manuscript_objs) == 0:
+        if not _auths_assocd(AuthorsManuscripts, manuscript_id, author1_id, author2_id):
             return abort(404)
-
-        (manuscript_obj,) = a1_manuscript_objs
-        # That row in authors_manuscripts needs to be deleted too.
-        ab_del = AuthorsManuscripts.delete().where(
-            AuthorsManuscripts.columns[1] == manuscript_id
-        )
-        db.session.execute(ab_del)
-        db.session.commit()
-        db.session.delete(manuscript_obj)
-        db.session.commit()
+        # del_model_obj() deletes the rows in authors_manuscripts with
+        # that manuscript_id too.
+        del_model_obj(manuscript_id, Manuscript)
         return jsonify(True)
     except Exception as exception:
         return handle_exc(exception)
@@ -1064,7 +1062,7 @@ def del_auth_by_auid_endpt(author_id: int):
     :return: a flask.Response object
     """
     try:
-        author_obj = Author.query.get_or_404(author_id)
+        author_obj = get_row_or_404(Author, author_id)
         ab_del = AuthorsBooks.delete().where(AuthorsBooks.columns[0] == author_id)
         db.session.execute(ab_del)
         am_del = AuthorsManuscripts.delete().where(
@@ -1074,6 +1072,7 @@ def del_auth_by_auid_endpt(author_id: int):
         db.session.commit()
         db.session.delete(author_obj)
         db.session.commit()
+        invalidate_rows(Author, author_id)
         return jsonify(True)
     except Exception as exception:
         return handle_exc(exception)
@@ -1093,19 +1092,14 @@ def del_auth_bk_endpt(author_id: int, book_id: int):
     :return: a flask.Response object
     """
     try:
-        author_obj = Author.query.get_or_404(author_id)
-        book_objs = list(filter(lambda bobj: bobj.book_id == book_id, author_obj.books))
+        abort_if_missing(Author, author_id)
         # This step verifies that there is a row in authors_books with
         # the given author_id and the given book_id.
-        if len(book_objs) == 0:
+        if not _auths_assocd(AuthorsBooks, book_id, author_id):
             return abort(404)
-        (book_obj,) = book_objs
-        # That row in authors_books must be deleted as well.
-        ab_del = AuthorsBooks.delete().where(AuthorsBooks.columns[1] == book_id)
-        db.session.execute(ab_del)
-        db.session.commit()
-        db.session.delete(book_obj)
-        db.session.commit()
+        # del_model_obj() deletes the rows in authors_books with that
+        # book_id as well.
+        del_model_obj(book_id, Book)
         return jsonify(True)
     except Exception as exception:
         return handle_exc(exception)
@@ -1127,25 +1121,14 @@ def del_auth_mscrpt_endpt(author_id: int, manuscript_id: int):
     :return: a flask.Response object
     """
     try:
-        author_obj = Author.query.get_or_404(author_id)
-        manuscript_objs = list(
-            filter(
-                lambda bobj: bobj.manuscript_id == manuscript_id, author_obj.manuscripts
-            )
-        )
+        abort_if_missing(Author, author_id)
         # This step verifies that there is a row in authors_manuscripts
         # with the given author_id and the given manuscript_id.
-        if len(manuscript_objs) == 0:
+        if not _auths_assocd(AuthorsManuscripts, manuscript_id, author_id):
             return abort(404)
-        (manuscript_obj,) = manuscript_objs
-        # That row in authors_manuscripts must be deleted as well.
-        ab_del = AuthorsManuscripts.delete().where(
-            AuthorsManuscripts.columns[1] == manuscript_id
-        )
-        db.session.execute(ab_del)
-        db.session.commit()
-        db.session.delete(manuscript_obj)
-        db.session.commit()
+        # del_model_obj() deletes the rows in authors_manuscripts with
+        # that manuscript_id as well.
+        del_model_obj(manuscript_id, Manuscript)
         return jsonify(True)
     except Exception as exception:
         return handle_exc(exception)
@@ -0,0 +1,181 @@
+#!/usr/bin/python3
+
+from functools import partial
+
+from flask import Blueprint, current_app, jsonify, request
+from flask.globals import app_ctx
+from werkzeug.test import EnvironBuilder
+
+from risuspubl.api.utility import handle_exc
+from risuspubl.dbmodels import db
+from risuspubl.fanout import fan_out_app_contexts
+from risuspubl.profiling import NESTED_REQUEST_KEY
+
+
+blueprint = Blueprint("batch", __name__, url_prefix="/batch")
+
+
+# The default configuration values, applied with setdefault() when the
+# blueprint is registered so that anything passed to create_app() in
+# test_config takes precedence.
+_default_config = {
+    # The most sub-requests a single batch can hold.
+    "BATCH_MAX_REQUESTS": 50,
+}
+
+# The methods a sub-request can use. Only GETs are run concurrently.
+_batch_methods = frozenset(("GET", "POST", "PATCH", "PUT", "DELETE"))
+
+
+@blueprint.record_once
+def _set_default_config(state):
+    for key, value in _default_config.items():
+        state.app.config.setdefault(key, value)
+
+
+def _parse_sub_requests(request_json):
+    # Validates request_json["requests"], a list of objects each with a
+    # method, a path (which can have a query string), and optionally a
+    # JSON body. Returns them as a list of (method, path, body) tuples.
+    sub_request_jsobjs = request_json.get("requests")
+    if not isinstance(sub_request_jsobjs, list) or not sub_request_jsobjs:
+        raise ValueError("parameter requests: must be a non-empty list")
+    max_requests = current_app.config["BATCH_MAX_REQUESTS"]
+    if len(sub_request_jsobjs) > max_requests:
+        raise ValueError(
+            f"parameter requests: a batch can hold at most {max_requests} requests"
+        )
+    sub_requests = list()
+    for index, sub_request_jsobj in enumerate(sub_request_jsobjs):
+        if not isinstance(sub_request_jsobj, dict) or not (
+            {"method", "path"} <= sub_request_jsobj.keys() <= {"method", "path", "body"}
+        ):
+            raise ValueError(
+                f"parameter requests: element {index} must be an object with "
+                + "method and path properties, and optionally a body"
+            )
+        method, path = sub_request_jsobj["method"], sub_request_jsobj["path"]
+        if not isinstance(method, str) or method.upper() not in _batch_methods:
+            raise ValueError(
+                f"parameter requests: element {index} has method {method!r}; "
+                + f"it must be one of {sorted(_batch_methods)}"
+            )
+        if not isinstance(path, str) or not path.startswith("/"):
+            raise ValueError(
+                f"parameter requests: element {index} has path {path!r}; it "
+                + "must be a string starting with /"
+            )
+        if path.split("?", 1)[0].rstrip("/") == blueprint.url_prefix:
+            raise ValueError(
+                f"parameter requests: element {index} is a batch; batches "
+                + "can't be nested"
+            )
+        sub_requests.append((method.upper(), path, sub_request_jsobj.get("body")))
+    return sub_requests
+
+
+def _dispatch_sub_request(app, environ):
+    # Runs the sub-request through the app's usual dispatch, with its
+    # before- and after-request hooks, but no WSGI round trip. The
+    # request context shares the current app context, and so its
+    # db.session and identity map. The hooks keep per-request state in
+    # g, so the sub-request gets a g of its own for the duration rather
+    # than overwriting the batch's.
+    outer_app_ctx = app_ctx._get_current_object()
+    outer_g = outer_app_ctx.g
+    outer_app_ctx.g = app.app_ctx_globals_class()
+    try:
+        with app.request_context(environ):
+            try:
+                response = app.full_dispatch_request()
+            except Exception as exception:
+                # HTTP errors are handled by full_dispatch_request();
+                # anything else would otherwise fail the whole batch.
+                response = app.make_response(handle_exc(exception))
+            # A failed statement leaves the shared session unusable until
+            # it's rolled back, which would fail every sub-request after
+            # this one too.
+            if response.status_code >= 500:
+                db.session.rollback()
+            return response
+    finally:
+        outer_app_ctx.g = outer_g
+
+
+def _serialize_sub_response(response):
+    # A JSON body is embedded as is, and any other as text.
+    headers = {
+        key: value for key, value in response.headers.items() if key != "Content-Length"
+    }
+    if response.is_json:
+        body = response.get_json(silent=True)
+    else:
+        body = response.get_data(as_text=True)
+    return dict(status=response.status_code, headers=headers, body=body)
+
+
+@blueprint.route("", methods=["POST"])
+def batch_endpt():
+    """
+    Implements a POST /batch endpoint. The JSON body has a requests list
+    of objects, each with a method, a path and optionally a JSON body,
+    and an optional concurrent boolean. Each request is dispatched to
+    the API's own endpoints in the same process, in order, sharing one
+    session; with concurrent true, runs of consecutive GET requests are
+    run at the same time each with a session of its own. Outputs a
+    responses list with the status, headers and body of each response,
+    in the same order.
+
+    :return: A flask.Response object.
+    """
+    try:
+        if not isinstance(request.json, dict):
+            raise ValueError("request body must be a JSON object")
+        unexpected_props = request.json.keys() - {"requests", "concurrent"}
+        if unexpected_props:
+            raise ValueError(
+                f"unexpected properties {sorted(unexpected_props)}; the request "
+                + "body has a requests list and optionally concurrent"
+            )
+        concurrent = request.json.get("concurrent", False)
+        if not isinstance(concurrent, bool):
+            raise ValueError("parameter concurrent: must be a boolean")
+        sub_requests = _parse_sub_requests(request.json)
+
+        app = current_app._get_current_object()
+        dispatchers = [
+            partial(
+                _dispatch_sub_request,
+                app,
+                EnvironBuilder(
+                    path=path,
+                    base_url=request.host_url,
+                    method=method,
+                    json=body,
+                    environ_base={
+                        "REMOTE_ADDR": request.remote_addr,
+                        NESTED_REQUEST_KEY: True,
+                    },
+                ).get_environ(),
+            )
+            for method, path, body in sub_requests
+        ]
+
+        # Writes run one at a time, in order; with concurrent, each run
+        # of GETs between them is fanned out.
+        responses = list()
+        index = 0
+        while index < len(sub_requests):
+            run_end = index + 1
+            if concurrent and sub_requests[index][0] == "GET":
+                while run_end < len(sub_requests) and sub_requests[run_end][0] == "GET":
+                    run_end += 1
+            responses.extend(fan_out_app_contexts(*dispatchers[index:run_end]))
+            index = run_end
+        return jsonify(
+            dict(
+                responses=[_serialize_sub_response(response) for response in responses]
+            )
+        )
+    except Exception as exception:
+        return handle_exc(exception)
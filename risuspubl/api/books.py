@@ -4,13 +4,19 @@ from flask import Blueprint, request
 
 from risuspubl.api.utility import (
     check_json_req_props,
+    crt_tbl_row_with_authors_clos,
     del_tbl_row_by_id_clos,
     disp_tbl_row_by_id_clos,
+    disp_tbl_rows_by_ids_clos,
     disp_tbl_rows_clos,
     handle_exc,
+    missing_ids,
+    parse_ids_json,
     updt_tbl_row_by_id_clos,
+    updt_tbl_rows_clos,
+    validate_author_ids,
 )
-from risuspubl.dbmodels import Book
+from risuspubl.dbmodels import Author, AuthorsBooks, Book
 
 
 blueprint = Blueprint("books", __name__, url_prefix="/books")
@@ -22,10 +28,19 @@ blueprint = Blueprint("books", __name__, url_prefix="/books")
 # A closure for GET /books
 disp_bks = disp_tbl_rows_clos(Book)
 
+# A closure for POST /books/ids
+disp_bks_by_ids = disp_tbl_rows_by_ids_clos(Book)
+
+# A closure for PATCH /books, a bulk update by filter
+updt_bks = updt_tbl_rows_clos(Book)
+
 
 # A closure for GET /books/<id>
 disp_bk_by_bkid = disp_tbl_row_by_id_clos(Book)
 
+# A closure for POST /books
+crt_bk_with_auths = crt_tbl_row_with_authors_clos(Book, AuthorsBooks)
+
 # A closure for PATCH /books/<id>
 updt_bk_by_bkid = updt_tbl_row_by_id_clos(Book)
 
@@ -39,10 +54,50 @@ def index_endpt():
     Implements a GET /books endpoint. All rows in the books table are
     loaded and output as a JSON list.
 
+    The filter, sort and fields query parameters narrow, order and
+    project the rows; see utility.compile_collection_query(). With an
+    ids query parameter, just the rows with those ids are output; see
+    utility.disp_tbl_rows_by_ids_clos().
+
     :return: A flask.Response object.
     """
     try:
-        return disp_bks()
+        return disp_bks(request.args)
+    except Exception as exception:
+        return handle_exc(exception)
+
+
+@blueprint.route("/ids", methods=["POST"])
+def disp_bks_by_ids_endpt():
+    """
+    Implements a POST /books/ids endpoint, the same multi-get as GET
+    /books?ids= for a list of book_ids too long for a URL. The JSON body
+    is {"ids": [...]}. The rows found are output in the order given,
+    and the ids not found are listed; see
+    utility.disp_tbl_rows_by_ids_clos().
+
+    :return: A flask.Response object.
+    """
+    try:
+        return disp_bks_by_ids(parse_ids_json(request.json), request.args)
+    except Exception as exception:
+        return handle_exc(exception)
+
+
+@blueprint.route("", methods=["PATCH"])
+def updt_bulk_endpt():
+    """
+    Implements a PATCH /books endpoint. Every row in the books table
+    matching the filter query parameters, of which there must be at
+    least one, is updated from the JSON parameters in one UPDATE. An
+    integer column can also be given as {"add": n} or {"mul": n}.
+    The number of rows updated is output, or with return=rows the rows
+    themselves; see utility.updt_tbl_rows_clos().
+
+    :return: A flask.Response object.
+    """
+    try:
+        return updt_bks(request.args, request.json)
     except Exception as exception:
         return handle_exc(exception)
 
@@ -58,18 +113,35 @@ def disp_bk_by_bkid_endpt(book_id: int):
     :return: A flask.Response object.
     """
     try:
-        return disp_bk_by_bkid(book_id)
+        return disp_bk_by_bkid(book_id, request.args)
     except Exception as exception:
         return handle_exc(exception)
 
 
-# A Create endpoint is deliberately not implemented, because without
-# a way to specify the author or authors to attach the book to, no
-# entry in the authors_books table would be created and the book
-# would an orphan in the database. /authors/<author_id>/books and
-# /authors/<author1_id>/<author2_id>/books already accept Create actions
-# and when done that way associations with an author or authors can be
-# created appropriately.
+@blueprint.route("", methods=["POST"])
+def crt_bk_endpt():
+    """
+    Implements a POST /books endpoint. A new row in the books table
+    is constituted from the JSON parameters and saved to that table. Its
+    author_ids property, a list of one or more author_ids, is required:
+    rows in the authors_books table associating the new book_id with
+    each of those authors are added, so the book isn't an orphan.
+
+    :return: A flask.Response object.
+    """
+    try:
+        book_json = dict(request.json)
+        author_ids = validate_author_ids(book_json.pop("author_ids", None))
+        check_json_req_props(Book, book_json, {"book_id"}, {"series_id"})
+        absent_author_ids = missing_ids(Author, author_ids)
+        if absent_author_ids:
+            raise ValueError(
+                f"supplied author_ids {absent_author_ids} do not correspond "
+                + "to any rows in the `authors` table"
+            )
+        return crt_bk_with_auths(author_ids, book_json)
+    except Exception as exception:
+        return handle_exc(exception)
 
 
 @blueprint.route("/<int:book_id>", methods=["PATCH", "PUT"])
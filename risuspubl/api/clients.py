@@ -3,13 +3,16 @@
 from flask import Blueprint, request
 
 from risuspubl.api.utility import (
-    crt_tbl_row_clos,
     check_json_req_props,
+    crt_tbl_row_clos,
     del_tbl_row_by_id_clos,
     disp_tbl_row_by_id_clos,
+    disp_tbl_rows_by_ids_clos,
     disp_tbl_rows_clos,
     handle_exc,
+    parse_ids_json,
     updt_tbl_row_by_id_clos,
+    updt_tbl_rows_clos,
 )
 from risuspubl.dbmodels import Client
 
@@ -24,6 +27,12 @@ blueprint = Blueprint("clients", __name__, url_prefix="/clients")
 # A closure for GET /clients
 disp_clnts = disp_tbl_rows_clos(Client)
 
+# A closure for POST /clients/ids
+disp_clnts_by_ids = disp_tbl_rows_by_ids_clos(Client)
+
+# A closure for PATCH /clients, a bulk update by filter
+updt_clnts = updt_tbl_rows_clos(Client)
+
 # A closure for POST /clients
 crt_clnt = crt_tbl_row_clos(Client)
 
@@ -44,10 +53,50 @@ def index_endpt():
     Implements a GET /clients endpoint. All rows in the clients table
     are loaded and output as a JSON list.
 
+    The filter, sort and fields query parameters narrow, order and
+    project the rows; see utility.compile_collection_query(). With an
+    ids query parameter, just the rows with those ids are output; see
+    utility.disp_tbl_rows_by_ids_clos().
+
+    :return: A flask.Response object.
+    """
+    try:
+        return disp_clnts(request.args)
+    except Exception as exception:
+        return handle_exc(exception)
+
+
+@blueprint.route("/ids", methods=["POST"])
+def disp_clnts_by_ids_endpt():
+    """
+    Implements a POST /clients/ids endpoint, the same multi-get as GET
+    /clients?ids= for a list of client_ids too long for a URL. The JSON body
+    is {"ids": [...]}. The rows found are output in the order given,
+    and the ids not found are listed; see
+    utility.disp_tbl_rows_by_ids_clos().
+
+    :return: A flask.Response object.
+    """
+    try:
+        return disp_clnts_by_ids(parse_ids_json(request.json), request.args)
+    except Exception as exception:
+        return handle_exc(exception)
+
+
+@blueprint.route("", methods=["PATCH"])
+def updt_bulk_endpt():
+    """
+    Implements a PATCH /clients endpoint. Every row in the clients table
+    matching the filter query parameters, of which there must be at
+    least one, is updated from the JSON parameters in one UPDATE. An
+    integer column can also be given as {"add": n} or {"mul": n}.
+    The number of rows updated is output, or with return=rows the rows
+    themselves; see utility.updt_tbl_rows_clos().
+
     :return: A flask.Response object.
     """
     try:
-        return disp_clnts()
+        return updt_clnts(request.args, request.json)
     except Exception as exception:
         return handle_exc(exception)
 
@@ -63,7 +112,7 @@ def disp_clnt_by_clid_endpt(client_id: int):
     :return: A flask.Response object.
     """
     try:
-        return disp_clnt_by_id(client_id)
+        return disp_clnt_by_id(client_id, request.args)
     except Exception as exception:
         return handle_exc(exception)
 
@@ -12,10 +12,55 @@ HELP_JSOBJ = {
     "docroot": {
         "/": {"GET": "Returns this help object."},
     },
+    "_metrics": {
+        "/_metrics": {
+            "GET": (
+                "Displays this process's operational counters: row cache "
+                + "hits, misses and evictions, and SQL statement counts and "
+                + "timings per endpoint. Only answers local requests unless "
+                + "METRICS_ALLOW_REMOTE is set."
+            )
+        },
+    },
+    "associations": {
+        "/associations/authors_books": {
+            "PATCH": (
+                "Adds the (author_id, book_id) pairs in the submitted add list "
+                + "to authors_books and removes those in its remove list, in "
+                + "one transaction."
+            ),
+        },
+        "/associations/authors_manuscripts": {
+            "PATCH": (
+                "Adds the (author_id, manuscript_id) pairs in the submitted add "
+                + "list to authors_manuscripts and removes those in its remove "
+                + "list, in one transaction."
+            ),
+        },
+    },
     "authors": {
         "/authors": {
+            "PATCH": (
+                "Updates every author matching the filter[{{column}}][{{op}}] "
+                + "parameters, at least one of which is required, according to "
+                + "the data submitted. Takes the optional return=rows and "
+                + "fields parameters."
+            ),
             "POST": "Adds the submitted object as a new author.",
-            "GET": "Returns a list of all authors.",
+            "GET": (
+                "Returns a list of all authors. Takes the optional "
+                + "filter[{{column}}][{{op}}], sort, fields and include "
+                + "parameters."
+                + " With an ids parameter, a list of author ids, displays "
+                + "just those authors, in that order."
+            ),
+        },
+        "/authors/ids": {
+            "POST": (
+                "Displays the authors with the author ids in the submitted "
+                + "object's ids list, in that order, and lists the ids not "
+                + "found. Takes the optional fields and include parameters."
+            ),
         },
         "/authors/{{authorId}}": {
             "DELETE": "Deletes the author with author id {{authorId}}.",
@@ -28,7 +73,10 @@ HELP_JSOBJ = {
         "/authors/{{authorId}}/books": {
             "GET": (
                 "Displays a list of all books by the author with author id "
-                + "{{authorId}}."
+                + "{{authorId}}. "
+                + "In id order, a page at a time: the after and per_page "
+                + "parameters select the page, and a Link header points to "
+                + "the next one."
             ),
             "POST": (
                 "Adds the submitted object as a new book and associates it "
@@ -52,7 +100,10 @@ HELP_JSOBJ = {
         "/authors/{{authorId}}/manuscripts": {
             "GET": (
                 "Displays a list of all manuscripts by the author with author "
-                + "id {{authorId}}."
+                + "id {{authorId}}. "
+                + "In id order, a page at a time: the after and per_page "
+                + "parameters select the page, and a Link header points to "
+                + "the next one."
             ),
             "POST": (
                 "Adds the submitted object as a new manuscript and associates "
@@ -101,7 +152,10 @@ HELP_JSOBJ = {
             "GET": (
                 "Displays a list of all books that are a collaboration "
                 + "between the authors with author ids {{authorOneId}} and "
-                + "{{authorTwoId}}."
+                + "{{authorTwoId}}. "
+                + "In id order, a page at a time: the after and per_page "
+                + "parameters select the page, and a Link header points to "
+                + "the next one."
             ),
             "POST": (
                 "Adds the submitted object as a new book and associates it "
@@ -128,7 +182,10 @@ HELP_JSOBJ = {
             "GET": (
                 "Displays a list of all manuscripts that are a collaboration "
                 + "between the authors with author ids {{authorOneId}} and "
-                + "{{authorTwoId}}."
+                + "{{authorTwoId}}. "
+                + "In id order, a page at a time: the after and per_page "
+                + "parameters select the page, and a Link header points to "
+                + "the next one."
             ),
             "POST": (
                 "Adds the submitted object as a new manuscript and associates "
@@ -154,11 +211,50 @@ HELP_JSOBJ = {
             ),
         },
     },
+    "batch": {
+        "/batch": {
+            "POST": (
+                "Dispatches each request in the submitted object's requests "
+                + "list, each an object with a method, a path and an optional "
+                + "body, and displays their responses in order. With "
+                + "concurrent set to true, consecutive GET requests run at "
+                + "the same time."
+            ),
+        },
+    },
     "books": {
-        "/books": {"GET": "Displays a list of all books."},
+        "/books": {
+            "PATCH": (
+                "Updates every book matching the filter[{{column}}][{{op}}] "
+                + "parameters, at least one of which is required, according to "
+                + "the data submitted. Takes the optional return=rows and "
+                + "fields parameters."
+            ),
+            "GET": (
+                "Displays a list of all books. Takes the optional "
+                + "filter[{{column}}][{{op}}], sort, fields and include "
+                + "parameters."
+                + " With an ids parameter, a list of book ids, displays "
+                + "just those books, in that order."
+            ),
+            "POST": (
+                "Adds the submitted object as a new book, associated with "
+                + "each author in its required author_ids list."
+            ),
+        },
+        "/books/ids": {
+            "POST": (
+                "Displays the books with the book ids in the submitted "
+                + "object's ids list, in that order, and lists the ids not "
+                + "found. Takes the optional fields and include parameters."
+            ),
+        },
         "/books/{{bookId}}": {
             "DELETE": "Deletes the book with book id {{bookId}}.",
-            "GET": "Displays the book with book id {{bookId}}.",
+            "GET": (
+                "Displays the book with book id {{bookId}}. Takes the optional "
+                + "fields and include parameters."
+            ),
             "PATCH": (
                 "Updates the book with book id {{bookId}} according to the "
                 + "data submitted."
@@ -167,9 +263,27 @@ HELP_JSOBJ = {
     },
     "clients": {
         "/clients": {
-            "GET": "Displays a list of all clients.",
+            "PATCH": (
+                "Updates every client matching the filter[{{column}}][{{op}}] "
+                + "parameters, at least one of which is required, according to "
+                + "the data submitted. Takes the optional return=rows and "
+                + "fields parameters."
+            ),
+            "GET": (
+                "Displays a list of all clients. Takes the optional "
+                + "filter[{{column}}][{{op}}], sort and fields parameters."
+                + " With an ids parameter, a list of client ids, displays "
+                + "just those clients, in that order."
+            ),
             "POST": "Adds the submitted object as a new client.",
         },
+        "/clients/ids": {
+            "POST": (
+                "Displays the clients with the client ids in the submitted "
+                + "object's ids list, in that order, and lists the ids not "
+                + "found. Takes the optional fields parameter."
+            ),
+        },
         "/clients/{{clientId}}": {
             "DELETE": "Deletes the client with client id {{clientId}}.",
             "GET": "Displays the client with client id {{clientId}}.",
@@ -181,12 +295,34 @@ HELP_JSOBJ = {
     },
     "editors": {
         "/editors": {
-            "GET": "Displays a list of all editors.",
+            "PATCH": (
+                "Updates every editor matching the filter[{{column}}][{{op}}] "
+                + "parameters, at least one of which is required, according to "
+                + "the data submitted. Takes the optional return=rows and "
+                + "fields parameters."
+            ),
+            "GET": (
+                "Displays a list of all editors. Takes the optional "
+                + "filter[{{column}}][{{op}}], sort, fields and include "
+                + "parameters."
+                + " With an ids parameter, a list of editor ids, displays "
+                + "just those editors, in that order."
+            ),
             "POST": "Adds the submitted object as a new editor.",
         },
+        "/editors/ids": {
+            "POST": (
+                "Displays the editors with the editor ids in the submitted "
+                + "object's ids list, in that order, and lists the ids not "
+                + "found. Takes the optional fields and include parameters."
+            ),
+        },
         "/editors/{{editorId}}": {
             "DELETE": "Deletes the editor with editor id {{editorId}}.",
-            "GET": "Displays the editor with editor id {{editorId}}.",
+            "GET": (
+                "Displays the editor with editor id {{editorId}}. Takes the optional "
+                + "fields and include parameters."
+            ),
             "PATCH": (
                 "Updates the editor with editor id {{editorId}} according to "
                 + "the data submitted."
@@ -195,7 +331,10 @@ HELP_JSOBJ = {
         "/editors/{{editorId}}/books": {
             "GET": (
                 "Displays a list of all books that the editor with editor id "
-                + "{{editorId}} was the editor on."
+                + "{{editorId}} was the editor on. "
+                + "In id order, a page at a time: the after and per_page "
+                + "parameters select the page, and a Link header points to "
+                + "the next one."
             ),
         },
         "/editors/{{editorId}}/books/{{bookId}}": {
@@ -216,7 +355,10 @@ HELP_JSOBJ = {
         "/editors/{{editorId}}/manuscripts": {
             "GET": (
                 "Displays a list of all manuscripts that the editor with "
-                + "editor id {{editorId}} was the editor on."
+                + "editor id {{editorId}} was the editor on. "
+                + "In id order, a page at a time: the after and per_page "
+                + "parameters select the page, and a Link header points to "
+                + "the next one."
             )
         },
         "/editors/{{editorId}}/manuscripts/{{manuscriptId}}": {
@@ -238,20 +380,110 @@ HELP_JSOBJ = {
         },
     },
     "manuscripts": {
-        "/manuscripts": {"GET": "Displays a list of all manuscripts."},
+        "/manuscripts": {
+            "PATCH": (
+                "Updates every manuscript matching the filter[{{column}}][{{op}}] "
+                + "parameters, at least one of which is required, according to "
+                + "the data submitted. Takes the optional return=rows and "
+                + "fields parameters."
+            ),
+            "GET": (
+                "Displays a list of all manuscripts. Takes the optional "
+                + "filter[{{column}}][{{op}}], sort, fields and include "
+                + "parameters."
+                + " With an ids parameter, a list of manuscript ids, displays "
+                + "just those manuscripts, in that order."
+            ),
+            "POST": (
+                "Adds the submitted object as a new manuscript, associated with "
+                + "each author in its required author_ids list."
+            ),
+        },
+        "/manuscripts/ids": {
+            "POST": (
+                "Displays the manuscripts with the manuscript ids in the submitted "
+                + "object's ids list, in that order, and lists the ids not "
+                + "found. Takes the optional fields and include parameters."
+            ),
+        },
         "/manuscripts/{{manuscriptId}}": {
             "DELETE": "Deletes the manuscript with manuscript id {{manuscriptId}}.",
-            "GET": "Displays the manuscript with manuscript id {{manuscriptId}}.",
+            "GET": (
+                "Displays the manuscript with manuscript id {{manuscriptId}}. Takes the optional "
+                + "fields and include parameters."
+            ),
             "PATCH": (
                 "Updates the manuscript with manuscript id {{manuscriptId}} "
                 + "according to the data submitted."
             ),
         },
     },
+    "metrics": {
+        "/metrics": {
+            "GET": (
+                "Displays request latency and response size histograms, "
+                + "in-flight requests, database pool, row cache and SQL "
+                + "statement metrics in Prometheus text exposition format. "
+                + "Only answers local requests unless METRICS_ALLOW_REMOTE "
+                + "is set."
+            )
+        },
+    },
     "sales_records": {
+        "/sales_records": {
+            "GET": (
+                "Displays the sales records with the sales record ids in the "
+                + "required ids parameter, in that order, and lists the ids "
+                + "not found. Takes the optional fields parameter."
+            ),
+        },
+        "/sales_records/ids": {
+            "POST": (
+                "Displays the sales records with the sales record ids in the "
+                + "submitted object's ids list, in that order, and lists the "
+                + "ids not found. Takes the optional fields parameter."
+            ),
+        },
         "/sales_records/books/{{bookId}}": {
             "GET": "Displays the sales records for the book with book id {{bookId}}."
         },
+        "/sales_records/rollups/books/{{bookId}}": {
+            "GET": (
+                "Displays the yearly sales totals for the book with book id "
+                + "{{bookId}}, in chronological order."
+            )
+        },
+        "/sales_records/rollups/editors/{{editorId}}": {
+            "GET": (
+                "Displays the yearly sales totals for the books edited by "
+                + "the editor with editor id {{editorId}}, in chronological "
+                + "order."
+            )
+        },
+        "/sales_records/rollups/series/{{seriesId}}": {
+            "GET": (
+                "Displays the yearly sales totals for the books in the "
+                + "series with series id {{seriesId}}, in chronological order."
+            )
+        },
+        "/sales_records/rollups/years/{{year}}/books/{{bookId}}": {
+            "GET": (
+                "Displays the sales totals for the book with book id "
+                + "{{bookId}} for the year {{year}}."
+            )
+        },
+        "/sales_records/rollups/years/{{year}}/editors/{{editorId}}": {
+            "GET": (
+                "Displays the sales totals for the books edited by the "
+                + "editor with editor id {{editorId}} for the year {{year}}."
+            )
+        },
+        "/sales_records/rollups/years/{{year}}/series/{{seriesId}}": {
+            "GET": (
+                "Displays the sales totals for the books in the series with "
+                + "series id {{seriesId}} for the year {{year}}."
+            )
+        },
         "/sales_records/years/{{year}}": {
             "GET": (
                 "Displays all sales records for the year {{year}}, in "
@@ -282,9 +514,27 @@ HELP_JSOBJ = {
     },
     "salespeople": {
         "/salespeople": {
-            "GET": "Displays a list of all salespeople.",
+            "PATCH": (
+                "Updates every salesperson matching the filter[{{column}}][{{op}}] "
+                + "parameters, at least one of which is required, according to "
+                + "the data submitted. Takes the optional return=rows and "
+                + "fields parameters."
+            ),
+            "GET": (
+                "Displays a list of all salespeople. Takes the optional "
+                + "filter[{{column}}][{{op}}], sort and fields parameters."
+                + " With an ids parameter, a list of salesperson ids, displays "
+                + "just those salespeople, in that order."
+            ),
             "POST": "Adds the submitted object as a new salesperson.",
         },
+        "/salespeople/ids": {
+            "POST": (
+                "Displays the salespeople with the salesperson ids in the submitted "
+                + "object's ids list, in that order, and lists the ids not "
+                + "found. Takes the optional fields parameter."
+            ),
+        },
         "/salespeople/{{salespersonId}}": {
             "DELETE": (
                 "Deletes the salesperson with salesperson id {{salespersonId}}."
@@ -300,7 +550,10 @@ HELP_JSOBJ = {
         "/salespeople/{{salespersonId}}/clients": {
             "GET": (
                 "Displays a list of all clients that the salesperson with "
-                + "salesperson id {{salespersonId}} handles."
+                + "salesperson id {{salespersonId}} handles. "
+                + "In id order, a page at a time: the after and per_page "
+                + "parameters select the page, and a Link header points to "
+                + "the next one."
             ),
             "POST": (
                 "Adds the submitted object as a new client and associates it "
@@ -324,14 +577,70 @@ HELP_JSOBJ = {
             ),
         },
     },
+    "search": {
+        "/search": {
+            "GET": (
+                "Displays books, manuscripts, series and authors matching the "
+                + "q parameter, fuzzily or by full text, best matches first. "
+                + "Each result has its type, id, rank and record. The page and "
+                + "per_page parameters page through the results."
+            )
+        },
+        "/search/authors": {
+            "GET": (
+                "Displays authors whose names or biographies match the q "
+                + "parameter, best matches first."
+            )
+        },
+        "/search/books": {
+            "GET": (
+                "Displays books whose titles match the q parameter, best "
+                + "matches first."
+            )
+        },
+        "/search/manuscripts": {
+            "GET": (
+                "Displays manuscripts whose working titles match the q "
+                + "parameter, best matches first."
+            )
+        },
+        "/search/series": {
+            "GET": (
+                "Displays series whose titles match the q parameter, best "
+                + "matches first."
+            )
+        },
+    },
     "series": {
         "/series": {
-            "GET": "Displays a list of all book series.",
+            "PATCH": (
+                "Updates every series matching the filter[{{column}}][{{op}}] "
+                + "parameters, at least one of which is required, according to "
+                + "the data submitted. Takes the optional return=rows and "
+                + "fields parameters."
+            ),
+            "GET": (
+                "Displays a list of all book series. Takes the optional "
+                + "filter[{{column}}][{{op}}], sort, fields and include "
+                + "parameters."
+                + " With an ids parameter, a list of series ids, displays "
+                + "just those series, in that order."
+            ),
             "POST": "Adds the submitted object as a new series.",
         },
+        "/series/ids": {
+            "POST": (
+                "Displays the series with the series ids in the submitted "
+                + "object's ids list, in that order, and lists the ids not "
+                + "found. Takes the optional fields and include parameters."
+            ),
+        },
         "/series/{{seriesId}}": {
             "DELETE": "Deletes the series with series id {{seriesId}}.",
-            "GET": "Displays the series with series id {{seriesId}}.",
+            "GET": (
+                "Displays the series with series id {{seriesId}}. Takes the optional "
+                + "fields and include parameters."
+            ),
             "PATCH": (
                 "Updates the series with series id {{seriesId}} according to "
                 + "the data submitted."
@@ -340,7 +649,10 @@ HELP_JSOBJ = {
         "/series/{{seriesId}}/books": {
             "GET": (
                 "Displays a list of the books in the series with series id "
-                + "{{seriesId}}."
+                + "{{seriesId}}. "
+                + "In id order, a page at a time: the after and per_page "
+                + "parameters select the page, and a Link header points to "
+                + "the next one."
             )
         },
         "/series/{{seriesId}}/books/{{bookId}}": {
@@ -357,7 +669,10 @@ HELP_JSOBJ = {
         "/series/{{seriesId}}/manuscripts": {
             "GET": (
                 "Displays a list of the manuscripts in the series with series "
-                + "id {{seriesId}}."
+                + "id {{seriesId}}. "
+                + "In id order, a page at a time: the after and per_page "
+                + "parameters select the page, and a Link header points to "
+                + "the next one."
             )
         },
         "/series/{{seriesId}}/manuscripts/{{manuscriptId}}": {
@@ -5,17 +5,23 @@ from flask import Blueprint, request, jsonify
 from risuspubl.api.utility import (
     check_json_req_props,
     crt_tbl_row_clos,
-    del_tbl_row_by_id_foreign_key_clos,
     del_tbl_row_by_id_clos,
-    disp_tbl_row_by_id_foreign_key_clos,
+    del_tbl_row_by_id_foreign_key_clos,
     disp_tbl_row_by_id_clos,
+    disp_tbl_row_by_id_foreign_key_clos,
     disp_tbl_rows_by_foreign_id_clos,
+    disp_tbl_rows_by_ids_clos,
     disp_tbl_rows_clos,
     handle_exc,
-    updt_tbl_row_by_id_foreign_key_clos,
+    parse_ids_json,
+    select_by_column,
     updt_tbl_row_by_id_clos,
+    updt_tbl_row_by_id_foreign_key_clos,
+    updt_tbl_rows_clos,
 )
+from risuspubl.cache import invalidate_rows
 from risuspubl.dbmodels import Book, Editor, Manuscript, db
+from risuspubl.lookups import get_row_or_404
 
 
 blueprint = Blueprint("editors", __name__, url_prefix="/editors")
@@ -28,6 +34,12 @@ blueprint = Blueprint("editors", __name__, url_prefix="/editors")
 # A closure for GET /editors
 disp_edtrs = disp_tbl_rows_clos(Editor)
 
+# A closure for POST /editors/ids
+disp_edtrs_by_ids = disp_tbl_rows_by_ids_clos(Editor)
+
+# A closure for PATCH /editors, a bulk update by filter
+updt_edtrs = updt_tbl_rows_clos(Editor)
+
 # A closure for POST /editors
 crt_edtr = crt_tbl_row_clos(Editor)
 
@@ -83,6 +95,10 @@ del_mscrpt_by_msid_and_edtr_id = del_tbl_row_by_id_foreign_key_clos(
     Editor, "editor_id", Manuscript, "manuscript_id"
 )
 
+# The books and manuscripts with an editor_id, for DELETE /editors/<id>.
+_bks_by_edtr_stmt = select_by_column(Book, "editor_id")
+_mscrpts_by_edtr_stmt = select_by_column(Manuscript, "editor_id")
+
 
 @blueprint.route("", methods=["GET"])
 def index_endpt():
@@ -90,10 +106,50 @@ def index_endpt():
     Implements a GET /editors endpoint. All rows in the editors table
     are loaded and output as a JSON list.
 
+    The filter, sort and fields query parameters narrow, order and
+    project the rows; see utility.compile_collection_query(). With an
+    ids query parameter, just the rows with those ids are output; see
+    utility.disp_tbl_rows_by_ids_clos().
+
+    :return: A flask.Response object.
+    """
+    try:
+        return disp_edtrs(request.args)
+    except Exception as exception:
+        return handle_exc(exception)
+
+
+@blueprint.route("/ids", methods=["POST"])
+def disp_edtrs_by_ids_endpt():
+    """
+    Implements a POST /editors/ids endpoint, the same multi-get as GET
+    /editors?ids= for a list of editor_ids too long for a URL. The JSON body
+    is {"ids": [...]}. The rows found are output in the order given,
+    and the ids not found are listed; see
+    utility.disp_tbl_rows_by_ids_clos().
+
     :return: A flask.Response object.
     """
     try:
-        return disp_edtrs()
+        return disp_edtrs_by_ids(parse_ids_json(request.json), request.args)
+    except Exception as exception:
+        return handle_exc(exception)
+
+
+@blueprint.route("", methods=["PATCH"])
+def updt_bulk_endpt():
+    """
+    Implements a PATCH /editors endpoint. Every row in the editors table
+    matching the filter query parameters, of which there must be at
+    least one, is updated from the JSON parameters in one UPDATE. An
+    integer column can also be given as {"add": n} or {"mul": n}.
+    The number of rows updated is output, or with return=rows the rows
+    themselves; see utility.updt_tbl_rows_clos().
+
+    :return: A flask.Response object.
+    """
+    try:
+        return updt_edtrs(request.args, request.json)
     except Exception as exception:
         return handle_exc(exception)
 
@@ -109,7 +165,7 @@ def disp_edtr_by_edid_endpt(editor_id: int):
     :return: A flask.Response object.
     """
     try:
-        return disp_edtr_by_id(editor_id)
+        return disp_edtr_by_id(editor_id, request.args)
     except Exception as exception:
         return handle_exc(exception)
 
@@ -126,7 +182,7 @@ def disp_edtr_bks_endpt(editor_id: int):
     :return: A flask.Response object.
     """
     try:
-        return disp_bks_by_edtr_id(editor_id)
+        return disp_bks_by_edtr_id(editor_id, request.args)
     except Exception as exception:
         return handle_exc(exception)
 
@@ -144,7 +200,7 @@ def disp_edtr_bk_by_edid_endpt(editor_id: int, book_id: int):
     :return: A flask.Response object.
     """
     try:
-        return disp_bk_by_bkid_and_edtr_id(editor_id, book_id)
+        return disp_bk_by_bkid_and_edtr_id(editor_id, book_id, request.args)
     except Exception as exception:
         return handle_exc(exception)
 
@@ -162,7 +218,7 @@ def disp_edtr_mscrpts_endpt(editor_id: int):
     :return: A flask.Response object.
     """
     try:
-        return disp_mscrpts_by_edtr_id(editor_id)
+        return disp_mscrpts_by_edtr_id(editor_id, request.args)
     except Exception as exception:
         return handle_exc(exception)
 
@@ -181,7 +237,7 @@ def disp_edtr_mscrpt_by_edid_endpt(editor_id: int, manuscript_id: int):
     :return: A flask.Response object.
     """
     try:
-        return disp_mscrpt_by_msid_and_edtr_id(editor_id, manuscript_id)
+        return disp_mscrpt_by_msid_and_edtr_id(editor_id, manuscript_id, request.args)
     except Exception as exception:
         return handle_exc(exception)
 
@@ -282,21 +338,33 @@ def del_edtr_by_edid_endpt(editor_id: int):
     """
     try:
         # Checking for the existence of this Editor object
-        editor_obj = Editor.query.get_or_404(editor_id)
+        editor_obj = get_row_or_404(Editor, editor_id)
 
         # Finding all Book and Manuscript objects with the editor_id
         # column set to this value and resetting it to None i.e. null
-        book_objs = Book.query.filter(Book.editor_id == editor_id)
+        book_ids = list()
+        book_objs = db.session.scalars(_bks_by_edtr_stmt, dict(editor_id=editor_id))
         for book_obj in book_objs:
             book_obj.editor_id = None
-        manuscript_objs = Manuscript.query.filter(Manuscript.editor_id == editor_id)
+            book_ids.append(book_obj.book_id)
+        manuscript_ids = list()
+        manuscript_objs = db.session.scalars(
+            _mscrpts_by_edtr_stmt, dict(editor_id=editor_id)
+        )
         for manuscript_obj in manuscript_objs:
             manuscript_obj.editor_id = None
+            manuscript_ids.append(manuscript_obj.manuscript_id)
         db.session.commit()
 
         # Deleting the object, now free of foreign key dependencies
         db.session.delete(editor_obj)
         db.session.commit()
+
+        # The changed books and manuscripts and the deleted editor are
+        # dropped from the row cache.
+        invalidate_rows(Book, *book_ids)
+        invalidate_rows(Manuscript, *manuscript_ids)
+        invalidate_rows(Editor, editor_id)
         return jsonify(True)
     except Exception as exception:
         return handle_exc(exception)
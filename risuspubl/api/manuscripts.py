@@ -3,13 +3,20 @@
 from flask import Blueprint, request
 
 from risuspubl.api.utility import (
+    check_json_req_props,
+    crt_tbl_row_with_authors_clos,
     del_tbl_row_by_id_clos,
     disp_tbl_row_by_id_clos,
+    disp_tbl_rows_by_ids_clos,
     disp_tbl_rows_clos,
     handle_exc,
+    missing_ids,
+    parse_ids_json,
     updt_tbl_row_by_id_clos,
+    updt_tbl_rows_clos,
+    validate_author_ids,
 )
-from risuspubl.dbmodels import Manuscript
+from risuspubl.dbmodels import Author, AuthorsManuscripts, Manuscript
 
 
 blueprint = Blueprint("manuscripts", __name__, url_prefix="/manuscripts")
@@ -22,10 +29,19 @@ blueprint = Blueprint("manuscripts", __name__, url_prefix="/manuscripts")
 # A closure for GET /manuscripts
 disp_mscrpts = disp_tbl_rows_clos(Manuscript)
 
+# A closure for POST /manuscripts/ids
+disp_mscrpts_by_ids = disp_tbl_rows_by_ids_clos(Manuscript)
+
+# A closure for PATCH /manuscripts, a bulk update by filter
+updt_mscrpts = updt_tbl_rows_clos(Manuscript)
+
 
 # A closure for GET /manuscripts/<id>
 disp_mscrpt_by_msid = disp_tbl_row_by_id_clos(Manuscript)
 
+# A closure for POST /manuscripts
+crt_mscrpt_with_auths = crt_tbl_row_with_authors_clos(Manuscript, AuthorsManuscripts)
+
 # A closure for PATCH /manuscripts/<id>
 updt_mscrpt_by_msd = updt_tbl_row_by_id_clos(Manuscript)
 
@@ -39,10 +55,50 @@ def index_endpt():
     Implements a GET /manuscripts endpoint. All rows in the manuscripts
     table are loaded and output as a JSON list.
 
+    The filter, sort and fields query parameters narrow, order and
+    project the rows; see utility.compile_collection_query(). With an
+    ids query parameter, just the rows with those ids are output; see
+    utility.disp_tbl_rows_by_ids_clos().
+
     :return: A flask.Response object.
     """
     try:
-        return disp_mscrpts()
+        return disp_mscrpts(request.args)
+    except Exception as exception:
+        return handle_exc(exception)
+
+
+@blueprint.route("/ids", methods=["POST"])
+def disp_mscrpts_by_ids_endpt():
+    """
+    Implements a POST /manuscripts/ids endpoint, the same multi-get as GET
+    /manuscripts?ids= for a list of manuscript_ids too long for a URL. The JSON body
+    is {"ids": [...]}. The rows found are output in the order given,
+    and the ids not found are listed; see
+    utility.disp_tbl_rows_by_ids_clos().
+
+    :return: A flask.Response object.
+    """
+    try:
+        return disp_mscrpts_by_ids(parse_ids_json(request.json), request.args)
+    except Exception as exception:
+        return handle_exc(exception)
+
+
+@blueprint.route("", methods=["PATCH"])
+def updt_bulk_endpt():
+    """
+    Implements a PATCH /manuscripts endpoint. Every row in the manuscripts table
+    matching the filter query parameters, of which there must be at
+    least one, is updated from the JSON parameters in one UPDATE. An
+    integer column can also be given as {"add": n} or {"mul": n}.
+    The number of rows updated is output, or with return=rows the rows
+    themselves; see utility.updt_tbl_rows_clos().
+
+    :return: A flask.Response object.
+    """
+    try:
+        return updt_mscrpts(request.args, request.json)
     except Exception as exception:
         return handle_exc(exception)
 
@@ -59,19 +115,38 @@ def disp_mscrpt_by_msid_endpt(manuscript_id: int):
     :return: A flask.Response object.
     """
     try:
-        return disp_mscrpt_by_msid(manuscript_id)
+        return disp_mscrpt_by_msid(manuscript_id, request.args)
     except Exception as exception:
         return handle_exc(exception)
 
 
-# A Create endpoint is deliberately not implemented, because
-# without a way to specify the author or authors to attach
-# the manuscript to, no entry in the authors_manuscripts
-# table would be created and the manuscript would an orphan
-# in the database. /authors/<author_id>/manuscripts and
-# /authors/<author1_id>/<author2_id>/manuscripts already accept Create
-# actions and when done that way associations with an author or authors
-# can be created appropriately.
+@blueprint.route("", methods=["POST"])
+def crt_mscrpt_endpt():
+    """
+    Implements a POST /manuscripts endpoint. A new row in the
+    manuscripts table is constituted from the JSON parameters and saved
+    to that table. Its author_ids property, a list of one or more
+    author_ids, is required: rows in the authors_manuscripts table
+    associating the new manuscript_id with each of those authors are
+    added, so the manuscript isn't an orphan.
+
+    :return: A flask.Response object.
+    """
+    try:
+        manuscript_json = dict(request.json)
+        author_ids = validate_author_ids(manuscript_json.pop("author_ids", None))
+        check_json_req_props(
+            Manuscript, manuscript_json, {"manuscript_id"}, {"series_id"}
+        )
+        absent_author_ids = missing_ids(Author, author_ids)
+        if absent_author_ids:
+            raise ValueError(
+                f"supplied author_ids {absent_author_ids} do not correspond "
+                + "to any rows in the `authors` table"
+            )
+        return crt_mscrpt_with_auths(author_ids, manuscript_json)
+    except Exception as exception:
+        return handle_exc(exception)
 
 
 @blueprint.route("/<int:manuscript_id>", methods=["PATCH", "PUT"])
@@ -0,0 +1,67 @@
+#!/usr/bin/python3
+
+from flask import Blueprint, Response, abort, current_app, jsonify, request
+
+from risuspubl.api.utility import handle_exc
+from risuspubl.cache import get_row_cache
+from risuspubl.prometheus import CONTENT_TYPE, render_exposition
+
+
+blueprint = Blueprint("metrics", __name__)
+
+
+# The addresses GET /_metrics and GET /metrics answer when
+# METRICS_ALLOW_REMOTE is off.
+_loopback_addrs = frozenset(("127.0.0.1", "::1"))
+
+
+def _abort_if_remote():
+    # Both endpoints expose the app's internals, so they answer only the
+    # loopback interface unless METRICS_ALLOW_REMOTE is set, and to
+    # anyone else they don't exist.
+    if (
+        not current_app.config["METRICS_ALLOW_REMOTE"]
+        and request.remote_addr not in _loopback_addrs
+    ):
+        abort(404)
+
+
+@blueprint.route("/_metrics", methods=["GET"])
+def disp_metrics_endpt():
+    """
+    Implements a GET /_metrics endpoint. Displays the operational
+    counters this process has collected, as a JSON object: the row
+    cache's counters, and the SQL statement count and timing totals for
+    each endpoint. Requests from anywhere but the loopback interface get
+    a 404 unless METRICS_ALLOW_REMOTE is set.
+
+    :return: A flask.Response object.
+    """
+    try:
+        _abort_if_remote()
+        row_cache = get_row_cache()
+        return jsonify(
+            dict(
+                row_cache=row_cache.stats() if row_cache is not None else None,
+                sql=current_app.extensions["sql_stats"].snapshot(),
+            )
+        )
+    except Exception as exception:
+        return handle_exc(exception)
+
+
+@blueprint.route("/metrics", methods=["GET"])
+def disp_prometheus_metrics_endpt():
+    """
+    Implements a GET /metrics endpoint. Displays every metric this
+    process has collected in Prometheus text exposition format. Requests
+    from anywhere but the loopback interface get a 404 unless
+    METRICS_ALLOW_REMOTE is set.
+
+    :return: A flask.Response object.
+    """
+    try:
+        _abort_if_remote()
+        return Response(render_exposition(), content_type=CONTENT_TYPE)
+    except Exception as exception:
+        return handle_exc(exception)
@@ -1,9 +1,22 @@
 #!/usr/bin/python3
 
-from flask import Blueprint, abort, jsonify
+from flask import Blueprint, abort, jsonify, request
+from sqlalchemy import bindparam, func, select
 
-from risuspubl.api.utility import disp_tbl_row_by_id_clos, handle_exc
-from risuspubl.dbmodels import SalesRecord, db
+from risuspubl.api.utility import (
+    disp_tbl_row_by_id_clos,
+    disp_tbl_rows_by_ids_clos,
+    handle_exc,
+    parse_ids,
+    parse_ids_json,
+)
+from risuspubl.dbmodels import (
+    BookYearSales,
+    EditorYearSales,
+    SalesRecord,
+    SeriesYearSales,
+    db,
+)
 
 
 blueprint = Blueprint("sales_records", __name__, url_prefix="/sales_records")
@@ -16,12 +29,67 @@ blueprint = Blueprint("sales_records", __name__, url_prefix="/sales_records")
 # A closure for GET /sales_records/<record_id>
 disp_slrcd_by_id = disp_tbl_row_by_id_clos(SalesRecord)
 
+# A closure for GET /sales_records?ids= and POST /sales_records/ids
+disp_slrcds_by_ids = disp_tbl_rows_by_ids_clos(SalesRecord)
+
+
+# The statements behind the endpoints below, built once at import time
+# with bound parameters so that SQLAlchemy's compiled cache is hit on
+# every request rather than a new Query being assembled each time.
+_min_and_max_year_stmt = select(func.min(SalesRecord.year), func.max(SalesRecord.year))
+_slrcds_by_yr_stmt = select(SalesRecord).where(SalesRecord.year == bindparam("year"))
+_slrcds_by_yr_mo_stmt = _slrcds_by_yr_stmt.where(
+    SalesRecord.month == bindparam("month")
+)
+_slrcds_by_bkid_stmt = select(SalesRecord).where(
+    SalesRecord.book_id == bindparam("book_id")
+)
+_slrcds_by_yr_bkid_stmt = _slrcds_by_bkid_stmt.where(
+    SalesRecord.year == bindparam("year")
+)
+_slrcds_by_yr_mo_bkid_stmt = _slrcds_by_yr_bkid_stmt.where(
+    SalesRecord.month == bindparam("month")
+)
+
 
 def _get_min_and_max_year():
-    return (
-        db.session.query(db.func.min(SalesRecord.year)).scalar(),
-        db.session.query(db.func.max(SalesRecord.year)).scalar(),
-    )
+    return tuple(db.session.execute(_min_and_max_year_stmt).one())
+
+
+@blueprint.route("", methods=["GET"])
+def disp_slrcds_by_ids_endpt():
+    """
+    Implements a GET /sales_records?ids= endpoint, a multi-get. The rows
+    in the sales_records table with the sales_record_ids listed are
+    output in the order given, and the ids not found are listed. The
+    table is too large to list whole, so the ids parameter is required.
+
+    :return: A flask.Response object.
+    """
+    try:
+        if "ids" not in request.args:
+            raise ValueError(
+                "parameter ids: required; the sales_records table can only be "
+                + "listed by sales_record_id"
+            )
+        return disp_slrcds_by_ids(parse_ids("ids", request.args["ids"]), request.args)
+    except Exception as exception:
+        return handle_exc(exception)
+
+
+@blueprint.route("/ids", methods=["POST"])
+def disp_slrcds_by_ids_post_endpt():
+    """
+    Implements a POST /sales_records/ids endpoint, the same multi-get as
+    GET /sales_records?ids= for a list of sales_record_ids too long for
+    a URL. The JSON body is {"ids": [...]}.
+
+    :return: A flask.Response object.
+    """
+    try:
+        return disp_slrcds_by_ids(parse_ids_json(request.json), request.args)
+    except Exception as exception:
+        return handle_exc(exception)
 
 
 @blueprint.route("/<int:sales_record_id>", methods=["GET"])
@@ -34,7 +102,7 @@ def disp_slrcd_endpt(sales_record_id: int):
     :return: A flask.Response object.
     """
     try:
-        return disp_slrcd_by_id(sales_record_id)
+        return disp_slrcd_by_id(sales_record_id, request.args)
     except Exception as exception:
         return handle_exc(exception)
 
@@ -57,7 +125,7 @@ def disp_slrcds_by_yr_endpt(year: int):
                 f"year parameter value {year} not in the range [{min_year}, {max_year}]: "
                 + "no sales in specified year"
             )
-        for sales_record_obj in SalesRecord.query.where(SalesRecord.year == year):
+        for sales_record_obj in db.session.scalars(_slrcds_by_yr_stmt, dict(year=year)):
             retval.append(sales_record_obj.serialize())
         retval.sort(
             key=lambda dictval: (dictval["year"], dictval["month"], dictval["book_id"])
@@ -93,8 +161,8 @@ def disp_slrcds_by_yr_mo_endpt(year: int, month: int):
                 f"month parameter value {month} not in the range [1, 12]: "
                 + "invalid month parameter"
             )
-        for sales_record_obj in SalesRecord.query.where(SalesRecord.year == year).where(
-            SalesRecord.month == month
+        for sales_record_obj in db.session.scalars(
+            _slrcds_by_yr_mo_stmt, dict(year=year, month=month)
         ):
             retval.append(sales_record_obj.serialize())
         if not len(retval):
@@ -119,9 +187,9 @@ def disp_slrcds_by_bkid_endpt(book_id: int):
     :return: a flask.Response object
     """
     try:
-        sales_record_objs = tuple(
-            SalesRecord.query.where(SalesRecord.book_id == book_id)
-        )
+        sales_record_objs = db.session.scalars(
+            _slrcds_by_bkid_stmt, dict(book_id=book_id)
+        ).all()
         if len(sales_record_objs) == 0:
             return abort(404)
         retval = [
@@ -146,11 +214,9 @@ def disp_slrcds_by_yr_bkid_endpt(year: int, book_id: int):
     :return: a flask.Response object
     """
     try:
-        sales_record_objs = tuple(
-            SalesRecord.query.where(SalesRecord.book_id == book_id).where(
-                SalesRecord.year == year
-            )
-        )
+        sales_record_objs = db.session.scalars(
+            _slrcds_by_yr_bkid_stmt, dict(year=year, book_id=book_id)
+        ).all()
         if len(sales_record_objs) == 0:
             return abort(404)
         retval = [
@@ -178,11 +244,9 @@ def disp_slrcds_by_yr_mo_bkid_endpt(year: int, month: int, book_id: int):
     :return: a flask.Response object
     """
     try:
-        sales_record_objs = tuple(
-            SalesRecord.query.where(SalesRecord.book_id == book_id)
-            .where(SalesRecord.year == year)
-            .where(SalesRecord.month == month)
-        )
+        sales_record_objs = db.session.scalars(
+            _slrcds_by_yr_mo_bkid_stmt, dict(year=year, month=month, book_id=book_id)
+        ).all()
         if len(sales_record_objs) == 0:
             return abort(404)
         (sales_record_obj,) = sales_record_objs
@@ -191,6 +255,155 @@ def disp_slrcds_by_yr_mo_bkid_endpt(year: int, month: int, book_id: int):
         return handle_exc(exception)
 
 
+# These private utility functions return closures that display rows
+# from one of the sales rollup tables: all of a book's, series' or
+# editor's yearly totals, or its totals for one year.
+def _disp_rollups_clos(rollup_model, id_column):
+    rollups_stmt = (
+        select(rollup_model)
+        .where(id_column == bindparam("model_id"))
+        .order_by(rollup_model.year)
+    )
+
+    def _disp_rollups(model_id: int):
+        rollup_objs = db.session.scalars(rollups_stmt, dict(model_id=model_id)).all()
+        if len(rollup_objs) == 0:
+            return abort(404)
+        return jsonify([rollup_obj.serialize() for rollup_obj in rollup_objs])
+
+    return _disp_rollups
+
+
+def _disp_rollup_by_yr_clos(rollup_model):
+    def _disp_rollup_by_yr(year: int, model_id: int):
+        # The rollup tables' primary keys are (*_id, year).
+        rollup_obj = db.session.get(rollup_model, (model_id, year))
+        if rollup_obj is None:
+            return abort(404)
+        return jsonify(rollup_obj.serialize())
+
+    return _disp_rollup_by_yr
+
+
+# Closures for GET /sales_records/rollups/{books,series,editors}/<id>
+disp_bk_rollups = _disp_rollups_clos(BookYearSales, BookYearSales.book_id)
+disp_srs_rollups = _disp_rollups_clos(SeriesYearSales, SeriesYearSales.series_id)
+disp_edtr_rollups = _disp_rollups_clos(EditorYearSales, EditorYearSales.editor_id)
+
+# Closures for GET
+# /sales_records/rollups/years/<year>/{books,series,editors}/<id>
+disp_bk_rollup_by_yr = _disp_rollup_by_yr_clos(BookYearSales)
+disp_srs_rollup_by_yr = _disp_rollup_by_yr_clos(SeriesYearSales)
+disp_edtr_rollup_by_yr = _disp_rollup_by_yr_clos(EditorYearSales)
+
+
+@blueprint.route("/rollups/books/<int:book_id>", methods=["GET"])
+def disp_bk_rollups_endpt(book_id: int):
+    """
+    Implements a GET /sales_records/rollups/books/{book_id} endpoint.
+    The book's sales totals for each year are loaded from the
+    book_year_sales rollup table and displayed in order by year.
+
+    :book_id: The book_id of the book to see yearly sales totals for.
+    :return: a flask.Response object
+    """
+    try:
+        return disp_bk_rollups(book_id)
+    except Exception as exception:
+        return handle_exc(exception)
+
+
+@blueprint.route("/rollups/series/<int:series_id>", methods=["GET"])
+def disp_srs_rollups_endpt(series_id: int):
+    """
+    Implements a GET /sales_records/rollups/series/{series_id} endpoint.
+    The sales totals of the books in the series for each year are loaded
+    from the series_year_sales rollup table and displayed in order by
+    year.
+
+    :series_id: The series_id of the series to see yearly sales totals
+    for.
+    :return: a flask.Response object
+    """
+    try:
+        return disp_srs_rollups(series_id)
+    except Exception as exception:
+        return handle_exc(exception)
+
+
+@blueprint.route("/rollups/editors/<int:editor_id>", methods=["GET"])
+def disp_edtr_rollups_endpt(editor_id: int):
+    """
+    Implements a GET /sales_records/rollups/editors/{editor_id}
+    endpoint. The sales totals of the books the editor edited for each
+    year are loaded from the editor_year_sales rollup table and
+    displayed in order by year.
+
+    :editor_id: The editor_id of the editor to see yearly sales totals
+    for.
+    :return: a flask.Response object
+    """
+    try:
+        return disp_edtr_rollups(editor_id)
+    except Exception as exception:
+        return handle_exc(exception)
+
+
+@blueprint.route("/rollups/years/<int:year>/books/<int:book_id>", methods=["GET"])
+def disp_bk_rollup_by_yr_endpt(year: int, book_id: int):
+    """
+    Implements a GET /sales_records/rollups/years/{year}/books/{book_id}
+    endpoint. The book's sales totals for that year are loaded from the
+    book_year_sales rollup table and displayed.
+
+    :year: The year to see the sales totals for.
+    :book_id: The book_id of the book to see the sales totals for.
+    :return: a flask.Response object
+    """
+    try:
+        return disp_bk_rollup_by_yr(year, book_id)
+    except Exception as exception:
+        return handle_exc(exception)
+
+
+@blueprint.route("/rollups/years/<int:year>/series/<int:series_id>", methods=["GET"])
+def disp_srs_rollup_by_yr_endpt(year: int, series_id: int):
+    """
+    Implements a GET
+    /sales_records/rollups/years/{year}/series/{series_id} endpoint. The
+    sales totals of the books in the series for that year are loaded
+    from the series_year_sales rollup table and displayed.
+
+    :year: The year to see the sales totals for.
+    :series_id: The series_id of the series to see the sales totals
+    for.
+    :return: a flask.Response object
+    """
+    try:
+        return disp_srs_rollup_by_yr(year, series_id)
+    except Exception as exception:
+        return handle_exc(exception)
+
+
+@blueprint.route("/rollups/years/<int:year>/editors/<int:editor_id>", methods=["GET"])
+def disp_edtr_rollup_by_yr_endpt(year: int, editor_id: int):
+    """
+    Implements a GET
+    /sales_records/rollups/years/{year}/editors/{editor_id} endpoint.
+    The sales totals of the books the editor edited for that year are
+    loaded from the editor_year_sales rollup table and displayed.
+
+    :year: The year to see the sales totals for.
+    :editor_id: The editor_id of the editor to see the sales totals
+    for.
+    :return: a flask.Response object
+    """
+    try:
+        return disp_edtr_rollup_by_yr(year, editor_id)
+    except Exception as exception:
+        return handle_exc(exception)
+
+
 # Adding, updating and deleting sales records is deliberately made
 # impossible since that's outside their object model: each book has
 # sales records for every month between its publication date and
@@ -7,16 +7,23 @@ from risuspubl.api.utility import (
     crt_model_obj,
     crt_tbl_row_clos,
     del_tbl_row_by_id_foreign_key_clos,
-    disp_tbl_row_by_id_foreign_key_clos,
     disp_tbl_row_by_id_clos,
+    disp_tbl_row_by_id_foreign_key_clos,
     disp_tbl_rows_by_foreign_id_clos,
+    disp_tbl_rows_by_ids_clos,
     disp_tbl_rows_clos,
     gen_crt_updt_argd,
     handle_exc,
-    updt_tbl_row_by_id_foreign_key_clos,
+    jsonify_and_commit,
+    parse_ids_json,
+    select_by_column,
     updt_tbl_row_by_id_clos,
+    updt_tbl_row_by_id_foreign_key_clos,
+    updt_tbl_rows_clos,
 )
+from risuspubl.cache import invalidate_rows
 from risuspubl.dbmodels import Client, Salesperson, db
+from risuspubl.lookups import abort_if_missing, get_row_or_404
 
 
 blueprint = Blueprint("salespeople", __name__, url_prefix="/salespeople")
@@ -29,6 +36,12 @@ blueprint = Blueprint("salespeople", __name__, url_prefix="/salespeople")
 # A closure for GET /salespeople
 disp_slsps = disp_tbl_rows_clos(Salesperson)
 
+# A closure for POST /salespeople/ids
+disp_slsps_by_ids = disp_tbl_rows_by_ids_clos(Salesperson)
+
+# A closure for PATCH /salespeople, a bulk update by filter
+updt_slsps = updt_tbl_rows_clos(Salesperson)
+
 # A closure for POST /salespeople
 crt_slsp = crt_tbl_row_clos(Salesperson)
 
@@ -61,6 +74,9 @@ del_clnt_by_clid_slsp_id = del_tbl_row_by_id_foreign_key_clos(
     Salesperson, "salesperson_id", Client, "client_id"
 )
 
+# The clients with a salesperson_id, for DELETE /salespeople/<id>.
+_clnts_by_slsp_stmt = select_by_column(Client, "salesperson_id")
+
 
 @blueprint.route("", methods=["GET"])
 def index_endpt():
@@ -68,10 +84,50 @@ def index_endpt():
     Implements a GET /salespeople endpoint. All rows in the salespeople
     table are loaded and output as a JSON list.
 
+    The filter, sort and fields query parameters narrow, order and
+    project the rows; see utility.compile_collection_query(). With an
+    ids query parameter, just the rows with those ids are output; see
+    utility.disp_tbl_rows_by_ids_clos().
+
+    :return: A flask.Response object.
+    """
+    try:
+        return disp_slsps(request.args)
+    except Exception as exception:
+        return handle_exc(exception)
+
+
+@blueprint.route("/ids", methods=["POST"])
+def disp_slsps_by_ids_endpt():
+    """
+    Implements a POST /salespeople/ids endpoint, the same multi-get as GET
+    /salespeople?ids= for a list of salesperson_ids too long for a URL. The JSON body
+    is {"ids": [...]}. The rows found are output in the order given,
+    and the ids not found are listed; see
+    utility.disp_tbl_rows_by_ids_clos().
+
+    :return: A flask.Response object.
+    """
+    try:
+        return disp_slsps_by_ids(parse_ids_json(request.json), request.args)
+    except Exception as exception:
+        return handle_exc(exception)
+
+
+@blueprint.route("", methods=["PATCH"])
+def updt_bulk_endpt():
+    """
+    Implements a PATCH /salespeople endpoint. Every row in the salespeople table
+    matching the filter query parameters, of which there must be at
+    least one, is updated from the JSON parameters in one UPDATE. An
+    integer column can also be given as {"add": n} or {"mul": n}.
+    The number of rows updated is output, or with return=rows the rows
+    themselves; see utility.updt_tbl_rows_clos().
+
     :return: A flask.Response object.
     """
     try:
-        return disp_slsps()
+        return updt_slsps(request.args, request.json)
     except Exception as exception:
         return handle_exc(exception)
 
@@ -89,7 +145,7 @@ def disp_slsp_by_slpid_endpt(salesperson_id: int):
     :return: A flask.Response object.
     """
     try:
-        return disp_slsp_by_id(salesperson_id)
+        return disp_slsp_by_id(salesperson_id, request.args)
     except Exception as exception:
         return handle_exc(exception)
 
@@ -106,7 +162,7 @@ def disp_slsp_clients_endpt(salesperson_id: int):
     :return: A flask.Response object.
     """
     try:
-        return disp_clnts_by_slsp_id(salesperson_id)
+        return disp_clnts_by_slsp_id(salesperson_id, request.args)
     except Exception as exception:
         return handle_exc(exception)
 
@@ -123,7 +179,7 @@ def disp_slsp_clnt_by_slpid_endpt(salesperson_id: int, client_id: int):
     :return: A flask.Response object.
     """
     try:
-        return disp_clnt_by_clid_slsp_id(salesperson_id, client_id)
+        return disp_clnt_by_clid_slsp_id(salesperson_id, client_id, request.args)
     except Exception as exception:
         return handle_exc(exception)
 
@@ -157,7 +213,7 @@ def crt_slsp_clnt_endpt(salesperson_id: int):
     """
     try:
         check_json_req_props(Client, request.json, {"client_id"})
-        Salesperson.query.get_or_404(salesperson_id)
+        abort_if_missing(Salesperson, salesperson_id)
         # Using crt_model_obj() to process request.json into a Client()
         # argument dict and instance a Client() object.
         client_obj = crt_model_obj(
@@ -166,8 +222,7 @@ def crt_slsp_clnt_endpt(salesperson_id: int):
         )
         client_obj.salesperson_id = salesperson_id
         db.session.add(client_obj)
-        db.session.commit()
-        return jsonify(client_obj.serialize())
+        return jsonify_and_commit(client_obj)
     except Exception as exception:
         return handle_exc(exception)
 
@@ -226,15 +281,21 @@ def del_slsp_by_slpid_endpt(salesperson_id: int):
     :return: A flask.Response object.
     """
     try:
-        salesperson_obj = Salesperson.query.get_or_404(salesperson_id)
+        salesperson_obj = get_row_or_404(Salesperson, salesperson_id)
         # Finding all Client objects with the salesperson_id column set
         # to this value and resetting it to None for each one.
-        client_objs = Client.query.filter(Client.salesperson_id == salesperson_id)
+        client_ids = list()
+        client_objs = db.session.scalars(
+            _clnts_by_slsp_stmt, dict(salesperson_id=salesperson_id)
+        )
         for client_obj in client_objs:
             client_obj.salesperson_id = None
+            client_ids.append(client_obj.client_id)
         db.session.commit()
         db.session.delete(salesperson_obj)
         db.session.commit()
+        invalidate_rows(Client, *client_ids)
+        invalidate_rows(Salesperson, salesperson_id)
         return jsonify(True)
     except Exception as exception:
         return handle_exc(exception)
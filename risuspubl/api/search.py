@@ -0,0 +1,245 @@
+#!/usr/bin/python3
+
+import heapq
+
+from flask import Blueprint, Response, current_app, jsonify, request, url_for
+from sqlalchemy import case, func, literal, or_, select, text
+from sqlalchemy.exc import OperationalError
+
+from risuspubl.api.utility import _validate_int, _validate_str, handle_exc
+from risuspubl.dbmodels import Author, AuthorMetadata, Book, Manuscript, Series, db
+
+
+blueprint = Blueprint("search", __name__, url_prefix="/search")
+
+
+# The default configuration values, applied with setdefault() when the
+# blueprint is registered so that anything passed to create_app() in
+# test_config takes precedence.
+_default_config = {
+    # A search query that runs longer than this is cancelled, and the
+    # endpoint responds 503.
+    "SEARCH_TIMEOUT_MS": 2000,
+    # The default and largest number of results per page.
+    "SEARCH_PER_PAGE": 20,
+    "SEARCH_MAX_PER_PAGE": 100,
+    # The last page that can be requested. Together with
+    # SEARCH_MAX_PER_PAGE this bounds the OFFSET of any search.
+    "SEARCH_MAX_PAGE": 50,
+}
+
+# The text search configuration. The tsvector indexes created by the
+# migration use the same one, and the expressions have to match for the
+# indexes to be used.
+_ts_config = "english"
+
+
+@blueprint.record_once
+def _set_default_config(state):
+    for key, value in _default_config.items():
+        state.app.config.setdefault(key, value)
+
+
+def _author_name():
+    return Author.first_name + " " + Author.last_name
+
+
+# What each kind of search looks at: the model, the text column to match
+# fuzzily and by full text, and for authors also their biography, which
+# is matched by full text only.
+_search_targets = {
+    "books": (Book, lambda: Book.title, None),
+    "manuscripts": (Manuscript, lambda: Manuscript.working_title, None),
+    "series": (Series, lambda: Series.title, None),
+    "authors": (Author, _author_name, lambda: AuthorMetadata.biography),
+}
+
+
+def _has_trigram_support():
+    # pg_trgm's similarity operators are used if the extension is
+    # installed; otherwise matching falls back to ILIKE, which is slower
+    # on large tables but gives the same results for substrings. Whether
+    # it is is remembered for the life of the pooled connection.
+    connection_info = db.session.connection().info
+    if "pg_trgm" not in connection_info:
+        connection_info["pg_trgm"] = bool(
+            db.session.execute(
+                text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            ).scalar()
+        )
+    return connection_info["pg_trgm"]
+
+
+def _search_stmt(target_name, q, trigram):
+    # Builds a SELECT of (model object, rank) for rows matching q, best
+    # matches first and ties broken by primary key.
+    model_class, text_column_fn, fulltext_column_fn = _search_targets[target_name]
+    text_column = text_column_fn()
+    ts_query = func.websearch_to_tsquery(_ts_config, q)
+    ts_vector = func.to_tsvector(_ts_config, text_column)
+    # Backslash, % and _ are escaped so the query is matched literally.
+    like_pattern = (
+        "%" + q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    )
+    match_clauses = [ts_vector.op("@@")(ts_query), text_column.ilike(like_pattern)]
+    rank = func.ts_rank(ts_vector, ts_query)
+    if trigram:
+        match_clauses.append(literal(q).op("<%")(text_column))
+        rank = rank + func.word_similarity(q, text_column)
+    else:
+        rank = rank + case((text_column.ilike(like_pattern), 0.5), else_=0.0)
+
+    primary_key = getattr(model_class, model_class.__primary_key__)
+    if fulltext_column_fn is None:
+        rank = rank.label("rank")
+        return (
+            select(model_class, rank)
+            .where(or_(*match_clauses))
+            .order_by(rank.desc(), primary_key)
+        )
+    # An author can match by their biography, so it's joined in. Grouping
+    # by author_id keeps one row per author, and an author without
+    # metadata ranks by name alone.
+    fulltext_vector = func.to_tsvector(_ts_config, fulltext_column_fn())
+    match_clauses.append(fulltext_vector.op("@@")(ts_query))
+    fulltext_rank = func.coalesce(func.ts_rank(fulltext_vector, ts_query), 0.0)
+    rank = func.max(rank + fulltext_rank / 2).label("rank")
+    return (
+        select(model_class, rank)
+        .outerjoin(AuthorMetadata, AuthorMetadata.author_id == Author.author_id)
+        .where(or_(*match_clauses))
+        .group_by(primary_key)
+        .order_by(rank.desc(), primary_key)
+    )
+
+
+def _search_args():
+    # Validates the q, page and per_page query parameters.
+    config = current_app.config
+    q = _validate_str("q", request.args.get("q", ""), 1, 128).strip()
+    if not q:
+        raise ValueError("parameter q: may not be blank")
+    page = _validate_int(
+        "page", request.args.get("page", 1), 1, config["SEARCH_MAX_PAGE"]
+    )
+    per_page = _validate_int(
+        "per_page",
+        request.args.get("per_page", config["SEARCH_PER_PAGE"]),
+        1,
+        config["SEARCH_MAX_PER_PAGE"],
+    )
+    return q, page, per_page
+
+
+def _run_search(target_names, q, limit):
+    # Runs the search for each target, taking up to limit rows from each,
+    # under the statement timeout. Returns (target name, model object,
+    # rank) tuples, best matches first.
+    trigram = _has_trigram_support()
+    db.session.execute(
+        text("SELECT set_config('statement_timeout', :timeout, true)"),
+        dict(timeout=str(current_app.config["SEARCH_TIMEOUT_MS"])),
+    )
+    results_by_target = [
+        [
+            (target_name, model_obj, rank)
+            for model_obj, rank in db.session.execute(
+                _search_stmt(target_name, q, trigram).limit(limit)
+            )
+        ]
+        for target_name in target_names
+    ]
+    # Each target's results are already in rank order, so they're merged
+    # rather than sorted.
+    return list(heapq.merge(*results_by_target, key=lambda result: -result[2]))
+
+
+def _paginated_response(jsobjs, has_more, q, page, per_page):
+    response = jsonify(jsobjs)
+    if has_more:
+        next_url = url_for(request.endpoint, q=q, page=page + 1, per_page=per_page)
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+    return response
+
+
+def _search_endpt_clos(target_name):
+    # Returns an endpoint function that searches one target and displays
+    # the matching rows, serialized the same as elsewhere in the API.
+    def _search_endpt():
+        try:
+            q, page, per_page = _search_args()
+            offset = (page - 1) * per_page
+            # One extra row is fetched to tell whether there's a next page.
+            results = _run_search((target_name,), q, offset + per_page + 1)
+            page_results = results[offset : offset + per_page]
+            return _paginated_response(
+                [model_obj.serialize() for _, model_obj, _ in page_results],
+                len(results) > offset + per_page,
+                q,
+                page,
+                per_page,
+            )
+        except OperationalError as exception:
+            return _timeout_response(exception)
+        except Exception as exception:
+            return handle_exc(exception)
+
+    _search_endpt.__name__ = f"search_{target_name}_endpt"
+    return _search_endpt
+
+
+def _timeout_response(exception):
+    # A search cancelled by the statement timeout is a 503; anything
+    # else goes to the usual handler.
+    if getattr(exception.orig, "pgcode", None) != "57014":
+        return handle_exc(exception)
+    db.session.rollback()
+    return Response(
+        "search took too long and was cancelled; try a more specific query\n", 503
+    )
+
+
+@blueprint.route("", methods=["GET"])
+def search_endpt():
+    """
+    Implements a GET /search?q={q} endpoint. Books, manuscripts, series
+    and authors (by name or biography) matching q, fuzzily or by full
+    text, are output as a JSON list, best matches first. Each result has
+    the type of thing found, its id, its rank and its serialization. The
+    page and per_page query parameters page through the results; if
+    there's another page, a Link header points to it.
+
+    :return: a flask.Response object
+    """
+    try:
+        q, page, per_page = _search_args()
+        offset = (page - 1) * per_page
+        results = _run_search(tuple(_search_targets), q, offset + per_page + 1)
+        retval = list()
+        for target_name, model_obj, rank in results[offset : offset + per_page]:
+            retval.append(
+                dict(
+                    type=target_name,
+                    id=getattr(model_obj, model_obj.__primary_key__),
+                    rank=round(float(rank), 6),
+                    record=model_obj.serialize(),
+                )
+            )
+        return _paginated_response(
+            retval, len(results) > offset + per_page, q, page, per_page
+        )
+    except OperationalError as exception:
+        return _timeout_response(exception)
+    except Exception as exception:
+        return handle_exc(exception)
+
+
+# GET /search/books, /search/manuscripts, /search/series and
+# /search/authors search just one kind of thing, and output the matches
+# the same way as GET /books etc.
+for _target_name in _search_targets:
+    blueprint.add_url_rule(
+        f"/{_target_name}",
+        view_func=_search_endpt_clos(_target_name),
+        methods=["GET"],
+    )
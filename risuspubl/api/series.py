@@ -6,13 +6,16 @@ from risuspubl.api.utility import (
     check_json_req_props,
     crt_tbl_row_clos,
     del_tbl_row_by_id_clos,
-    disp_tbl_row_by_id_foreign_key_clos,
     disp_tbl_row_by_id_clos,
+    disp_tbl_row_by_id_foreign_key_clos,
     disp_tbl_rows_by_foreign_id_clos,
+    disp_tbl_rows_by_ids_clos,
     disp_tbl_rows_clos,
     handle_exc,
-    updt_tbl_row_by_id_foreign_key_clos,
+    parse_ids_json,
     updt_tbl_row_by_id_clos,
+    updt_tbl_row_by_id_foreign_key_clos,
+    updt_tbl_rows_clos,
 )
 from risuspubl.dbmodels import Book, Manuscript, Series
 
@@ -27,6 +30,12 @@ blueprint = Blueprint("series", __name__, url_prefix="/series")
 # A closure for GET /series
 disp_srs = disp_tbl_rows_clos(Series)
 
+# A closure for POST /series/ids
+disp_srs_by_ids = disp_tbl_rows_by_ids_clos(Series)
+
+# A closure for PATCH /series, a bulk update by filter
+updt_srs = updt_tbl_rows_clos(Series)
+
 # A closure for POST /series
 crt_srs = crt_tbl_row_clos(Series)
 
@@ -79,10 +88,50 @@ def index_endpt():
     Implements a GET /series endpoint. All rows in the series table are
     loaded and output as a JSON list.
 
+    The filter, sort and fields query parameters narrow, order and
+    project the rows; see utility.compile_collection_query(). With an
+    ids query parameter, just the rows with those ids are output; see
+    utility.disp_tbl_rows_by_ids_clos().
+
+    :return: A flask.Response object.
+    """
+    try:
+        return disp_srs(request.args)
+    except Exception as exception:
+        return handle_exc(exception)
+
+
+@blueprint.route("/ids", methods=["POST"])
+def disp_srs_by_ids_endpt():
+    """
+    Implements a POST /series/ids endpoint, the same multi-get as GET
+    /series?ids= for a list of series_ids too long for a URL. The JSON body
+    is {"ids": [...]}. The rows found are output in the order given,
+    and the ids not found are listed; see
+    utility.disp_tbl_rows_by_ids_clos().
+
+    :return: A flask.Response object.
+    """
+    try:
+        return disp_srs_by_ids(parse_ids_json(request.json), request.args)
+    except Exception as exception:
+        return handle_exc(exception)
+
+
+@blueprint.route("", methods=["PATCH"])
+def updt_bulk_endpt():
+    """
+    Implements a PATCH /series endpoint. Every row in the series table
+    matching the filter query parameters, of which there must be at
+    least one, is updated from the JSON parameters in one UPDATE. An
+    integer column can also be given as {"add": n} or {"mul": n}.
+    The number of rows updated is output, or with return=rows the rows
+    themselves; see utility.updt_tbl_rows_clos().
+
     :return: A flask.Response object.
     """
     try:
-        return disp_srs()
+        return updt_srs(request.args, request.json)
     except Exception as exception:
         return handle_exc(exception)
 
@@ -98,7 +147,7 @@ def disp_srs_by_srid_endpt(series_id: int):
     :return: A flask.Response object.
     """
     try:
-        return disp_srs_by_id(series_id)
+        return disp_srs_by_id(series_id, request.args)
     except Exception as exception:
         return handle_exc(exception)
 
@@ -115,7 +164,7 @@ def disp_srs_bks_endpt(series_id: int):
     :return: A flask.Response object.
     """
     try:
-        return disp_bks_by_srs_id(series_id)
+        return disp_bks_by_srs_id(series_id, request.args)
     except Exception as exception:
         return handle_exc(exception)
 
@@ -133,7 +182,7 @@ def disp_srs_bk_by_bkid_endpt(series_id: int, book_id: int):
     :return: A flask.Response object.
     """
     try:
-        return disp_bk_by_bkid_srs_id(series_id, book_id)
+        return disp_bk_by_bkid_srs_id(series_id, book_id, request.args)
     except Exception as exception:
         return handle_exc(exception)
 
@@ -151,7 +200,7 @@ def disp_srs_mscrpts_endpt(series_id: int):
     :return: A flask.Response object.
     """
     try:
-        return disp_mscrpts_by_srs_id(series_id)
+        return disp_mscrpts_by_srs_id(series_id, request.args)
     except Exception as exception:
         return handle_exc(exception)
 
@@ -170,7 +219,7 @@ def disp_srs_mscrpt_by_msid_endpt(series_id: int, manuscript_id: int):
     :return: A flask.Response object.
     """
     try:
-        return disp_mscrpt_by_mscrpt_id_srs_id(series_id, manuscript_id)
+        return disp_mscrpt_by_mscrpt_id_srs_id(series_id, manuscript_id, request.args)
     except Exception as exception:
         return handle_exc(exception)
 
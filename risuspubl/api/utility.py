@@ -1,12 +1,26 @@
 #!/usr/bin/python3
 
+import json
 import math
+import operator
+import re
 import traceback
 from datetime import date, timedelta
+from decimal import Decimal, InvalidOperation
 from operator import attrgetter
-
-from flask import Response, abort, jsonify
-
+from urllib.parse import urlencode
+
+from flask import Response, abort, jsonify, request
+from sqlalchemy import Integer, and_, any_, bindparam, func, inspect, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import lazyload, load_only, selectinload
+
+from risuspubl.cache import (
+    cache_row,
+    get_cached_row,
+    invalidate_rows,
+    row_generation,
+)
 from risuspubl.dbmodels import (
     Author,
     AuthorMetadata,
@@ -21,6 +35,7 @@ from risuspubl.dbmodels import (
     Series,
     db,
 )
+from risuspubl.lookups import abort_if_missing, get_row_or_404, row_lookups
 
 import werkzeug.exceptions
 
@@ -68,11 +83,12 @@ def crt_model_obj(model_subclass, params_argd, optional_params=()):
             raise ValueError(f"required parameter '{param_name}' not present")
         if param_name.endswith("_id") and param_value is not None:
             # Matching a *_id parameter with the Model class for the
-            # table where that column is a primary key, and doing a
-            # get() to confirm the *_id value corresponds to a row in
-            # that table. If not, a ValueError is raised.
+            # table where that column is a primary key, and confirming
+            # the *_id value corresponds to a row in that table; a row
+            # this request has already looked up isn't SELECTed again.
+            # If not, a ValueError is raised.
             id_model_subclass = _foreign_keys_to_model_subclasses[param_name]
-            if id_model_subclass.query.get(param_value) is None:
+            if missing_ids(id_model_subclass, [param_value]):
                 raise ValueError(
                     f"supplied '{param_name}' value '{param_value}' does not "
                     + "correspond to any row in the "
@@ -82,45 +98,114 @@ def crt_model_obj(model_subclass, params_argd, optional_params=()):
     return model_subclass(**model_obj_args)
 
 
-def updt_model_obj(id_val, model_subclass, params_argd):
+def updt_model_obj(id_val, model_subclass, params_argd, field_names=None):
     """
-    Retrieves the object in the SQLAlchemy.Model subclass by the given
-    id, and updates it using the dict of key/value pairs to assign new
-    attribute values. If a value in the parameter argd is None, it is
-    skipped. The object is *not* saved, just returned. The calling code
-    has to save it itself.
+    Updates the row in the table represented by the SQLAlchemy.Model
+    subclass with the given id, using the dict of key/value pairs to
+    assign new column values. If a value in the parameter argd is None,
+    it is skipped. The update is a single UPDATE ... RETURNING, so the
+    object returned already holds the row's new values and serializing
+    it doesn't SELECT the row again. The update is *not* committed; the
+    calling code has to commit it itself, and should serialize the
+    object first (see jsonify_and_commit()).
 
     :model_subclass: An SQLAlchemy.Model subclass class object, the
     class to instance an object of.
     :params_argd: A dict of parameter keys to values.
+    :field_names: An optional argument, a list of column names. If
+    given, only those columns (and the primary key) are returned by the
+    UPDATE, for the object to be serialized with serialize(field_names).
     :return: An instance of the class that was the first argument.
     """
-    model_obj = model_subclass.query.get_or_404(id_val)
     # If all the dict's param_value slots are None, this update can't
-    # proceed bc there's nothing to update, so a ValueError is raised.
+    # proceed bc there's nothing to update, so a ValueError is raised;
+    # unless there's no such row, which is a 404 first.
     if all(param_value is None for param_value in params_argd.values()):
+        abort_if_missing(model_subclass, id_val)
         raise ValueError(
             "update action executed with no parameters indicating fields to update"
         )
+    update_values = dict()
     for param_name, param_value in params_argd.items():
         if param_value is None:
             continue
         if param_name.endswith("_id"):
             # Matching a *_id parameters with the Model class for the
-            # table where that column is a primary key, and doing a
-            # get() to confirm the *_id value corresponds to a row in
-            # that table. If not, a ValueError is raised.
+            # table where that column is a primary key, and confirming
+            # the *_id value corresponds to a row in that table. If not,
+            # a ValueError is raised; unless there's no row to update,
+            # which is a 404 first.
             id_model_subclass = _foreign_keys_to_model_subclasses[param_name]
-            if id_model_subclass.query.get(param_value) is None:
+            if missing_ids(id_model_subclass, [param_value]):
+                abort_if_missing(model_subclass, id_val)
                 raise ValueError(
                     f"supplied '{param_name}' value '{param_value}' does not "
                     + "correspond to any row in the "
                     + f"`{id_model_subclass.__tablename__}` table"
                 )
-        setattr(model_obj, param_name, param_value)
+        update_values[param_name] = param_value
+    primary_key = getattr(model_subclass, model_subclass.__primary_key__)
+    update_stmt = (
+        update(model_subclass)
+        .where(primary_key == id_val)
+        .values(**update_values)
+        .returning(model_subclass)
+    )
+    if field_names is not None:
+        update_stmt = update_stmt.options(
+            *fields_options(table_columns(model_subclass), field_names)
+        )
+    model_obj = db.session.execute(update_stmt).scalar_one_or_none()
+    # No row came back, so there's no row with that id.
+    if model_obj is None:
+        return abort(404)
     return model_obj
 
 
+def jsonify_and_commit(model_obj, field_names=None):
+    """
+    Serializes and jsonifies a model object that's just been added to
+    the session or updated, then commits. Committing expires every
+    object in the session, so serializing afterward would SELECT the
+    row again; after the flush here the object's attributes are already
+    current (an INSERT returns the new primary key), so it's serialized
+    first.
+
+    :model_obj: An instance of an SQLAlchemy.Model subclass.
+    :field_names: An optional argument, the list of column names to
+    serialize, as returned by parse_fields().
+    :return: A flask.Response object.
+    """
+    db.session.flush()
+    response = jsonify(model_obj.serialize(field_names))
+    db.session.commit()
+    return response
+
+
+def select_by_column(model_class, column_name, *column_names):
+    """
+    Returns a SELECT of the rows in the table represented by the
+    SQLAlchemy.Model subclass whose column_name column equals a bound
+    parameter of the same name, as do any further column_names. It's
+    meant to be built once, when a closure or module is set up, and
+    executed with a value for each parameter each time, e.g.
+    db.session.scalars(stmt, {"author_id": 4}), so no statement is
+    constructed per request and every execution finds the same compiled
+    SQL in the engine's statement cache.
+
+    :model_class: An SQLAlchemy.Model subclass.
+    :column_name: The name of a column of that table.
+    :column_names: The names of more columns of that table.
+    :return: A sqlalchemy.sql.Select object.
+    """
+    return select(model_class).where(
+        *(
+            getattr(model_class, name) == bindparam(name)
+            for name in (column_name, *column_names)
+        )
+    )
+
+
 def del_model_obj(id_val, model_subclass):
     """
     Looks up an id value in the provided SQLAlchemy.Model subclass, and
@@ -134,7 +219,7 @@ def del_model_obj(id_val, model_subclass):
     table to delete a row from.
     :return: None
     """
-    model_obj = model_subclass.query.get_or_404(id_val)
+    model_obj = get_row_or_404(model_subclass, id_val)
     # In the case of Book or Manuscript objects, there's also
     # corresponding rows in authors_books or authors_manuscripts that
     # need to be deleted as well.
@@ -150,6 +235,8 @@ def del_model_obj(id_val, model_subclass):
         db.session.commit()
     db.session.delete(model_obj)
     db.session.commit()
+    row_lookups().forget(model_subclass, id_val)
+    invalidate_rows(model_subclass, id_val)
 
 
 def _validate_date(
@@ -478,14 +565,95 @@ def crt_tbl_row_clos(model_class):
                 model_class, gen_crt_updt_argd(model_class, request_json)
             )
             db.session.add(model_class_obj)
-            db.session.commit()
-            return jsonify(model_class_obj.serialize())
+            return jsonify_and_commit(model_class_obj)
         except Exception as exception:
             return handle_exc(exception)
 
     return _internal_create_table_row
 
 
+def missing_ids(model_class, id_vals):
+    """
+    Looks up a list of primary key values in the table represented by
+    the SQLAlchemy.Model subclass, in one SELECT, and returns the ones
+    that have no row. Values the request has already looked up aren't
+    SELECTed again; see lookups.RowLookups.
+
+    :model_class: An SQLAlchemy.Model subclass.
+    :id_vals: A list of primary key values.
+    :return: A list of the values in id_vals with no row, in order.
+    """
+    return row_lookups().missing_ids(model_class, id_vals)
+
+
+def validate_author_ids(param_value):
+    """
+    Validates an author_ids request property: a non-empty list of
+    distinct integer author_ids. Whether those authors exist isn't
+    checked; see missing_ids().
+
+    :param_value: The value of the author_ids property.
+    :return: The list of author_ids.
+    """
+    if (
+        not isinstance(param_value, list)
+        or not param_value
+        or not all(
+            isinstance(author_id, int) and not isinstance(author_id, bool)
+            for author_id in param_value
+        )
+    ):
+        raise ValueError("parameter author_ids: must be a non-empty list of integers")
+    if len(set(param_value)) != len(param_value):
+        raise ValueError("parameter author_ids: may not repeat an id")
+    return param_value
+
+
+def crt_tbl_row_with_authors_clos(model_class, assoc_table):
+    """
+    Returns a function that creates a row in the books or manuscripts
+    table and associates it with one or more authors, using the
+    supplied SQLAlchemy.Model subclass and association table.
+
+    :model_class: the Model subclass for the table, Book or Manuscript
+    :assoc_table: the association table, AuthorsBooks or
+    AuthorsManuscripts
+    :return: a function that creates the row and its associations
+
+    The closure:
+
+    :author_ids: a list of distinct author_ids of existing authors
+    :request_json: a reference to the request.json object, or a dict
+    of the columns of the new row
+    :return: a flask.Response object
+    """
+    id_column_name = model_class.__primary_key__
+
+    def _internal_create_table_row_with_authors(author_ids, request_json):
+        model_class_obj = crt_model_obj(
+            model_class,
+            gen_crt_updt_argd(model_class, request_json),
+            optional_params={"series_id"},
+        )
+        # Flushing the new row gets its id, INSERTed with RETURNING.
+        # The association rows for every author then go in one
+        # multi-row INSERT, and it's all committed at once.
+        db.session.add(model_class_obj)
+        db.session.flush()
+        model_id = getattr(model_class_obj, id_column_name)
+        db.session.execute(
+            assoc_table.insert().values(
+                [
+                    {"author_id": author_id, id_column_name: model_id}
+                    for author_id in author_ids
+                ]
+            )
+        )
+        return jsonify_and_commit(model_class_obj)
+
+    return _internal_create_table_row_with_authors
+
+
 def del_tbl_row_by_id_clos(model_class):
     """
     Returns a function that executes an endpoint function for DELETE
@@ -529,20 +697,23 @@ def del_tbl_row_by_id_foreign_key_clos(
     :return: A flask.Response object.
     """
 
+    inner_by_ids_stmt = select_by_column(inner_class, inner_id_column, outer_id_column)
+
     def _internal_delete_table_row_by_id_and_foreign_key(outer_id, inner_id):
         try:
             # Verifying that a row in the outer table with a primary key
             # equal to outer_id exists, else it's a 404.
-            outer_class.query.get_or_404(outer_id)
-
-            # Verifying that a row exists in the inner table with a
-            # foreign key from the outer table, else it's a 404.
-            if not any(
-                getattr(inner_class_obj, inner_id_column) == inner_id
-                for inner_class_obj in inner_class.query.where(
-                    getattr(inner_class, outer_id_column) == outer_id
-                )
-            ):
+            abort_if_missing(outer_class, outer_id)
+
+            # Loading the row in the inner table with that primary key
+            # and a foreign key from the outer table, else it's a 404.
+            # Only that row is fetched, by its primary key, and
+            # del_model_obj() finds it in the identity map.
+            inner_class_obj = db.session.scalars(
+                inner_by_ids_stmt,
+                {inner_id_column: inner_id, outer_id_column: outer_id},
+            ).first()
+            if inner_class_obj is None:
                 return abort(404)
 
             # Deleting the row in the inner table with that foreign key.
@@ -556,14 +727,164 @@ def del_tbl_row_by_id_foreign_key_clos(
     return _internal_delete_table_row_by_id_and_foreign_key
 
 
-def disp_tbl_rows_by_foreign_id_clos(outer_class, outer_id_column, inner_class):
+# The default and largest page sizes of the nested collection endpoints,
+# GET /{outer_table}/{outer_id}/{inner_table}, which are paged by
+# keyset.
+_keyset_per_page = 100
+_keyset_max_per_page = 1000
+
+
+def parse_keyset_args(request_args):
+    """
+    Validates the after and per_page query parameters of a nested
+    collection endpoint. Rows come out in primary key order, and after
+    is the last primary key of the previous page (0, the default, for
+    the first page); per_page is how many rows a page holds.
+
+    :request_args: the query parameters, a werkzeug MultiDict
+    :return: a tuple of after and per_page, both ints
+    """
+    after = _validate_int("after", request_args.get("after", 0), 0)
+    per_page = _validate_int(
+        "per_page",
+        request_args.get("per_page", _keyset_per_page),
+        1,
+        _keyset_max_per_page,
+    )
+    return after, per_page
+
+
+def keyset_page_stmt(outer_class, outer_id_column, inner_class, assoc_table=None):
+    """
+    Returns a SELECT of one page of the rows in the inner table that
+    belong to a row in the outer table, in primary key order, that also
+    shows whether the outer row exists. The outer row is outer joined to
+    its inner rows (through the association table, if one is given), so
+    the statement returns no rows if there's no outer row, and one row
+    with None for the inner object if it has no inner rows past the key.
+    Each row is a (outer primary key, inner object) tuple. Seeking past
+    the previous page's last key rather than using OFFSET, it reads the
+    same index range for any page of any outer row.
+
+    The statement is meant to be built once and executed with the bound
+    parameters outer_id, after (see parse_keyset_args()) and limit,
+    which should be one more than the page size; see keyset_page_result().
+
+    :outer_class: the Model subclass for the outer table
+    :outer_id_column: the name of the column in the inner table, or in
+    the association table, holding the outer table's primary key
+    :inner_class: the Model subclass for the inner table
+    :assoc_table: the association Table between the two, if any
+    :return: a sqlalchemy.sql.Select object
+    """
+    outer_key = getattr(outer_class, outer_class.__primary_key__)
+    inner_key = getattr(inner_class, inner_class.__primary_key__)
+    stmt = select(outer_key, inner_class).select_from(outer_class)
+    if assoc_table is None:
+        order_key = inner_key
+        stmt = stmt.outerjoin(
+            inner_class,
+            and_(
+                getattr(inner_class, outer_id_column) == outer_key,
+                inner_key > bindparam("after"),
+            ),
+        )
+    else:
+        order_key = assoc_table.columns[inner_class.__primary_key__]
+        stmt = stmt.outerjoin(
+            assoc_table,
+            and_(
+                assoc_table.columns[outer_id_column] == outer_key,
+                order_key > bindparam("after"),
+            ),
+        ).outerjoin(inner_class, inner_key == order_key)
+    return (
+        stmt.where(outer_key == bindparam("outer_id"))
+        .order_by(order_key)
+        .limit(bindparam("limit"))
+    )
+
+
+def keyset_page_result(rows, per_page):
+    """
+    Takes a page of inner objects from the rows returned by a
+    keyset_page_stmt() statement executed with a limit of per_page + 1,
+    where the extra row, if there is one, shows that there's a next
+    page.
+
+    :rows: the list of (outer primary key, inner object) rows
+    :per_page: the page size
+    :return: a tuple of the list of inner objects, or None if there's no
+    outer row, and the primary key to pass as after for the next page,
+    or None if this is the last page
+    """
+    if not rows:
+        return None, None
+    inner_objs = [inner_obj for _, inner_obj in rows if inner_obj is not None]
+    if len(inner_objs) <= per_page:
+        return inner_objs, None
+    inner_objs = inner_objs[:per_page]
+    return inner_objs, getattr(inner_objs[-1], inner_objs[-1].__primary_key__)
+
+
+def keyset_page_found(inner_objs, after, empty_ok):
+    """
+    Tells whether a page returned by keyset_page_result() should be
+    output, rather than being a 404. No outer row is a 404, and so is an
+    outer row with no inner rows at all, unless empty_ok. A later page
+    with nothing past the previous one's last key is an empty list.
+
+    :inner_objs: the list of inner objects, or None if there's no outer
+    row, from keyset_page_result()
+    :after: the after value the page was fetched with
+    :empty_ok: whether an outer row with no inner rows is output
+    :return: a bool
+    """
+    if inner_objs is None:
+        return False
+    return bool(inner_objs) or empty_ok or after > 0
+
+
+def keyset_link(path, request_args, next_after):
+    """
+    Returns the value of a Link header pointing to the next page of a
+    keyset-paged endpoint: the same path and query parameters, with
+    after set to the last primary key of this page.
+
+    :path: the request's path
+    :request_args: the query parameters, a werkzeug MultiDict
+    :next_after: the after value returned by keyset_page_result()
+    :return: a str
+    """
+    query_params = [
+        (name, value)
+        for name, value in request_args.items(multi=True)
+        if name != "after"
+    ]
+    query_params.append(("after", next_after))
+    return f'<{path}?{urlencode(query_params)}>; rel="next"'
+
+
+def disp_tbl_rows_by_foreign_id_clos(
+    outer_class, outer_id_column, inner_class, assoc_table=None, empty_ok=False
+):
     """
     Returns a function that executes an endpoint function for GET
     /{outer_table}/{outer_id}/{inner_table}, using the supplied
-    SQLAlchemy.Model subclasses.
+    SQLAlchemy.Model subclasses. The rows are output a page at a time in
+    primary key order, fetched with one SELECT that also checks the
+    outer row exists (see keyset_page_stmt()). If there's another page,
+    a Link header points to it.
 
     :outer_class: the Model subclass for the outer table
+    :outer_id_column: the name of the column holding the outer table's
+    primary key, in the inner table or the association table
     :inner_class: the Model subclass for the inner table
+    :assoc_table: the association Table between the two, if the inner
+    rows are associated with the outer one through it
+    :empty_ok: if True, an outer row with no inner rows gets an empty
+    list rather than a 404; a page past the last inner row is an empty
+    list either way
 
     :return: a function that executes GET
     /{outer_table}/{outer_id}/{inner_table}
@@ -571,47 +892,515 @@ def disp_tbl_rows_by_foreign_id_clos(outer_class, outer_id_column, inner_class):
     The closure:
 
     :outer_id: a value for the primary key column in the outer table
+    :request_args: the request's query parameters, request.args; a
+    fields parameter selects the inner table columns to output, and
+    after and per_page select the page (see parse_keyset_args())
     :return: A flask.Response object.
     """
-
-    def _internal_display_table_rows_by_foreign_id(outer_id):
+    inner_columns = table_columns(inner_class)
+    # serialize() only reads column attributes, so the eagerly-loaded
+    # relationships aren't loaded and it's one SELECT.
+    page_stmt = keyset_page_stmt(
+        outer_class, outer_id_column, inner_class, assoc_table
+    ).options(lazyload("*"))
+
+    def _internal_display_table_rows_by_foreign_id(outer_id, request_args):
         try:
-            outer_class.query.get_or_404(outer_id)
-            # An outer_class object for every row in the inner_class
-            # table with the given outer_id.
-            retval = [
-                inner_class_obj.serialize()
-                for inner_class_obj in inner_class.query.where(
-                    getattr(inner_class, outer_id_column) == outer_id
-                )
-            ]
-            if not len(retval):
+            field_names = parse_fields(inner_columns, request_args)
+            after, per_page = parse_keyset_args(request_args)
+            inner_class_objs, next_after = keyset_page_result(
+                db.session.execute(
+                    page_stmt.options(*fields_options(inner_columns, field_names)),
+                    dict(outer_id=outer_id, after=after, limit=per_page + 1),
+                ).all(),
+                per_page,
+            )
+            if not keyset_page_found(inner_class_objs, after, empty_ok):
                 return abort(404)
-            return jsonify(retval)
+            response = jsonify(
+                [
+                    inner_class_obj.serialize(field_names)
+                    for inner_class_obj in inner_class_objs
+                ]
+            )
+            if next_after is not None:
+                response.headers["Link"] = keyset_link(
+                    request.path, request_args, next_after
+                )
+            return response
         except Exception as exception:
             return handle_exc(exception)
 
     return _internal_display_table_rows_by_foreign_id
 
 
+# The comparison operators a collection filter can use, by the name
+# used in the query string. `in` takes a comma-separated list.
+_filter_ops = {
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "lt": operator.lt,
+    "lte": operator.le,
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "in": lambda column, values: column.in_(values),
+}
+
+# Matches the filter[{column}], filter[{column}][{op}] and
+# {column}[{op}] query parameter names.
+_filter_param_re = re.compile(r"(?:filter\[(\w+)\]|(\w+))(?:\[(\w+)\])?")
+
+
+def _parse_filter_value(param_name, column, param_value):
+    # Parses a filter value to the column's Python type, with the same
+    # validation as request JSON. The value null matches NULL with eq
+    # and ne.
+    if param_value == "null":
+        return None
+    python_type = column.type.python_type
+    if python_type is bool:
+        return _validate_bool(param_name, param_value)
+    elif python_type is int:
+        return _validate_int(param_name, param_value)
+    elif python_type is date:
+        return date.fromisoformat(
+            _validate_date(param_name, param_value, "0001-01-01", "9999-12-31")
+        )
+    elif python_type is Decimal:
+        try:
+            return Decimal(param_value)
+        except InvalidOperation:
+            raise ValueError(
+                f"parameter {param_name}: value {param_value} doesn't parse as a "
+                + "number"
+            ) from None
+    return param_value
+
+
+def _parse_column_names(param_name, param_value, columns, descending_ok=False):
+    # Splits a comma-separated list of column names, each of which must
+    # be a column of the table. If descending_ok, a name may be prefixed
+    # with -.
+    column_names = [name.strip() for name in param_value.split(",")]
+    for column_name in column_names:
+        if descending_ok and column_name.startswith("-"):
+            column_name = column_name[1:]
+        if column_name not in columns:
+            raise ValueError(
+                f"parameter {param_name}: {column_name!r} isn't one of "
+                + ", ".join(columns)
+            )
+    return column_names
+
+
+def table_columns(model_class):
+    """
+    Returns the column attributes of a SQLAlchemy.Model subclass by
+    name, the names that compile_collection_query() accepts.
+
+    :model_class: the Model subclass for the table
+    :return: a dict
+    """
+    return {
+        column_attr.key: getattr(model_class, column_attr.key)
+        for column_attr in inspect(model_class).column_attrs
+    }
+
+
+def parse_fields(columns, request_args):
+    """
+    Parses the fields query parameter, a comma-separated list of the
+    columns to output.
+
+    :columns: the dict returned by table_columns() for the table
+    :request_args: the query parameters, a werkzeug MultiDict
+    :return: the list of field names, or None if the parameter wasn't
+    given
+    """
+    if "fields" not in request_args:
+        return None
+    return _parse_column_names("fields", request_args["fields"], columns)
+
+
+def fields_options(columns, field_names):
+    """
+    Returns the loader options that load just the columns named by
+    parse_fields() (and the primary key), for Select.options() or
+    Session.get(). Model objects loaded with them are serialized with
+    serialize(field_names).
+
+    :columns: the dict returned by table_columns() for the table
+    :field_names: the list of field names, or None for all of them
+    :return: a tuple of loader options
+    """
+    if field_names is None:
+        return ()
+    return (load_only(*(columns[field_name] for field_name in field_names)),)
+
+
+# How many relationships deep include= can reach; include=authors.books
+# is 2 deep.
+_include_max_depth = 2
+
+
+def parse_includes(model_class, request_args):
+    """
+    Parses the include query parameter, a comma-separated list of the
+    related objects to embed in the output, by relationship name. A
+    name can be followed by a . and the name of one of its
+    relationships, to _include_max_depth deep. The relationships that
+    can be named are those in each model's __includes__.
+
+    :model_class: the Model subclass for the table
+    :request_args: the query parameters, a werkzeug MultiDict
+    :return: a dict of relationship names to dicts of the same form,
+    for what to include of those relationships; or None if the
+    parameter wasn't given
+    """
+    if "include" not in request_args:
+        return None
+    include_tree = dict()
+    for include_path in request_args["include"].split(","):
+        relationship_names = include_path.strip().split(".")
+        if len(relationship_names) > _include_max_depth:
+            raise ValueError(
+                f"parameter include: {include_path} is more than "
+                + f"{_include_max_depth} relationships deep"
+            )
+        include_subtree, include_class = include_tree, model_class
+        for relationship_name in relationship_names:
+            includes = getattr(include_class, "__includes__", ())
+            if relationship_name not in includes:
+                raise ValueError(
+                    f"parameter include: {relationship_name!r} isn't one of "
+                    + f"the related objects of {include_class.__tablename__}"
+                    + (f", which are {', '.join(includes)}" if includes else "")
+                )
+            include_subtree = include_subtree.setdefault(relationship_name, dict())
+            include_class = getattr(
+                include_class, relationship_name
+            ).property.mapper.class_
+    return include_tree
+
+
+def _include_loaders(model_class, include_tree, parent_loader=None):
+    # Each included relationship is loaded with selectinload(), so all
+    # the rows' related objects come from one SELECT. The relationships
+    # of the related objects that aren't included are left unloaded,
+    # rather than loaded however they're configured.
+    loaders = list()
+    for relationship_name, include_subtree in include_tree.items():
+        relationship = getattr(model_class, relationship_name)
+        if parent_loader is None:
+            loader = selectinload(relationship)
+        else:
+            loader = parent_loader.selectinload(relationship)
+        loaders.append(loader.lazyload("*"))
+        loaders.extend(
+            _include_loaders(
+                relationship.property.mapper.class_, include_subtree, loader
+            )
+        )
+    return loaders
+
+
+def load_options(model_class, columns, field_names, include_tree):
+    """
+    Returns the loader options for loading model objects to output with
+    serialize_model(): they load just the columns named by
+    parse_fields() and the related objects named by parse_includes().
+
+    :model_class: the Model subclass for the table
+    :columns: the dict returned by table_columns(model_class)
+    :field_names: the list of field names, or None for all of them
+    :include_tree: the dict returned by parse_includes(), or None
+    :return: a tuple of loader options
+    """
+    if include_tree is None:
+        return fields_options(columns, field_names)
+    if field_names is not None:
+        # A many-to-one relationship is loaded by its foreign key, so
+        # that column is loaded whether or not it's output.
+        field_names = list(field_names)
+        for relationship_name in include_tree:
+            relationship = getattr(model_class, relationship_name).property
+            field_names.extend(
+                column.key
+                for column in relationship.local_columns
+                if column.key in columns and column.key not in field_names
+            )
+    return (
+        *fields_options(columns, field_names),
+        *_include_loaders(model_class, include_tree),
+    )
+
+
+def serialize_model(model_obj, field_names=None, include_tree=None):
+    """
+    Serializes a model object loaded with load_options(): its fields,
+    or just those named, and under the name of each included
+    relationship, its related object or list of objects serialized the
+    same way (or null if there's no related object).
+
+    :model_obj: the model object
+    :field_names: the list of field names, or None for all of them
+    :include_tree: the dict returned by parse_includes(), or None
+    :return: a dict
+    """
+    retval = model_obj.serialize(field_names)
+    for relationship_name, include_subtree in (include_tree or {}).items():
+        related = getattr(model_obj, relationship_name)
+        if related is None:
+            retval[relationship_name] = None
+        elif isinstance(related, list):
+            retval[relationship_name] = [
+                serialize_model(related_obj, None, include_subtree)
+                for related_obj in related
+            ]
+        else:
+            retval[relationship_name] = serialize_model(related, None, include_subtree)
+    return retval
+
+
+def parse_filter_criteria(columns, request_args):
+    """
+    Compiles the filter query parameters of a request into a list of
+    SQL criteria, every one of which must hold. Filters are
+    filter[{column}]={value}, which tests equality, or
+    filter[{column}][{op}]={value} or {column}[{op}]={value}, where op
+    is one of eq, ne, lt, lte, gt, gte or in. Only the table's columns
+    can be named, and values are validated against the column types, so
+    a request can't inject SQL.
+
+    :columns: the dict returned by table_columns(model_class)
+    :request_args: the query parameters, a werkzeug MultiDict
+    :return: a list of criteria for a where() clause
+    """
+    criteria = list()
+    for param_name, param_value in request_args.items(multi=True):
+        match = _filter_param_re.fullmatch(param_name)
+        # Other parameters without brackets, like sort and fields, aren't
+        # filters.
+        if match is None or match[2] is not None and match[3] is None:
+            if "[" in param_name:
+                raise ValueError(f"parameter {param_name}: not a valid filter")
+            continue
+        column_name = match[1] or match[2]
+        op_name = match[3] or "eq"
+        if column_name not in columns:
+            raise ValueError(
+                f"parameter {param_name}: can't filter on {column_name}; the "
+                + f"columns are {', '.join(columns)}"
+            )
+        if op_name not in _filter_ops:
+            raise ValueError(
+                f"parameter {param_name}: {op_name} isn't one of "
+                + ", ".join(_filter_ops)
+            )
+        column = columns[column_name]
+        if op_name == "in":
+            value = [
+                _parse_filter_value(param_name, column, item)
+                for item in param_value.split(",")
+            ]
+        else:
+            value = _parse_filter_value(param_name, column, param_value)
+        criteria.append(_filter_ops[op_name](column, value))
+    return criteria
+
+
+def compile_collection_query(model_class, columns, request_args):
+    """
+    Compiles the filter, sort and fields query parameters of a GET
+    /{table} request into a SELECT statement. Filters are parsed by
+    parse_filter_criteria(). sort is a comma-separated list of columns,
+    each descending if prefixed with -. fields is a comma-separated
+    list of the columns to output, and include of the related objects
+    to embed (see parse_includes()). Only the table's columns can be
+    named, so a request can't inject SQL.
+
+    :model_class: the Model subclass for the table
+    :columns: the dict returned by table_columns(model_class)
+    :request_args: the query parameters, a werkzeug MultiDict
+    :return: a tuple of the statement, which selects model objects, and
+    the field names and include tree to serialize them with using
+    serialize_model(), each None if its parameter wasn't given
+    """
+    criteria = parse_filter_criteria(columns, request_args)
+    field_names = parse_fields(columns, request_args)
+    include_tree = parse_includes(model_class, request_args)
+    stmt = (
+        select(model_class)
+        .options(*load_options(model_class, columns, field_names, include_tree))
+        .where(*criteria)
+    )
+
+    if "sort" in request_args:
+        sort_names = _parse_column_names(
+            "sort", request_args["sort"], columns, descending_ok=True
+        )
+        order_by = [
+            columns[sort_name[1:]].desc()
+            if sort_name.startswith("-")
+            else columns[sort_name]
+            for sort_name in sort_names
+        ]
+        # Rows that tie are ordered by primary key, so the order is
+        # stable from one request to the next.
+        order_by.append(columns[model_class.__primary_key__])
+        stmt = stmt.order_by(*order_by)
+    return stmt, field_names, include_tree
+
+
+# The most ids a multi-get can ask for at once.
+_multi_get_max_ids = 1000
+
+
+def parse_ids(param_name, param_value):
+    """
+    Validates the ids of a multi-get: a comma-separated string of
+    integers from a query parameter, or a list of integers from request
+    JSON. Repeated ids are dropped.
+
+    :param_name: the parameter name, for error messages
+    :param_value: the string or list
+    :return: a list of distinct ids, in the order given
+    """
+    if isinstance(param_value, str):
+        id_vals = [
+            _validate_int(param_name, id_str.strip(), 1)
+            for id_str in param_value.split(",")
+        ]
+    elif isinstance(param_value, list) and all(
+        isinstance(id_val, int) and not isinstance(id_val, bool)
+        for id_val in param_value
+    ):
+        id_vals = param_value
+    else:
+        raise ValueError(f"parameter {param_name}: must be a list of integers")
+    if not id_vals:
+        raise ValueError(f"parameter {param_name}: must name at least one id")
+    if len(id_vals) > _multi_get_max_ids:
+        raise ValueError(
+            f"parameter {param_name}: at most {_multi_get_max_ids} ids can be "
+            + "requested at once"
+        )
+    return list(dict.fromkeys(id_vals))
+
+
+def parse_ids_json(request_json):
+    """
+    Validates the JSON body of a POST /{table}/ids multi-get, an object
+    with just an ids list.
+
+    :request_json: the request.json object
+    :return: the list of ids returned by parse_ids()
+    """
+    if (
+        not isinstance(request_json, dict)
+        or request_json.keys() != {"ids"}
+        or not isinstance(request_json["ids"], list)
+    ):
+        raise ValueError("request body must be an object with just an ids list")
+    return parse_ids("ids", request_json["ids"])
+
+
+def compile_multi_get_query(model_class, columns, id_vals, request_args):
+    """
+    Compiles a multi-get, a GET /{table}?ids= or POST /{table}/ids
+    request, into one SELECT of the rows with those primary keys, using
+    WHERE {primary key} = ANY(:ids) so the list is a single array
+    parameter. The fields and include query parameters apply; filters
+    and sort don't, since the rows come out in the order of id_vals.
+
+    :model_class: the Model subclass for the table
+    :columns: the dict returned by table_columns(model_class)
+    :id_vals: the list returned by parse_ids()
+    :request_args: the query parameters, a werkzeug MultiDict
+    :return: a tuple of the statement, and the field names and include
+    tree to pass to multi_get_result()
+    """
+    if parse_filter_criteria(columns, request_args) or "sort" in request_args:
+        raise ValueError("ids can't be combined with filter or sort parameters")
+    field_names = parse_fields(columns, request_args)
+    include_tree = parse_includes(model_class, request_args)
+    # serialize_model() only reads the relationships that are included,
+    # so the eagerly-loaded ones aren't, and it's one SELECT plus one
+    # per included relationship.
+    stmt = (
+        select(model_class)
+        .options(
+            lazyload("*"),
+            *load_options(model_class, columns, field_names, include_tree),
+        )
+        .where(
+            columns[model_class.__primary_key__]
+            == any_(bindparam("ids", id_vals, type_=ARRAY(Integer)))
+        )
+    )
+    return stmt, field_names, include_tree
+
+
+def multi_get_result(model_objs, id_vals, field_names, include_tree):
+    """
+    Arranges the model objects loaded by a multi-get in the order of the
+    requested ids, and lists the ids with no row.
+
+    :model_objs: the model objects selected by compile_multi_get_query()
+    :id_vals: the list returned by parse_ids()
+    :field_names: the field names returned by compile_multi_get_query()
+    :include_tree: the include tree returned by compile_multi_get_query()
+    :return: a dict, with the serialized rows under rows and the ids
+    that weren't found under missing
+    """
+    model_objs_by_id = {
+        getattr(model_obj, model_obj.__primary_key__): model_obj
+        for model_obj in model_objs
+    }
+    return dict(
+        rows=[
+            serialize_model(model_objs_by_id[id_val], field_names, include_tree)
+            for id_val in id_vals
+            if id_val in model_objs_by_id
+        ],
+        missing=[id_val for id_val in id_vals if id_val not in model_objs_by_id],
+    )
+
+
 def disp_tbl_rows_clos(model_class):
     """
     Returns an endpoint function that executes GET /{table}, using the
-    supplied SQLAlchemy.Model subclasses.
+    supplied SQLAlchemy.Model subclasses. The rows can be filtered,
+    sorted and projected with query parameters; see
+    compile_collection_query(). With an ids query parameter, it's a
+    multi-get instead; see disp_tbl_rows_by_ids_clos().
 
     :model_class: the Model subclass for the table
     :return: a function that executes GET /{table}
 
-    The closure (takes no arguments):
+    The closure:
 
+    :request_args: the request's query parameters, request.args
     :return: a flask.Response object
     """
+    # The table's columns, which are all that a query can name.
+    columns = table_columns(model_class)
+    # The closure for GET /{table}?ids=
+    disp_rows_by_ids = disp_tbl_rows_by_ids_clos(model_class)
 
-    def _internal_display_table_rows():
+    def _internal_display_table_rows(request_args):
         try:
+            # With ids, it's a multi-get.
+            if "ids" in request_args:
+                return disp_rows_by_ids(
+                    parse_ids("ids", request_args["ids"]), request_args
+                )
+            stmt, field_names, include_tree = compile_collection_query(
+                model_class, columns, request_args
+            )
             result = [
-                model_class_obj.serialize()
-                for model_class_obj in model_class.query.all()
+                serialize_model(model_class_obj, field_names, include_tree)
+                for model_class_obj in db.session.scalars(stmt)
             ]
             return jsonify(result)
         except Exception as exception:
@@ -620,6 +1409,40 @@ def disp_tbl_rows_clos(model_class):
     return _internal_display_table_rows
 
 
+def disp_tbl_rows_by_ids_clos(model_class):
+    """
+    Returns a function that executes a multi-get, GET /{table}?ids= or
+    POST /{table}/ids, using the supplied SQLAlchemy.Model subclass. All
+    the rows are loaded with one query; see compile_multi_get_query().
+
+    :model_class: the Model subclass for the table
+    :return: a function that executes the multi-get
+
+    The closure:
+
+    :id_vals: the list of ids returned by parse_ids()
+    :request_args: the request's query parameters, request.args
+    :return: a flask.Response object; its JSON has the rows found under
+    rows, in the order of id_vals, and the ids not found under missing
+    """
+    columns = table_columns(model_class)
+
+    def _internal_display_table_rows_by_ids(id_vals, request_args):
+        try:
+            stmt, field_names, include_tree = compile_multi_get_query(
+                model_class, columns, id_vals, request_args
+            )
+            return jsonify(
+                multi_get_result(
+                    db.session.scalars(stmt), id_vals, field_names, include_tree
+                )
+            )
+        except Exception as exception:
+            return handle_exc(exception)
+
+    return _internal_display_table_rows_by_ids
+
+
 def disp_tbl_row_by_id_clos(model_class):
     """
     Returns an endpoint function that executes GET /{table}/{id}, using
@@ -631,13 +1454,61 @@ def disp_tbl_row_by_id_clos(model_class):
     The closure:
 
     :model_id: a value for the primary key column in the table
+    :request_args: the request's query parameters, request.args; a
+    fields parameter selects the columns to output, and an include
+    parameter the related objects to embed
     :return: a flask.Response object
     """
+    columns = table_columns(model_class)
 
-    def _internal_display_table_row_by_id(model_id):
+    def _internal_display_table_row_by_id(model_id, request_args):
         try:
-            model_class_obj = model_class.query.get_or_404(model_id)
-            return jsonify(model_class_obj.serialize())
+            field_names = parse_fields(columns, request_args)
+            include_tree = parse_includes(model_class, request_args)
+            if include_tree is not None:
+                # The row cache doesn't hold related objects, so the row
+                # and those are loaded together.
+                model_class_obj = db.session.get(
+                    model_class,
+                    model_id,
+                    options=load_options(
+                        model_class, columns, field_names, include_tree
+                    ),
+                )
+                if model_class_obj is None:
+                    return abort(404)
+                return jsonify(
+                    serialize_model(model_class_obj, field_names, include_tree)
+                )
+            # If the row's JSON is in the row cache, it's served from
+            # there without touching the database.
+            payload = get_cached_row(model_class, model_id)
+            if payload is not None:
+                if field_names is None:
+                    return Response(payload, mimetype="application/json")
+                model_jsobj = json.loads(payload)
+                return jsonify(
+                    {field_name: model_jsobj[field_name] for field_name in field_names}
+                )
+            if field_names is not None:
+                # Only the whole row is cached, so a projection is
+                # loaded but not cached.
+                model_class_obj = db.session.get(
+                    model_class,
+                    model_id,
+                    options=fields_options(columns, field_names),
+                )
+                if model_class_obj is None:
+                    return abort(404)
+                return jsonify(model_class_obj.serialize(field_names))
+            # The entry's generation is taken before the row is read, so
+            # that if a write changes it in the meantime, the row read
+            # here isn't cached over the written-through one.
+            generation = row_generation(model_class, model_id)
+            model_class_obj = get_row_or_404(model_class, model_id)
+            response = jsonify(model_class_obj.serialize())
+            cache_row(model_class, model_id, response.get_data(), generation)
+            return response
         except Exception as exception:
             return handle_exc(exception)
 
@@ -662,26 +1533,29 @@ def disp_tbl_row_by_id_foreign_key_clos(
     :outer_id: a value for the primary key column in the outer table
     :inner_id: a value for the primary key column in the inner table;
     this row will be deleted
+    :request_args: the request's query parameters, request.args; a
+    fields parameter selects the inner table columns to output
     :return: a flask.Response object
     """
+    inner_columns = table_columns(inner_class)
+    inner_by_ids_stmt = select_by_column(inner_class, inner_id_column, outer_id_column)
 
-    def _internal_display_table_row_by_id_and_foreign_key(outer_id, inner_id):
+    def _internal_display_table_row_by_id_and_foreign_key(
+        outer_id, inner_id, request_args
+    ):
         try:
-            outer_class.query.get_or_404(outer_id)
-            # An inner_class object for every row in the inner_class
-            # table with the given outer_id.
-            inner_class_objs = list(
-                inner_class.query.where(
-                    getattr(inner_class, outer_id_column) == outer_id
-                )
-            )
-            # Iterating across the list looking for the inner_class
-            # object with the given inner_class_id. If it's found, it's
-            # serialized and returned. Otherwise, a 404 error is raised.
-            for inner_class_obj in inner_class_objs:
-                if getattr(inner_class_obj, inner_id_column) == inner_id:
-                    return jsonify(inner_class_obj.serialize())
-            return abort(404)
+            field_names = parse_fields(inner_columns, request_args)
+            abort_if_missing(outer_class, outer_id)
+            # The inner_class object with the given inner_id, if its
+            # row has the given outer_id. If it's found, it's serialized
+            # and returned. Otherwise, a 404 error is raised.
+            inner_class_obj = db.session.scalars(
+                inner_by_ids_stmt.options(*fields_options(inner_columns, field_names)),
+                {inner_id_column: inner_id, outer_id_column: outer_id},
+            ).first()
+            if inner_class_obj is None:
+                return abort(404)
+            return jsonify(inner_class_obj.serialize(field_names))
         except Exception as exception:
             return handle_exc(exception)
 
@@ -706,18 +1580,19 @@ def updt_tbl_row_by_id_clos(model_class):
 
     def _internal_update_table_row_by_id(model_id, request_json):
         try:
-            # updt_model_obj is used to fetch and update the model class
-            # object indicates by the model_class object and its id
-            # value model_id. gen_crt_updt_argd() is used to build
-            # its param dict argument.
+            # updt_model_obj is used to update the row indicated by the
+            # model_class object and its id value model_id, returning
+            # its model class object. gen_crt_updt_argd() is used to
+            # build its param dict argument.
             model_class_obj = updt_model_obj(
                 model_id,
                 model_class,
                 gen_crt_updt_argd(model_class, request_json),
             )
-            db.session.add(model_class_obj)
-            db.session.commit()
-            return jsonify(model_class_obj.serialize())
+            response = jsonify_and_commit(model_class_obj)
+            # Writing the updated row through to the row cache.
+            cache_row(model_class, model_id, response.get_data())
+            return response
         except Exception as exception:
             return handle_exc(exception)
 
@@ -747,26 +1622,29 @@ def updt_tbl_row_by_id_foreign_key_clos(
     :return: a flask.Response object
     """
 
+    inner_by_ids_stmt = select_by_column(inner_class, inner_id_column, outer_id_column)
+
     def _internal_update_table_row_by_id_and_foreign_key(
         outer_id, inner_id, request_json
     ):
         try:
             # Verifying that a row in the outer table with a primary key
             # equal to outer_id exists, else it's a 404.
-            outer_class.query.get_or_404(outer_id)
-
-            # Verifying that a row exists in the inner table with a
-            # foreign key from the outer table, else it's a 404.
-            if not any(
-                getattr(inner_class_obj, inner_id_column) == inner_id
-                for inner_class_obj in inner_class.query.where(
-                    getattr(inner_class, outer_id_column) == outer_id
-                )
-            ):
+            abort_if_missing(outer_class, outer_id)
+
+            # Loading the row in the inner table with that primary key
+            # and a foreign key from the outer table, else it's a 404.
+            # Only that row is fetched, by its primary key, and
+            # updt_model_obj() finds it in the identity map.
+            inner_class_obj = db.session.scalars(
+                inner_by_ids_stmt,
+                {inner_id_column: inner_id, outer_id_column: outer_id},
+            ).first()
+            if inner_class_obj is None:
                 return abort(404)
 
-            # Using updt_model_obj() to fetch the inner_class object and
-            # update it against request.json.
+            # Using updt_model_obj() to update the inner_class row
+            # against request.json and get its object back.
             inner_class_obj = updt_model_obj(
                 inner_id,
                 inner_class,
@@ -774,15 +1652,187 @@ def updt_tbl_row_by_id_foreign_key_clos(
                     inner_class, request_json, **{outer_id_column: outer_id}
                 ),
             )
-            db.session.add(inner_class_obj)
-            db.session.commit()
-            return jsonify(inner_class_obj.serialize())
+            response = jsonify_and_commit(inner_class_obj)
+            # Writing the updated row through to the row cache.
+            cache_row(inner_class, inner_id, response.get_data())
+            return response
         except Exception as exception:
             return handle_exc(exception)
 
     return _internal_update_table_row_by_id_and_foreign_key
 
 
+# The arithmetic a bulk update can apply to an integer column, as
+# {column: {op: operand}} in the request JSON, e.g. {"salary": {"mul":
+# 1.03}} for a 3% raise. A result that isn't an integer is rounded.
+_bulk_update_ops = {
+    "add": operator.add,
+    "mul": operator.mul,
+}
+
+
+def _bulk_update_values(model_class, columns, request_json):
+    # Validates the JSON body of a bulk update once, and returns the
+    # dict of column values for the UPDATE: plain values are validated
+    # the same as for PATCH /{table}/{id}, and {op: operand} objects
+    # become expressions on the column's current value.
+    if not isinstance(request_json, dict) or not request_json:
+        raise ValueError(
+            "update action executed with no parameters indicating fields to update"
+        )
+    check_json_req_props(
+        model_class, request_json, {model_class.__primary_key__}, chk_missing=False
+    )
+    update_values = dict()
+    plain_json = dict()
+    for column_name, value in request_json.items():
+        if not isinstance(value, dict):
+            plain_json[column_name] = value
+            continue
+        column = columns[column_name]
+        if column.type.python_type is not int or column_name.endswith("_id"):
+            raise ValueError(
+                f"parameter {column_name}: only integer columns that aren't ids "
+                + "can be updated with add or mul"
+            )
+        op_name, operand = next(iter(value.items())) if len(value) == 1 else (None, 0)
+        if (
+            op_name not in _bulk_update_ops
+            or not isinstance(operand, (int, float))
+            or isinstance(operand, bool)
+        ):
+            raise ValueError(
+                f"parameter {column_name}: must be a value, "
+                + '{"add": number} or {"mul": number}'
+            )
+        if op_name == "mul" and operand <= 0:
+            raise ValueError(f"parameter {column_name}: mul must be positive")
+        update_values[column_name] = func.round(
+            _bulk_update_ops[op_name](column, operand)
+        )
+    for column_name, value in gen_crt_updt_argd(model_class, plain_json).items():
+        if value is None:
+            continue
+        update_values[column_name] = value
+    # Each *_id value is checked to correspond to a row, once for the
+    # whole update.
+    for column_name, value in update_values.items():
+        if column_name.endswith("_id") and column_name in plain_json:
+            id_model_subclass = _foreign_keys_to_model_subclasses[column_name]
+            if missing_ids(id_model_subclass, [value]):
+                raise ValueError(
+                    f"supplied '{column_name}' value '{value}' does not "
+                    + "correspond to any row in the "
+                    + f"`{id_model_subclass.__tablename__}` table"
+                )
+    return update_values
+
+
+def _check_bulk_update_results(model_class, column_names, result_rows):
+    # Validates the values an add or mul update computed for each row,
+    # as returned by the UPDATE, against the same per-column ranges as a
+    # PATCH /{table}/{id}. _validate_int() only range-checks a value it
+    # has to parse, so they're passed as strings. Raises a ValueError
+    # for the first row that's out of range; the caller rolls back.
+    for result_row in result_rows:
+        gen_crt_updt_argd(
+            model_class,
+            {
+                column_name: None if value is None else str(value)
+                for column_name, value in zip(column_names, result_row)
+            },
+        )
+
+
+def updt_tbl_rows_clos(model_class):
+    """
+    Returns an endpoint function that executes PATCH /{table}, a bulk
+    update of every row matching the filter query parameters, using the
+    supplied SQLAlchemy.Model subclass.
+
+    :model_class: the Model subclass for the table
+    :return: a function that executes PATCH /{table}
+
+    The closure:
+
+    :request_args: the query parameters, a werkzeug MultiDict; at least
+    one filter is required (see parse_filter_criteria()). With
+    return=rows the updated rows are output, projected by fields if
+    given; otherwise just how many there were.
+    :request_json: a reference to the request.json object available
+    within the endpoint function; column values, or {"add": n} or
+    {"mul": n} for integer columns; the values these compute are held
+    to the same ranges as plain values, and if any row's is out of
+    range nothing is updated
+    :return: a flask.Response object
+    """
+    columns = table_columns(model_class)
+    primary_key = columns[model_class.__primary_key__]
+
+    def _internal_update_table_rows(request_args, request_json):
+        try:
+            criteria = parse_filter_criteria(columns, request_args)
+            # Updating the whole table by leaving out the filter is more
+            # likely a mistake than not, so it isn't allowed.
+            if not criteria:
+                raise ValueError("a bulk update needs at least one filter")
+            return_param = request_args.get("return", "count")
+            if return_param not in ("count", "rows"):
+                raise ValueError("parameter return: must be count or rows")
+            field_names = parse_fields(columns, request_args)
+            update_stmt = (
+                update(model_class)
+                .where(*criteria)
+                .values(**_bulk_update_values(model_class, columns, request_json))
+            )
+            # The columns set with add or mul are returned too, to check
+            # their new values before committing.
+            computed_column_names = [
+                column_name
+                for column_name, value in request_json.items()
+                if isinstance(value, dict)
+            ]
+            computed_columns = [
+                columns[column_name] for column_name in computed_column_names
+            ]
+            # One UPDATE ... RETURNING does the whole thing, returning
+            # the updated rows or just their ids, which are needed to
+            # drop them from the row cache.
+            if return_param == "rows":
+                result_rows = db.session.execute(
+                    update_stmt.returning(model_class, *computed_columns).options(
+                        *fields_options(columns, field_names)
+                    )
+                ).all()
+                model_objs = [result_row[0] for result_row in result_rows]
+                model_ids = [getattr(obj, primary_key.key) for obj in model_objs]
+            else:
+                result_rows = db.session.execute(
+                    update_stmt.returning(primary_key, *computed_columns)
+                ).all()
+                model_ids = [result_row[0] for result_row in result_rows]
+            try:
+                _check_bulk_update_results(
+                    model_class,
+                    computed_column_names,
+                    [result_row[1:] for result_row in result_rows],
+                )
+            except ValueError:
+                db.session.rollback()
+                raise
+            if return_param == "rows":
+                response = jsonify([obj.serialize(field_names) for obj in model_objs])
+            else:
+                response = jsonify(dict(updated=len(model_ids)))
+            db.session.commit()
+            invalidate_rows(model_class, *model_ids)
+            return response
+        except Exception as exception:
+            return handle_exc(exception)
+
+    return _internal_update_table_rows
+
+
 def check_json_req_props(
     sqlal_model_cls,
     request_json,
@@ -0,0 +1,338 @@
+#!/usr/bin/python3
+
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+
+# redis is optional; it's only needed if ROW_CACHE_BACKEND is 'redis'.
+try:
+    import redis
+except ImportError:
+    redis = None
+
+
+# The default configuration values, applied with setdefault() so that
+# anything passed to create_app() in test_config takes precedence.
+_default_config = {
+    # 'lru' for an in-process cache, 'redis' for a shared cache on a
+    # local Redis-compatible server, or None to disable row caching.
+    # Off by default: an 'lru' cache is per process, so with more than
+    # one worker process a write handled by one leaves the others
+    # serving the old row until ROW_CACHE_TTL. Use 'redis' then.
+    "ROW_CACHE_BACKEND": None,
+    # Bounds on the in-process LRU cache. Whichever is hit first causes
+    # the least recently used entries to be evicted.
+    "ROW_CACHE_MAX_ENTRIES": 10000,
+    "ROW_CACHE_MAX_BYTES": 32 * 2**20,
+    # Seconds before an entry expires regardless of use. Writes through
+    # the API invalidate entries immediately; the TTL bounds how long
+    # a row changed some other way (e.g. via psql) can be served stale.
+    "ROW_CACHE_TTL": 300,
+    "ROW_CACHE_REDIS_URL": "redis://localhost:6379/0",
+    "ROW_CACHE_REDIS_PREFIX": "risuspubl:row:",
+}
+
+
+class LRURowCache:
+    """
+    An in-process least-recently-used cache of serialized rows, bounded
+    both by number of entries and by total payload bytes. Safe to share
+    between threads. Each worker process has its own copy, so a write
+    handled by one process doesn't invalidate another process's entry;
+    it's only suitable for a single worker process. Use RedisRowCache
+    with more than one.
+
+    Every set() and delete() gives the key a new generation. A reader
+    that misses takes the key's generation before querying the
+    database, and passes it to set(), which skips storing the row if a
+    write has changed the key since, so a row read before a concurrent
+    write committed can't replace the written-through one.
+    """
+
+    def __init__(self, max_entries, max_bytes, ttl):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._bytes = 0
+        self._entries = OrderedDict()
+        # The generation of each recently written key, bounded like the
+        # entries. A key that isn't in it has the floor generation,
+        # which is raised past any generation dropped from it, so a
+        # generation never reverts to one a reader could have taken.
+        self._generations = OrderedDict()
+        self._last_generation = 0
+        self._generation_floor = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                # Expired, treated as a miss.
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def generation(self, key):
+        with self._lock:
+            return self._generations.get(key, self._generation_floor)
+
+    def set(self, key, payload, generation=None):
+        with self._lock:
+            if generation is not None and generation != self._generations.get(
+                key, self._generation_floor
+            ):
+                return
+            self._bump_generation(key)
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, payload)
+            self._bytes += len(payload)
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._bump_generation(key)
+            if key in self._entries:
+                self._remove(key)
+            self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return dict(
+                backend="lru",
+                hits=self.hits,
+                misses=self.misses,
+                evictions=self.evictions,
+                invalidations=self.invalidations,
+                entries=len(self._entries),
+                bytes=self._bytes,
+            )
+
+    def _remove(self, key):
+        # Caller must hold the lock.
+        _, payload = self._entries.pop(key)
+        self._bytes -= len(payload)
+
+    def _bump_generation(self, key):
+        # Caller must hold the lock.
+        self._last_generation += 1
+        self._generations.pop(key, None)
+        self._generations[key] = self._last_generation
+        while len(self._generations) > self.max_entries:
+            _, dropped_generation = self._generations.popitem(last=False)
+            self._generation_floor = max(self._generation_floor, dropped_generation)
+
+
+class RedisRowCache:
+    """
+    A cache of serialized rows kept on a Redis-compatible server, so that
+    every worker process shares entries and sees every invalidation.
+    Evictions are the server's own, reported from its INFO stats.
+    Generations are kept as counters on the server beside the entries,
+    and a conditional set() is a WATCH transaction on the counter; see
+    LRURowCache.
+    """
+
+    def __init__(self, url, prefix, ttl):
+        if redis is None:
+            raise RuntimeError(
+                "ROW_CACHE_BACKEND is 'redis' but the redis module is not installed"
+            )
+        self.prefix = prefix
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        payload = self._client.get(self.prefix + key)
+        if payload is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return payload
+
+    def generation(self, key):
+        return self._client.get(self.prefix + "gen:" + key)
+
+    def set(self, key, payload, generation=None):
+        generation_key = self.prefix + "gen:" + key
+        with self._client.pipeline() as pipeline:
+            try:
+                pipeline.watch(generation_key)
+                if generation is not None and generation != pipeline.get(
+                    generation_key
+                ):
+                    return
+                pipeline.multi()
+                pipeline.set(self.prefix + key, payload, ex=self.ttl)
+                pipeline.incr(generation_key)
+                pipeline.expire(generation_key, self.ttl)
+                pipeline.execute()
+            except redis.WatchError:
+                # The key was written while this was being stored.
+                pass
+
+    def delete(self, key):
+        generation_key = self.prefix + "gen:" + key
+        with self._client.pipeline() as pipeline:
+            pipeline.delete(self.prefix + key)
+            pipeline.incr(generation_key)
+            pipeline.expire(generation_key, self.ttl)
+            pipeline.execute()
+        self.invalidations += 1
+
+    def clear(self):
+        for key in self._client.scan_iter(match=self.prefix + "*"):
+            self._client.delete(key)
+
+    def stats(self):
+        server_stats = self._client.info("stats")
+        return dict(
+            backend="redis",
+            hits=self.hits,
+            misses=self.misses,
+            evictions=server_stats.get("evicted_keys", 0),
+            invalidations=self.invalidations,
+        )
+
+
+def row_key(model_class, model_id):
+    """
+    Returns the cache key for a row: its table name and primary key
+    value.
+
+    :model_class: The SQLAlchemy.Model subclass for the table.
+    :model_id: The primary key value of the row.
+    :return: A str.
+    """
+    return f"{model_class.__tablename__}:{model_id}"
+
+
+def get_row_cache():
+    """
+    Returns the row cache configured on the current app, or None if row
+    caching is disabled.
+
+    :return: An LRURowCache, a RedisRowCache, or None.
+    """
+    return current_app.extensions.get("row_cache")
+
+
+def get_cached_row(model_class, model_id):
+    """
+    Looks up the serialized JSON of a row in the row cache.
+
+    :model_class: The SQLAlchemy.Model subclass for the table.
+    :model_id: The primary key value of the row.
+    :return: A bytes object, or None on a miss or if caching is off.
+    """
+    row_cache = get_row_cache()
+    if row_cache is None:
+        return None
+    return row_cache.get(row_key(model_class, model_id))
+
+
+def row_generation(model_class, model_id):
+    """
+    Returns the current generation of a row's cache entry, to be taken
+    before reading the row from the database and passed to cache_row()
+    with what was read.
+
+    :model_class: The SQLAlchemy.Model subclass for the table.
+    :model_id: The primary key value of the row.
+    :return: An opaque value, or None if caching is off.
+    """
+    row_cache = get_row_cache()
+    if row_cache is None:
+        return None
+    return row_cache.generation(row_key(model_class, model_id))
+
+
+def cache_row(model_class, model_id, payload, generation=None):
+    """
+    Stores the serialized JSON of a row in the row cache. A no-op if
+    caching is off.
+
+    :model_class: The SQLAlchemy.Model subclass for the table.
+    :model_id: The primary key value of the row.
+    :payload: A bytes object, the row's JSON serialization.
+    :generation: (Optional.) The row_generation() taken before the row
+    was read. If given, the row isn't stored if the entry has been
+    written or invalidated since then, as what was read may predate
+    that write. A write-through of a just-committed row omits it.
+    :return: None
+    """
+    row_cache = get_row_cache()
+    if row_cache is not None:
+        row_cache.set(row_key(model_class, model_id), payload, generation)
+
+
+def invalidate_rows(model_class, *model_ids):
+    """
+    Removes rows from the row cache. Must be called after any commit
+    that changes or deletes rows of a cached table. A no-op if caching
+    is off.
+
+    :model_class: The SQLAlchemy.Model subclass for the table.
+    :*model_ids: The primary key values of the rows.
+    :return: None
+    """
+    row_cache = get_row_cache()
+    if row_cache is None:
+        return
+    for model_id in model_ids:
+        row_cache.delete(row_key(model_class, model_id))
+
+
+def init_app(app):
+    """
+    Configures the row cache for the given flask.Flask app according to
+    its ROW_CACHE_* settings, setting defaults for any not already set.
+
+    :app: The flask.Flask object to configure the row cache for.
+    :return: None
+    """
+    for key, value in _default_config.items():
+        app.config.setdefault(key, value)
+    match app.config["ROW_CACHE_BACKEND"]:
+        case "lru":
+            row_cache = LRURowCache(
+                app.config["ROW_CACHE_MAX_ENTRIES"],
+                app.config["ROW_CACHE_MAX_BYTES"],
+                app.config["ROW_CACHE_TTL"],
+            )
+        case "redis":
+            row_cache = RedisRowCache(
+                app.config["ROW_CACHE_REDIS_URL"],
+                app.config["ROW_CACHE_REDIS_PREFIX"],
+                app.config["ROW_CACHE_TTL"],
+            )
+        case None:
+            row_cache = None
+        case backend:
+            raise ValueError(f"unrecognized ROW_CACHE_BACKEND '{backend}'")
+    app.extensions["row_cache"] = row_cache
@@ -0,0 +1,255 @@
+#!/usr/bin/python3
+
+import gzip
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+
+from flask import request
+
+# brotli and zstandard are optional. If either isn't installed, that
+# encoding is simply never offered during Accept-Encoding negotiation.
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# The default configuration values, applied with setdefault() so that
+# anything passed to create_app() in test_config takes precedence.
+_default_config = {
+    # Set to False to disable response compression entirely.
+    "COMPRESS_ENABLED": True,
+    # Bodies shorter than this many bytes are sent uncompressed; below a
+    # few hundred bytes the encoding overhead isn't worth the CPU.
+    "COMPRESS_MIN_SIZE": 500,
+    # Compression levels by encoding. gzip runs 1-9, brotli 0-11, zstd
+    # 1-22. The defaults favor throughput over the last few percent of
+    # size reduction.
+    "COMPRESS_LEVELS": {"gzip": 6, "br": 4, "zstd": 3},
+    # Encodings in server preference order, used to break ties when a
+    # client accepts several with equal quality.
+    "COMPRESS_ENCODINGS": ("zstd", "br", "gzip"),
+    # Only responses with these mimetypes are compressed.
+    "COMPRESS_MIMETYPES": ("application/json", "text/plain", "text/html"),
+    # The number of compressed bodies kept in the precompressed cache.
+    # Large collection responses like GET /books are byte-identical
+    # between writes, so their compressed form can be reused. 0
+    # disables the cache.
+    "COMPRESS_CACHE_SIZE": 64,
+}
+
+
+class _PrecompressedCache:
+    """
+    A small thread-safe LRU cache that maps a (encoding, level, body
+    digest) key to the compressed bytes for that body. Hashing a body is
+    an order of magnitude cheaper than compressing it, so repeated
+    identical responses skip the compressor entirely.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+def available_encodings():
+    """
+    Returns a tuple of the content-codings this installation can
+    produce. gzip is always available; br and zstd depend on whether
+    the optional brotli and zstandard modules are installed.
+
+    :return: A tuple of encoding names.
+    """
+    encodings = ["gzip"]
+    if brotli is not None:
+        encodings.append("br")
+    if zstandard is not None:
+        encodings.append("zstd")
+    return tuple(encodings)
+
+
+def compress_bytes(body, encoding, level):
+    """
+    Compresses a bytes object in one shot using the given content-coding.
+
+    :body: The bytes to compress.
+    :encoding: One of 'gzip', 'br' or 'zstd'.
+    :level: The compression level to use for that encoding.
+    :return: The compressed bytes.
+    """
+    match encoding:
+        case "gzip":
+            # mtime=0 keeps the output deterministic, so identical
+            # bodies produce identical compressed bytes.
+            return gzip.compress(body, compresslevel=level, mtime=0)
+        case "br":
+            return brotli.compress(body, quality=level)
+        case "zstd":
+            return zstandard.ZstdCompressor(level=level).compress(body)
+        case _:
+            raise ValueError(f"unsupported content-coding '{encoding}'")
+
+
+def compress_stream(chunks, encoding, level):
+    """
+    A generator that incrementally compresses an iterable of bytes
+    chunks using the given content-coding, so a streamed response is
+    never held in memory all at once.
+
+    :chunks: An iterable of bytes objects.
+    :encoding: One of 'gzip', 'br' or 'zstd'.
+    :level: The compression level to use for that encoding.
+    :return: A generator of compressed bytes objects.
+    """
+    match encoding:
+        case "gzip":
+            # wbits of 16 + MAX_WBITS has zlib write a gzip header and
+            # trailer rather than a bare zlib stream.
+            compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            process, finish = compressor.compress, compressor.flush
+        case "br":
+            compressor = brotli.Compressor(quality=level)
+            process, finish = compressor.process, compressor.finish
+        case "zstd":
+            compressor = zstandard.ZstdCompressor(level=level).compressobj()
+            process, finish = compressor.compress, compressor.flush
+        case _:
+            raise ValueError(f"unsupported content-coding '{encoding}'")
+    for chunk in chunks:
+        compressed = process(chunk)
+        if compressed:
+            yield compressed
+    yield finish()
+
+
+def _choose_encoding(accept_encodings, server_encodings):
+    # Picks the encoding the client rates highest, using the server's
+    # preference order to break ties. Returns None if the client
+    # accepts none of them.
+    best_encoding = accept_encodings.best_match(server_encodings)
+    if best_encoding is None or accept_encodings.quality(best_encoding) <= 0:
+        return None
+    return best_encoding
+
+
+def compress_response_clos(app):
+    """
+    Returns an after_request handler that compresses responses for the
+    given flask.Flask app, according to the COMPRESS_* settings in its
+    configuration.
+
+    :app: The flask.Flask object to build the handler for.
+    :return: A function that accepts a flask.Response and returns it,
+    compressed if appropriate.
+
+    The closure:
+
+    :response: The flask.Response object produced by the endpoint.
+    :return: The same flask.Response object.
+    """
+    config = app.config
+    server_encodings = [
+        encoding
+        for encoding in config["COMPRESS_ENCODINGS"]
+        if encoding in available_encodings()
+    ]
+    precompressed = (
+        _PrecompressedCache(config["COMPRESS_CACHE_SIZE"])
+        if config["COMPRESS_CACHE_SIZE"] > 0
+        else None
+    )
+    app.extensions["compression"] = precompressed
+
+    def _internal_compress_response(response):
+        if not config["COMPRESS_ENABLED"]:
+            return response
+        # Only successful responses in one of the configured mimetypes
+        # that haven't already been encoded are candidates.
+        if (
+            response.mimetype not in config["COMPRESS_MIMETYPES"]
+            or not (200 <= response.status_code < 300)
+            or response.status_code == 204
+            or "Content-Encoding" in response.headers
+            or response.direct_passthrough
+        ):
+            return response
+
+        # Whatever is decided below, a cache between here and the
+        # client needs to know the body depends on Accept-Encoding.
+        response.vary.add("Accept-Encoding")
+
+        encoding = _choose_encoding(request.accept_encodings, server_encodings)
+        if encoding is None:
+            return response
+        level = config["COMPRESS_LEVELS"][encoding]
+
+        # Generator responses are compressed as they stream; their
+        # length isn't known so the threshold can't be applied.
+        if response.is_streamed:
+            response.response = compress_stream(
+                response.iter_encoded(), encoding, level
+            )
+            response.headers.pop("Content-Length", None)
+            response.headers["Content-Encoding"] = encoding
+            return response
+
+        body = response.get_data()
+        if len(body) < config["COMPRESS_MIN_SIZE"]:
+            return response
+
+        compressed = None
+        if precompressed is not None:
+            cache_key = (
+                encoding,
+                level,
+                hashlib.blake2b(body, digest_size=16).digest(),
+            )
+            compressed = precompressed.get(cache_key)
+        if compressed is None:
+            compressed = compress_bytes(body, encoding, level)
+            if precompressed is not None:
+                precompressed.put(cache_key, compressed)
+
+        # Incompressible bodies are sent as-is.
+        if len(compressed) >= len(body):
+            return response
+        response.set_data(compressed)
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+    return _internal_compress_response
+
+
+def init_app(app):
+    """
+    Registers response compression on the given flask.Flask app. Sets
+    defaults for any COMPRESS_* configuration values not already set.
+
+    :app: The flask.Flask object to register compression with.
+    :return: None
+    """
+    for key, value in _default_config.items():
+        app.config.setdefault(key, value)
+    app.after_request(compress_response_clos(app))
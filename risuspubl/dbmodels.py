@@ -5,6 +5,23 @@ from flask_sqlalchemy import SQLAlchemy
 db = SQLAlchemy()
 
 
+def _serialize(model_obj, fields, **converters):
+    # Serializes a model object's columns as a dict, or just the columns
+    # named in fields. Only the columns output are read, so one that was
+    # left out of a load_only() query isn't loaded to serialize it.
+    # converters maps column names to functions that make their values
+    # JSON-friendly.
+    if fields is None:
+        fields = model_obj.__mapper__.column_attrs.keys()
+    retval = dict()
+    for field_name in fields:
+        value = getattr(model_obj, field_name)
+        if field_name in converters:
+            value = converters[field_name](value)
+        retval[field_name] = value
+    return retval
+
+
 class Author(db.Model):
     __tablename__ = "authors"
     __primary_key__ = "author_id"
@@ -13,12 +30,8 @@ class Author(db.Model):
     first_name = db.Column("first_name", db.String(64), nullable=False)
     last_name = db.Column("last_name", db.String(64), nullable=False)
 
-    def serialize(self):
-        return {
-            "author_id": self.author_id,
-            "first_name": self.first_name,
-            "last_name": self.last_name,
-        }
+    def serialize(self, fields=None):
+        return _serialize(self, fields)
 
 
 class Book(db.Model):
@@ -36,16 +49,8 @@ class Book(db.Model):
     edition_number = db.Column("edition_number", db.Integer, nullable=False)
     is_in_print = db.Column("is_in_print", db.Boolean, nullable=False)
 
-    def serialize(self):
-        return {
-            "book_id": self.book_id,
-            "editor_id": self.editor_id,
-            "series_id": self.series_id,
-            "title": self.title,
-            "publication_date": str(self.publication_date),
-            "edition_number": self.edition_number,
-            "is_in_print": self.is_in_print,
-        }
+    def serialize(self, fields=None):
+        return _serialize(self, fields, publication_date=str)
 
 
 class Client(db.Model):
@@ -65,19 +70,8 @@ class Client(db.Model):
     zipcode = db.Column("zipcode", db.String(9), nullable=False)
     country = db.Column("country", db.String(64), nullable=False)
 
-    def serialize(self):
-        return {
-            "client_id": self.client_id,
-            "salesperson_id": self.salesperson_id,
-            "email_address": self.email_address,
-            "phone_number": self.phone_number,
-            "business_name": self.business_name,
-            "street_address": self.street_address,
-            "city": self.city,
-            "state": self.state,
-            "zipcode": self.zipcode,
-            "country": self.country,
-        }
+    def serialize(self, fields=None):
+        return _serialize(self, fields)
 
 
 class Editor(db.Model):
@@ -89,13 +83,8 @@ class Editor(db.Model):
     last_name = db.Column("last_name", db.String(64), nullable=False)
     salary = db.Column("salary", db.Integer, nullable=False)
 
-    def serialize(self):
-        return {
-            "editor_id": self.editor_id,
-            "first_name": self.first_name,
-            "last_name": self.last_name,
-            "salary": self.salary,
-        }
+    def serialize(self, fields=None):
+        return _serialize(self, fields)
 
 
 # Defining these late because the 2nd Model subclass didn't exist until now.
@@ -117,41 +106,44 @@ class Manuscript(db.Model):
     due_date = db.Column("due_date", db.Date, nullable=False)
     advance = db.Column("advance", db.Integer, nullable=False)
 
-    def serialize(self):
-        return {
-            "manuscript_id": self.manuscript_id,
-            "editor_id": self.editor_id,
-            "series_id": self.series_id,
-            "working_title": self.working_title,
-            "due_date": str(self.due_date),
-            "advance": self.advance,
-        }
+    def serialize(self, fields=None):
+        return _serialize(self, fields, due_date=str)
 
 
+# sales_records is range-partitioned by year, one partition per year (see
+# risuspubl/monthend.py), so that a query for a year only reads that
+# year's partition. PostgreSQL requires a partitioned table's primary
+# key to include the partition key, so the table's is (sales_record_id,
+# year); the ORM still identifies rows by sales_record_id alone, which
+# its sequence keeps unique.
 class SalesRecord(db.Model):
     __tablename__ = "sales_records"
     __primary_key__ = "sales_record_id"
+    __table_args__ = {"postgresql_partition_by": "RANGE (year)"}
 
     sales_record_id = db.Column(
         "sales_record_id", db.Integer, primary_key=True, autoincrement=True
     )
     book_id = db.Column("book_id", db.Integer, nullable=False)
-    year = db.Column("year", db.Integer, nullable=False)
+    year = db.Column("year", db.Integer, primary_key=True, autoincrement=False)
     month = db.Column("month", db.Integer, nullable=False)
     copies_sold = db.Column("copies_sold", db.Integer, nullable=False)
     gross_profit = db.Column("gross_profit", db.Numeric, nullable=False)
     net_profit = db.Column("net_profit", db.Numeric, nullable=False)
 
-    def serialize(self):
-        return {
-            "sales_record_id": self.sales_record_id,
-            "book_id": self.book_id,
-            "year": self.year,
-            "month": self.month,
-            "copies_sold": self.copies_sold,
-            "gross_profit": self.gross_profit.__float__(),
-            "net_profit": self.net_profit.__float__(),
-        }
+    def serialize(self, fields=None):
+        return _serialize(self, fields, gross_profit=float, net_profit=float)
+
+    __mapper_args__ = {"primary_key": [sales_record_id]}
+
+
+# Rows for a year that doesn't have a partition yet go in the default
+# partition, so that inserting them never fails.
+db.event.listen(
+    SalesRecord.__table__,
+    "after_create",
+    db.DDL("CREATE TABLE sales_records_default PARTITION OF sales_records DEFAULT"),
+)
 
 
 class Salesperson(db.Model):
@@ -165,13 +157,8 @@ class Salesperson(db.Model):
     last_name = db.Column("last_name", db.String(64), nullable=False)
     salary = db.Column("salary", db.Integer, nullable=False)
 
-    def serialize(self):
-        return {
-            "salesperson_id": self.salesperson_id,
-            "first_name": self.first_name,
-            "last_name": self.last_name,
-            "salary": self.salary,
-        }
+    def serialize(self, fields=None):
+        return _serialize(self, fields)
 
 
 # Defining these late because the 2nd Model subclass didn't exist until now.
@@ -188,12 +175,8 @@ class Series(db.Model):
     title = db.Column("title", db.String(64), nullable=False)
     volumes = db.Column("volumes", db.Integer, nullable=False)
 
-    def serialize(self):
-        return {
-            "series_id": self.series_id,
-            "title": self.title,
-            "volumes": self.volumes,
-        }
+    def serialize(self, fields=None):
+        return _serialize(self, fields)
 
 
 class AuthorMetadata(db.Model):
@@ -210,16 +193,8 @@ class AuthorMetadata(db.Model):
     photo_res_horiz = db.Column("photo_res_horiz", db.Integer, nullable=False)
     photo_res_vert = db.Column("photo_res_vert", db.Integer, nullable=False)
 
-    def serialize(self):
-        return {
-            "author_metadata_id": self.author_metadata_id,
-            "author_id": self.author_id,
-            "age": self.age,
-            "biography": self.biography,
-            "photo_url": self.photo_url,
-            "photo_res_horiz": self.photo_res_horiz,
-            "photo_res_vert": self.photo_res_vert,
-        }
+    def serialize(self, fields=None):
+        return _serialize(self, fields)
 
 
 # Defining these late because the 2nd Model subclass didn't exist until now.
@@ -300,3 +275,100 @@ Author.manuscripts = db.relationship(
     viewonly=True,
     backref=db.backref("author_manuscripts", lazy=True),
 )
+
+
+# These relationships aren't loaded unless asked for. The include query
+# parameter (see risuspubl/api/utility.py) loads them with one batched
+# SELECT ... WHERE ... IN (...) per relationship and embeds them in the
+# response.
+Book.editor = db.relationship(Editor, viewonly=True)
+Book.series = db.relationship(Series, viewonly=True)
+Book.sales = db.relationship(
+    SalesRecord,
+    primaryjoin=Book.book_id == db.foreign(SalesRecord.book_id),
+    viewonly=True,
+    order_by=(SalesRecord.year, SalesRecord.month, SalesRecord.sales_record_id),
+)
+Manuscript.editor = db.relationship(Editor, viewonly=True)
+Manuscript.series = db.relationship(Series, viewonly=True)
+Editor.books = db.relationship(Book, viewonly=True, order_by=Book.book_id)
+Editor.manuscripts = db.relationship(
+    Manuscript, viewonly=True, order_by=Manuscript.manuscript_id
+)
+Series.books = db.relationship(Book, viewonly=True, order_by=Book.book_id)
+Series.manuscripts = db.relationship(
+    Manuscript, viewonly=True, order_by=Manuscript.manuscript_id
+)
+
+# The relationships whose objects can be embedded with include=, by
+# model.
+Author.__includes__ = ("books", "manuscripts")
+Book.__includes__ = ("authors", "editor", "sales", "series")
+Editor.__includes__ = ("books", "manuscripts")
+Manuscript.__includes__ = ("authors", "editor", "series")
+Series.__includes__ = ("books", "manuscripts")
+
+
+# The sales rollup tables hold the sales totals for each book, series and
+# editor in each year. They're maintained by risuspubl/rollups.py as each
+# month of sales records is loaded, so that a yearly summary is a single
+# row lookup however many years of sales_records have built up. A book's
+# sales count toward the series and editor it had when they were rolled
+# up.
+class BookYearSales(db.Model):
+    __tablename__ = "book_year_sales"
+    __primary_key__ = ("book_id", "year")
+
+    book_id = db.Column("book_id", db.Integer, primary_key=True, autoincrement=False)
+    year = db.Column("year", db.Integer, primary_key=True, autoincrement=False)
+    copies_sold = db.Column("copies_sold", db.BigInteger, nullable=False)
+    gross_profit = db.Column("gross_profit", db.Numeric, nullable=False)
+    net_profit = db.Column("net_profit", db.Numeric, nullable=False)
+
+    def serialize(self, fields=None):
+        return _serialize(self, fields, gross_profit=float, net_profit=float)
+
+
+class SeriesYearSales(db.Model):
+    __tablename__ = "series_year_sales"
+    __primary_key__ = ("series_id", "year")
+
+    series_id = db.Column(
+        "series_id", db.Integer, primary_key=True, autoincrement=False
+    )
+    year = db.Column("year", db.Integer, primary_key=True, autoincrement=False)
+    copies_sold = db.Column("copies_sold", db.BigInteger, nullable=False)
+    gross_profit = db.Column("gross_profit", db.Numeric, nullable=False)
+    net_profit = db.Column("net_profit", db.Numeric, nullable=False)
+
+    def serialize(self, fields=None):
+        return _serialize(self, fields, gross_profit=float, net_profit=float)
+
+
+class EditorYearSales(db.Model):
+    __tablename__ = "editor_year_sales"
+    __primary_key__ = ("editor_id", "year")
+
+    editor_id = db.Column(
+        "editor_id", db.Integer, primary_key=True, autoincrement=False
+    )
+    year = db.Column("year", db.Integer, primary_key=True, autoincrement=False)
+    copies_sold = db.Column("copies_sold", db.BigInteger, nullable=False)
+    gross_profit = db.Column("gross_profit", db.Numeric, nullable=False)
+    net_profit = db.Column("net_profit", db.Numeric, nullable=False)
+
+    def serialize(self, fields=None):
+        return _serialize(self, fields, gross_profit=float, net_profit=float)
+
+
+# Records which months have been added to the rollup tables, so that
+# rolling up the same month twice doesn't count its sales twice.
+class SalesRollupMonth(db.Model):
+    __tablename__ = "sales_rollup_months"
+    __primary_key__ = ("year", "month")
+
+    year = db.Column("year", db.Integer, primary_key=True, autoincrement=False)
+    month = db.Column("month", db.Integer, primary_key=True, autoincrement=False)
+    rolled_up_at = db.Column(
+        "rolled_up_at", db.DateTime, nullable=False, server_default=db.func.now()
+    )
@@ -0,0 +1,185 @@
+#!/usr/bin/python3
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app, g
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from risuspubl.dbmodels import db
+from risuspubl.sqlstats import RequestSqlStats, current_request_sql_stats
+
+
+# The default configuration values, applied with setdefault() so that
+# anything passed to create_app() in test_config takes precedence.
+_default_config = {
+    # The most queries a single request can have running at once. 1
+    # runs them one after another on the request's own session.
+    "FANOUT_MAX_CONCURRENCY": 4,
+    # The number of worker threads shared by all requests. Each one
+    # holds a pooled connection while it runs a query, so the engine's
+    # pool needs this much room on top of the request threads.
+    "FANOUT_POOL_SIZE": 4,
+}
+
+# Set on the worker threads while they run a func, so that a fan_out()
+# nested in one (as when a batch's concurrent GETs dispatch a composite
+# read) runs serially instead of waiting on the pool it's running on,
+# which can otherwise have every worker blocked on work queued behind it.
+_worker_state = threading.local()
+
+
+def _can_use_other_connections(session):
+    # Other connections can only see what this session can if it isn't
+    # bound to a single connection (as in the tests, which run inside
+    # one outer transaction) and has no unflushed changes.
+    return isinstance(session.get_bind(), Engine) and not (
+        session.new or session.dirty or session.deleted
+    )
+
+
+def _runs_serially(funcs):
+    # The conditions under which fan_out() and fan_out_app_contexts()
+    # call their funcs one after another in the current thread.
+    return (
+        len(funcs) < 2
+        or current_app.config["FANOUT_MAX_CONCURRENCY"] < 2
+        or getattr(_worker_state, "in_worker", False)
+        or not _can_use_other_connections(db.session)
+    )
+
+
+def _call_in_own_session(app, func, request_stats):
+    # Runs func with a session of its own, in an app context of its own
+    # so that abort() and the SQL statement counters work.
+    with app.app_context():
+        task_stats = None
+        if request_stats is not None:
+            g._sql_stats = task_stats = RequestSqlStats()
+        # Objects are left loaded when the session closes, so that the
+        # caller can serialize them.
+        with Session(db.engine, expire_on_commit=False) as session:
+            return func(session), task_stats
+
+
+def _call_in_own_app_context(app, func, request_stats):
+    # Runs func in an app context of its own, which gives it a db.session
+    # of its own. Its statements are tallied by whatever it dispatches.
+    with app.app_context():
+        return func(), None
+
+
+def _fan_out_parallel(
+    app, executor, funcs, max_concurrency, request_stats, call=_call_in_own_session
+):
+    # At most max_concurrency runners are submitted, each taking the next
+    # func until there are none left, so a request never holds more
+    # than that many connections however many funcs it passes. call runs
+    # each func, with its own session or its own app context.
+    results = [None] * len(funcs)
+    exceptions = [None] * len(funcs)
+    pending = iter(enumerate(funcs))
+    pending_lock = threading.Lock()
+
+    def runner():
+        _worker_state.in_worker = True
+        try:
+            while True:
+                with pending_lock:
+                    index, func = next(pending, (None, None))
+                if func is None:
+                    return
+                try:
+                    results[index], task_stats = call(app, func, request_stats)
+                except Exception as exception:
+                    exceptions[index] = exception
+                    continue
+                if task_stats is not None:
+                    with pending_lock:
+                        request_stats.merge(task_stats)
+        finally:
+            _worker_state.in_worker = False
+
+    futures = [executor.submit(runner) for _ in range(min(max_concurrency, len(funcs)))]
+    for future in futures:
+        future.result()
+    # The first failure in argument order is raised, so that the outcome
+    # doesn't depend on which query happened to finish first.
+    for exception in exceptions:
+        if exception is not None:
+            raise exception
+    return results
+
+
+def fan_out(*funcs):
+    """
+    Calls each of the given functions with a sqlalchemy.orm.Session to
+    query with, running them concurrently on separate pooled connections
+    so that a composite read waits for one database round trip rather
+    than one per query. Falls back to calling them one after another
+    with the request's own session when FANOUT_MAX_CONCURRENCY is 1,
+    when other connections can't see what that session can, or when
+    called from one of the worker threads itself.
+
+    The functions must only read, and shouldn't use db.session. The
+    objects they return are detached from their session, with whatever
+    attributes they loaded still set.
+
+    :funcs: Functions that take a Session argument.
+    :return: A list of the functions' return values, in argument order.
+    """
+    if _runs_serially(funcs):
+        return [func(db.session) for func in funcs]
+    return _fan_out_parallel(
+        current_app._get_current_object(),
+        current_app.extensions["fanout"],
+        funcs,
+        current_app.config["FANOUT_MAX_CONCURRENCY"],
+        current_request_sql_stats(),
+    )
+
+
+def fan_out_app_contexts(*funcs):
+    """
+    Calls each of the given functions with no arguments, running them
+    concurrently each in an app context of its own, and so with a
+    db.session of its own on a separate pooled connection. This is for
+    work that goes through db.session, like dispatching a read-only
+    request to an endpoint function. Falls back to calling them one
+    after another in the current app context under the same conditions
+    as fan_out().
+
+    The functions must only read, and should return values that don't
+    need their session, such as flask.Response objects.
+
+    :funcs: Functions that take no arguments.
+    :return: A list of the functions' return values, in argument order.
+    """
+    if _runs_serially(funcs):
+        return [func() for func in funcs]
+    return _fan_out_parallel(
+        current_app._get_current_object(),
+        current_app.extensions["fanout"],
+        funcs,
+        current_app.config["FANOUT_MAX_CONCURRENCY"],
+        None,
+        call=_call_in_own_app_context,
+    )
+
+
+def init_app(app):
+    """
+    Sets defaults for any FANOUT_* configuration values not already set
+    on the given flask.Flask app, and creates the worker threads that
+    fan_out() runs queries on.
+
+    :app: The flask.Flask object to use fan_out() with.
+    :return: None
+    """
+    for key, value in _default_config.items():
+        app.config.setdefault(key, value)
+    app.extensions["fanout"] = ThreadPoolExecutor(
+        max_workers=app.config["FANOUT_POOL_SIZE"],
+        thread_name_prefix="risuspubl-fanout",
+    )
@@ -3,29 +3,48 @@
 import os
 import flask
 
+from risuspubl import (
+    cache,
+    compression,
+    fanout,
+    lookups,
+    monthend,
+    profiling,
+    prometheus,
+    rollups,
+    sqlstats,
+)
 from risuspubl.api import (
+    associations,
     authors,
+    batch,
     books,
     clients,
     docroot,
     editors,
     manuscripts,
+    metrics,
     sales_records,
     salespeople,
+    search,
     series,
 )
 from risuspubl.dbmodels import db
 
 
 API_MODULES = (
+    associations,
     authors,
+    batch,
     books,
     clients,
     docroot,
     editors,
     manuscripts,
+    metrics,
     sales_records,
     salespeople,
+    search,
     series,
 )
 
@@ -51,10 +70,20 @@ def create_app(test_config=None):
         app.config.from_mapping(test_config)
 
     db.init_app(app)
+    profiling.init_app(app)
+    cache.init_app(app)
+    sqlstats.init_app(app)
+    prometheus.init_app(app)
+    fanout.init_app(app)
+    lookups.init_app(app)
+    rollups.init_app(app)
+    monthend.init_app(app)
 
     for api_module in API_MODULES:
         app.register_blueprint(api_module.blueprint)
 
+    compression.init_app(app)
+
     # ensure the instance folder exists
     try:
         os.makedirs(app.instance_path)
@@ -0,0 +1,203 @@
+#!/usr/bin/python3
+
+from flask import abort, g, has_request_context
+from sqlalchemy import select
+
+from risuspubl.dbmodels import db
+
+
+class RowLookups:
+    """
+    A request's record of the rows it has looked up by primary key, so
+    that each row is fetched at most once per request however many
+    helpers and endpoint functions ask about it. Rows that have been
+    loaded are found in the session's identity map, which only holds
+    them as long as something else does, so this holds them until the
+    request ends. It also keeps the primary keys known to exist without
+    their row having been loaded, from a primary-key-only SELECT, and
+    those known not to exist, which the identity map can't hold.
+    """
+
+    def __init__(self):
+        self._found = set()
+        self._absent = set()
+        self._loaded = list()
+
+    @staticmethod
+    def _in_identity_map(model_class, id_val):
+        return db.session.identity_key(model_class, id_val) in db.session.identity_map
+
+    def _unknown_ids(self, model_class, id_vals):
+        # The ids nothing is known about yet, in order and without
+        # repeats.
+        return [
+            id_val
+            for id_val in dict.fromkeys(id_vals)
+            if (model_class, id_val) not in self._found
+            and (model_class, id_val) not in self._absent
+            and not self._in_identity_map(model_class, id_val)
+        ]
+
+    def _record(self, model_class, id_vals, found_ids):
+        for id_val in id_vals:
+            if id_val in found_ids:
+                self._found.add((model_class, id_val))
+            else:
+                self._absent.add((model_class, id_val))
+
+    def missing_ids(self, model_class, id_vals):
+        """
+        Returns the primary key values in id_vals that have no row in
+        the table. The ones not known yet are looked up with one SELECT
+        of just the primary key column.
+
+        :model_class: An SQLAlchemy.Model subclass.
+        :id_vals: A list of primary key values.
+        :return: A list of the values in id_vals with no row, in order.
+        """
+        unknown_ids = self._unknown_ids(model_class, id_vals)
+        if unknown_ids:
+            primary_key = getattr(model_class, model_class.__primary_key__)
+            found_ids = set(
+                db.session.scalars(
+                    select(primary_key).where(primary_key.in_(unknown_ids))
+                )
+            )
+            self._record(model_class, unknown_ids, found_ids)
+        return [id_val for id_val in id_vals if (model_class, id_val) in self._absent]
+
+    def prefetch(self, model_class, id_vals):
+        """
+        Loads the rows with the primary key values in id_vals into the
+        session with one SELECT, skipping any that are loaded already or
+        known not to exist, so that get() finds them in the identity
+        map.
+
+        :model_class: An SQLAlchemy.Model subclass.
+        :id_vals: A list of primary key values.
+        :return: None
+        """
+        unloaded_ids = [
+            id_val
+            for id_val in dict.fromkeys(id_vals)
+            if (model_class, id_val) not in self._absent
+            and not self._in_identity_map(model_class, id_val)
+        ]
+        if not unloaded_ids:
+            return
+        primary_key = getattr(model_class, model_class.__primary_key__)
+        model_objs = db.session.scalars(
+            select(model_class).where(primary_key.in_(unloaded_ids))
+        ).all()
+        self._loaded.extend(model_objs)
+        found_ids = {
+            getattr(model_obj, model_class.__primary_key__) for model_obj in model_objs
+        }
+        self._record(model_class, unloaded_ids, found_ids)
+
+    def get(self, model_class, id_val):
+        """
+        Returns the row with that primary key value as a model object,
+        or None if there's no such row. A row already loaded comes from
+        the identity map, and a row known not to exist isn't looked up
+        again.
+
+        :model_class: An SQLAlchemy.Model subclass.
+        :id_val: A primary key value.
+        :return: An instance of model_class, or None.
+        """
+        if (model_class, id_val) in self._absent:
+            return None
+        model_obj = db.session.get(model_class, id_val)
+        if model_obj is None:
+            self._record(model_class, (id_val,), ())
+        else:
+            self._loaded.append(model_obj)
+            self._record(model_class, (id_val,), (id_val,))
+        return model_obj
+
+    def forget(self, model_class, id_val):
+        """
+        Records that the row with that primary key value has been
+        deleted.
+
+        :model_class: An SQLAlchemy.Model subclass.
+        :id_val: A primary key value.
+        :return: None
+        """
+        self._found.discard((model_class, id_val))
+        self._absent.add((model_class, id_val))
+
+
+def row_lookups():
+    """
+    Returns the current request's RowLookups, creating it on first use.
+    Outside a request, e.g. in the flask shell, every call returns a new
+    one, so nothing is remembered between calls.
+
+    :return: A RowLookups object.
+    """
+    if not has_request_context():
+        return RowLookups()
+    return g.setdefault("_row_lookups", RowLookups())
+
+
+def get_row_or_404(model_class, id_val):
+    """
+    Returns the row with that primary key value as a model object, via
+    the request's RowLookups, or aborts with a 404 if there's no such
+    row.
+
+    :model_class: An SQLAlchemy.Model subclass.
+    :id_val: A primary key value.
+    :return: An instance of model_class.
+    """
+    model_obj = row_lookups().get(model_class, id_val)
+    if model_obj is None:
+        return abort(404)
+    return model_obj
+
+
+def get_rows_or_404(model_class, *id_vals):
+    """
+    Returns the rows with those primary key values as model objects,
+    loading the ones not loaded already with one SELECT, or aborts with
+    a 404 if any of them has no row.
+
+    :model_class: An SQLAlchemy.Model subclass.
+    :id_vals: Primary key values.
+    :return: A list of instances of model_class, in the order of id_vals.
+    """
+    lookups = row_lookups()
+    lookups.prefetch(model_class, id_vals)
+    return [get_row_or_404(model_class, id_val) for id_val in id_vals]
+
+
+def abort_if_missing(model_class, *id_vals):
+    """
+    Aborts with a 404 if any of the primary key values has no row in the
+    table. Only the primary key column is SELECTed, and only for values
+    the request hasn't already looked up.
+
+    :model_class: An SQLAlchemy.Model subclass.
+    :id_vals: Primary key values.
+    :return: None
+    """
+    if row_lookups().missing_ids(model_class, id_vals):
+        abort(404)
+
+
+def init_app(app):
+    """
+    Has each request's RowLookups discarded when the request ends. A
+    request can run in an app context that outlives it (as in the
+    tests, or when one is pushed around several requests), and what it
+    learned mustn't carry over to the next.
+
+    :app: The flask.Flask object to use RowLookups with.
+    :return: None
+    """
+
+    @app.teardown_request
+    def _discard_row_lookups(exception):
+        g.pop("_row_lookups", None)
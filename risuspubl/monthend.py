@@ -0,0 +1,200 @@
+#!/usr/bin/python3
+
+import csv
+import io
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy import select, text, tuple_
+
+from risuspubl.dbmodels import SalesRollupMonth, db
+from risuspubl.rollups import roll_up_month
+
+
+# The columns a month-end CSV file can have, named in its header row.
+# sales_record_id is always left to the sequence.
+_csv_column_names = (
+    "book_id",
+    "year",
+    "month",
+    "copies_sold",
+    "gross_profit",
+    "net_profit",
+)
+
+# An arbitrary key for the advisory lock that serializes partition
+# creation.
+_partition_lock_key = 0x5A1E5
+
+
+def _year_partition_name(year: int) -> str:
+    return f"sales_records_y{int(year)}"
+
+
+def ensure_year_partition(year: int) -> bool:
+    """
+    Creates the partition of sales_records for the given year if it
+    doesn't exist yet. Any rows for that year in the default partition
+    are moved into it. Does nothing if sales_records isn't partitioned.
+
+    :year: The year to create a partition for.
+    :return: True if the partition was created, False otherwise.
+    """
+    year = int(year)
+    partition_name = _year_partition_name(year)
+    is_partitioned = db.session.execute(
+        text(
+            "SELECT 1 FROM pg_partitioned_table "
+            + "WHERE partrelid = to_regclass('sales_records')"
+        )
+    ).scalar()
+    if not is_partitioned:
+        return False
+    # Concurrent imports wait here, and then find the partition exists.
+    db.session.execute(
+        text("SELECT pg_advisory_xact_lock(:key)"), dict(key=_partition_lock_key)
+    )
+    if db.session.execute(
+        text("SELECT to_regclass(:name)"), dict(name=partition_name)
+    ).scalar():
+        db.session.commit()
+        return False
+    # A partition can't be attached while the default partition holds
+    # rows in its range, so those are moved to the new table first.
+    db.session.execute(
+        text(
+            f"CREATE TABLE {partition_name} "
+            + "(LIKE sales_records INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+    )
+    if db.session.execute(text("SELECT to_regclass('sales_records_default')")).scalar():
+        db.session.execute(
+            text(
+                "WITH moved AS (DELETE FROM sales_records_default WHERE year = :year "
+                + f"RETURNING *) INSERT INTO {partition_name} SELECT * FROM moved"
+            ),
+            dict(year=year),
+        )
+    db.session.execute(
+        text(
+            f"ALTER TABLE sales_records ATTACH PARTITION {partition_name} "
+            + f"FOR VALUES FROM ({year}) TO ({year + 1})"
+        )
+    )
+    db.session.commit()
+    return True
+
+
+def import_month(csv_fh) -> dict:
+    """
+    Loads a month-end CSV file of sales records: the partitions for
+    their years are created if need be, the rows are bulk-loaded with
+    COPY, and each month in the file is rolled up. The load and the
+    rollups are committed together, so a failure leaves neither behind.
+    The file's first row must name its columns, which are a subset of
+    book_id, year, month, copies_sold, gross_profit and net_profit that
+    includes year and month.
+
+    :csv_fh: A file object open for reading text.
+    :return: A dict with the number of rows loaded, the years whose
+    partitions were created and the (year, month) pairs rolled up.
+    """
+    csv_text = csv_fh.read()
+    csv_reader = csv.DictReader(io.StringIO(csv_text))
+    column_names = tuple(csv_reader.fieldnames or ())
+    if not column_names or not set(column_names) <= set(_csv_column_names):
+        raise ValueError(
+            f"CSV header {', '.join(column_names)} doesn't consist of columns "
+            + f"among {', '.join(_csv_column_names)}"
+        )
+    if not {"year", "month"} <= set(column_names):
+        raise ValueError(
+            f"CSV header {', '.join(column_names)} doesn't include both the "
+            + "year and month columns"
+        )
+    months = set()
+    row_count = 0
+    for row in csv_reader:
+        months.add((int(row["year"]), int(row["month"])))
+        row_count += 1
+    # Rows added to a month after it's rolled up wouldn't be counted, so
+    # a month can only be imported once.
+    rolled_up_months = db.session.execute(
+        select(SalesRollupMonth.year, SalesRollupMonth.month).where(
+            tuple_(SalesRollupMonth.year, SalesRollupMonth.month).in_(sorted(months))
+        )
+    ).all()
+    if rolled_up_months:
+        raise ValueError(
+            "sales records were already imported for "
+            + ", ".join(
+                f"{year}-{month:02d}" for year, month in sorted(rolled_up_months)
+            )
+        )
+
+    created_years = [
+        year
+        for year in sorted({year for year, _ in months})
+        if ensure_year_partition(year)
+    ]
+    try:
+        dbapi_connection = db.session.connection().connection.dbapi_connection
+        with dbapi_connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY sales_records ({', '.join(column_names)}) FROM STDIN "
+                + "WITH (FORMAT csv, HEADER true)",
+                io.StringIO(csv_text),
+            )
+        for year, month in sorted(months):
+            # A concurrent import of the same month rolls it up first,
+            # in which case this one's rows are discarded.
+            if not roll_up_month(year, month):
+                raise ValueError(
+                    f"sales records were already imported for {year}-{month:02d}"
+                )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return dict(
+        rows=row_count, created_partitions=created_years, rolled_up=sorted(months)
+    )
+
+
+monthend_cli = AppGroup("monthend", help="Month-end sales record imports.")
+
+
+@monthend_cli.command("import")
+@click.argument("csv_file", type=click.File("r"))
+def import_command(csv_file):
+    """Import a CSV file of sales records and roll them up."""
+    result = import_month(csv_file)
+    for year in result["created_partitions"]:
+        click.echo(f"created partition {_year_partition_name(year)}")
+    click.echo(
+        f"imported {result['rows']} sales records for "
+        + ", ".join(f"{year}-{month:02d}" for year, month in result["rolled_up"])
+    )
+
+
+@monthend_cli.command("partition")
+@click.argument("year", type=int)
+def partition_command(year):
+    """Create the sales_records partition for a year ahead of time."""
+    if ensure_year_partition(year):
+        click.echo(f"created partition {_year_partition_name(year)}")
+    else:
+        click.echo(
+            f"partition {_year_partition_name(year)} already exists, or "
+            + "sales_records isn't partitioned"
+        )
+
+
+def init_app(app):
+    """
+    Registers the `flask monthend` commands on the given flask.Flask app.
+
+    :app: The flask.Flask object to register the commands with.
+    :return: None
+    """
+    app.cli.add_command(monthend_cli)
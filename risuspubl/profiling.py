@@ -0,0 +1,187 @@
+#!/usr/bin/python3
+
+import cProfile
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from os.path import basename, join as path_join
+
+from flask import g, request
+
+
+# The default configuration values, applied with setdefault() so that
+# anything passed to create_app() in test_config takes precedence.
+_default_config = {
+    # Profiling is off unless this is True. It's read on every request,
+    # so it can be switched on and off in a running app.
+    "PROFILE_ENABLED": False,
+    # Profile one request in this many with cProfile and save a .pstats
+    # file. 0 disables this.
+    "PROFILE_SAMPLE_EVERY": 0,
+    # Any request taking longer than this many milliseconds gets its
+    # stack samples saved as a .folded file, ready for flamegraph.pl or
+    # speedscope. None disables this.
+    "PROFILE_SLOW_MS": 1000,
+    # How often the sampling profiler takes a stack sample.
+    "PROFILE_SAMPLE_INTERVAL_MS": 5,
+    # Where profiles go, in a subdirectory per endpoint. None means a
+    # profiles/ directory in the instance folder.
+    "PROFILE_DIR": None,
+    # How many profiles to keep per endpoint; older ones are deleted.
+    "PROFILE_KEEP": 20,
+}
+
+# Set in the WSGI environ of a request dispatched from within another
+# request on the same thread, like a POST /batch sub-request. Those
+# aren't profiled on their own: the profilers are per thread, so they'd
+# stop the enclosing request's profile, and they're covered by it.
+NESTED_REQUEST_KEY = "risuspubl.nested_request"
+
+
+def _fold_stack(frame):
+    # Renders a stack as a semicolon-separated list of frames, outermost
+    # first, which is the input format flamegraph.pl expects.
+    frame_names = list()
+    while frame is not None:
+        code = frame.f_code
+        frame_names.append(
+            f"{code.co_name} ({basename(code.co_filename)}:{code.co_firstlineno})"
+        )
+        frame = frame.f_back
+    return ";".join(reversed(frame_names))
+
+
+class SlowRequestSampler:
+    """
+    A sampling profiler that, while any request is being handled, takes
+    a stack sample of each request's thread at a fixed interval from a
+    background thread. The samples are only written out if the request
+    turns out to be slow, so a fast request costs little more than
+    registering and unregistering itself.
+
+    :interval: The number of seconds between samples.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._active = dict()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start_request(self):
+        """
+        Starts sampling the calling thread.
+
+        :return: None
+        """
+        self._active[threading.get_ident()] = Counter()
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name="risuspubl-profiler", daemon=True
+                    )
+                    self._thread.start()
+
+    def finish_request(self):
+        """
+        Stops sampling the calling thread.
+
+        :return: A collections.Counter mapping folded stacks to sample
+        counts, or None if the thread wasn't being sampled.
+        """
+        return self._active.pop(threading.get_ident(), None)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            if not self._active:
+                continue
+            frames = sys._current_frames()
+            for thread_id, stack_counts in list(self._active.items()):
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    stack_counts[_fold_stack(frame)] += 1
+
+
+def _profile_dir(app, endpoint):
+    profile_dir = app.config["PROFILE_DIR"] or path_join(app.instance_path, "profiles")
+    endpoint_dir = path_join(profile_dir, endpoint)
+    os.makedirs(endpoint_dir, exist_ok=True)
+    return endpoint_dir
+
+
+def _rotate(endpoint_dir, keep):
+    # Filenames start with a timestamp, so sorting them sorts by age.
+    filenames = sorted(os.listdir(endpoint_dir))
+    for filename in filenames[: max(0, len(filenames) - keep)]:
+        os.remove(path_join(endpoint_dir, filename))
+
+
+def _profile_path(app, endpoint, elapsed_ms, extension):
+    endpoint_dir = _profile_dir(app, endpoint)
+    # Leave room for the new file within the limit.
+    _rotate(endpoint_dir, app.config["PROFILE_KEEP"] - 1)
+    timestamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime())
+    return path_join(
+        endpoint_dir,
+        f"{timestamp}.{time.time_ns() % 10**9:09d}-{elapsed_ms:.0f}ms.{extension}",
+    )
+
+
+def init_app(app):
+    """
+    Registers the profiling hooks on the given flask.Flask app, setting
+    defaults for any PROFILE_* configuration values not already set.
+    Should be called before other request hooks are registered, so that
+    the profile covers them.
+
+    :app: The flask.Flask object to profile.
+    :return: None
+    """
+    for key, value in _default_config.items():
+        app.config.setdefault(key, value)
+    request_counter = itertools.count(1)
+    sampler = SlowRequestSampler(app.config["PROFILE_SAMPLE_INTERVAL_MS"] / 1000)
+
+    @app.before_request
+    def _start_profiling():
+        if not app.config["PROFILE_ENABLED"] or request.environ.get(NESTED_REQUEST_KEY):
+            return
+        sample_every = app.config["PROFILE_SAMPLE_EVERY"]
+        # next() on an itertools.count is atomic, so no lock is needed.
+        if sample_every and next(request_counter) % sample_every == 0:
+            profiler = cProfile.Profile()
+            g._profile = (time.perf_counter(), profiler)
+            profiler.enable()
+        elif app.config["PROFILE_SLOW_MS"] is not None:
+            g._profile = (time.perf_counter(), None)
+            sampler.start_request()
+
+    @app.teardown_request
+    def _finish_profiling(exception):
+        profile = g.pop("_profile", None)
+        if profile is None:
+            return
+        start, profiler = profile
+        if profiler is not None:
+            profiler.disable()
+        else:
+            stack_counts = sampler.finish_request()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        endpoint = request.endpoint or "unmatched"
+        # A failure to write a profile mustn't fail the request.
+        try:
+            if profiler is not None:
+                profiler.dump_stats(_profile_path(app, endpoint, elapsed_ms, "pstats"))
+            elif stack_counts and elapsed_ms >= app.config["PROFILE_SLOW_MS"]:
+                with open(
+                    _profile_path(app, endpoint, elapsed_ms, "folded"), "w"
+                ) as folded_fh:
+                    for stack, count in stack_counts.items():
+                        folded_fh.write(f"{stack} {count}\n")
+        except OSError:
+            app.logger.exception("couldn't write profile for %s", endpoint)
@@ -0,0 +1,337 @@
+#!/usr/bin/python3
+
+import bisect
+import threading
+import time
+
+from flask import current_app, g, request
+
+from risuspubl.cache import get_row_cache
+from risuspubl.dbmodels import db
+
+
+# The default configuration values, applied with setdefault() so that
+# anything passed to create_app() in test_config takes precedence.
+_default_config = {
+    # Set to False to stop collecting request metrics.
+    "METRICS_ENABLED": True,
+    # GET /_metrics and GET /metrics only answer requests from the
+    # loopback interface unless this is True.
+    "METRICS_ALLOW_REMOTE": False,
+}
+
+# Histogram bucket upper bounds. Request latency is in seconds and
+# response size in bytes.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# When a new thread registers its shard and there are more than this
+# many, the shards of threads that have exited are folded together.
+# Keeps thread-per-request servers from accumulating shards forever.
+_max_live_shards = 256
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class ThreadShardedDict:
+    """
+    A dict of mutable per-key values where every thread writes only to
+    its own shard, so recording a value takes no lock. Readers merge the
+    shards together; a read that races a write may see that write half
+    applied, which is fine for metrics. The registry lock is only taken
+    once per thread, when its shard is created, and by readers.
+
+    :new_value: A callable that returns a fresh value for a new key.
+    :merge_value: A callable that accepts two values and folds the
+    second into the first in place.
+    """
+
+    def __init__(self, new_value, merge_value):
+        self._new_value = new_value
+        self._merge_value = merge_value
+        self._local = threading.local()
+        self._shards = list()
+        self._retired = dict()
+        self._lock = threading.Lock()
+
+    def value(self, key):
+        """
+        Returns this thread's value for the given key, creating it if
+        need be. The caller updates it in place.
+
+        :key: A hashable key.
+        :return: The mutable value.
+        """
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._register_shard()
+        value = shard.get(key)
+        if value is None:
+            value = shard[key] = self._new_value()
+        return value
+
+    def merged(self):
+        """
+        Returns the values of every shard merged together.
+
+        :return: A dict mapping keys to merged values.
+        """
+        with self._lock:
+            self._retire_dead_shards()
+            shards = [shard for _, shard in self._shards]
+            result = dict()
+            self._merge_into(result, self._retired)
+        for shard in shards:
+            self._merge_into(result, shard)
+        return result
+
+    def _register_shard(self):
+        shard = self._local.shard = dict()
+        with self._lock:
+            if len(self._shards) >= _max_live_shards:
+                self._retire_dead_shards()
+            self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def _retire_dead_shards(self):
+        # Caller must hold the lock. A shard whose thread has exited
+        # will never be written again, so it's safe to fold.
+        live_shards = list()
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                live_shards.append((thread, shard))
+            else:
+                self._merge_into(self._retired, shard)
+        self._shards = live_shards
+
+    def _merge_into(self, target, shard):
+        # list() takes a snapshot of the items in one step, so a writer
+        # adding a key concurrently can't break the iteration.
+        for key, value in list(shard.items()):
+            target_value = target.get(key)
+            if target_value is None:
+                target_value = target[key] = self._new_value()
+            self._merge_value(target_value, value)
+
+
+def _new_histogram(bucket_count):
+    # A histogram value is a list of per-bucket counts (not cumulative;
+    # the last slot is the +Inf bucket), followed by the sum.
+    return lambda: [0] * (bucket_count + 1) + [0.0]
+
+
+def _merge_sums(target, value):
+    for index, element in enumerate(value):
+        target[index] += element
+
+
+class RequestMetrics:
+    """
+    The request latency and response size histograms and the in-flight
+    gauges, labeled by endpoint name and method.
+    """
+
+    def __init__(self):
+        self.latency = ThreadShardedDict(
+            _new_histogram(len(LATENCY_BUCKETS)), _merge_sums
+        )
+        self.size = ThreadShardedDict(_new_histogram(len(SIZE_BUCKETS)), _merge_sums)
+        self.in_flight = ThreadShardedDict(lambda: [0], _merge_sums)
+
+    def observe(self, histogram, buckets, labels, amount):
+        value = histogram.value(labels)
+        value[bisect.bisect_left(buckets, amount)] += 1
+        value[-1] += amount
+
+
+def _escape_label(label_value):
+    return (
+        str(label_value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    )
+
+
+def _labels_expr(**labels):
+    return (
+        "{"
+        + ",".join(f'{name}="{_escape_label(value)}"' for name, value in labels.items())
+        + "}"
+    )
+
+
+def _render_histogram(lines, name, help_text, buckets, merged):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for (endpoint, method), value in sorted(merged.items()):
+        cumulative = 0
+        for bound, count in zip(buckets + ("+Inf",), value[:-1]):
+            cumulative += count
+            labels = _labels_expr(endpoint=endpoint, method=method, le=bound)
+            lines.append(f"{name}_bucket{labels} {cumulative}")
+        labels = _labels_expr(endpoint=endpoint, method=method)
+        lines.append(f"{name}_sum{labels} {value[-1]}")
+        lines.append(f"{name}_count{labels} {cumulative}")
+
+
+def _render_metric(lines, name, metric_type, help_text, samples):
+    # samples is an iterable of (labels dict, value) pairs.
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {metric_type}")
+    for labels, value in samples:
+        lines.append(f"{name}{_labels_expr(**labels) if labels else ''} {value}")
+
+
+def render_exposition():
+    """
+    Renders every metric the current app collects in the Prometheus
+    text exposition format: the request histograms and gauges, database
+    connection pool gauges, row cache counters, and the per-endpoint SQL
+    statement totals. Must be called within an app context.
+
+    :return: A str.
+    """
+    request_metrics = current_app.extensions["request_metrics"]
+    lines = list()
+
+    _render_histogram(
+        lines,
+        "risuspubl_request_duration_seconds",
+        "Request latency by endpoint and method.",
+        LATENCY_BUCKETS,
+        request_metrics.latency.merged(),
+    )
+    _render_histogram(
+        lines,
+        "risuspubl_response_size_bytes",
+        "Response body size by endpoint and method.",
+        SIZE_BUCKETS,
+        request_metrics.size.merged(),
+    )
+    _render_metric(
+        lines,
+        "risuspubl_requests_in_flight",
+        "gauge",
+        "Requests currently being handled, by endpoint and method.",
+        (
+            (dict(endpoint=endpoint, method=method), value[0])
+            for (endpoint, method), value in sorted(
+                request_metrics.in_flight.merged().items()
+            )
+        ),
+    )
+
+    # Connection pool gauges for each engine. Only QueuePool (the
+    # default for PostgreSQL) reports these.
+    pool_samples = {"size": [], "checked_out": [], "checked_in": [], "overflow": []}
+    for bind_key, engine in db.engines.items():
+        pool = engine.pool
+        if not hasattr(pool, "checkedout"):
+            continue
+        labels = dict(bind=bind_key or "default")
+        pool_samples["size"].append((labels, pool.size()))
+        pool_samples["checked_out"].append((labels, pool.checkedout()))
+        pool_samples["checked_in"].append((labels, pool.checkedin()))
+        pool_samples["overflow"].append((labels, pool.overflow()))
+    for stat_name, samples in pool_samples.items():
+        _render_metric(
+            lines,
+            f"risuspubl_db_pool_{stat_name}",
+            "gauge",
+            f"Database connection pool {stat_name.replace('_', ' ')} connections.",
+            samples,
+        )
+
+    row_cache = get_row_cache()
+    if row_cache is not None:
+        row_cache_stats = row_cache.stats()
+        for stat_name in ("hits", "misses", "evictions", "invalidations"):
+            _render_metric(
+                lines,
+                f"risuspubl_row_cache_{stat_name}_total",
+                "counter",
+                f"Row cache {stat_name}.",
+                [({}, row_cache_stats[stat_name])],
+            )
+        for stat_name in ("entries", "bytes"):
+            if stat_name in row_cache_stats:
+                _render_metric(
+                    lines,
+                    f"risuspubl_row_cache_{stat_name}",
+                    "gauge",
+                    f"Row cache {stat_name} currently held.",
+                    [({}, row_cache_stats[stat_name])],
+                )
+
+    sql_totals = current_app.extensions["sql_stats"].snapshot()
+    _render_metric(
+        lines,
+        "risuspubl_sql_statements_total",
+        "counter",
+        "SQL statements issued, by endpoint.",
+        (
+            (dict(endpoint=endpoint), totals["statements"])
+            for endpoint, totals in sorted(sql_totals.items())
+        ),
+    )
+    _render_metric(
+        lines,
+        "risuspubl_sql_duration_seconds_total",
+        "counter",
+        "Time spent executing SQL statements, by endpoint.",
+        (
+            (dict(endpoint=endpoint), totals["db_seconds"])
+            for endpoint, totals in sorted(sql_totals.items())
+        ),
+    )
+
+    return "\n".join(lines) + "\n"
+
+
+def init_app(app):
+    """
+    Registers request metrics collection on the given flask.Flask app,
+    setting defaults for any METRICS_* configuration values not already
+    set. Should be called before compression is registered, so response
+    sizes are measured after compression.
+
+    :app: The flask.Flask object to collect metrics for.
+    :return: None
+    """
+    for key, value in _default_config.items():
+        app.config.setdefault(key, value)
+    request_metrics = RequestMetrics()
+    app.extensions["request_metrics"] = request_metrics
+    if not app.config["METRICS_ENABLED"]:
+        return
+
+    @app.before_request
+    def _start_request_metrics():
+        labels = (request.endpoint or "<unmatched>", request.method)
+        request_metrics.in_flight.value(labels)[0] += 1
+        g._metrics_request = (labels, time.perf_counter())
+
+    @app.after_request
+    def _observe_response_size(response):
+        metrics_request = g.get("_metrics_request")
+        # Streamed responses have no length to observe.
+        if metrics_request is not None and response.content_length is not None:
+            request_metrics.observe(
+                request_metrics.size,
+                SIZE_BUCKETS,
+                metrics_request[0],
+                response.content_length,
+            )
+        return response
+
+    @app.teardown_request
+    def _finish_request_metrics(exception):
+        metrics_request = g.pop("_metrics_request", None)
+        if metrics_request is None:
+            return
+        labels, start = metrics_request
+        request_metrics.observe(
+            request_metrics.latency,
+            LATENCY_BUCKETS,
+            labels,
+            time.perf_counter() - start,
+        )
+        request_metrics.in_flight.value(labels)[0] -= 1
@@ -0,0 +1,176 @@
+#!/usr/bin/python3
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy import delete, func, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from risuspubl.dbmodels import (
+    Book,
+    BookYearSales,
+    EditorYearSales,
+    SalesRecord,
+    SalesRollupMonth,
+    SeriesYearSales,
+    db,
+)
+
+
+# Each rollup table, with the column its sales are grouped by. The
+# series_id and editor_id come from the books table.
+_rollup_groupings = (
+    (BookYearSales, SalesRecord.book_id),
+    (SeriesYearSales, Book.series_id),
+    (EditorYearSales, Book.editor_id),
+)
+
+_total_column_names = ("copies_sold", "gross_profit", "net_profit")
+
+
+def _totals_select(group_column, *where_clauses):
+    # A SELECT of the sales totals per group_column value and year, in
+    # the column order of the rollup tables.
+    totals_select = select(
+        group_column,
+        SalesRecord.year,
+        func.sum(SalesRecord.copies_sold),
+        func.sum(SalesRecord.gross_profit),
+        func.sum(SalesRecord.net_profit),
+    )
+    if group_column.table is Book.__table__:
+        totals_select = totals_select.join(Book, Book.book_id == SalesRecord.book_id)
+    return totals_select.where(group_column.is_not(None), *where_clauses).group_by(
+        group_column, SalesRecord.year
+    )
+
+
+def _insert_totals(rollup_model, group_column, *where_clauses):
+    column_names = (group_column.name, "year") + _total_column_names
+    return pg_insert(rollup_model).from_select(
+        column_names, _totals_select(group_column, *where_clauses)
+    )
+
+
+def roll_up_month(year: int, month: int) -> bool:
+    """
+    Adds one month of sales records to the rollup tables in the current
+    transaction, without committing it, so that the caller can commit
+    it together with loading the month's records. A month that has
+    already been rolled up is skipped.
+
+    :year: The year of the month to roll up.
+    :month: The month to roll up (between 1 and 12).
+    :return: True if the month was rolled up, False if it already had
+    been.
+    """
+    if not (1 <= month <= 12):
+        raise ValueError(
+            f"month parameter value {month} not in the range [1, 12]: "
+            + "invalid month parameter"
+        )
+    # Recording the month first means that a concurrent refresh of the
+    # same month waits on this row, and then finds it already there.
+    rolled_up = db.session.execute(
+        pg_insert(SalesRollupMonth)
+        .values(year=year, month=month)
+        .on_conflict_do_nothing()
+        .returning(literal(True))
+    ).scalar()
+    if not rolled_up:
+        return False
+    for rollup_model, group_column in _rollup_groupings:
+        insert_totals = _insert_totals(
+            rollup_model,
+            group_column,
+            SalesRecord.year == year,
+            SalesRecord.month == month,
+        )
+        # The month's totals are added to any already there for the
+        # year.
+        db.session.execute(
+            insert_totals.on_conflict_do_update(
+                index_elements=(group_column.name, "year"),
+                set_={
+                    column_name: getattr(rollup_model, column_name)
+                    + getattr(insert_totals.excluded, column_name)
+                    for column_name in _total_column_names
+                },
+            )
+        )
+    return True
+
+
+def refresh_month(year: int, month: int) -> bool:
+    """
+    Adds one month of sales records to the rollup tables and commits.
+    Only that month's rows in sales_records are read, so this should be
+    run once a month's records have all been loaded. A month that has
+    already been rolled up is skipped.
+
+    :year: The year of the month to roll up.
+    :month: The month to roll up (between 1 and 12).
+    :return: True if the month was rolled up, False if it already had
+    been.
+    """
+    try:
+        rolled_up = roll_up_month(year, month)
+    except Exception:
+        db.session.rollback()
+        raise
+    if rolled_up:
+        db.session.commit()
+    else:
+        db.session.rollback()
+    return rolled_up
+
+
+def rebuild():
+    """
+    Empties the rollup tables and rebuilds them from every row in
+    sales_records, e.g. after past sales records were corrected.
+
+    :return: None
+    """
+    db.session.execute(delete(SalesRollupMonth))
+    for rollup_model, _ in _rollup_groupings:
+        db.session.execute(delete(rollup_model))
+    db.session.execute(
+        pg_insert(SalesRollupMonth).from_select(
+            ("year", "month"),
+            select(SalesRecord.year, SalesRecord.month).distinct(),
+        )
+    )
+    for rollup_model, group_column in _rollup_groupings:
+        db.session.execute(_insert_totals(rollup_model, group_column))
+    db.session.commit()
+
+
+rollups_cli = AppGroup("rollups", help="Maintain the sales rollup tables.")
+
+
+@rollups_cli.command("refresh")
+@click.argument("year", type=int)
+@click.argument("month", type=int)
+def refresh_command(year, month):
+    """Roll up one month of newly loaded sales records."""
+    if refresh_month(year, month):
+        click.echo(f"rolled up {year}-{month:02d}")
+    else:
+        click.echo(f"{year}-{month:02d} was already rolled up")
+
+
+@rollups_cli.command("rebuild")
+def rebuild_command():
+    """Rebuild the rollup tables from all sales records."""
+    rebuild()
+    click.echo("rebuilt the sales rollups")
+
+
+def init_app(app):
+    """
+    Registers the `flask rollups` commands on the given flask.Flask app.
+
+    :app: The flask.Flask object to register the commands with.
+    :return: None
+    """
+    app.cli.add_command(rollups_cli)
@@ -0,0 +1,212 @@
+#!/usr/bin/python3
+
+import time
+
+from flask import g, has_app_context, request
+from sqlalchemy import event
+
+from risuspubl.dbmodels import db
+from risuspubl.prometheus import ThreadShardedDict
+
+
+# The default configuration values, applied with setdefault() so that
+# anything passed to create_app() in test_config takes precedence.
+_default_config = {
+    # Set to False to stop counting and timing SQL statements.
+    "SQL_STATS_ENABLED": True,
+    # Set to False to omit the Server-Timing response header.
+    "SQL_STATS_SERVER_TIMING": True,
+}
+
+# The slowest statement's SQL is kept for display in /_metrics, cut
+# down to this many characters.
+_statement_display_len = 200
+
+# Savepoint bookkeeping is counted and timed like any other statement,
+# but never reported as the slowest: that's there to point at a query
+# worth looking at, and a savepoint that stalls on the network isn't.
+_savepoint_prefixes = ("SAVEPOINT", "RELEASE", "ROLLBACK TO SAVEPOINT")
+
+
+class RequestSqlStats:
+    """
+    The SQL statement tallies for a single request: how many statements
+    ran, their total time, and the slowest one.
+    """
+
+    def __init__(self):
+        self.statement_count = 0
+        self.total_seconds = 0.0
+        self.slowest_seconds = 0.0
+        self.slowest_statement = None
+
+    def record(self, statement, seconds):
+        self.statement_count += 1
+        self.total_seconds += seconds
+        if seconds > self.slowest_seconds and not statement.startswith(
+            _savepoint_prefixes
+        ):
+            self.slowest_seconds = seconds
+            self.slowest_statement = statement
+
+    def merge(self, other):
+        """
+        Adds another RequestSqlStats' tallies to these, e.g. those of
+        queries the request ran on other threads.
+
+        :other: A RequestSqlStats object.
+        :return: None
+        """
+        self.statement_count += other.statement_count
+        self.total_seconds += other.total_seconds
+        if other.slowest_seconds > self.slowest_seconds:
+            self.slowest_seconds = other.slowest_seconds
+            self.slowest_statement = other.slowest_statement
+
+    def server_timing(self):
+        """
+        Formats these tallies as a Server-Timing header value.
+
+        :return: A str.
+        """
+        return (
+            f'db;dur={self.total_seconds * 1000:.3f};desc="{self.statement_count} '
+            + 'statements", '
+            + f"db-slowest;dur={self.slowest_seconds * 1000:.3f}"
+        )
+
+
+def _new_endpoint_totals():
+    # requests, statements, db_seconds, max_request_statements,
+    # slowest_statement_seconds, slowest_statement
+    return [0, 0, 0.0, 0, 0.0, None]
+
+
+def _merge_endpoint_totals(totals, other_totals):
+    totals[0] += other_totals[0]
+    totals[1] += other_totals[1]
+    totals[2] += other_totals[2]
+    totals[3] = max(totals[3], other_totals[3])
+    if other_totals[4] > totals[4]:
+        totals[4] = other_totals[4]
+        totals[5] = other_totals[5]
+
+
+class EndpointSqlStats:
+    """
+    Per-endpoint aggregates of RequestSqlStats, kept for the life of the
+    process and displayed by GET /_metrics and GET /metrics. Each thread
+    adds to its own shard, so recording a request takes no lock.
+    """
+
+    def __init__(self):
+        self._by_endpoint = ThreadShardedDict(
+            _new_endpoint_totals, _merge_endpoint_totals
+        )
+
+    def add(self, endpoint, request_stats):
+        totals = self._by_endpoint.value(endpoint)
+        totals[0] += 1
+        totals[1] += request_stats.statement_count
+        totals[2] += request_stats.total_seconds
+        if request_stats.statement_count > totals[3]:
+            totals[3] = request_stats.statement_count
+        if request_stats.slowest_seconds > totals[4]:
+            totals[4] = request_stats.slowest_seconds
+            totals[5] = request_stats.slowest_statement[:_statement_display_len]
+
+    def snapshot(self):
+        """
+        Returns a copy of the per-endpoint aggregates.
+
+        :return: A dict mapping endpoint names to dicts of totals.
+        """
+        return {
+            endpoint: dict(
+                requests=totals[0],
+                statements=totals[1],
+                db_seconds=totals[2],
+                max_request_statements=totals[3],
+                slowest_statement_seconds=totals[4],
+                slowest_statement=totals[5],
+            )
+            for endpoint, totals in self._by_endpoint.merged().items()
+        }
+
+
+def current_request_sql_stats():
+    """
+    Returns the RequestSqlStats for the request being handled, or None
+    if statement counting is off or there's no request underway.
+
+    :return: A RequestSqlStats object or None.
+    """
+    return g.get("_sql_stats")
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # A stack, since a statement can in principle be issued while
+    # another on the same connection is being timed.
+    conn.info.setdefault("_sql_stats_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    seconds = time.perf_counter() - conn.info["_sql_stats_start"].pop()
+    # Statements issued outside a request (e.g. from the flask shell)
+    # aren't attributed to anything.
+    if has_app_context():
+        request_stats = g.get("_sql_stats")
+        if request_stats is not None:
+            request_stats.record(statement, seconds)
+
+
+def _handle_error(exception_context):
+    # A statement that raises never reaches after_cursor_execute, so its
+    # start time is discarded here to keep the stack balanced.
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("_sql_stats_start"):
+        conn.info["_sql_stats_start"].pop()
+
+
+def init_app(app):
+    """
+    Registers SQL statement counting and timing on the given flask.Flask
+    app. The app's engines get cursor execution listeners, and each
+    request's tallies are added to a Server-Timing header and to
+    per-endpoint aggregates. Must be called after db.init_app(app).
+
+    :app: The flask.Flask object to register statement counting with.
+    :return: None
+    """
+    for key, value in _default_config.items():
+        app.config.setdefault(key, value)
+    endpoint_stats = EndpointSqlStats()
+    app.extensions["sql_stats"] = endpoint_stats
+    if not app.config["SQL_STATS_ENABLED"]:
+        return
+
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+            event.listen(engine, "handle_error", _handle_error)
+
+    @app.before_request
+    def _start_request_sql_stats():
+        g._sql_stats = RequestSqlStats()
+
+    @app.after_request
+    def _finish_request_sql_stats(response):
+        request_stats = g.pop("_sql_stats", None)
+        if request_stats is None:
+            return response
+        endpoint_stats.add(request.endpoint or "<unmatched>", request_stats)
+        if app.config["SQL_STATS_SERVER_TIMING"]:
+            response.headers.add("Server-Timing", request_stats.server_timing())
+        return response
+
+    @app.teardown_request
+    def _discard_request_sql_stats(exception):
+        # If the request failed before after_request ran, the tallies
+        # mustn't leak into whatever runs next in this app context.
+        g.pop("_sql_stats", None)
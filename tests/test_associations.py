@@ -0,0 +1,133 @@
+#!/usr/bin/python3
+
+import os
+
+from conftest import Genius
+
+from risuspubl.dbmodels import AuthorsBooks, AuthorsManuscripts, db
+
+
+# Set environment variable for Flask's configuration
+os.environ["FLASK_ENV"] = "testing"
+# This should be set before creating the app instance.
+
+
+def _assoc_pairs(assoc_table, other_id_column):
+    return set(
+        db.session.execute(
+            assoc_table.select().with_only_columns(
+                assoc_table.c.author_id, assoc_table.c[other_id_column]
+            )
+        )
+    )
+
+
+# Testing the PATCH /associations/authors_books endpoint: adding and
+# removing pairs in one request, one statement each, and refusing bad
+# ids and orphaned books
+def test_update_authors_books_endpoint(db_w_cleanup, staged_app_client, sql_statements):
+    app, client = staged_app_client
+
+    author_ids = [Genius.gen_author_obj().author_id for _ in range(3)]
+    book_ids = [Genius.gen_book_obj().book_id for _ in range(3)]
+    for book_id in book_ids:
+        Genius.gen_authors_books_obj(author_ids[0], book_id)
+
+    # Moving every book from the first author to the other two, and
+    # re-adding one pair that's already there.
+    add_jsobjs = [
+        dict(author_id=author_id, book_id=book_id)
+        for author_id in author_ids[1:]
+        for book_id in book_ids
+    ] + [dict(author_id=author_ids[0], book_id=book_ids[0])]
+    remove_jsobjs = [
+        dict(author_id=author_ids[0], book_id=book_id) for book_id in book_ids[1:]
+    ]
+    sql_statements.clear()
+    response = client.patch(
+        "/associations/authors_books",
+        json=dict(add=add_jsobjs, remove=remove_jsobjs),
+    )
+    statements = list(sql_statements)
+    assert response.status_code == 200, response.data.decode("utf8")
+    assert response.get_json() == dict(added=6, removed=2)
+    assert _assoc_pairs(AuthorsBooks, "book_id") == {
+        (author_id, book_id) for author_id in author_ids[1:] for book_id in book_ids
+    } | {(author_ids[0], book_ids[0])}
+    assert [statement.split()[0] for statement in statements].count("INSERT") == 1
+    assert [statement.split()[0] for statement in statements].count("DELETE") == 1
+
+    # Adding them again changes nothing.
+    response = client.put("/associations/authors_books", json=dict(add=add_jsobjs))
+    assert response.status_code == 200, response.data.decode("utf8")
+    assert response.get_json() == dict(added=0, removed=0)
+
+    # Testing for 400 errors, none of which change anything: a bogus
+    # author_id or book_id, a pair both added and removed, removing a
+    # book's last authors, and malformed bodies
+    pairs = _assoc_pairs(AuthorsBooks, "book_id")
+    bogus_author_id = max(author_ids) + 1
+    bogus_book_id = max(book_ids) + 1
+    for request_jsobj in (
+        dict(add=[dict(author_id=bogus_author_id, book_id=book_ids[0])]),
+        dict(add=[dict(author_id=author_ids[0], book_id=bogus_book_id)]),
+        dict(
+            add=[dict(author_id=author_ids[0], book_id=book_ids[1])],
+            remove=[dict(author_id=author_ids[0], book_id=book_ids[1])],
+        ),
+        dict(
+            add=[dict(author_id=author_ids[0], book_id=book_ids[1])],
+            remove=[
+                dict(author_id=author_id, book_id=book_ids[2])
+                for author_id in author_ids[1:]
+            ],
+        ),
+        dict(add=[dict(author_id=author_ids[0], manuscript_id=1)]),
+        dict(add=[[author_ids[0], book_ids[1]]]),
+        dict(add={}),
+        dict(remove=[], delete=[]),
+    ):
+        response = client.patch("/associations/authors_books", json=request_jsobj)
+        assert response.status_code == 400, response.data.decode("utf8")
+    assert _assoc_pairs(AuthorsBooks, "book_id") == pairs
+
+    app.config["ASSOCIATIONS_MAX_PAIRS"] = 2
+    try:
+        response = client.patch(
+            "/associations/authors_books", json=dict(add=add_jsobjs)
+        )
+        assert response.status_code == 400, response.data.decode("utf8")
+    finally:
+        app.config["ASSOCIATIONS_MAX_PAIRS"] = 10000
+
+
+# Testing the PATCH /associations/authors_manuscripts endpoint
+def test_update_authors_manuscripts_endpoint(db_w_cleanup, staged_app_client):
+    app, client = staged_app_client
+
+    author_ids = [Genius.gen_author_obj().author_id for _ in range(2)]
+    manuscript_id = Genius.gen_manuscript_obj().manuscript_id
+    Genius.gen_authors_manuscripts_obj(author_ids[0], manuscript_id)
+
+    response = client.patch(
+        "/associations/authors_manuscripts",
+        json=dict(
+            add=[dict(author_id=author_ids[1], manuscript_id=manuscript_id)],
+            remove=[dict(author_id=author_ids[0], manuscript_id=manuscript_id)],
+        ),
+    )
+    assert response.status_code == 200, response.data.decode("utf8")
+    assert response.get_json() == dict(added=1, removed=1)
+    assert _assoc_pairs(AuthorsManuscripts, "manuscript_id") == {
+        (author_ids[1], manuscript_id)
+    }
+
+    # Removing the manuscript's only author is refused.
+    response = client.patch(
+        "/associations/authors_manuscripts",
+        json=dict(remove=[dict(author_id=author_ids[1], manuscript_id=manuscript_id)]),
+    )
+    assert response.status_code == 400, response.data.decode("utf8")
+    assert _assoc_pairs(AuthorsManuscripts, "manuscript_id") == {
+        (author_ids[1], manuscript_id)
+    }
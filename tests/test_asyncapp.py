@@ -0,0 +1,166 @@
+#!/usr/bin/python3
+
+import asyncio
+import os
+
+import pytest
+from sqlalchemy import delete, insert
+
+from conftest import Genius
+
+from risuspubl.dbmodels import Book, Manuscript, SalesRecord, Series, db
+
+
+pytest.importorskip("asyncpg")
+
+from risuspubl.asyncapp import create_asgi_app  # noqa: E402
+
+
+# Set environment variable for Flask's configuration
+os.environ["FLASK_ENV"] = "testing"
+# This should be set before creating the app instance.
+
+
+async def _asgi_get(asgi_app, path):
+    # Drives the app through the ASGI interface and collects the
+    # response.
+    messages = list()
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    path, _, query_string = path.partition("?")
+    await asgi_app(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": path,
+            "query_string": query_string.encode("latin1"),
+            "headers": [],
+        },
+        receive,
+        send,
+    )
+    return messages[0]["status"], messages[1]["body"]
+
+
+# Testing that the async app's responses match the Flask app's for each
+# of its routes, including 404s and 400s
+def test_async_read_routes(db_w_cleanup, staged_app_client):
+    app, client = staged_app_client
+
+    # The async app has its own connections, so it can only see rows that
+    # are committed, not those in the tests' outer transaction.
+    with db.engine.begin() as connection:
+        series_id = connection.execute(
+            insert(Series)
+            .values(**Genius.gen_series_dict())
+            .returning(Series.series_id)
+        ).scalar()
+        book_id = connection.execute(
+            insert(Book)
+            .values(**Genius.gen_book_dict(None, series_id))
+            .returning(Book.book_id)
+        ).scalar()
+        empty_series_id = connection.execute(
+            insert(Series)
+            .values(**Genius.gen_series_dict())
+            .returning(Series.series_id)
+        ).scalar()
+        manuscript_id = connection.execute(
+            insert(Manuscript)
+            .values(**Genius.gen_manuscript_dict(None, series_id))
+            .returning(Manuscript.manuscript_id)
+        ).scalar()
+        sales_record_ids = list()
+        for month in (1, 2, 3):
+            sales_record_dict = Genius.gen_sales_record_dict_by_pubdate(
+                book_id, Genius.todays_date.replace(year=2001), 2020, month
+            )
+            sales_record_ids.append(
+                connection.execute(
+                    insert(SalesRecord)
+                    .values(**sales_record_dict)
+                    .returning(SalesRecord.sales_record_id)
+                ).scalar()
+            )
+
+    paths = [
+        "/books",
+        f"/books/{book_id}",
+        f"/books/{book_id + 1000}",
+        f"/books?filter[series_id]={series_id}&fields=book_id,publication_date",
+        "/books?publication_date[gte]=3000-01-01",
+        # An unknown column is a 400.
+        "/books?filter[isbn]=0",
+        "/series",
+        "/series?sort=-volumes,title",
+        f"/series/{series_id}",
+        f"/series/{series_id}/books",
+        f"/series/{series_id}/books/{book_id}",
+        f"/series/{series_id}/books/{book_id + 1000}",
+        f"/series/{series_id}/manuscripts",
+        f"/series/{series_id}/manuscripts/{manuscript_id}",
+        f"/books/{book_id}?fields=title,is_in_print",
+        f"/series/{series_id}?fields=volumes",
+        f"/series/{series_id}/books?fields=book_id,series_id",
+        f"/series/{series_id}/books?per_page=1&fields=title",
+        # A page past the last row is empty, but a series with no rows
+        # at all or no series is a 404.
+        f"/series/{series_id}/manuscripts?after={manuscript_id}",
+        f"/series/{empty_series_id}/books",
+        f"/series/{series_id + 1000}/books",
+        # A page size out of range is a 400.
+        f"/series/{series_id}/books?per_page=0",
+        f"/series/{series_id}/manuscripts/{manuscript_id}?fields=due_date",
+        f"/sales_records/{sales_record_ids[1]}?fields=gross_profit",
+        f"/books/{book_id}?fields=isbn",
+        f"/books/{book_id}?include=series,sales,editor",
+        "/series?fields=title&include=books.sales,manuscripts",
+        "/books?include=authors.books.series",
+        f"/books?ids={book_id + 1000},{book_id}&include=series",
+        f"/series?ids={series_id}&fields=title",
+        # Filtering a multi-get is a 400.
+        f"/books?ids={book_id}&sort=title",
+        f"/sales_records/{sales_record_ids[0]}",
+        "/sales_records/years/2020",
+        "/sales_records/years/2020/months/2",
+        f"/sales_records/books/{book_id}",
+        f"/sales_records/years/2020/books/{book_id}",
+        f"/sales_records/years/2020/months/3/books/{book_id}",
+        f"/sales_records/years/2020/months/4/books/{book_id}",
+        # An out-of-range year is a 400.
+        "/sales_records/years/1900",
+    ]
+
+    async def get_all(asgi_app):
+        try:
+            return [await _asgi_get(asgi_app, path) for path in paths]
+        finally:
+            await asgi_app.engine.dispose()
+
+    try:
+        asgi_app = create_asgi_app(
+            dict(SQLALCHEMY_DATABASE_URI=app.config["SQLALCHEMY_DATABASE_URI"])
+        )
+        async_responses = asyncio.run(get_all(asgi_app))
+        for path, (status, body) in zip(paths, async_responses):
+            response = client.get(path)
+            assert status == response.status_code, path
+            if status == 200:
+                assert body == response.data, path
+    finally:
+        with db.engine.begin() as connection:
+            connection.execute(
+                delete(SalesRecord).where(SalesRecord.book_id == book_id)
+            )
+            connection.execute(
+                delete(Manuscript).where(Manuscript.manuscript_id == manuscript_id)
+            )
+            connection.execute(delete(Book).where(Book.book_id == book_id))
+            connection.execute(
+                delete(Series).where(Series.series_id.in_((series_id, empty_series_id)))
+            )
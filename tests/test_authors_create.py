@@ -3,7 +3,7 @@
 import os
 import random
 
-from risuspubl.dbmodels import AuthorsBooks, AuthorsManuscripts
+from risuspubl.dbmodels import AuthorsBooks, AuthorsManuscripts, db
 
 from conftest import Genius, DbBasedTester, randint_excluding
 
@@ -30,6 +30,44 @@ def test_author_create_endpoint(db_w_cleanup, staged_app_client):
     assert response.status_code == 400, response.data.decode("utf8")
 
 
+# Testing that creating a row is one INSERT ... RETURNING and that the
+# new row isn't SELECTed back to serialize it
+def test_create_endpoints_statements(db_w_cleanup, staged_app_client, sql_statements):
+    app, client = staged_app_client
+
+    author_obj = Genius.gen_author_obj()
+    editor_obj = Genius.gen_editor_obj()
+    author_id = author_obj.author_id
+    editor_id = editor_obj.editor_id
+    db.session.expunge_all()
+    sql_statements.clear()
+    author_dict = Genius.gen_author_dict()
+    author_response = client.post("/authors", json=author_dict)
+    author_statements = list(sql_statements)
+    sql_statements.clear()
+    book_dict = Genius.gen_book_dict(editor_id)
+    book_response = client.post(f"/authors/{author_id}/books", json=book_dict)
+    statements = list(sql_statements)
+    DbBasedTester.test_author_resp(author_response, author_dict)
+    DbBasedTester.test_book_resp(book_response, book_dict)
+
+    (insert_statement,) = author_statements
+    assert insert_statement.startswith("INSERT INTO authors")
+    assert "RETURNING authors.author_id" in insert_statement
+    # After the author and editor are looked up, the book and its
+    # authors_books row are inserted, and nothing is SELECTed back.
+    insert_index = next(
+        index
+        for index, statement in enumerate(statements)
+        if statement.startswith("INSERT INTO books")
+    )
+    assert [statement.split(" (")[0] for statement in statements[insert_index:]] == [
+        "INSERT INTO books",
+        "INSERT INTO authors_books",
+    ]
+    assert "RETURNING books.book_id" in statements[insert_index]
+
+
 # Testing the POST /authors/<id>/books endpoint -- test 2 of 84
 def test_create_author_book_endpoint(db_w_cleanup, staged_app_client):
     db = db_w_cleanup
@@ -5,6 +5,8 @@ import random
 import json
 import operator
 
+from sqlalchemy import event
+
 from conftest import Genius, DbBasedTester, randint_excluding
 
 
@@ -169,6 +171,53 @@ def test_display_author_metadata_endpoint(db_w_cleanup, staged_app_client):
     assert response.status_code == 500, response.data.decode("utf8")
 
 
+# Testing the fields parameter of the GET and PATCH
+# /authors/<id>/metadata endpoints and GET /authors/<id>: only the
+# fields asked for are output, and the biography isn't selected unless
+# it's asked for
+def test_display_author_metadata_endpoint_fields(
+    db_w_cleanup, staged_app_client, sql_statements
+):
+    app, client = staged_app_client
+    db = db_w_cleanup
+
+    author_obj = Genius.gen_author_obj()
+    metadata_obj = Genius.gen_metadata_obj(author_obj.author_id)
+    author_id = author_obj.author_id
+    author_jsobj = author_obj.serialize()
+    metadata_jsobj = metadata_obj.serialize()
+
+    # The test shares the app's session; emptying it makes the requests
+    # load rows the way they would in a new session.
+    db.session.expunge_all()
+    sql_statements.clear()
+    response = client.get(f"/authors/{author_id}/metadata?fields=photo_url,age")
+    assert response.status_code == 200, response.data.decode("utf8")
+    assert response.get_json() == dict(
+        photo_url=metadata_jsobj["photo_url"], age=metadata_jsobj["age"]
+    )
+    response = client.patch(
+        f"/authors/{author_id}/metadata?fields=age", json=dict(age=40)
+    )
+    assert response.status_code == 200, response.data.decode("utf8")
+    assert response.get_json() == dict(age=40)
+    assert any("authors_metadata" in statement for statement in sql_statements)
+    assert not any("biography" in statement for statement in sql_statements)
+
+    # The row cache holds whole rows; a projection of a cached row comes
+    # from the cache too.
+    for _ in range(2):
+        response = client.get(f"/authors/{author_id}?fields=last_name")
+        assert response.status_code == 200, response.data.decode("utf8")
+        assert response.get_json() == dict(last_name=author_jsobj["last_name"])
+        client.get(f"/authors/{author_id}")
+
+    response = client.get(f"/authors/{author_id}/metadata?fields=ssn")
+    assert response.status_code == 400, response.data.decode("utf8")
+    response = client.get(f"/authors/{author_id}?fields=")
+    assert response.status_code == 400, response.data.decode("utf8")
+
+
 # Testing the GET /authors/<id>/<id>/books/<id> endpoint -- test 19 of 84
 def test_display_authors_book_by_id_endpoint(db_w_cleanup, staged_app_client):
     app, client = staged_app_client
@@ -503,3 +552,119 @@ def test_display_authors_manuscripts_endpoint(db_w_cleanup, staged_app_client):
         f"/authors/{author_obj.author_id}/{author_obj.author_id}/manuscripts"
     )
     assert response.status_code == 400, response.data.decode("utf8")
+
+
+# Testing that GET, PATCH and DELETE /authors/<id>/books/<id> and
+# /authors/<id>/<id>/books/<id> check that the book is the authors' with
+# a lookup in authors_books rather than by loading all the authors'
+# books: of an author's several books, at most the one asked for is
+# fetched
+def test_author_book_membership_lookup(db_w_cleanup, staged_app_client):
+    app, client = staged_app_client
+    db = db_w_cleanup
+
+    author_ids = [Genius.gen_author_obj().author_id for _ in range(2)]
+    book_ids = [Genius.gen_book_obj().book_id for _ in range(5)]
+    for book_id in book_ids:
+        for author_id in author_ids:
+            Genius.gen_authors_books_obj(author_id, book_id)
+    other_book_id = Genius.gen_book_obj().book_id
+    db.session.expunge_all()
+    book_rows = list()
+
+    def count_book_rows(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("SELECT books."):
+            book_rows.append(cursor.rowcount)
+
+    # The test shares the app's session; each request starts with it
+    # empty, the way it would in a new session.
+    def start_request():
+        db.session.expunge_all()
+        book_rows.clear()
+
+    event.listen(db.engine, "after_cursor_execute", count_book_rows)
+    try:
+        for path in (
+            f"/authors/{author_ids[0]}/books/{book_ids[0]}",
+            f"/authors/{author_ids[0]}/{author_ids[1]}/books/{book_ids[0]}",
+        ):
+            start_request()
+            response = client.get(path)
+            assert response.status_code == 200, response.data.decode("utf8")
+            assert response.get_json()["book_id"] == book_ids[0]
+            assert sum(book_rows) == 1
+        start_request()
+        response = client.patch(
+            f"/authors/{author_ids[0]}/{author_ids[1]}/books/{book_ids[1]}",
+            json=dict(edition_number=3),
+        )
+        assert response.status_code == 200, response.data.decode("utf8")
+        # The UPDATE returns the row, so no book is SELECTed at all.
+        assert book_rows == []
+        start_request()
+        response = client.delete(f"/authors/{author_ids[1]}/books/{book_ids[2]}")
+        assert response.status_code == 200, response.data.decode("utf8")
+        # The book is refreshed after the authors_books rows are
+        # deleted, but it's still the only one loaded.
+        assert book_rows and max(book_rows) == 1
+    finally:
+        event.remove(db.engine, "after_cursor_execute", count_book_rows)
+
+    # A book that isn't the author's is a 400 for GET and a 404
+    # otherwise; so is a deleted one.
+    response = client.get(f"/authors/{author_ids[0]}/books/{other_book_id}")
+    assert response.status_code == 400, response.data.decode("utf8")
+    for method, path in (
+        ("GET", f"/authors/{author_ids[0]}/{author_ids[1]}/books/{other_book_id}"),
+        ("PATCH", f"/authors/{author_ids[0]}/books/{book_ids[2]}"),
+        ("DELETE", f"/authors/{author_ids[0]}/{author_ids[1]}/books/{book_ids[2]}"),
+    ):
+        response = client.open(path, method=method, json=dict(edition_number=4))
+        assert response.status_code == 404, (method, path)
+
+
+# Testing that GET /authors/<id>/books and /authors/<id>/<id>/books are
+# paged by keyset in book_id order, following the Link header, and that
+# an author with no books gets an empty list
+def test_author_books_pages(db_w_cleanup, staged_app_client):
+    app, client = staged_app_client
+
+    author_ids = [Genius.gen_author_obj().author_id for _ in range(3)]
+    book_ids = sorted(Genius.gen_book_obj().book_id for _ in range(5))
+    for book_id in book_ids:
+        Genius.gen_authors_books_obj(author_ids[0], book_id)
+    shared_book_ids = book_ids[1::2]
+    for book_id in shared_book_ids:
+        Genius.gen_authors_books_obj(author_ids[1], book_id)
+
+    for path, expected_book_ids in (
+        (f"/authors/{author_ids[0]}/books?per_page=2", book_ids),
+        (f"/authors/{author_ids[0]}/{author_ids[1]}/books?per_page=1", shared_book_ids),
+    ):
+        paged_book_ids = list()
+        while path is not None:
+            response = client.get(path)
+            assert response.status_code == 200, response.data.decode("utf8")
+            paged_book_ids.extend(
+                book_jsobj["book_id"] for book_jsobj in response.get_json()
+            )
+            link = response.headers.get("Link")
+            path = None if link is None else link[1 : link.index(">")]
+        assert paged_book_ids == expected_book_ids
+
+    for path in (
+        f"/authors/{author_ids[2]}/books",
+        f"/authors/{author_ids[2]}/manuscripts",
+        f"/authors/{author_ids[0]}/{author_ids[2]}/books",
+    ):
+        response = client.get(path)
+        assert response.status_code == 200, response.data.decode("utf8")
+        assert response.get_json() == []
+    for path in (
+        f"/authors/{max(author_ids) + 1000}/books",
+        f"/authors/{author_ids[0]}/{max(author_ids) + 1000}/books",
+    ):
+        response = client.get(path)
+        assert response.status_code == 404, response.data.decode("utf8")
+    response = client.get(f"/authors/{author_ids[0]}/books?per_page=1001")
+    assert response.status_code == 400, response.data.decode("utf8")
@@ -3,6 +3,8 @@
 import os
 import random
 
+from risuspubl.dbmodels import db
+
 from conftest import Genius, DbBasedTester, randint_excluding
 
 
@@ -107,6 +109,48 @@ def test_update_author_by_id_endpoint(db_w_cleanup, staged_app_client):
     assert response.status_code == 400, response.data.decode("utf8")
 
 
+# Testing that updating a row is one UPDATE ... RETURNING, with no
+# SELECT of the row before or after
+def test_update_endpoints_statements(db_w_cleanup, staged_app_client, sql_statements):
+    app, client = staged_app_client
+
+    author_obj = Genius.gen_author_obj()
+    book_obj = Genius.gen_book_obj()
+    author_id = author_obj.author_id
+    book_id = book_obj.book_id
+    db.session.expunge_all()
+    sql_statements.clear()
+    author_dict = Genius.gen_author_dict()
+    author_response = client.patch(f"/authors/{author_id}", json=author_dict)
+    author_statements = list(sql_statements)
+    sql_statements.clear()
+    book_response = client.patch(f"/books/{book_id}", json=dict(title="Retitled"))
+    statements = list(sql_statements)
+    DbBasedTester.test_author_resp(author_response, author_dict)
+    assert book_response.status_code == 200, book_response.data.decode("utf8")
+    assert book_response.get_json()["title"] == "Retitled"
+
+    (update_statement,) = author_statements
+    assert update_statement.startswith("UPDATE authors")
+    assert "RETURNING" in update_statement
+    (update_statement,) = statements
+    assert update_statement.startswith("UPDATE books")
+
+    # The response is also what's in the table, and what GET returns.
+    response = client.get(f"/books/{book_id}")
+    assert response.get_json() == book_response.get_json()
+
+    # A missing row is a 404 even when a foreign key is bad too, as it was
+    # when the row was loaded first.
+    bogus_editor_id = Genius.gen_editor_obj().editor_id + 1000
+    response = client.patch(
+        f"/books/{book_id + 1000}", json=dict(editor_id=bogus_editor_id)
+    )
+    assert response.status_code == 404, response.data.decode("utf8")
+    response = client.patch(f"/books/{book_id}", json=dict(editor_id=bogus_editor_id))
+    assert response.status_code == 400, response.data.decode("utf8")
+
+
 # Testing the PATCH /authors/<id>/manuscripts/<id> endpoint -- test 27 of 84
 def test_update_author_manuscript_endpoint(db_w_cleanup, staged_app_client):
     app, client = staged_app_client
@@ -0,0 +1,170 @@
+#!/usr/bin/python3
+
+import os
+import threading
+
+from conftest import DbBasedTester, Genius, _database_uri, _worker_database
+
+from risuspubl.dbmodels import Book, db
+from risuspubl.flaskapp import create_app
+
+
+# Set environment variable for Flask's configuration
+os.environ["FLASK_ENV"] = "testing"
+# This should be set before creating the app instance.
+
+
+# Testing the POST /batch endpoint: the sub-requests are dispatched in
+# order through the usual endpoints, a write is visible to the reads
+# after it, each gets its own status, and each is counted under its own
+# endpoint in the SQL statistics
+def test_batch_endpoint(db_w_cleanup, staged_app_client):
+    app, client = staged_app_client
+
+    author_obj = Genius.gen_author_obj()
+    author_id = author_obj.author_id
+    author_jsobj = author_obj.serialize()
+    editor_id = Genius.gen_editor_obj().editor_id
+    book_jsobj = Genius.gen_book_dict(editor_id)
+    sql_stats = app.extensions["sql_stats"]
+    requests_before = sql_stats.snapshot().get("authors.disp_auth_by_auid_endpt", {})
+
+    for concurrent in (False, True):
+        response = client.post(
+            "/batch",
+            json=dict(
+                requests=[
+                    dict(method="GET", path=f"/authors/{author_id}"),
+                    dict(
+                        method="post",
+                        path=f"/authors/{author_id}/books",
+                        body=book_jsobj,
+                    ),
+                    dict(method="GET", path=f"/authors/{author_id}/books"),
+                    dict(method="GET", path=f"/authors/{author_id + 1000}"),
+                    dict(method="GET", path="/books?ids=0&sort=title"),
+                    dict(method="DELETE", path="/nonesuch"),
+                ],
+                concurrent=concurrent,
+            ),
+        )
+        assert response.status_code == 200, response.data.decode("utf8")
+        sub_responses = response.get_json()["responses"]
+        assert [sub_response["status"] for sub_response in sub_responses] == [
+            200,
+            200,
+            200,
+            404,
+            400,
+            404,
+        ]
+        assert sub_responses[0]["body"] == author_jsobj
+        assert sub_responses[0]["headers"]["Content-Type"] == "application/json"
+        book_id = sub_responses[1]["body"]["book_id"]
+        assert db.session.get(Book, book_id).title == book_jsobj["title"]
+        assert book_id in [
+            author_book_jsobj["book_id"]
+            for author_book_jsobj in sub_responses[2]["body"]
+        ]
+        assert isinstance(sub_responses[4]["body"], str)
+
+    requests_after = sql_stats.snapshot()["authors.disp_auth_by_auid_endpt"]
+    assert requests_after["requests"] == requests_before.get("requests", 0) + 4
+
+    # Testing for 400 errors with a malformed batch, which dispatches
+    # none of its requests
+    for request_jsobj in (
+        [dict(method="GET", path="/books")],
+        dict(),
+        dict(requests=[]),
+        dict(requests=[dict(method="GET", path="/books")], concurrent="yes"),
+        dict(requests=[dict(method="GET", path="/books")], parallel=True),
+        dict(requests=[dict(method="GET")]),
+        dict(requests=[dict(method="GET", path="/books", headers={})]),
+        dict(requests=[dict(method="OPTIONS", path="/books")]),
+        dict(requests=[dict(method="GET", path="books")]),
+        dict(requests=[dict(method="POST", path="/batch", body=dict())]),
+        dict(requests=[dict(method="GET", path="/books")] * 51),
+        dict(
+            requests=[
+                dict(method="GET", path="/books"),
+                dict(method="DELETE", path=f"/authors/{author_id}"),
+                dict(method="GET", path=7),
+            ]
+        ),
+    ):
+        response = client.post("/batch", json=request_jsobj)
+        assert response.status_code == 400, request_jsobj
+    assert client.get(f"/authors/{author_id}").status_code == 200
+
+
+# Testing that a sub-request which fails with a 500 has the shared
+# session rolled back, so the sub-requests after it still run
+def test_batch_failed_sub_request(db_w_cleanup, staged_app_client):
+    app, client = staged_app_client
+
+    series_id = Genius.gen_series_obj().series_id
+    book_id = Genius.gen_book_obj(series_id=series_id).book_id
+
+    response = client.post(
+        "/batch",
+        json=dict(
+            requests=[
+                dict(method="DELETE", path=f"/series/{series_id}"),
+                dict(method="GET", path="/authors"),
+                dict(method="GET", path=f"/series/{series_id}/books"),
+            ]
+        ),
+    )
+    assert response.status_code == 200, response.data.decode("utf8")
+    sub_responses = response.get_json()["responses"]
+    assert [sub_response["status"] for sub_response in sub_responses] == [
+        500,
+        200,
+        200,
+    ]
+    assert [book_jsobj["book_id"] for book_jsobj in sub_responses[2]["body"]] == [
+        book_id
+    ]
+
+
+# Testing that concurrent GETs which each fan out themselves complete,
+# rather than waiting on the worker threads they're running on. This
+# needs a session bound to the engine, not the tests' outer transaction,
+# so it uses an app of its own (and pool of its own, in case it does
+# hang) and the empty committed tables, where every author is a 404.
+def test_batch_concurrent_nested_fan_out(staged_app_client):
+    batch_app = create_app(
+        dict(SQLALCHEMY_DATABASE_URI=_database_uri(_worker_database()))
+    )
+    outer_session = db.session
+    db.session = DbBasedTester._app_session
+    responses = list()
+
+    def post_batch():
+        responses.append(
+            batch_app.test_client().post(
+                "/batch",
+                json=dict(
+                    requests=[dict(method="GET", path="/authors/1/2")]
+                    * (batch_app.config["FANOUT_POOL_SIZE"] + 1),
+                    concurrent=True,
+                ),
+            )
+        )
+
+    try:
+        batch_thread = threading.Thread(target=post_batch, daemon=True)
+        batch_thread.start()
+        batch_thread.join(15)
+        assert not batch_thread.is_alive(), "concurrent batch hung"
+    finally:
+        db.session = outer_session
+        batch_app.extensions["fanout"].shutdown(wait=False)
+        with batch_app.app_context():
+            db.engine.dispose()
+    response = responses[0]
+    assert response.status_code == 200, response.data.decode("utf8")
+    assert {
+        sub_response["status"] for sub_response in response.get_json()["responses"]
+    } == {404}
@@ -2,6 +2,8 @@
 
 import os
 import random
+from datetime import date
+from operator import itemgetter
 
 from risuspubl.dbmodels import (
     Author,
@@ -88,6 +90,368 @@ def test_index_endpoint(db_w_cleanup, staged_app_client):
         )
 
 
+# Testing the GET /books endpoint's filter, sort and fields parameters
+def test_index_endpoint_query_params(db_w_cleanup, staged_app_client):
+    app, client = staged_app_client
+
+    editor_obj = Genius.gen_editor_obj()
+    book_objs_l = list()
+    for publication_date, is_in_print in (
+        ("2019-06-01", True),
+        ("2020-03-01", True),
+        ("2021-09-01", False),
+        ("2022-01-01", True),
+    ):
+        book_obj = Genius.gen_book_obj(editor_obj.editor_id)
+        book_obj.publication_date = date.fromisoformat(publication_date)
+        book_obj.is_in_print = is_in_print
+        book_objs_l.append(book_obj)
+    db_w_cleanup.session.commit()
+
+    response = client.get(
+        "/books?filter[is_in_print]=true&publication_date[gte]=2020-01-01"
+        + "&sort=-publication_date&fields=book_id,title,publication_date"
+    )
+    assert response.status_code == 200, response.data.decode("utf8")
+    assert response.get_json() == [
+        dict(
+            book_id=book_obj.book_id,
+            title=book_obj.title,
+            publication_date=book_obj.publication_date.isoformat(),
+        )
+        for book_obj in (book_objs_l[3], book_objs_l[1])
+    ]
+
+    book_ids = [book_obj.book_id for book_obj in book_objs_l]
+    response = client.get(
+        f"/books?filter[book_id][in]={book_ids[0]},{book_ids[2]}"
+        + "&filter[series_id]=null&sort=publication_date"
+    )
+    assert response.status_code == 200, response.data.decode("utf8")
+    assert response.get_json() == [
+        book_objs_l[0].serialize(),
+        book_objs_l[2].serialize(),
+    ]
+
+    # Testing for 400 errors with an unknown column, operator or value
+    for query_string in (
+        "filter[isbn]=0",
+        "title[like]=Dune",
+        "filter[is_in_print]=maybe",
+        "publication_date[lt]=2020-13-01",
+        "sort=-isbn",
+        "fields=book_id,",
+        "filter[title]][=x",
+    ):
+        response = client.get(f"/books?{query_string}")
+        assert response.status_code == 400, query_string
+
+
+# Testing the multi-get, GET /books?ids= and POST /books/ids: the rows
+# are output in the order of the ids, the missing ids are listed, and
+# it's one SELECT
+def test_multi_get_books_endpoint(db_w_cleanup, staged_app_client, sql_statements):
+    db = db_w_cleanup
+    app, client = staged_app_client
+
+    editor_id = Genius.gen_editor_obj().editor_id
+    book_ids = [Genius.gen_book_obj(editor_id).book_id for _ in range(3)]
+    bogus_book_id = max(book_ids) + 1000
+    id_vals = [book_ids[2], bogus_book_id, book_ids[0], book_ids[2]]
+    db.session.expunge_all()
+    sql_statements.clear()
+    response = client.get(
+        "/books?ids=" + ",".join(map(str, id_vals)) + "&fields=book_id,title"
+    )
+    assert response.status_code == 200, response.data.decode("utf8")
+    (select_statement,) = sql_statements
+    assert "= ANY (" in select_statement
+    assert response.get_json() == dict(
+        rows=[
+            dict(book_id=book_id, title=db.session.get(Book, book_id).title)
+            for book_id in (book_ids[2], book_ids[0])
+        ],
+        missing=[bogus_book_id],
+    )
+
+    # POST /books/ids takes the ids in the body, and include works.
+    response = client.post(
+        "/books/ids?include=editor", json=dict(ids=[book_ids[1], book_ids[0]])
+    )
+    assert response.status_code == 200, response.data.decode("utf8")
+    response_jsobj = response.get_json()
+    assert [book_jsobj["book_id"] for book_jsobj in response_jsobj["rows"]] == [
+        book_ids[1],
+        book_ids[0],
+    ]
+    assert response_jsobj["rows"][0]["editor"]["editor_id"] == editor_id
+    assert response_jsobj["missing"] == []
+
+    # Testing for 400 errors with bad or too many ids, filtering or
+    # sorting a multi-get, and a bad request body
+    for query_string in (
+        "ids=",
+        "ids=1,x",
+        "ids=1,,2",
+        "ids=" + ",".join(map(str, range(1, 1002))),
+        f"ids={book_ids[0]}&filter[is_in_print]=true",
+        f"ids={book_ids[0]}&sort=title",
+    ):
+        response = client.get(f"/books?{query_string}")
+        assert response.status_code == 400, query_string
+    for request_jsobj in (
+        dict(),
+        dict(ids=[]),
+        dict(ids="1,2"),
+        dict(ids=[1, True]),
+        dict(ids=[1], fields="title"),
+        [1, 2],
+    ):
+        response = client.post("/books/ids", json=request_jsobj)
+        assert response.status_code == 400, request_jsobj
+
+
+# Testing the include parameter of GET /books/<id> and GET /books: the
+# related objects are embedded, each relationship is loaded with one
+# SELECT however many books there are, and includes are checked
+def test_display_book_include_endpoint(db_w_cleanup, staged_app_client, sql_statements):
+    app, client = staged_app_client
+    db = db_w_cleanup
+
+    editor_obj = Genius.gen_editor_obj()
+    series_obj = Genius.gen_series_obj()
+    book_objs_l = [
+        Genius.gen_book_obj(editor_obj.editor_id, series_obj.series_id)
+        for _ in range(3)
+    ]
+    author_objs_l = [Genius.gen_author_obj() for _ in range(2)]
+    for book_obj in book_objs_l:
+        for author_obj in author_objs_l:
+            Genius.gen_authors_books_obj(author_obj.author_id, book_obj.book_id)
+    sales_record_objs_l = [
+        Genius.gen_sales_record_obj(book_objs_l[0].book_id, 2020, month)
+        for month in (1, 2)
+    ]
+    book_jsobj = book_objs_l[0].serialize()
+    editor_jsobj = editor_obj.serialize()
+    series_jsobj = series_obj.serialize()
+    author_jsobjs = sorted(
+        (author_obj.serialize() for author_obj in author_objs_l),
+        key=itemgetter("author_id"),
+    )
+    sales_record_jsobjs = [
+        sales_record_obj.serialize() for sales_record_obj in sales_record_objs_l
+    ]
+    book_ids = [book_obj.book_id for book_obj in book_objs_l]
+
+    # The test shares the app's session; emptying it makes the requests
+    # load rows the way they would in a new session.
+    db.session.expunge_all()
+    sql_statements.clear()
+    response = client.get(f"/books/{book_ids[0]}?include=authors,sales,series,editor")
+    assert response.status_code == 200, response.data.decode("utf8")
+    assert sum(statement.startswith("SELECT") for statement in sql_statements) == 5
+    response_jsobj = response.get_json()
+    response_jsobj["authors"].sort(key=itemgetter("author_id"))
+    assert response_jsobj == dict(
+        book_jsobj,
+        authors=author_jsobjs,
+        sales=sales_record_jsobjs,
+        series=series_jsobj,
+        editor=editor_jsobj,
+    )
+
+    sql_statements.clear()
+    response = client.get("/books?include=authors,editor&sort=book_id")
+    assert response.status_code == 200, response.data.decode("utf8")
+    assert sum(statement.startswith("SELECT") for statement in sql_statements) == 3
+    response_jsobjs = response.get_json()
+    assert [jsobj["book_id"] for jsobj in response_jsobjs] == book_ids
+    for jsobj in response_jsobjs:
+        assert jsobj["editor"] == editor_jsobj
+        assert sorted(jsobj["authors"], key=itemgetter("author_id")) == author_jsobjs
+
+    # Nested includes, with fields
+    response = client.get(
+        f"/series/{series_jsobj['series_id']}?fields=title&include=books.authors"
+    )
+    assert response.status_code == 200, response.data.decode("utf8")
+    response_jsobj = response.get_json()
+    assert set(response_jsobj) == {"title", "books"}
+    assert [jsobj["book_id"] for jsobj in response_jsobj["books"]] == book_ids
+    assert all(len(jsobj["authors"]) == 2 for jsobj in response_jsobj["books"])
+    response = client.get(f"/books/{book_ids[0]}?fields=title&include=editor")
+    assert response.status_code == 200, response.data.decode("utf8")
+    assert response.get_json() == dict(title=book_jsobj["title"], editor=editor_jsobj)
+
+    # Testing for 400 errors with an unknown relationship, or one too
+    # many levels deep
+    for query_string in (
+        "include=publisher",
+        "include=editor_id",
+        "include=authors.books.series",
+        "include=sales.book",
+    ):
+        response = client.get(f"/books/{book_ids[0]}?{query_string}")
+        assert response.status_code == 400, query_string
+        response = client.get(f"/books?{query_string}")
+        assert response.status_code == 400, query_string
+
+
+# Testing the PATCH /books endpoint, which updates every book matching
+# its filters in one UPDATE
+def test_bulk_update_books_endpoint(db_w_cleanup, staged_app_client, sql_statements):
+    db = db_w_cleanup
+    app, client = staged_app_client
+
+    editor_id = Genius.gen_editor_obj().editor_id
+    publication_dates = [date(1994, 3, 1), date(1999, 12, 31), date(2000, 1, 1)]
+    book_ids = list()
+    for publication_date in publication_dates:
+        book_obj = Genius.gen_book_obj(editor_id)
+        book_obj.publication_date = publication_date
+        book_obj.is_in_print = True
+        db.session.commit()
+        book_ids.append(book_obj.book_id)
+    # The last book is in the row cache, and stays current.
+    client.get(f"/books/{book_ids[-1]}")
+    db.session.expunge_all()
+    sql_statements.clear()
+    response = client.patch(
+        "/books?publication_date[lt]=2000-01-01", json=dict(is_in_print=False)
+    )
+    assert response.status_code == 200, response.data.decode("utf8")
+    assert response.get_json() == dict(updated=2)
+    (update_statement,) = sql_statements
+    assert update_statement.startswith("UPDATE books")
+    assert [db.session.get(Book, book_id).is_in_print for book_id in book_ids] == [
+        False,
+        False,
+        True,
+    ]
+
+    # return=rows outputs the updated rows, and fields projects them.
+    response = client.patch(
+        f"/books?filter[book_id][in]={book_ids[1]},{book_ids[2]}"
+        + "&return=rows&fields=title,edition_number",
+        json=dict(edition_number={"add": 1}, editor_id=editor_id),
+    )
+    assert response.status_code == 200, response.data.decode("utf8")
+    assert sorted(response.get_json(), key=itemgetter("title")) == sorted(
+        (
+            dict(title=book_obj.title, edition_number=book_obj.edition_number)
+            for book_obj in (db.session.get(Book, book_id) for book_id in book_ids[1:])
+        ),
+        key=itemgetter("title"),
+    )
+    response = client.get(f"/books/{book_ids[-1]}")
+    assert response.get_json() == db.session.get(Book, book_ids[-1]).serialize()
+
+    # Arithmetic that would take any row's edition_number out of [1, 10]
+    # is a 400, and updates none of them.
+    edition_numbers = [
+        db.session.get(Book, book_id).edition_number for book_id in book_ids
+    ]
+    for return_param, request_jsobj in (
+        ("count", dict(edition_number={"add": 10})),
+        ("rows", dict(edition_number={"mul": 20}, is_in_print=True)),
+        ("count", dict(edition_number={"add": -10})),
+    ):
+        response = client.patch(
+            f"/books?filter[book_id][in]={','.join(map(str, book_ids))}"
+            + f"&return={return_param}",
+            json=request_jsobj,
+        )
+        assert response.status_code == 400, request_jsobj
+        db.session.expire_all()
+        assert [
+            db.session.get(Book, book_id).edition_number for book_id in book_ids
+        ] == edition_numbers
+        assert db.session.get(Book, book_ids[0]).is_in_print is False
+
+    # Testing for 400 errors with no filter, no or unexpected JSON, a
+    # bogus editor_id, arithmetic on a non-integer column or with a bad
+    # operand, and a bad return parameter
+    for query_string, request_jsobj in (
+        ("", dict(is_in_print=False)),
+        ("?book_id=1", dict(is_in_print=False)),
+        ("?title[eq]=x", dict()),
+        ("?title[eq]=x", dict(book_id=1)),
+        ("?title[eq]=x", dict(salary=1)),
+        ("?title[eq]=x", dict(editor_id=editor_id + 1)),
+        ("?title[eq]=x", dict(title={"add": 1})),
+        ("?title[eq]=x", dict(editor_id={"add": 1})),
+        ("?title[eq]=x", dict(edition_number={"pow": 2})),
+        ("?title[eq]=x", dict(edition_number={"mul": "2"})),
+        ("?title[eq]=x", dict(edition_number={"mul": 0})),
+        ("?title[eq]=x&return=all", dict(is_in_print=False)),
+    ):
+        response = client.patch(f"/books{query_string}", json=request_jsobj)
+        assert response.status_code == 400, (query_string, request_jsobj)
+
+
+# Testing the POST /books endpoint, which associates the new book with
+# every author in author_ids in one multi-row INSERT
+def test_create_book_endpoint(
+    db_w_cleanup, staged_app_client, sql_statements, monkeypatch
+):
+    db = db_w_cleanup
+    app, client = staged_app_client
+
+    editor_id = Genius.gen_editor_obj().editor_id
+    author_ids = [Genius.gen_author_obj().author_id for _ in range(3)]
+    session_commit = db.session.commit
+    commit_count = 0
+
+    def count_commit():
+        nonlocal commit_count
+        commit_count += 1
+        session_commit()
+
+    book_dict = Genius.gen_book_dict(editor_id)
+    sql_statements.clear()
+    with monkeypatch.context() as patch:
+        patch.setattr(db.session, "commit", count_commit)
+        response = client.post("/books", json=dict(book_dict, author_ids=author_ids))
+    DbBasedTester.test_book_resp(response, book_dict)
+    book_id = response.get_json()["book_id"]
+    assert sorted(
+        author_id
+        for author_id, _ in db.session.execute(
+            AuthorsBooks.select().where(AuthorsBooks.c.book_id == book_id)
+        )
+    ) == sorted(author_ids)
+    (ab_insert,) = (
+        statement
+        for statement in sql_statements
+        if statement.startswith("INSERT INTO authors_books")
+    )
+    assert ab_insert.count("(%(") == len(author_ids)
+    assert commit_count == 1
+
+    # Testing for 400 errors with no author_ids, an empty or repeating
+    # list, an author_id that doesn't exist, and an unexpected property
+    bogus_author_id = max(author_ids) + 1
+    for author_ids_value in (
+        None,
+        [],
+        [author_ids[0], author_ids[0]],
+        [author_ids[0], "1"],
+        [author_ids[0], bogus_author_id],
+    ):
+        book_jsobj = Genius.gen_book_dict(editor_id)
+        if author_ids_value is not None:
+            book_jsobj["author_ids"] = author_ids_value
+        response = client.post("/books", json=book_jsobj)
+        assert response.status_code == 400, response.data.decode("utf8")
+    response = client.post(
+        "/books",
+        json=dict(Genius.gen_book_dict(editor_id), author_ids=author_ids, advance=1),
+    )
+    assert response.status_code == 400, response.data.decode("utf8")
+    assert db.session.query(Book).count() == 1
+
+
 # Testing the PATCH /books/<id> endpoint -- test 34 of 84
 def test_update_book_by_id_endpoint(db_w_cleanup, staged_app_client):
     app, client = staged_app_client
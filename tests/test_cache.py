@@ -0,0 +1,144 @@
+#!/usr/bin/python3
+
+import os
+from types import SimpleNamespace
+
+import risuspubl.api.utility
+from risuspubl.cache import LRURowCache, get_row_cache
+from conftest import Genius, DbBasedTester
+
+
+# Set environment variable for Flask's configuration
+os.environ["FLASK_ENV"] = "testing"
+# This should be set before creating the app instance.
+
+
+# Testing that GET /books/<id> is served from the row cache and that
+# PATCH and DELETE invalidate it
+def test_row_cache_read_through_and_invalidation(db_w_cleanup, staged_app_client):
+    app, client = staged_app_client
+
+    row_cache = get_row_cache()
+    editor_obj = Genius.gen_editor_obj()
+    book_obj = Genius.gen_book_obj(editor_obj.editor_id)
+    book_id = book_obj.book_id
+
+    response = client.get(f"/books/{book_id}")
+    DbBasedTester.test_book_resp(response, book_obj)
+    hits = row_cache.stats()["hits"]
+    cached_response = client.get(f"/books/{book_id}")
+    assert row_cache.stats()["hits"] == hits + 1
+    assert cached_response.data == response.data
+
+    # The update is written through, so the next read is a hit that
+    # reflects the new values.
+    book_dict = Genius.gen_book_dict(editor_obj.editor_id)
+    response = client.patch(f"/books/{book_id}", json=book_dict)
+    DbBasedTester.test_book_resp(response, book_dict)
+    response = client.get(f"/books/{book_id}")
+    DbBasedTester.test_book_resp(response, book_dict)
+
+    # Deleting the editor nulls the book's editor_id, which has to be
+    # visible in the book's next read.
+    response = client.delete(f"/editors/{editor_obj.editor_id}")
+    assert response.status_code == 200, response.data.decode("utf8")
+    response = client.get(f"/books/{book_id}")
+    assert response.get_json()["editor_id"] is None
+
+    response = client.delete(f"/books/{book_id}")
+    assert response.status_code == 200, response.data.decode("utf8")
+    response = client.get(f"/books/{book_id}")
+    assert response.status_code == 404, response.data.decode("utf8")
+
+    # The counters are exposed at /_metrics.
+    response = client.get("/_metrics")
+    assert response.status_code == 200, response.data.decode("utf8")
+    assert response.get_json()["row_cache"]["hits"] == row_cache.stats()["hits"]
+
+
+# Testing that a GET /books/<id> miss which read the row before a
+# concurrent PATCH wrote it through doesn't replace the new entry with
+# the row it read
+def test_row_cache_read_miss_racing_update(
+    db_w_cleanup, staged_app_client, monkeypatch
+):
+    app, client = staged_app_client
+
+    editor_obj = Genius.gen_editor_obj()
+    book_obj = Genius.gen_book_obj(editor_obj.editor_id)
+    book_id = book_obj.book_id
+    book_title = book_obj.title
+    book_dict = Genius.gen_book_dict(editor_obj.editor_id)
+    get_row_or_404 = risuspubl.api.utility.get_row_or_404
+
+    # The PATCH commits and is written through after the GET has read
+    # the row, but before it caches it.
+    def get_row_or_404_racing_update(model_class, model_id):
+        book_jsobj = get_row_or_404(model_class, model_id).serialize()
+        # A client of its own, since the test's client keeps its last
+        # request's context pushed after returning.
+        response = app.test_client().patch(f"/books/{book_id}", json=book_dict)
+        DbBasedTester.test_book_resp(response, book_dict)
+        return SimpleNamespace(serialize=lambda: book_jsobj)
+
+    with monkeypatch.context() as patch_context:
+        patch_context.setattr(
+            risuspubl.api.utility, "get_row_or_404", get_row_or_404_racing_update
+        )
+        response = client.get(f"/books/{book_id}")
+    assert response.status_code == 200, response.data.decode("utf8")
+    assert response.get_json()["title"] == book_title
+
+    response = client.get(f"/books/{book_id}")
+    DbBasedTester.test_book_resp(response, book_dict)
+
+
+# Testing that a conditional set is skipped once the key has been written
+# or invalidated, including after its generation is evicted
+def test_lru_row_cache_generations():
+    row_cache = LRURowCache(max_entries=2, max_bytes=100, ttl=60)
+    generation = row_cache.generation("a")
+    row_cache.set("a", b"new")
+    row_cache.set("a", b"old", generation)
+    assert row_cache.get("a") == b"new"
+
+    generation = row_cache.generation("a")
+    row_cache.delete("a")
+    row_cache.set("a", b"old", generation)
+    assert row_cache.get("a") is None
+
+    generation = row_cache.generation("a")
+    row_cache.set("a", b"read", generation)
+    assert row_cache.get("a") == b"read"
+
+    # Writing other keys evicts a's generation, which mustn't make an
+    # earlier one current again.
+    generation = row_cache.generation("a")
+    row_cache.set("a", b"new")
+    for key in ("b", "c"):
+        row_cache.set(key, b"x")
+    row_cache.set("a", b"old", generation)
+    assert row_cache.get("a") is None
+
+
+# Testing that the LRU cache evicts by both entry count and byte size
+def test_lru_row_cache_bounds():
+    row_cache = LRURowCache(max_entries=3, max_bytes=100, ttl=60)
+    for key in ("a", "b", "c", "d"):
+        row_cache.set(key, b"x" * 10)
+    assert row_cache.get("a") is None
+    assert row_cache.get("d") == b"x" * 10
+    assert row_cache.stats()["evictions"] == 1
+
+    # A 90-byte payload pushes the total past max_bytes, so the least
+    # recently used entries go until it fits.
+    row_cache.get("b")
+    row_cache.set("e", b"y" * 90)
+    assert row_cache.get("e") == b"y" * 90
+    assert row_cache.get("c") is None
+    assert row_cache.stats()["bytes"] <= 100
+
+    # Entries past their TTL are misses.
+    expired_cache = LRURowCache(max_entries=3, max_bytes=100, ttl=-1)
+    expired_cache.set("a", b"x")
+    assert expired_cache.get("a") is None
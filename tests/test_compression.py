@@ -0,0 +1,87 @@
+#!/usr/bin/python3
+
+import gzip
+import json
+import os
+
+from flask import Response
+
+from risuspubl import compression
+from conftest import Genius
+
+
+# Set environment variable for Flask's configuration
+os.environ["FLASK_ENV"] = "testing"
+# This should be set before creating the app instance.
+
+
+# Testing that GET /books is compressed when the client accepts gzip
+def test_compressed_collection_response(db_w_cleanup, staged_app_client):
+    app, client = staged_app_client
+
+    editor_obj = Genius.gen_editor_obj()
+    for _ in range(10):
+        Genius.gen_book_obj(editor_obj.editor_id)
+
+    response = client.get("/books", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200, response.data.decode("utf8")
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    books_jsobj = json.loads(gzip.decompress(response.data))
+    assert len(books_jsobj) == 10
+
+    # The second identical response comes out of the precompressed
+    # cache and must be byte-identical to the first.
+    second_response = client.get("/books", headers={"Accept-Encoding": "gzip"})
+    assert second_response.data == response.data
+
+    # Without an Accept-Encoding header the body is sent as-is.
+    response = client.get("/books")
+    assert "Content-Encoding" not in response.headers
+    assert len(response.get_json()) == 10
+
+    # A client that refuses gzip gets an uncompressed body.
+    response = client.get("/books", headers={"Accept-Encoding": "gzip;q=0"})
+    assert "Content-Encoding" not in response.headers
+
+
+# Testing that responses under COMPRESS_MIN_SIZE aren't compressed
+def test_small_response_not_compressed(db_w_cleanup, staged_app_client):
+    app, client = staged_app_client
+
+    author_obj = Genius.gen_author_obj()
+    response = client.get(
+        f"/authors/{author_obj.author_id}", headers={"Accept-Encoding": "gzip"}
+    )
+    assert response.status_code == 200, response.data.decode("utf8")
+    assert len(response.data) < app.config["COMPRESS_MIN_SIZE"]
+    assert "Content-Encoding" not in response.headers
+    assert response.get_json()["author_id"] == author_obj.author_id
+
+
+# Testing streamed compression of a generator response
+def test_streamed_response_compressed(staged_app_client):
+    app, client = staged_app_client
+
+    compress_response = compression.compress_response_clos(app)
+    chunks = [json.dumps(Genius.gen_author_dict()) + "\n" for _ in range(50)]
+    for encoding in compression.available_encodings():
+        with app.test_request_context(headers={"Accept-Encoding": encoding}):
+            response = compress_response(
+                Response(iter(chunks), mimetype="application/json")
+            )
+            assert response.headers["Content-Encoding"] == encoding
+            assert "Content-Length" not in response.headers
+            compressed = b"".join(response.response)
+        match encoding:
+            case "gzip":
+                decompressed = gzip.decompress(compressed)
+            case "br":
+                decompressed = compression.brotli.decompress(compressed)
+            case "zstd":
+                decompressed = (
+                    compression.zstandard.ZstdDecompressor()
+                    .decompressobj()
+                    .decompress(compressed)
+                )
+        assert decompressed.decode("utf8") == "".join(chunks)
@@ -8,6 +8,7 @@ from risuspubl.dbmodels import (
     Book,
     Editor,
     Manuscript,
+    db,
 )
 from conftest import Genius, DbBasedTester, randint_excluding
 
@@ -190,6 +191,51 @@ def test_display_editor_books_endpoint(db_w_cleanup, staged_app_client):
     assert response.status_code == 404, response.data.decode("utf8")
 
 
+# Testing that GET /editors/<id>/books is paged by keyset: the books come
+# in book_id order, per_page at a time, with a Link header to the next
+# page, and each page is one SELECT that also checks that the editor
+# exists
+def test_display_editor_books_pages(db_w_cleanup, staged_app_client, sql_statements):
+    app, client = staged_app_client
+
+    editor_id = Genius.gen_editor_obj().editor_id
+    book_ids = sorted(Genius.gen_book_obj(editor_id).book_id for _ in range(5))
+    Genius.gen_book_obj(Genius.gen_editor_obj().editor_id)
+    db.session.expunge_all()
+    path = f"/editors/{editor_id}/books?fields=book_id,title&per_page=2"
+    paged_book_ids = list()
+    page_count = 0
+    while path is not None:
+        sql_statements.clear()
+        response = client.get(path)
+        assert response.status_code == 200, response.data.decode("utf8")
+        assert len(sql_statements) == 1, sql_statements
+        page_count += 1
+        for book_jsobj in response.get_json():
+            assert book_jsobj.keys() == {"book_id", "title"}
+            paged_book_ids.append(book_jsobj["book_id"])
+        link = response.headers.get("Link")
+        path = None if link is None else link[1 : link.index(">")]
+    assert paged_book_ids == book_ids
+    assert page_count == 3
+
+    response = client.get(f"/editors/{editor_id}/books")
+    assert [book_jsobj["book_id"] for book_jsobj in response.get_json()] == book_ids
+    assert "Link" not in response.headers
+    # A page past the last book is empty; an editor with no books at all
+    # is a 404.
+    response = client.get(f"/editors/{editor_id}/books?after={book_ids[-1]}")
+    assert response.status_code == 200, response.data.decode("utf8")
+    assert response.get_json() == []
+    response = client.get(f"/editors/{Genius.gen_editor_obj().editor_id}/books")
+    assert response.status_code == 404, response.data.decode("utf8")
+    for query_string in ("per_page=0", "per_page=1001", "after=-1", "after=x"):
+        response = client.get(f"/editors/{editor_id}/books?{query_string}")
+        assert response.status_code == 400, query_string
+    response = client.get(f"/editors/{editor_id + 1000}/books")
+    assert response.status_code == 404, response.data.decode("utf8")
+
+
 # Testing the GET /editors/<id> endpoint -- test 46 of 84
 def test_display_editor_by_id_endpoint(db_w_cleanup, staged_app_client):
     app, client = staged_app_client
@@ -294,6 +340,35 @@ def test_index_endpoint(db_w_cleanup, staged_app_client):
         )
 
 
+# Testing the PATCH /editors endpoint: a 3% raise for every editor
+# earning less than a threshold
+def test_bulk_update_editors_endpoint(db_w_cleanup, staged_app_client):
+    db = db_w_cleanup
+    app, client = staged_app_client
+
+    editor_objs = [Genius.gen_editor_obj() for _ in range(3)]
+    for editor_obj, salary in zip(editor_objs, (50000, 60000, 90000)):
+        editor_obj.salary = salary
+    db.session.commit()
+    editor_ids = [editor_obj.editor_id for editor_obj in editor_objs]
+
+    response = client.patch(
+        "/editors?salary[lt]=80000&return=rows",
+        json=dict(salary={"mul": 1.03}),
+    )
+    assert response.status_code == 200, response.data.decode("utf8")
+    assert sorted(
+        (editor_jsobj["editor_id"], editor_jsobj["salary"])
+        for editor_jsobj in response.get_json()
+    ) == [(editor_ids[0], 51500), (editor_ids[1], 61800)]
+    db.session.expire_all()
+    assert [db.session.get(Editor, editor_id).salary for editor_id in editor_ids] == [
+        51500,
+        61800,
+        90000,
+    ]
+
+
 # Testing the PATCH /editors/<id>/books/<id> endpoint -- test 50 of 84
 def test_update_editor_book_by_id_endpoint(db_w_cleanup, staged_app_client):
     app, client = staged_app_client
@@ -0,0 +1,81 @@
+#!/usr/bin/python3
+
+import os
+import threading
+import time
+
+import pytest
+from flask import abort
+from sqlalchemy import text
+from werkzeug.exceptions import NotFound
+
+from conftest import Genius
+
+from risuspubl.dbmodels import Author, db
+from risuspubl.fanout import _fan_out_parallel, fan_out
+
+
+# Set environment variable for Flask's configuration
+os.environ["FLASK_ENV"] = "testing"
+# This should be set before creating the app instance.
+
+
+# Testing that fan_out() falls back to the request's own session when
+# it's bound to the tests' outer transaction, so uncommitted rows are
+# still visible
+def test_fan_out_serial_fallback(db_w_cleanup, staged_app_client):
+    app, client = staged_app_client
+
+    author_obj = Genius.gen_author_obj()
+    author_id = author_obj.author_id
+    sessions = list()
+
+    def load_author(session):
+        sessions.append(session)
+        return session.get(Author, author_id).author_id
+
+    assert fan_out(load_author, load_author) == [author_id, author_id]
+    assert sessions == [db.session, db.session]
+
+    response = client.get(f"/authors/{author_id}/{author_id + 1}")
+    assert response.status_code == 404, response.data.decode("utf8")
+
+
+# Testing that the parallel path runs each function on its own
+# connection, never more at once than the cap, and raises the first
+# failure in argument order
+def test_fan_out_parallel(db_w_cleanup, staged_app_client):
+    app, client = staged_app_client
+
+    running = 0
+    max_running = 0
+    running_lock = threading.Lock()
+
+    def backend_pid(session):
+        nonlocal running, max_running
+        with running_lock:
+            running += 1
+            max_running = max(max_running, running)
+        backend_pid = session.execute(text("SELECT pg_backend_pid()")).scalar()
+        time.sleep(0.05)
+        with running_lock:
+            running -= 1
+        return backend_pid
+
+    backend_pids = _fan_out_parallel(
+        app, app.extensions["fanout"], [backend_pid] * 4, 2, None
+    )
+    assert len(backend_pids) == 4
+    assert len(set(backend_pids)) >= 2
+    assert max_running == 2
+
+    def not_found(session):
+        abort(404)
+
+    def value_error(session):
+        raise ValueError("second")
+
+    with pytest.raises(NotFound):
+        _fan_out_parallel(
+            app, app.extensions["fanout"], [not_found, value_error], 2, None
+        )
@@ -0,0 +1,84 @@
+#!/usr/bin/python3
+
+import os
+
+from conftest import Genius
+
+from risuspubl.dbmodels import Author, Editor, Salesperson, db
+from risuspubl.lookups import row_lookups
+
+
+# Set environment variable for Flask's configuration
+os.environ["FLASK_ENV"] = "testing"
+# This should be set before creating the app instance.
+
+
+# Testing that a request's RowLookups looks each row up at most once:
+# rows in the identity map and rows known to be missing aren't SELECTed
+# again, and the lookups don't outlive the request
+def test_row_lookups(db_w_cleanup, staged_app_client, sql_statements):
+    app, client = staged_app_client
+
+    editor_ids = [Genius.gen_editor_obj().editor_id for _ in range(2)]
+    bogus_editor_id = max(editor_ids) + 1000
+    db.session.expunge_all()
+    sql_statements.clear()
+
+    with app.test_request_context():
+        lookups = row_lookups()
+        assert row_lookups() is lookups
+        assert lookups.missing_ids(Editor, [bogus_editor_id, *editor_ids]) == [
+            bogus_editor_id
+        ]
+        assert lookups.missing_ids(Editor, editor_ids[:1]) == []
+        assert lookups.get(Editor, bogus_editor_id) is None
+        assert len(sql_statements) == 1
+        lookups.prefetch(Editor, [editor_ids[1], bogus_editor_id])
+        assert len(sql_statements) == 2
+        assert lookups.get(Editor, editor_ids[1]).editor_id == editor_ids[1]
+        assert len(sql_statements) == 2
+        lookups.forget(Editor, editor_ids[1])
+        assert lookups.missing_ids(Editor, editor_ids) == editor_ids[1:]
+        assert len(sql_statements) == 2
+
+    # Each request starts over, so the forgotten editor is found again.
+    response = client.get(f"/editors/{editor_ids[1]}")
+    assert response.status_code == 200, response.data.decode("utf8")
+
+
+# Testing that endpoints share their lookups with the helpers: the
+# salesperson a new client belongs to is SELECTed once, and the two
+# authors of a book are loaded with one SELECT
+def test_endpoint_lookups(db_w_cleanup, staged_app_client, sql_statements):
+    app, client = staged_app_client
+
+    salesperson_id = Genius.gen_salesperson_obj().salesperson_id
+    author_ids = [Genius.gen_author_obj().author_id for _ in range(2)]
+    editor_id = Genius.gen_editor_obj().editor_id
+    book_id = Genius.gen_book_obj(editor_id).book_id
+    for author_id in author_ids:
+        Genius.gen_authors_books_obj(author_id, book_id)
+    db.session.expunge_all()
+    sql_statements.clear()
+    response = client.post(
+        f"/salespeople/{salesperson_id}/clients",
+        json=Genius.gen_client_dict(salesperson_id),
+    )
+    assert response.status_code == 200, response.data.decode("utf8")
+    assert (
+        sum(statement.startswith("SELECT salespeople.") for statement in sql_statements)
+        == 1
+    )
+
+    sql_statements.clear()
+    response = client.patch(
+        f"/authors/{author_ids[0]}/{author_ids[1]}/books/{book_id}",
+        json=dict(edition_number=2),
+    )
+    assert response.status_code == 200, response.data.decode("utf8")
+    assert (
+        sum(statement.startswith("SELECT authors.") for statement in sql_statements)
+        == 1
+    )
+    assert db.session.get(Author, author_ids[0]) is not None
+    assert db.session.get(Salesperson, salesperson_id) is not None
@@ -89,6 +89,42 @@ def test_index_endpoint(db_w_cleanup, staged_app_client):
         )
 
 
+# Testing the POST /manuscripts endpoint
+def test_create_manuscript_endpoint(db_w_cleanup, staged_app_client):
+    db = db_w_cleanup
+    app, client = staged_app_client
+
+    editor_id = Genius.gen_editor_obj().editor_id
+    author_ids = [Genius.gen_author_obj().author_id for _ in range(2)]
+    manuscript_dict = Genius.gen_manuscript_dict(editor_id)
+    response = client.post(
+        "/manuscripts", json=dict(manuscript_dict, author_ids=author_ids)
+    )
+    DbBasedTester.test_manuscript_resp(response, manuscript_dict)
+    manuscript_id = response.get_json()["manuscript_id"]
+    assert sorted(
+        author_id
+        for author_id, _ in db.session.execute(
+            AuthorsManuscripts.select().where(
+                AuthorsManuscripts.c.manuscript_id == manuscript_id
+            )
+        )
+    ) == sorted(author_ids)
+
+    # Testing for 400 errors with no author_ids and an author_id that
+    # doesn't exist
+    response = client.post("/manuscripts", json=Genius.gen_manuscript_dict(editor_id))
+    assert response.status_code == 400, response.data.decode("utf8")
+    response = client.post(
+        "/manuscripts",
+        json=dict(
+            Genius.gen_manuscript_dict(editor_id), author_ids=[max(author_ids) + 1]
+        ),
+    )
+    assert response.status_code == 400, response.data.decode("utf8")
+    assert db.session.query(Manuscript).count() == 1
+
+
 # Testing the PATCH /manuscripts/<id> endpoint -- test 56 of 84
 def test_update_manuscript_by_id_endpoint(db_w_cleanup, staged_app_client):
     app, client = staged_app_client
@@ -0,0 +1,130 @@
+#!/usr/bin/python3
+
+import io
+import os
+
+import pytest
+from sqlalchemy import text
+
+from conftest import Genius
+
+import risuspubl.monthend
+from risuspubl.dbmodels import db
+from risuspubl.monthend import ensure_year_partition, import_month
+
+
+# Set environment variable for Flask's configuration
+os.environ["FLASK_ENV"] = "testing"
+# This should be set before creating the app instance.
+
+
+def _partition_counts():
+    return dict(
+        db.session.execute(
+            text(
+                "SELECT tableoid::regclass::text, count(*) FROM sales_records "
+                + "GROUP BY 1"
+            )
+        ).all()
+    )
+
+
+# Testing that creating a year's partition moves that year's rows out of
+# the default partition, and that a query for the year only scans it
+def test_ensure_year_partition(db_w_cleanup, staged_app_client):
+    app, client = staged_app_client
+
+    editor_obj = Genius.gen_editor_obj()
+    book_obj = Genius.gen_book_obj(editor_obj.editor_id)
+    sales_record_obj = Genius.gen_sales_record_obj(book_obj.book_id, 2015, 6)
+    assert _partition_counts() == {"sales_records_default": 1}
+
+    assert ensure_year_partition(2015) is True
+    assert ensure_year_partition(2015) is False
+    assert _partition_counts() == {"sales_records_y2015": 1}
+
+    query_plan = "\n".join(
+        db.session.execute(
+            text("EXPLAIN SELECT * FROM sales_records WHERE year = 2015")
+        ).scalars()
+    )
+    assert "sales_records_y2015" in query_plan
+    assert "sales_records_default" not in query_plan
+
+    response = client.get("/sales_records/years/2015")
+    assert response.status_code == 200, response.data.decode("utf8")
+    assert [jsobj["sales_record_id"] for jsobj in response.get_json()] == [
+        sales_record_obj.sales_record_id
+    ]
+
+
+# Testing that a month-end import creates the year's partition, loads
+# the rows into it and rolls the month up, and that a month can't be
+# imported twice
+def test_import_month(db_w_cleanup, staged_app_client):
+    app, client = staged_app_client
+
+    editor_obj = Genius.gen_editor_obj()
+    book_objs = [Genius.gen_book_obj(editor_obj.editor_id) for _ in range(2)]
+    csv_text = "book_id,year,month,copies_sold,gross_profit,net_profit\n" + "".join(
+        f"{book_obj.book_id},2016,3,{copies_sold},{copies_sold * 12.5},"
+        + f"{copies_sold * 1.25}\n"
+        for book_obj, copies_sold in zip(book_objs, (80, 90))
+    )
+
+    result = import_month(io.StringIO(csv_text))
+    assert result == dict(rows=2, created_partitions=[2016], rolled_up=[(2016, 3)])
+    assert _partition_counts() == {"sales_records_y2016": 2}
+
+    response = client.get("/sales_records/years/2016/months/3")
+    assert response.status_code == 200, response.data.decode("utf8")
+    assert len(response.get_json()) == 2
+    response = client.get(f"/sales_records/rollups/editors/{editor_obj.editor_id}")
+    assert response.status_code == 200, response.data.decode("utf8")
+    assert response.get_json() == [
+        dict(
+            editor_id=editor_obj.editor_id,
+            year=2016,
+            copies_sold=170,
+            gross_profit=2125.0,
+            net_profit=212.5,
+        )
+    ]
+
+    with pytest.raises(ValueError):
+        import_month(io.StringIO(csv_text))
+    with pytest.raises(ValueError):
+        import_month(io.StringIO("book_id,year,month,sales_record_id\n"))
+    with pytest.raises(ValueError):
+        import_month(
+            io.StringIO(
+                "book_id,copies_sold,gross_profit,net_profit\n"
+                + f"{book_objs[0].book_id},10,125.0,12.5\n"
+            )
+        )
+
+
+# Testing that a month-end import that fails while rolling up leaves
+# none of its rows loaded, so that it can be retried
+def test_import_month_failure(db_w_cleanup, staged_app_client, monkeypatch):
+    app, client = staged_app_client
+
+    editor_obj = Genius.gen_editor_obj()
+    book_obj = Genius.gen_book_obj(editor_obj.editor_id)
+    csv_text = (
+        "book_id,year,month,copies_sold,gross_profit,net_profit\n"
+        + f"{book_obj.book_id},2017,5,40,500.0,50.0\n"
+    )
+
+    def fail_roll_up_month(year, month):
+        raise RuntimeError("rollup failed")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(risuspubl.monthend, "roll_up_month", fail_roll_up_month)
+        with pytest.raises(RuntimeError):
+            import_month(io.StringIO(csv_text))
+    assert _partition_counts() == {}
+
+    result = import_month(io.StringIO(csv_text))
+    assert result == dict(rows=1, created_partitions=[], rolled_up=[(2017, 5)])
+    assert _partition_counts() == {"sales_records_y2017": 1}
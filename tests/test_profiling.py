@@ -0,0 +1,130 @@
+#!/usr/bin/python3
+
+import os
+import pstats
+import time
+
+from conftest import Genius
+
+import risuspubl.api.batch
+from risuspubl.profiling import SlowRequestSampler
+
+
+# Set environment variable for Flask's configuration
+os.environ["FLASK_ENV"] = "testing"
+# This should be set before creating the app instance.
+
+
+# Testing that sampled requests are profiled to rotated .pstats files,
+# and that slow requests are dumped as folded stacks
+def test_profiling(db_w_cleanup, staged_app_client, tmp_path):
+    app, client = staged_app_client
+
+    author_obj = Genius.gen_author_obj()
+    profile_config = dict(
+        PROFILE_ENABLED=True,
+        PROFILE_SAMPLE_EVERY=1,
+        PROFILE_DIR=str(tmp_path),
+        PROFILE_KEEP=2,
+    )
+    saved_config = {key: app.config[key] for key in profile_config}
+    app.config.update(profile_config)
+    try:
+        for _ in range(3):
+            response = client.get(f"/authors/{author_obj.author_id}")
+            assert response.status_code == 200, response.data.decode("utf8")
+        endpoint_dir = tmp_path / "authors.disp_auth_by_auid_endpt"
+        profile_paths = sorted(endpoint_dir.iterdir())
+        assert len(profile_paths) == 2
+        assert all(path.suffix == ".pstats" for path in profile_paths)
+        pstats.Stats(str(profile_paths[-1]))
+
+        # With cProfile sampling off and a 0ms threshold, every request is
+        # slow, and the sampler's stacks are written out.
+        app.config.update(
+            PROFILE_SAMPLE_EVERY=0,
+            PROFILE_SLOW_MS=0,
+            PROFILE_DIR=str(tmp_path / "slow"),
+        )
+        response = client.get(f"/authors/{author_obj.author_id}")
+        assert response.status_code == 200, response.data.decode("utf8")
+        # A request that finishes before the first sample leaves nothing
+        # to write, so the directory may not exist.
+        endpoint_dir = tmp_path / "slow" / "authors.disp_auth_by_auid_endpt"
+        for path in endpoint_dir.glob("*"):
+            assert path.suffix == ".folded"
+            for line in path.read_text().splitlines():
+                stack, count = line.rsplit(" ", 1)
+                assert int(count) >= 1
+    finally:
+        app.config.update(saved_config)
+        app.config["PROFILE_SLOW_MS"] = 1000
+
+
+# Testing that a POST /batch is profiled as one request, through to the
+# end, with its sub-requests inside its profile rather than their own
+def test_profiling_batch(db_w_cleanup, staged_app_client, tmp_path, monkeypatch):
+    app, client = staged_app_client
+
+    author_obj = Genius.gen_author_obj()
+    batch_json = dict(
+        requests=[dict(method="GET", path=f"/authors/{author_obj.author_id}")] * 2
+    )
+    profile_config = dict(
+        PROFILE_ENABLED=True,
+        PROFILE_SAMPLE_EVERY=1,
+        PROFILE_DIR=str(tmp_path),
+    )
+    saved_config = {key: app.config[key] for key in profile_config}
+    app.config.update(profile_config)
+    try:
+        response = client.post("/batch", json=batch_json)
+        assert response.status_code == 200, response.data.decode("utf8")
+        assert [path.name for path in tmp_path.iterdir()] == ["batch.batch_endpt"]
+        (profile_path,) = (tmp_path / "batch.batch_endpt").iterdir()
+        profile_stats = pstats.Stats(str(profile_path))
+        assert any(
+            function_name == "_serialize_sub_response"
+            for _, _, function_name in profile_stats.stats
+        )
+
+        # Serializing the sub-responses is made slow enough to be
+        # sampled, after the sub-requests have finished.
+        serialize_sub_response = risuspubl.api.batch._serialize_sub_response
+
+        def slow_serialize_sub_response(response):
+            time.sleep(0.05)
+            return serialize_sub_response(response)
+
+        monkeypatch.setattr(
+            risuspubl.api.batch, "_serialize_sub_response", slow_serialize_sub_response
+        )
+        app.config.update(
+            PROFILE_SAMPLE_EVERY=0,
+            PROFILE_SLOW_MS=0,
+            PROFILE_DIR=str(tmp_path / "slow"),
+        )
+        response = client.post("/batch", json=batch_json)
+        assert response.status_code == 200, response.data.decode("utf8")
+        assert [path.name for path in (tmp_path / "slow").iterdir()] == [
+            "batch.batch_endpt"
+        ]
+        (profile_path,) = (tmp_path / "slow" / "batch.batch_endpt").iterdir()
+        assert profile_path.suffix == ".folded"
+        assert "slow_serialize_sub_response" in profile_path.read_text()
+    finally:
+        app.config.update(saved_config)
+        app.config["PROFILE_SLOW_MS"] = 1000
+
+
+# Testing that the sampling profiler collects the stacks of a busy thread
+def test_slow_request_sampler():
+    sampler = SlowRequestSampler(0.001)
+    sampler.start_request()
+    deadline = time.perf_counter() + 0.1
+    while time.perf_counter() < deadline:
+        pass
+    stack_counts = sampler.finish_request()
+    assert sum(stack_counts.values()) >= 1
+    assert all("test_slow_request_sampler" in stack for stack in stack_counts)
+    assert sampler.finish_request() is None
@@ -0,0 +1,59 @@
+#!/usr/bin/python3
+
+import os
+import threading
+
+from conftest import Genius
+
+from risuspubl.prometheus import ThreadShardedDict
+
+
+# Set environment variable for Flask's configuration
+os.environ["FLASK_ENV"] = "testing"
+# This should be set before creating the app instance.
+
+
+# Testing GET /metrics after a request to another blueprint
+def test_prometheus_metrics(db_w_cleanup, staged_app_client):
+    app, client = staged_app_client
+
+    author_obj = Genius.gen_author_obj()
+    response = client.get(f"/authors/{author_obj.author_id}")
+    assert response.status_code == 200, response.data.decode("utf8")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200, response.data.decode("utf8")
+    assert response.content_type.startswith("text/plain; version=0.0.4")
+    exposition = response.data.decode("utf8")
+    labels = 'endpoint="authors.disp_auth_by_auid_endpt",method="GET"'
+    assert f'risuspubl_request_duration_seconds_bucket{{{labels},le="+Inf"}}' in (
+        exposition
+    )
+    assert f"risuspubl_response_size_bytes_count{{{labels}}}" in exposition
+    assert f"risuspubl_requests_in_flight{{{labels}}} 0" in exposition
+    assert 'risuspubl_db_pool_checked_out{bind="default"}' in exposition
+    assert "risuspubl_row_cache_misses_total" in exposition
+    assert 'risuspubl_sql_statements_total{endpoint="authors.' in exposition
+
+    # Only local clients are answered by default.
+    response = client.get("/metrics", environ_base={"REMOTE_ADDR": "192.0.2.1"})
+    assert response.status_code == 404
+
+
+# Testing that values written from several threads are all merged
+def test_thread_sharded_dict():
+    counters = ThreadShardedDict(
+        lambda: [0], lambda total, other: total.__setitem__(0, total[0] + other[0])
+    )
+
+    def count():
+        for _ in range(1000):
+            counters.value("key")[0] += 1
+
+    threads = [threading.Thread(target=count) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    counters.value("key")[0] += 1
+    assert counters.merged() == {"key": [4001]}
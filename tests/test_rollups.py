@@ -0,0 +1,123 @@
+#!/usr/bin/python3
+
+import os
+
+import pytest
+
+from conftest import Genius
+
+from risuspubl.dbmodels import SalesRecord, db
+from risuspubl.rollups import rebuild, refresh_month
+
+
+# Set environment variable for Flask's configuration
+os.environ["FLASK_ENV"] = "testing"
+# This should be set before creating the app instance.
+
+
+def _gen_month_of_sales_records(book_objs, year, month):
+    sales_record_objs = list()
+    for book_obj in book_objs:
+        sales_record_obj = SalesRecord(
+            **Genius.gen_sales_record_dict_by_pubdate(
+                book_obj.book_id, book_obj.publication_date, year, month
+            )
+        )
+        db.session.add(sales_record_obj)
+        sales_record_objs.append(sales_record_obj)
+    db.session.commit()
+    return sales_record_objs
+
+
+def _totals(sales_record_objs):
+    return dict(
+        copies_sold=sum(obj.copies_sold for obj in sales_record_objs),
+        gross_profit=pytest.approx(
+            float(sum(obj.gross_profit for obj in sales_record_objs))
+        ),
+        net_profit=pytest.approx(
+            float(sum(obj.net_profit for obj in sales_record_objs))
+        ),
+    )
+
+
+# Testing that refreshing month by month adds each month's sales to the
+# yearly rollups, and that they're displayed by the GET
+# /sales_records/rollups/... endpoints
+def test_rollups_refresh_month(db_w_cleanup, staged_app_client):
+    app, client = staged_app_client
+
+    editor_obj = Genius.gen_editor_obj()
+    series_obj = Genius.gen_series_obj()
+    book_objs = [
+        Genius.gen_book_obj(editor_obj.editor_id, series_obj.series_id)
+        for _ in range(2)
+    ]
+    book_id = book_objs[0].book_id
+    january_objs = _gen_month_of_sales_records(book_objs, 2020, 1)
+
+    assert refresh_month(2020, 1) is True
+    # A month that's already been rolled up isn't counted again.
+    assert refresh_month(2020, 1) is False
+    response = client.get(f"/sales_records/rollups/books/{book_id}")
+    assert response.status_code == 200, response.data.decode("utf8")
+    assert response.get_json() == [
+        dict(book_id=book_id, year=2020, **_totals(january_objs[:1]))
+    ]
+
+    february_objs = _gen_month_of_sales_records(book_objs, 2020, 2)
+    assert refresh_month(2020, 2) is True
+    all_objs = january_objs + february_objs
+
+    response = client.get(f"/sales_records/rollups/years/2020/books/{book_id}")
+    assert response.status_code == 200, response.data.decode("utf8")
+    assert response.get_json() == dict(
+        book_id=book_id, year=2020, **_totals(all_objs[::2])
+    )
+    response = client.get(
+        f"/sales_records/rollups/years/2020/series/{series_obj.series_id}"
+    )
+    assert response.status_code == 200, response.data.decode("utf8")
+    assert response.get_json() == dict(
+        series_id=series_obj.series_id, year=2020, **_totals(all_objs)
+    )
+    response = client.get(f"/sales_records/rollups/editors/{editor_obj.editor_id}")
+    assert response.status_code == 200, response.data.decode("utf8")
+    assert response.get_json() == [
+        dict(editor_id=editor_obj.editor_id, year=2020, **_totals(all_objs))
+    ]
+
+    # Testing for 404 errors when there are no rollups for the year or id
+    response = client.get(f"/sales_records/rollups/years/2019/books/{book_id}")
+    assert response.status_code == 404, response.data.decode("utf8")
+    response = client.get(f"/sales_records/rollups/series/{series_obj.series_id + 1}")
+    assert response.status_code == 404, response.data.decode("utf8")
+
+    with pytest.raises(ValueError):
+        refresh_month(2020, 13)
+
+
+# Testing that a rebuild from every sales record matches the rollups
+# built up month by month
+def test_rollups_rebuild(db_w_cleanup, staged_app_client):
+    app, client = staged_app_client
+
+    editor_obj = Genius.gen_editor_obj()
+    series_obj = Genius.gen_series_obj()
+    book_obj = Genius.gen_book_obj(editor_obj.editor_id, series_obj.series_id)
+    for year, month in ((2019, 12), (2020, 1), (2020, 2)):
+        _gen_month_of_sales_records([book_obj], year, month)
+        refresh_month(year, month)
+
+    rollup_paths = (
+        f"/sales_records/rollups/books/{book_obj.book_id}",
+        f"/sales_records/rollups/series/{series_obj.series_id}",
+        f"/sales_records/rollups/editors/{editor_obj.editor_id}",
+    )
+    refreshed_jsobjs = [client.get(path).get_json() for path in rollup_paths]
+    assert [jsobj["year"] for jsobj in refreshed_jsobjs[0]] == [2019, 2020]
+
+    rebuild()
+    assert [client.get(path).get_json() for path in rollup_paths] == refreshed_jsobjs
+    # The rebuild records every month it rolled up.
+    assert refresh_month(2020, 2) is False
@@ -30,6 +30,46 @@ def test_display_sales_record_endpoint(db_w_cleanup, staged_app_client):
     assert response.status_code == 404, response.data.decode("utf8")
 
 
+# Testing the multi-get, GET /sales_records?ids= and POST
+# /sales_records/ids, which across partitions outputs the rows in the
+# order of the ids
+def test_multi_get_sales_records_endpoint(db_w_cleanup, staged_app_client):
+    app, client = staged_app_client
+
+    editor_obj = Genius.gen_editor_obj()
+    book_obj = Genius.gen_book_obj(editor_obj.editor_id)
+    sales_record_objs_l = [
+        Genius.gen_sales_record_obj(book_obj.book_id, year, 6)
+        for year in (2019, 2021, 2020)
+    ]
+    sales_record_ids = [
+        sales_record_obj.sales_record_id for sales_record_obj in sales_record_objs_l
+    ]
+    bogus_sales_record_id = max(sales_record_ids) + 1000
+    response = client.get(
+        "/sales_records?ids="
+        + ",".join(map(str, [bogus_sales_record_id, *reversed(sales_record_ids)]))
+    )
+    assert response.status_code == 200, response.data.decode("utf8")
+    assert [
+        sales_record_jsobj["year"] for sales_record_jsobj in response.get_json()["rows"]
+    ] == [2020, 2021, 2019]
+    assert response.get_json()["missing"] == [bogus_sales_record_id]
+
+    response = client.post(
+        "/sales_records/ids?fields=copies_sold", json=dict(ids=sales_record_ids[:1])
+    )
+    assert response.status_code == 200, response.data.decode("utf8")
+    assert response.get_json() == dict(
+        rows=[dict(copies_sold=sales_record_objs_l[0].copies_sold)],
+        missing=[],
+    )
+
+    # Testing for a 400 error when GET /sales_records has no ids
+    response = client.get("/sales_records")
+    assert response.status_code == 400, response.data.decode("utf8")
+
+
 # Testing the GET /sales_records/books/<id> endpoint -- test 68 of 84
 def test_display_sales_records_by_book_id_endpoint(db_w_cleanup, staged_app_client):
     app, client = staged_app_client
@@ -0,0 +1,108 @@
+#!/usr/bin/python3
+
+import os
+
+from conftest import Genius
+
+from risuspubl.dbmodels import Book, Series, db
+
+
+# Set environment variable for Flask's configuration
+os.environ["FLASK_ENV"] = "testing"
+# This should be set before creating the app instance.
+
+
+def _gen_book_obj_titled(title):
+    book_obj = Book(**dict(Genius.gen_book_dict(), title=title))
+    db.session.add(book_obj)
+    db.session.commit()
+    return book_obj
+
+
+# Testing the GET /search/books endpoint: matching whole words and
+# partial words, pagination, and parameter validation
+def test_search_books_endpoint(db_w_cleanup, staged_app_client):
+    app, client = staged_app_client
+
+    messiah_obj = _gen_book_obj_titled("Dune Messiah")
+    winds_obj = _gen_book_obj_titled("The Winds of Dune")
+    _gen_book_obj_titled("Children of Time")
+
+    response = client.get("/search/books?q=dune")
+    assert response.status_code == 200, response.data.decode("utf8")
+    assert {book_jsobj["book_id"] for book_jsobj in response.get_json()} == {
+        messiah_obj.book_id,
+        winds_obj.book_id,
+    }
+    assert "Link" not in response.headers
+
+    response = client.get("/search/books?q=Messi")
+    assert response.status_code == 200, response.data.decode("utf8")
+    assert response.get_json() == [messiah_obj.serialize()]
+
+    # Paging through the two results one at a time, following the Link
+    # header.
+    response = client.get("/search/books?q=dune&per_page=1")
+    assert response.status_code == 200, response.data.decode("utf8")
+    (first_jsobj,) = response.get_json()
+    next_url = response.headers["Link"].split(">")[0].lstrip("<")
+    assert "page=2" in next_url
+    response = client.get(next_url)
+    assert response.status_code == 200, response.data.decode("utf8")
+    (second_jsobj,) = response.get_json()
+    assert {first_jsobj["book_id"], second_jsobj["book_id"]} == {
+        messiah_obj.book_id,
+        winds_obj.book_id,
+    }
+    assert "Link" not in response.headers
+
+    # LIKE wildcards in the query are matched literally.
+    response = client.get("/search/books?q=%25")
+    assert response.status_code == 200, response.data.decode("utf8")
+    assert response.get_json() == []
+
+    # Testing for 400 errors with a missing query and too large a page
+    response = client.get("/search/books")
+    assert response.status_code == 400, response.data.decode("utf8")
+    response = client.get("/search/books?q=dune&per_page=1000")
+    assert response.status_code == 400, response.data.decode("utf8")
+
+
+# Testing the GET /search/authors endpoint, which matches names and
+# biographies, and the GET /search endpoint across every type
+def test_search_authors_and_all_endpoints(db_w_cleanup, staged_app_client):
+    app, client = staged_app_client
+
+    author_obj = Genius.gen_author_obj()
+    metadata_obj = Genius.gen_metadata_obj(author_obj.author_id)
+    metadata_obj.biography = "Grew up among lighthouse keepers on a windswept coast."
+    db.session.commit()
+    other_author_obj = Genius.gen_author_obj()
+
+    response = client.get("/search/authors?q=lighthouses")
+    assert response.status_code == 200, response.data.decode("utf8")
+    assert response.get_json() == [author_obj.serialize()]
+
+    response = client.get(f"/search/authors?q={other_author_obj.last_name}")
+    assert response.status_code == 200, response.data.decode("utf8")
+    assert other_author_obj.author_id in {
+        author_jsobj["author_id"] for author_jsobj in response.get_json()
+    }
+
+    series_obj = Series(**dict(Genius.gen_series_dict(), title="Lighthouse Trilogy"))
+    db.session.add(series_obj)
+    db.session.commit()
+    book_obj = _gen_book_obj_titled("The Lighthouse")
+
+    response = client.get("/search?q=lighthouse")
+    assert response.status_code == 200, response.data.decode("utf8")
+    results = response.get_json()
+    assert {(result["type"], result["id"]) for result in results} == {
+        ("authors", author_obj.author_id),
+        ("books", book_obj.book_id),
+        ("series", series_obj.series_id),
+    }
+    ranks = [result["rank"] for result in results]
+    assert ranks == sorted(ranks, reverse=True)
+    (book_result,) = (result for result in results if result["type"] == "books")
+    assert book_result["record"] == book_obj.serialize()
@@ -0,0 +1,60 @@
+#!/usr/bin/python3
+
+import os
+
+import pytest
+
+from conftest import Genius
+
+from risuspubl.sqlstats import RequestSqlStats
+
+
+# Set environment variable for Flask's configuration
+os.environ["FLASK_ENV"] = "testing"
+# This should be set before creating the app instance.
+
+
+# Testing the Server-Timing header and the per-endpoint SQL totals in
+# GET /_metrics
+def test_sql_statement_counting(db_w_cleanup, staged_app_client):
+    app, client = staged_app_client
+
+    Genius.gen_author_obj()
+
+    # GET /authors always queries the table, whereas a row lookup by id can
+    # be answered from the session's identity map without any SQL.
+    response = client.get("/authors")
+    assert response.status_code == 200, response.data.decode("utf8")
+    server_timing = response.headers["Server-Timing"]
+    assert server_timing.startswith("db;dur=")
+    assert "db-slowest;dur=" in server_timing
+
+    response = client.get("/_metrics")
+    assert response.status_code == 200, response.data.decode("utf8")
+    endpoint_totals = response.get_json()["sql"]["authors.index_endpt"]
+    assert endpoint_totals["requests"] >= 1
+    assert endpoint_totals["statements"] >= 1
+    assert endpoint_totals["slowest_statement"].startswith("SELECT")
+
+    # Only local clients are answered by default.
+    response = client.get("/_metrics", environ_base={"REMOTE_ADDR": "192.0.2.1"})
+    assert response.status_code == 404
+    app.config["METRICS_ALLOW_REMOTE"] = True
+    try:
+        response = client.get("/_metrics", environ_base={"REMOTE_ADDR": "192.0.2.1"})
+        assert response.status_code == 200, response.data.decode("utf8")
+    finally:
+        app.config["METRICS_ALLOW_REMOTE"] = False
+
+
+# Testing that savepoints are counted and timed, but never taken for the
+# slowest statement (the tests' requests all run inside one)
+def test_request_sql_stats_skips_savepoints():
+    request_stats = RequestSqlStats()
+    request_stats.record("SELECT authors.author_id FROM authors", 0.001)
+    request_stats.record("SAVEPOINT sa_savepoint_1", 0.5)
+    request_stats.record("RELEASE SAVEPOINT sa_savepoint_1", 0.5)
+    assert request_stats.statement_count == 3
+    assert request_stats.total_seconds == pytest.approx(1.001)
+    assert request_stats.slowest_statement.startswith("SELECT")
+    assert request_stats.slowest_seconds == 0.001